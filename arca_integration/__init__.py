@@ -1,10 +1,16 @@
-from .client import ArcaClient
-from .exceptions import ArcaError, ArcaAuthError, ArcaValidationError, ArcaNetworkError
+from .client import ArcaClient, registrar_observador
+from .exceptions import ArcaError, ArcaAuthError, ArcaValidationError, ArcaNetworkError, ArcaLimiteError
+from .limitador import LimitadorArca, LimiteServicio, configurar_limitador
 
 __all__ = [
     'ArcaClient',
+    'registrar_observador',
     'ArcaError',
     'ArcaAuthError',
     'ArcaValidationError',
     'ArcaNetworkError',
+    'ArcaLimiteError',
+    'LimitadorArca',
+    'LimiteServicio',
+    'configurar_limitador',
 ]
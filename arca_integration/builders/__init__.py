@@ -1,3 +1,3 @@
-from .factura_builder import FacturaBuilder
+from .factura_builder import FacturaBuilder, build_caea_informe
 
-__all__ = ['FacturaBuilder']
+__all__ = ['FacturaBuilder', 'build_caea_informe']
@@ -268,3 +268,34 @@ class FacturaBuilder:
                 }
             }
         }
+
+
+def build_caea_informe(punto_venta: int, tipo_cbte: int, caea: str, det_requests: List[dict]) -> dict:
+    """
+    Arma el request de FECAEARegInformativo a partir de detalles generados por
+    FacturaBuilder.build() (FECAEDetRequest), agregando el CAEA a cada uno.
+
+    Todos los detalles deben compartir punto de venta y tipo de comprobante.
+    """
+    if not det_requests:
+        raise ArcaValidationError('No hay comprobantes para informar')
+    if not caea:
+        raise ArcaValidationError('CAEA requerido para informar comprobantes')
+
+    detalles = sorted(
+        ({**det, 'CAEA': str(caea)} for det in det_requests),
+        key=lambda det: int(det['CbteDesde']),
+    )
+
+    return {
+        'FeCAEARegInfReq': {
+            'FeCabReq': {
+                'CantReg': len(detalles),
+                'PtoVta': punto_venta,
+                'CbteTipo': tipo_cbte,
+            },
+            'FeDetReq': {
+                'FECAEADetRequest': detalles,
+            },
+        }
+    }
@@ -10,8 +10,8 @@ import os
 import ssl
 import logging
 import importlib
-from contextlib import contextmanager
-from typing import Optional
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Optional
 from datetime import date, datetime
 from decimal import Decimal
 
@@ -35,12 +35,48 @@ import arca_arg.auth as arca_auth
 import arca_arg.webservice as arca_ws
 from arca_arg.webservice import ArcaWebService
 from arca_arg.settings import WSDL_FEV1_HOM, WSDL_FEV1_PROD, WSDL_CONSTANCIA_HOM, WSDL_CONSTANCIA_PROD
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout as RequestsTimeout
+from zeep.exceptions import Fault, TransportError
 
-from .exceptions import ArcaError, ArcaAuthError
+from .exceptions import ArcaError, ArcaAuthError, ArcaLimiteError
+from .limitador import limitador_actual
 
 
 logger = logging.getLogger(__name__)
 
+# Funciones llamadas tras cada operación SOAP con
+# (servicio, metodo, resultado, duracion_segundos, ambiente).
+_observadores: list[Callable[[str, str, str, float, str], None]] = []
+
+
+def registrar_observador(observador: Callable[[str, str, str, float, str], None]) -> None:
+    """Registra un observador de llamadas SOAP (métricas, trazas)."""
+    if observador not in _observadores:
+        _observadores.append(observador)
+
+
+def _clasificar_error(exc: Exception) -> str:
+    """``fault``, ``ta_valido``, ``timeout``, ``conexion`` (transporte) o ``error``.
+
+    ``error`` queda para lo que falla de este lado: validación de zeep,
+    certificado o firma del TRA, etc.
+    """
+    if isinstance(exc, Fault):
+        return 'fault'
+    mensaje = str(exc).lower()
+    if 'ya posee un ta valido' in mensaje or 'ya posee un ta válido' in mensaje:
+        return 'ta_valido'
+    if isinstance(exc, (TimeoutError, RequestsTimeout)) or 'timed out' in mensaje or 'timeout' in mensaje:
+        return 'timeout'
+    if isinstance(exc, (ConnectionError, RequestsConnectionError, TransportError)):
+        return 'conexion'
+    return 'error'
+
+
+def simulador_url() -> Optional[str]:
+    """URL del simulador de ARCA definida en ``ARCA_SIMULADOR_URL`` (o None)."""
+    return (os.getenv('ARCA_SIMULADOR_URL') or '').strip().rstrip('/') or None
+
 
 class ArcaClient:
     """
@@ -67,6 +103,16 @@ class ArcaClient:
         self.verbose_include_raw = os.getenv('ARCA_VERBOSE_INCLUDE_RAW', 'false').strip().lower() == 'true'
         flask_env = (os.getenv('FLASK_ENV', 'development') or 'development').strip().lower()
         self.environment = 'dev' if flask_env.startswith('dev') else ('prod' if flask_env.startswith('prod') else flask_env)
+        # URL base del simulador local (python -m arca_integration.simulador).
+        # Si está definida, WSAA, WSFE y padrón apuntan al simulador; nunca en
+        # producción, donde un CAE del simulador quedaría como autorizado.
+        self.simulador_url = simulador_url()
+        if self.simulador_url and (self.is_production or self.environment == 'prod'):
+            logger.error(
+                'ARCA_SIMULADOR_URL ignorada (ambiente=%s, FLASK_ENV=%s): se usa ARCA real',
+                self.ambiente, flask_env,
+            )
+            self.simulador_url = None
 
         self._temp_dir = tempfile.mkdtemp()
         self._cert_path = os.path.join(self._temp_dir, 'cert.pem')
@@ -75,7 +121,8 @@ class ArcaClient:
         # Cache estable de TA por CUIT/ambiente para evitar pedir login WSAA
         # en cada emisión (evita errores como "ya posee un TA válido").
         ta_cache_root = os.getenv('ARCA_TA_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'arca_ta_cache')
-        ta_base_dir = os.path.join(ta_cache_root, self.ambiente, self.cuit)
+        ta_ambiente = f'{self.ambiente}-simulador' if self.simulador_url else self.ambiente
+        ta_base_dir = os.path.join(ta_cache_root, ta_ambiente, self.cuit)
         os.makedirs(ta_base_dir, exist_ok=True)
         if not ta_base_dir.endswith(os.sep):
             ta_base_dir = ta_base_dir + os.sep
@@ -106,6 +153,8 @@ class ArcaClient:
         arca_auth.TA_FILES_PATH = self._ta_path
         arca_auth.PROD = self.is_production
         arca_auth.WSDL_WSAA = arca_settings.WSDL_WSAA_PROD if self.is_production else arca_settings.WSDL_WSAA_HOM
+        if self.simulador_url:
+            arca_auth.WSDL_WSAA = f'{self.simulador_url}/ws/services/LoginCms?wsdl'
 
         arca_ws.CUIT = self.cuit
 
@@ -118,6 +167,8 @@ class ArcaClient:
         """Obtiene o crea la instancia de WSFE (Factura Electrónica)."""
         if self._wsfe is None:
             wsdl = WSDL_FEV1_PROD if self.is_production else WSDL_FEV1_HOM
+            if self.simulador_url:
+                wsdl = f'{self.simulador_url}/wsfev1/service.asmx?WSDL'
             self._wsfe = self._create_webservice_with_ta_fallback(
                 wsdl=wsdl,
                 service='wsfe',
@@ -130,6 +181,8 @@ class ArcaClient:
         """Obtiene o crea la instancia del servicio de Constancia de Inscripción (padrón)."""
         if self._ws_constancia is None:
             wsdl = WSDL_CONSTANCIA_PROD if self.is_production else WSDL_CONSTANCIA_HOM
+            if self.simulador_url:
+                wsdl = f'{self.simulador_url}/sr-padron/webservices/personaServiceA5?wsdl'
             self._ws_constancia = self._create_webservice_with_ta_fallback(
                 wsdl=wsdl,
                 service='ws_sr_constancia_inscripcion',
@@ -147,20 +200,24 @@ class ArcaClient:
             self._ensure_settings()
 
             for attempt in range(3):
+                # Sin TA local válido, crear el webservice implica un loginCms contra WSAA.
+                metodo = 'init' if self._has_valid_local_ta(service) else 'loginCms'
                 try:
-                    return ArcaWebService(wsdl, service, enable_logging=False)
+                    with self._medir_llamada('wsaa', metodo):
+                        return ArcaWebService(wsdl, service, enable_logging=False)
+                except ArcaLimiteError:
+                    raise
                 except Exception as e:
                     message = str(e)
                     lowered = self._normalize_wsaa_message(message)
 
                     if 'ya posee un ta valido' in lowered and attempt < 2:
-                        # Otro proceso puede haber emitido TA válido recién.
-                        # Reintentar reutilizando cache local.
-                        time.sleep(attempt + 1)
+                        # Otro proceso puede haber emitido TA válido recién:
+                        # si ya está en el cache local se reintenta con él.
+                        # Si no, no se espera acá; el llamador reprograma.
                         self._ensure_settings()
                         if self._has_valid_local_ta(service):
                             continue
-                        continue
 
                     raise ArcaAuthError(f'{error_prefix}: {message}')
 
@@ -253,16 +310,7 @@ class ArcaClient:
                 'CbteTipo': tipo_cbte,
             }
 
-            request_started = time.perf_counter()
-            self._log_ws_request('FECompUltimoAutorizado', 'wsfe', data)
-            result = ws.send_request('FECompUltimoAutorizado', data)
-            self._log_ws_response(
-                'FECompUltimoAutorizado',
-                'wsfe',
-                result,
-                'raw',
-                duration_ms=(time.perf_counter() - request_started) * 1000,
-            )
+            result = self._send_ws_request(ws, 'FECompUltimoAutorizado', 'wsfe', data)
             return result.CbteNro
         except ArcaError:
             raise
@@ -312,17 +360,7 @@ class ArcaClient:
                 }
             }
 
-            request_started = time.perf_counter()
-            self._log_ws_request('FECAESolicitar', 'wsfe', data)
-
-            result = ws.send_request('FECAESolicitar', data)
-            self._log_ws_response(
-                'FECAESolicitar',
-                'wsfe',
-                result,
-                'raw',
-                duration_ms=(time.perf_counter() - request_started) * 1000,
-            )
+            result = self._send_ws_request(ws, 'FECAESolicitar', 'wsfe', data)
 
             parsed_response = self._parse_cae_response(result)
             self._log_ws_response('FECAESolicitar', 'wsfe', parsed_response, 'parsed')
@@ -362,16 +400,7 @@ class ArcaClient:
                 }
             }
 
-            request_started = time.perf_counter()
-            self._log_ws_request('FECompConsultar', 'wsfe', data)
-            result = ws.send_request('FECompConsultar', data)
-            self._log_ws_response(
-                'FECompConsultar',
-                'wsfe',
-                result,
-                'raw',
-                duration_ms=(time.perf_counter() - request_started) * 1000,
-            )
+            result = self._send_ws_request(ws, 'FECompConsultar', 'wsfe', data)
 
             if hasattr(result, 'ResultGet') and result.ResultGet:
                 cbte = result.ResultGet
@@ -405,6 +434,221 @@ class ArcaClient:
         except Exception as e:
             raise ArcaError(f'Error al consultar comprobante: {str(e)}')
 
+    def fecaea_solicitar(self, periodo: int, orden: int) -> dict:
+        """
+        Solicita el CAEA de una quincena (FECAEASolicitar).
+
+        Args:
+            periodo: Período YYYYMM
+            orden: 1 (días 1 a 15) o 2 (días 16 a fin de mes)
+
+        Returns:
+            Datos del CAEA otorgado (o errores de ARCA si no se otorgó)
+        """
+        return self._send_caea_request('FECAEASolicitar', periodo, orden, 'Error al solicitar CAEA')
+
+    def fecaea_consultar(self, periodo: int, orden: int) -> dict:
+        """
+        Consulta un CAEA ya otorgado (FECAEAConsultar).
+
+        Args:
+            periodo: Período YYYYMM
+            orden: 1 o 2
+
+        Returns:
+            Datos del CAEA (o errores de ARCA si no existe)
+        """
+        return self._send_caea_request('FECAEAConsultar', periodo, orden, 'Error al consultar CAEA')
+
+    def _send_caea_request(self, method_name: str, periodo: int, orden: int, error_prefix: str) -> dict:
+        try:
+            self._ensure_settings()
+            ws = self.wsfe
+
+            auth = ws.get_type('FEAuthRequest')
+            auth['Token'] = ws.token
+            auth['Sign'] = ws.sign
+            auth['Cuit'] = ws.cuit
+
+            data = {
+                'Auth': auth,
+                'Periodo': int(periodo),
+                'Orden': int(orden),
+            }
+
+            result = self._send_ws_request(ws, method_name, 'wsfe', data)
+
+            parsed_response = self._parse_caea_response(result)
+            self._log_ws_response(method_name, 'wsfe', parsed_response, 'parsed')
+            return parsed_response
+        except ArcaError:
+            raise
+        except Exception as e:
+            raise ArcaError(f'{error_prefix}: {str(e)}')
+
+    def fecaea_reg_informativo(self, request_data: dict) -> dict:
+        """
+        Informa comprobantes emitidos con CAEA (FECAEARegInformativo).
+
+        Args:
+            request_data: Estructura generada por build_caea_informe():
+                {
+                    'FeCAEARegInfReq': {
+                        'FeCabReq': { 'CantReg': N, 'PtoVta': 1, 'CbteTipo': 1 },
+                        'FeDetReq': { 'FECAEADetRequest': [ { ... }, ... ] }
+                    }
+                }
+
+        Returns:
+            Resultado general y detalle por número de comprobante
+        """
+        try:
+            self._ensure_settings()
+            ws = self.wsfe
+
+            auth = ws.get_type('FEAuthRequest')
+            auth['Token'] = ws.token
+            auth['Sign'] = ws.sign
+            auth['Cuit'] = ws.cuit
+
+            data = {
+                'Auth': auth,
+                'FeCAEARegInfReq': request_data['FeCAEARegInfReq'],
+            }
+
+            result = self._send_ws_request(ws, 'FECAEARegInformativo', 'wsfe', data)
+
+            parsed_response = self._parse_caea_informe_response(result)
+            self._log_ws_response('FECAEARegInformativo', 'wsfe', parsed_response, 'parsed')
+            return parsed_response
+        except ArcaError:
+            raise
+        except Exception as e:
+            raise ArcaError(f'Error al informar comprobantes CAEA: {str(e)}')
+
+    def fe_param_get_tipos_cbte(self) -> list[dict]:
+        """Tipos de comprobante habilitados (FEParamGetTiposCbte)."""
+        return self._param_get_lista('FEParamGetTiposCbte', 'CbteTipo')
+
+    def fe_param_get_tipos_iva(self) -> list[dict]:
+        """Alícuotas de IVA (FEParamGetTiposIva)."""
+        return self._param_get_lista('FEParamGetTiposIva', 'IvaTipo')
+
+    def fe_param_get_tipos_doc(self) -> list[dict]:
+        """Tipos de documento (FEParamGetTiposDoc)."""
+        return self._param_get_lista('FEParamGetTiposDoc', 'DocTipo')
+
+    def fe_param_get_tipos_monedas(self) -> list[dict]:
+        """Monedas (FEParamGetTiposMonedas)."""
+        return self._param_get_lista('FEParamGetTiposMonedas', 'Moneda')
+
+    def fe_param_get_condicion_iva_receptor(self, clase_cmp: Optional[str] = None) -> list[dict]:
+        """Condiciones de IVA del receptor, opcionalmente por clase de comprobante."""
+        params = {'ClaseCmp': clase_cmp} if clase_cmp else None
+        return self._param_get_lista('FEParamGetCondicionIvaReceptor', 'CondicionIvaReceptor', params)
+
+    def fe_param_get_ptos_venta(self) -> list[dict]:
+        """
+        Puntos de venta habilitados para el CUIT (FEParamGetPtosVenta).
+
+        Returns:
+            Lista de {'nro', 'emision_tipo', 'bloqueado', 'fch_baja'}
+        """
+        items = self._param_get_raw('FEParamGetPtosVenta', 'PtoVenta')
+        return [
+            {
+                'nro': int(getattr(item, 'Nro', 0) or 0),
+                'emision_tipo': getattr(item, 'EmisionTipo', None),
+                'bloqueado': str(getattr(item, 'Bloqueado', 'N') or 'N').upper() == 'S',
+                'fch_baja': self._fecha_param(getattr(item, 'FchBaja', None)),
+            }
+            for item in items
+        ]
+
+    def fe_param_get_cotizacion(self, mon_id: str, fch_cotiz: Optional[str] = None) -> dict:
+        """
+        Cotización de una moneda (FEParamGetCotizacion).
+
+        Args:
+            mon_id: Código de moneda ARCA (DOL, 060, ...)
+            fch_cotiz: Fecha YYYYMMDD (opcional, por defecto la última)
+
+        Returns:
+            {'mon_id', 'mon_cotiz', 'fch_cotiz'}
+        """
+        params = {'MonId': mon_id}
+        if fch_cotiz:
+            params['FchCotiz'] = fch_cotiz
+
+        result = self._send_param_request('FEParamGetCotizacion', params)
+        cotizacion = getattr(result, 'ResultGet', None)
+        if not cotizacion or getattr(cotizacion, 'MonCotiz', None) is None:
+            errores = self._parse_ws_messages(getattr(result, 'Errors', None), 'Err')
+            detalle = '; '.join(e.get('msg', '') for e in errores if e.get('msg'))
+            raise ArcaError(f'ARCA no informó cotización para {mon_id}' + (f': {detalle}' if detalle else ''))
+
+        return {
+            'mon_id': getattr(cotizacion, 'MonId', None) or mon_id,
+            'mon_cotiz': float(cotizacion.MonCotiz),
+            'fch_cotiz': self._fecha_param(getattr(cotizacion, 'FchCotiz', None)),
+        }
+
+    def _param_get_lista(self, method_name: str, item_attr: str, params: Optional[dict] = None) -> list[dict]:
+        items = self._param_get_raw(method_name, item_attr, params)
+        parsed = []
+        for item in items:
+            entry = {
+                'id': getattr(item, 'Id', None),
+                'desc': getattr(item, 'Desc', None),
+                'fch_desde': self._fecha_param(getattr(item, 'FchDesde', None)),
+                'fch_hasta': self._fecha_param(getattr(item, 'FchHasta', None)),
+            }
+            if getattr(item, 'Cmp_Clase', None) is not None:
+                entry['cmp_clase'] = item.Cmp_Clase
+            parsed.append(entry)
+        return parsed
+
+    def _param_get_raw(self, method_name: str, item_attr: str, params: Optional[dict] = None) -> list:
+        result = self._send_param_request(method_name, params)
+        container = getattr(result, 'ResultGet', None)
+        items = getattr(container, item_attr, None) if container else None
+        if items is None:
+            errores = self._parse_ws_messages(getattr(result, 'Errors', None), 'Err')
+            # 602: "Sin Resultados" no es un error para una consulta de parámetros.
+            errores = [e for e in errores if str(e.get('code')) != '602']
+            if errores:
+                detalle = '; '.join(f"{e.get('code')}: {e.get('msg')}" for e in errores)
+                raise ArcaError(f'Error en {method_name}: {detalle}')
+            return []
+        return items if isinstance(items, list) else [items]
+
+    def _send_param_request(self, method_name: str, params: Optional[dict] = None):
+        try:
+            self._ensure_settings()
+            ws = self.wsfe
+
+            auth = ws.get_type('FEAuthRequest')
+            auth['Token'] = ws.token
+            auth['Sign'] = ws.sign
+            auth['Cuit'] = ws.cuit
+
+            data = {'Auth': auth, **(params or {})}
+
+            result = self._send_ws_request(ws, method_name, 'wsfe', data)
+            return result
+        except ArcaError:
+            raise
+        except Exception as e:
+            raise ArcaError(f'Error al consultar parámetros ({method_name}): {str(e)}')
+
+    def _fecha_param(self, value) -> Optional[str]:
+        if not value or str(value).upper() == 'NULL':
+            return None
+        raw = str(value)
+        if len(raw) == 8 and raw.isdigit():
+            return f'{raw[:4]}-{raw[4:6]}-{raw[6:8]}'
+        return raw
+
     def consultar_padron(self, cuit_consulta: str) -> dict:
         """
         Consulta el padrón de ARCA para obtener datos de un contribuyente.
@@ -421,7 +665,8 @@ class ArcaClient:
 
             cuit_int = int(cuit_consulta.replace('-', ''))
             if hasattr(ws, 'get_persona'):
-                result = ws.get_persona(cuit_int)
+                with self._medir_llamada('padron', 'getPersona_v2'):
+                    result = ws.get_persona(cuit_int)
             else:
                 data = {
                     'token': ws.token,
@@ -429,23 +674,30 @@ class ArcaClient:
                     'cuitRepresentada': ws.cuit,
                     'idPersona': cuit_int,
                 }
-                result = ws.send_request('getPersona_v2', data)
+                result = self._send_ws_request(ws, 'getPersona_v2', 'padron', data)
 
-            if hasattr(result, 'personaReturn') and result.personaReturn:
-                persona = result.personaReturn
-                nombre = getattr(persona, 'nombre', '') or ''
-                apellido = getattr(persona, 'apellido', '') or ''
+            # zeep desenvuelve getPersona_v2Response cuando personaReturn es su único hijo.
+            persona = result.personaReturn if hasattr(result, 'personaReturn') else result
+            if persona:
+                dg = getattr(persona, 'datosGenerales', None)
+                nombre = getattr(persona, 'nombre', None) or getattr(dg, 'nombre', '') or ''
+                apellido = getattr(persona, 'apellido', None) or getattr(dg, 'apellido', '') or ''
 
                 if apellido and nombre:
                     razon_social = f'{apellido}, {nombre}'
                 elif nombre:
                     razon_social = nombre
                 else:
-                    razon_social = getattr(persona, 'razonSocial', '') or str(cuit_consulta)
+                    razon_social = (
+                        getattr(persona, 'razonSocial', None)
+                        or getattr(dg, 'razonSocial', None)
+                        or str(cuit_consulta)
+                    )
 
                 direccion = None
-                if hasattr(persona, 'domicilio') and persona.domicilio:
-                    dom = persona.domicilio[0] if isinstance(persona.domicilio, list) else persona.domicilio
+                domicilio = getattr(persona, 'domicilio', None) or getattr(dg, 'domicilioFiscal', None)
+                if domicilio:
+                    dom = domicilio[0] if isinstance(domicilio, list) else domicilio
                     direccion = self._format_domicilio(dom)
 
                 condicion_iva = None
@@ -474,6 +726,8 @@ class ArcaClient:
         except ArcaError:
             raise
         except Exception as e:
+            if 'no existe persona' in self._normalize_wsaa_message(str(e)):
+                return {'success': False, 'error': 'Persona no encontrada'}
             raise ArcaError(f'Error al consultar padrón: {str(e)}')
 
     def _parse_cae_response(self, result) -> dict:
@@ -523,6 +777,114 @@ class ArcaClient:
 
         return response
 
+    def _parse_caea_response(self, result) -> dict:
+        """Parsea la respuesta de FECAEASolicitar / FECAEAConsultar."""
+        response = {
+            'caea': None,
+            'periodo': None,
+            'orden': None,
+            'fch_vig_desde': None,
+            'fch_vig_hasta': None,
+            'fch_tope_inf': None,
+            'observaciones': [],
+            'errores': self._parse_ws_messages(getattr(result, 'Errors', None), 'Err'),
+        }
+
+        cbte = getattr(result, 'ResultGet', None)
+        if cbte:
+            response['caea'] = str(cbte.CAEA) if getattr(cbte, 'CAEA', None) else None
+            response['periodo'] = getattr(cbte, 'Periodo', None)
+            response['orden'] = getattr(cbte, 'Orden', None)
+            response['fch_vig_desde'] = str(cbte.FchVigDesde) if getattr(cbte, 'FchVigDesde', None) else None
+            response['fch_vig_hasta'] = str(cbte.FchVigHasta) if getattr(cbte, 'FchVigHasta', None) else None
+            response['fch_tope_inf'] = str(cbte.FchTopeInf) if getattr(cbte, 'FchTopeInf', None) else None
+            response['observaciones'] = self._parse_ws_messages(getattr(cbte, 'Observaciones', None), 'Obs')
+
+        return response
+
+    def _parse_caea_informe_response(self, result) -> dict:
+        """Parsea la respuesta de FECAEARegInformativo."""
+        response = {
+            'resultado': None,
+            'detalles': [],
+            'errores': self._parse_ws_messages(getattr(result, 'Errors', None), 'Err'),
+        }
+
+        cab = getattr(result, 'FeCabResp', None)
+        if cab:
+            response['resultado'] = getattr(cab, 'Resultado', None)
+
+        det_resp = getattr(result, 'FeDetResp', None)
+        det_list = getattr(det_resp, 'FECAEADetResponse', None) if det_resp else None
+        if det_list:
+            if not isinstance(det_list, list):
+                det_list = [det_list]
+            for det in det_list:
+                response['detalles'].append({
+                    'numero_comprobante': getattr(det, 'CbteDesde', None),
+                    'resultado': getattr(det, 'Resultado', None),
+                    'caea': str(det.CAEA) if getattr(det, 'CAEA', None) else None,
+                    'observaciones': self._parse_ws_messages(getattr(det, 'Observaciones', None), 'Obs'),
+                })
+
+        return response
+
+    def _parse_ws_messages(self, container, item_attr: str) -> list[dict]:
+        if not container:
+            return []
+
+        items = getattr(container, item_attr, container)
+        if not items:
+            return []
+        if not isinstance(items, list):
+            items = [items]
+
+        return [
+            {'code': getattr(item, 'Code', None), 'msg': getattr(item, 'Msg', '')}
+            for item in items
+        ]
+
+    @contextmanager
+    def _medir_llamada(self, servicio: str, metodo: str):
+        """Mide una operación y la informa a los observadores registrados.
+
+        Antes pasa por el limitador de tasa configurado (clave CUIT, ambiente
+        y servicio); la espera no cuenta en la duración ni en los observadores.
+        """
+        limitador = limitador_actual()
+        if (servicio, metodo) == ('wsaa', 'init'):
+            # Reutiliza el TA local: no hay llamada a WSAA que limitar.
+            limitador = None
+        with limitador.llamada(self.cuit, self.ambiente, servicio) if limitador else nullcontext():
+            started = time.perf_counter()
+            resultado = 'ok'
+            try:
+                yield
+            except Exception as exc:
+                resultado = _clasificar_error(exc)
+                raise
+            finally:
+                duracion = time.perf_counter() - started
+                for observador in _observadores:
+                    try:
+                        observador(servicio, metodo, resultado, duracion, self.ambiente)
+                    except Exception:
+                        logger.debug('Observador de llamadas ARCA falló', exc_info=True)
+
+    def _send_ws_request(self, ws: ArcaWebService, method_name: str, wsid: str, data: dict):
+        request_started = time.perf_counter()
+        self._log_ws_request(method_name, wsid, data)
+        with self._medir_llamada(wsid, method_name):
+            result = ws.send_request(method_name, data)
+        self._log_ws_response(
+            method_name,
+            wsid,
+            result,
+            'raw',
+            duration_ms=(time.perf_counter() - request_started) * 1000,
+        )
+        return result
+
     def _log_ws_request(self, method_name: str, wsid: str, params: dict):
         if not self.verbose_logs:
             return
@@ -16,3 +16,8 @@ class ArcaValidationError(ArcaError):
 class ArcaNetworkError(ArcaError):
     """Error de red al comunicarse con ARCA."""
     pass
+
+
+class ArcaLimiteError(ArcaNetworkError):
+    """La llamada superó la espera máxima del limitador de tasa/concurrencia."""
+    pass
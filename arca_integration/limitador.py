@@ -0,0 +1,172 @@
+"""Límite de tasa y de concurrencia distribuido para las llamadas SOAP a ARCA.
+
+Cada llamada de ``ArcaClient`` pasa por el limitador configurado con
+``configurar_limitador`` (ninguno = sin límite), con clave
+``(cuit, ambiente, servicio)``: así varios workers con el mismo certificado
+no superan lo que ARCA tolera.
+
+- Tasa: token bucket en Redis (``por_segundo`` con ráfaga ``rafaga``). El
+  script Lua usa el reloj del servidor Redis, no el de cada worker.
+- Concurrencia: semáforo en un sorted set; cada lugar vence a los
+  ``ttl_concurrencia`` segundos por si el proceso que lo tomó muere.
+
+Si la espera supera ``espera_maxima`` se lanza ``ArcaLimiteError`` (un error
+de red: el llamador lo reintenta más tarde). Si Redis no responde, la llamada
+sigue sin límite.
+"""
+
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from .exceptions import ArcaLimiteError
+
+logger = logging.getLogger(__name__)
+
+# Devuelve 0 si tomó un token, o los ms a esperar hasta que haya uno.
+SCRIPT_TOKEN_BUCKET = """
+local tasa = tonumber(ARGV[1])
+local capacidad = tonumber(ARGV[2])
+local reloj = redis.call('TIME')
+local ahora = tonumber(reloj[1]) * 1000 + math.floor(tonumber(reloj[2]) / 1000)
+local datos = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(datos[1]) or capacidad
+local ts = tonumber(datos[2]) or ahora
+tokens = math.min(capacidad, tokens + math.max(0, ahora - ts) * tasa / 1000)
+local espera = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  espera = math.ceil((1 - tokens) * 1000 / tasa)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(ahora))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacidad * 1000 / tasa) + 1000)
+return espera
+"""
+
+# Devuelve 1 si tomó un lugar (ARGV[1]) de los ARGV[2] disponibles.
+SCRIPT_SEMAFORO = """
+local reloj = redis.call('TIME')
+local ahora = tonumber(reloj[1]) * 1000 + math.floor(tonumber(reloj[2]) / 1000)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ahora)
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[2]) then
+  redis.call('ZADD', KEYS[1], ahora + tonumber(ARGV[3]), ARGV[1])
+  redis.call('PEXPIRE', KEYS[1], tonumber(ARGV[3]))
+  return 1
+end
+return 0
+"""
+
+_ESPERA_SEMAFORO = 0.05
+
+
+@dataclass
+class LimiteServicio:
+    """Límite de un servicio (``wsaa``, ``wsfe``, ``padron``). 0 = sin límite."""
+    por_segundo: float = 0
+    rafaga: Optional[int] = None
+    concurrencia: int = 0
+
+
+class LimitadorArca:
+    def __init__(
+        self,
+        obtener_redis: Callable,
+        limites: dict[str, LimiteServicio],
+        espera_maxima: float = 30,
+        ttl_concurrencia: float = 120,
+        prefijo: str = 'arca:limite:',
+        dormir: Callable[[float], None] = time.sleep,
+    ):
+        self.obtener_redis = obtener_redis
+        self.limites = limites
+        self.espera_maxima = espera_maxima
+        self.ttl_concurrencia = ttl_concurrencia
+        self.prefijo = prefijo
+        self.dormir = dormir
+        self._scripts: dict[tuple[int, str], Callable] = {}
+
+    def _script(self, cliente, fuente: str):
+        clave = (id(cliente), fuente)
+        script = self._scripts.get(clave)
+        if script is None:
+            script = cliente.register_script(fuente)
+            self._scripts[clave] = script
+        return script
+
+    def _clave(self, cuit: str, ambiente: str, servicio: str, parte: str) -> str:
+        return f'{self.prefijo}{cuit}:{ambiente}:{servicio}:{parte}'
+
+    def _tomar_lugar(self, cliente, clave: str, limite: LimiteServicio, vence: float) -> Optional[str]:
+        lugar = uuid.uuid4().hex
+        semaforo = self._script(cliente, SCRIPT_SEMAFORO)
+        ttl_ms = int(self.ttl_concurrencia * 1000)
+        while not semaforo(keys=[clave], args=[lugar, limite.concurrencia, ttl_ms]):
+            if time.monotonic() + _ESPERA_SEMAFORO > vence:
+                raise ArcaLimiteError(f'Sin lugar libre para {clave} en {self.espera_maxima:g}s')
+            self.dormir(_ESPERA_SEMAFORO)
+        return lugar
+
+    def _tomar_token(self, cliente, clave: str, limite: LimiteServicio, vence: float) -> None:
+        bucket = self._script(cliente, SCRIPT_TOKEN_BUCKET)
+        rafaga = limite.rafaga or max(1, int(limite.por_segundo))
+        while True:
+            espera_ms = int(bucket(keys=[clave], args=[limite.por_segundo, rafaga]))
+            if espera_ms <= 0:
+                return
+            if time.monotonic() + espera_ms / 1000 > vence:
+                raise ArcaLimiteError(f'Límite de tasa de {clave}: espera mayor a {self.espera_maxima:g}s')
+            self.dormir(espera_ms / 1000)
+
+    @contextmanager
+    def llamada(self, cuit: str, ambiente: str, servicio: str):
+        """Bloque de una llamada SOAP: espera lugar y token antes de entrar."""
+        limite = self.limites.get(servicio)
+        if limite is None or (limite.por_segundo <= 0 and limite.concurrencia <= 0):
+            yield
+            return
+
+        vence = time.monotonic() + self.espera_maxima
+        clave_concurrencia = self._clave(cuit, ambiente, servicio, 'concurrencia')
+        cliente = None
+        lugar = None
+        try:
+            cliente = self.obtener_redis()
+            if limite.concurrencia > 0:
+                lugar = self._tomar_lugar(cliente, clave_concurrencia, limite, vence)
+            if limite.por_segundo > 0:
+                self._tomar_token(cliente, self._clave(cuit, ambiente, servicio, 'tasa'), limite, vence)
+        except ArcaLimiteError:
+            self._liberar(cliente, clave_concurrencia, lugar)
+            raise
+        except Exception as exc:  # Redis caído: se sigue sin límite.
+            logger.warning('Limitador ARCA sin Redis (%s): %s', servicio, exc)
+
+        try:
+            yield
+        finally:
+            self._liberar(cliente, clave_concurrencia, lugar)
+
+    def _liberar(self, cliente, clave: str, lugar: Optional[str]) -> None:
+        if cliente is None or lugar is None:
+            return
+        try:
+            cliente.zrem(clave, lugar)
+        except Exception:
+            logger.debug('No se pudo liberar el lugar %s de %s', lugar, clave, exc_info=True)
+
+
+_limitador: Optional[LimitadorArca] = None
+
+
+def configurar_limitador(limitador: Optional[LimitadorArca]) -> None:
+    """Limitador que usan todas las instancias de ``ArcaClient`` (None = sin límite)."""
+    global _limitador
+    _limitador = limitador
+
+
+def limitador_actual() -> Optional[LimitadorArca]:
+    return _limitador
@@ -107,6 +107,86 @@ class WSFEService:
             tipo_cbte=tipo_cbte,
         )
 
+    def obtener_caea(self, periodo: int, orden: int) -> dict:
+        """
+        Obtiene el CAEA de una quincena. Si ya fue otorgado, lo consulta.
+
+        Returns:
+            Diccionario con:
+            - success: True/False
+            - caea, periodo, orden
+            - fch_vig_desde, fch_vig_hasta, fch_tope_inf (ISO format)
+            - error_code / error_message (si falló)
+        """
+        result = self.client.fecaea_solicitar(periodo=periodo, orden=orden)
+        if not result.get('caea'):
+            # Un CAEA ya otorgado para el período no se puede volver a solicitar.
+            consulta = self.client.fecaea_consultar(periodo=periodo, orden=orden)
+            if consulta.get('caea'):
+                result = consulta
+
+        if result.get('caea'):
+            return {
+                'success': True,
+                'caea': result['caea'],
+                'periodo': int(result.get('periodo') or periodo),
+                'orden': int(result.get('orden') or orden),
+                'fch_vig_desde': self._parse_fecha(result.get('fch_vig_desde')),
+                'fch_vig_hasta': self._parse_fecha(result.get('fch_vig_hasta')),
+                'fch_tope_inf': self._parse_fecha(result.get('fch_tope_inf')),
+                'observaciones': result.get('observaciones', []),
+            }
+
+        errores = result.get('errores', [])
+        return {
+            'success': False,
+            'error_code': errores[0].get('code') if errores else None,
+            'error_message': '; '.join(e.get('msg', '') for e in errores if e.get('msg'))
+            or 'ARCA no otorgó el CAEA',
+            'errores': errores,
+        }
+
+    def informar_caea(self, request_data: dict) -> dict:
+        """
+        Informa un bloque de comprobantes emitidos con CAEA.
+
+        Args:
+            request_data: Request generado por build_caea_informe()
+
+        Returns:
+            Diccionario con:
+            - success: True si ARCA procesó el bloque (aunque rechace algunos)
+            - resultados: {numero: {'aprobado': bool, 'mensaje': str}}
+            - error_code / error_message (si ARCA rechazó el bloque completo)
+        """
+        result = self.client.fecaea_reg_informativo(request_data)
+
+        resultados = {}
+        for det in result.get('detalles', []):
+            numero = det.get('numero_comprobante')
+            if numero is None:
+                continue
+            mensajes = '; '.join(o.get('msg', '') for o in det.get('observaciones', []) if o.get('msg'))
+            resultados[int(numero)] = {
+                'aprobado': det.get('resultado') in ('A', 'O'),
+                'mensaje': mensajes or None,
+            }
+
+        errores = result.get('errores', [])
+        if not resultados and errores:
+            return {
+                'success': False,
+                'error_code': errores[0].get('code'),
+                'error_message': '; '.join(e.get('msg', '') for e in errores if e.get('msg')),
+                'resultados': {},
+            }
+
+        return {
+            'success': True,
+            'resultado': result.get('resultado'),
+            'resultados': resultados,
+        }
+
     def _parse_fecha(self, fecha_str: Optional[str]) -> Optional[str]:
         """Parsea fecha de formato ARCA (YYYYMMDD) a ISO."""
         if not fecha_str:
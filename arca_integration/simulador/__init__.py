@@ -0,0 +1,15 @@
+"""Simulador local de WSAA, WSFEv1 y padrón A5 para pruebas de carga.
+
+Uso típico::
+
+    with SimuladorArca(config=ConfigSimulador(latencia_ms=150)) as simulador:
+        os.environ['ARCA_SIMULADOR_URL'] = simulador.base_url
+        ...  # ArcaClient real contra el simulador
+
+Desde la línea de comandos: ``python -m arca_integration.simulador --help``.
+"""
+
+from .certificado import generar_certificado_prueba
+from .servidor import ConfigSimulador, EstadoSimulador, SimuladorArca
+
+__all__ = ['ConfigSimulador', 'EstadoSimulador', 'SimuladorArca', 'generar_certificado_prueba']
@@ -0,0 +1,57 @@
+import argparse
+import logging
+
+from .servidor import ConfigSimulador, SimuladorArca
+
+
+def _latencias(valores: list[str]) -> dict[str, float]:
+    latencias = {}
+    for valor in valores:
+        operacion, _, ms = valor.partition('=')
+        if not ms:
+            raise argparse.ArgumentTypeError(f'Formato esperado OPERACION=MS: {valor}')
+        latencias[operacion] = float(ms)
+    return latencias
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m arca_integration.simulador',
+        description='Simulador local de WSAA/WSFE/padrón de ARCA.',
+    )
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--latencia-ms', type=float, default=80.0, help='latencia media por operación')
+    parser.add_argument('--jitter-ms', type=float, default=40.0, help='variación uniforme +/- sobre la latencia')
+    parser.add_argument('--latencia', action='append', default=[], metavar='OPERACION=MS',
+                        help='latencia media de una operación puntual (repetible)')
+    parser.add_argument('--tasa-10016', type=float, default=0.0, help='probabilidad de error de secuencia 10016')
+    parser.add_argument('--tasa-ta-valido', type=float, default=0.0, help='probabilidad de "ya posee un TA valido"')
+    parser.add_argument('--tasa-timeout', type=float, default=0.0, help='probabilidad de cortar la conexión sin responder')
+    parser.add_argument('--timeout-segundos', type=float, default=5.0)
+    parser.add_argument('--sin-ta-unico', action='store_true', help='permite pedir TA aunque el anterior siga vigente')
+    parser.add_argument('--cuit-inexistente', action='append', default=[], help='CUIT que el padrón no encuentra')
+    parser.add_argument('--semilla', type=int, default=None)
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+    config = ConfigSimulador(
+        latencia_ms=args.latencia_ms,
+        jitter_ms=args.jitter_ms,
+        latencias_ms=_latencias(args.latencia),
+        tasa_error_10016=args.tasa_10016,
+        tasa_ta_valido=args.tasa_ta_valido,
+        tasa_timeout=args.tasa_timeout,
+        timeout_segundos=args.timeout_segundos,
+        ta_unico=not args.sin_ta_unico,
+        cuits_inexistentes=set(args.cuit_inexistente),
+        semilla=args.semilla,
+    )
+    simulador = SimuladorArca(args.host, args.port, config)
+    print(f'Simulador ARCA escuchando en {simulador.base_url} (ARCA_SIMULADOR_URL={simulador.base_url})')
+    simulador.servir()
+
+
+if __name__ == '__main__':
+    main()
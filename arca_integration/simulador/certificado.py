@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta, timezone
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+
+def generar_certificado_prueba(cuit: str, dias: int = 30) -> tuple[bytes, bytes]:
+    """Certificado autofirmado y clave (PEM) para firmar el TRA contra el simulador."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    nombre = x509.Name([
+        x509.NameAttribute(NameOID.COMMON_NAME, 'simulador'),
+        x509.NameAttribute(NameOID.SERIAL_NUMBER, f'CUIT {cuit}'),
+    ])
+    ahora = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(nombre)
+        .issuer_name(nombre)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(ahora - timedelta(minutes=5))
+        .not_valid_after(ahora + timedelta(days=dias))
+        .sign(key, hashes.SHA256())
+    )
+    return (
+        cert.public_bytes(serialization.Encoding.PEM),
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.TraditionalOpenSSL,
+            serialization.NoEncryption(),
+        ),
+    )
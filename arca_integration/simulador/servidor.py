@@ -0,0 +1,616 @@
+"""Servidor SOAP local que imita WSAA, WSFEv1 y el padrón A5 de ARCA.
+
+Mantiene la numeración por CUIT/punto de venta/tipo, emite CAE ficticios y
+permite inyectar latencia y errores para medir el pipeline de emisión sin
+depender de homologación.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+from xml.sax.saxutils import escape
+
+from lxml import etree
+
+from .wsdl import (
+    PADRON_NS,
+    PADRON_PATH,
+    PADRON_WSDL,
+    WSAA_NS,
+    WSAA_PATH,
+    WSAA_WSDL,
+    WSFE_NS,
+    WSFE_PATH,
+    WSFE_WSDL,
+)
+
+logger = logging.getLogger(__name__)
+
+SOAP_ENV = 'http://schemas.xmlsoap.org/soap/envelope/'
+
+MSG_TA_VALIDO = 'El CEE ya posee un TA valido para el acceso al WSN solicitado'
+MSG_10016 = (
+    'El numero o fecha del comprobante no se corresponde con el proximo a autorizar. '
+    'Consultar metodo FECompUltimoAutorizado.'
+)
+MSG_PERSONA_INEXISTENTE = 'No existe persona con ese Id'
+
+
+@dataclass
+class ConfigSimulador:
+    """Comportamiento del simulador. Se puede cambiar en caliente vía ``/_simulador/config``."""
+
+    latencia_ms: float = 80.0
+    jitter_ms: float = 40.0
+    # Latencia media por operación (ej. {'FECAESolicitar': 300}); pisa ``latencia_ms``.
+    latencias_ms: dict[str, float] = field(default_factory=dict)
+    # Probabilidades [0, 1] de inyectar cada error.
+    tasa_error_10016: float = 0.0
+    tasa_ta_valido: float = 0.0
+    tasa_timeout: float = 0.0
+    # Tiempo que se retiene la conexión antes de cortarla en un timeout.
+    timeout_segundos: float = 5.0
+    # Como WSAA real: rechaza LoginCms mientras el TA anterior del certificado siga vigente.
+    ta_unico: bool = True
+    ta_duracion_segundos: int = 12 * 3600
+    cae_dias_vigencia: int = 10
+    cuits_inexistentes: set[str] = field(default_factory=set)
+    semilla: int | None = None
+
+    def actualizar(self, valores: dict) -> None:
+        for campo, valor in valores.items():
+            if not hasattr(self, campo):
+                raise ValueError(f'Parámetro desconocido: {campo}')
+            if campo == 'cuits_inexistentes':
+                valor = {str(c) for c in valor}
+            setattr(self, campo, valor)
+
+    def to_dict(self) -> dict:
+        return {
+            'latencia_ms': self.latencia_ms,
+            'jitter_ms': self.jitter_ms,
+            'latencias_ms': dict(self.latencias_ms),
+            'tasa_error_10016': self.tasa_error_10016,
+            'tasa_ta_valido': self.tasa_ta_valido,
+            'tasa_timeout': self.tasa_timeout,
+            'timeout_segundos': self.timeout_segundos,
+            'ta_unico': self.ta_unico,
+            'ta_duracion_segundos': self.ta_duracion_segundos,
+            'cae_dias_vigencia': self.cae_dias_vigencia,
+            'cuits_inexistentes': sorted(self.cuits_inexistentes),
+            'semilla': self.semilla,
+        }
+
+
+class SoapFault(Exception):
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class CortarConexion(Exception):
+    """Simula un timeout: la conexión se cierra sin respuesta."""
+
+
+class EstadoSimulador:
+    """Estado en memoria: TA emitidos, numeración y comprobantes autorizados."""
+
+    def __init__(self, config: ConfigSimulador):
+        self.config = config
+        self._lock = threading.Lock()
+        self._random = random.Random(config.semilla)
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.tickets: dict[tuple[str, str], float] = {}
+            self.ultimos: dict[tuple[int, int, int], int] = {}
+            self.fechas: dict[tuple[int, int, int], str] = {}
+            self.comprobantes: dict[tuple[int, int, int, int], dict] = {}
+            self.contadores: Counter = Counter()
+            self._cae = 70000000000000 + self._random.randint(0, 10 ** 8)
+
+    def sortear(self, tasa: float) -> bool:
+        if not tasa:
+            return False
+        with self._lock:
+            return self._random.random() < tasa
+
+    def latencia(self, operacion: str) -> float:
+        media = self.config.latencias_ms.get(operacion, self.config.latencia_ms)
+        with self._lock:
+            jitter = self._random.uniform(-self.config.jitter_ms, self.config.jitter_ms)
+        return max(0.0, media + jitter) / 1000
+
+    def contar(self, clave: str) -> None:
+        with self._lock:
+            self.contadores[clave] += 1
+
+    def resumen(self) -> dict:
+        with self._lock:
+            return {
+                'contadores': dict(self.contadores),
+                'ultimos': {f'{c}:{p}:{t}': n for (c, p, t), n in self.ultimos.items()},
+                'comprobantes': len(self.comprobantes),
+                'tickets': len(self.tickets),
+            }
+
+    # ── WSAA ──────────────────────────────────────────────
+
+    def login(self, cms_b64: str) -> str:
+        cms = base64.b64decode(cms_b64 or '')
+        match = re.search(rb'<service>\s*([^<\s]+)\s*</service>', cms)
+        servicio = match.group(1).decode() if match else 'wsfe'
+        clave = (_huella_certificado(cms), servicio)
+
+        if self.sortear(self.config.tasa_ta_valido):
+            self.contar('error:ta_valido')
+            raise SoapFault('ns1:coe.alreadyAuthenticated', MSG_TA_VALIDO)
+
+        ahora = time.time()
+        with self._lock:
+            vence = self.tickets.get(clave)
+            if self.config.ta_unico and vence and vence > ahora:
+                self.contadores['error:ta_valido'] += 1
+                raise SoapFault('ns1:coe.alreadyAuthenticated', MSG_TA_VALIDO)
+            vence = ahora + self.config.ta_duracion_segundos
+            self.tickets[clave] = vence
+            token = base64.b64encode(self._random.randbytes(48)).decode()
+            sign = base64.b64encode(self._random.randbytes(32)).decode()
+
+        generado = datetime.fromtimestamp(ahora).astimezone()
+        expira = datetime.fromtimestamp(vence).astimezone()
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<loginTicketResponse version="1.0"><header>'
+            '<source>CN=wsaahomo, O=AFIP, C=AR</source><destination>simulador</destination>'
+            f'<uniqueId>{int(ahora)}</uniqueId>'
+            f'<generationTime>{generado.isoformat(timespec="milliseconds")}</generationTime>'
+            f'<expirationTime>{expira.isoformat(timespec="milliseconds")}</expirationTime>'
+            f'</header><credentials><token>{token}</token><sign>{sign}</sign></credentials>'
+            '</loginTicketResponse>'
+        )
+
+    # ── WSFE ──────────────────────────────────────────────
+
+    def ultimo_autorizado(self, cuit: int, punto_venta: int, tipo_cbte: int) -> int:
+        with self._lock:
+            return self.ultimos.get((cuit, punto_venta, tipo_cbte), 0)
+
+    def solicitar_cae(self, cuit: int, cabecera: dict, detalles: list[dict]) -> dict:
+        punto_venta = cabecera['PtoVta']
+        tipo_cbte = cabecera['CbteTipo']
+        clave = (cuit, punto_venta, tipo_cbte)
+        hoy = date.today()
+
+        if detalles and self.sortear(self.config.tasa_error_10016):
+            # Otro sistema emitió el próximo número entre la consulta y el envío.
+            with self._lock:
+                self.ultimos[clave] = self.ultimos.get(clave, 0) + 1
+            self.contar('error:10016')
+
+        respuestas = []
+        with self._lock:
+            for det in detalles:
+                esperado = self.ultimos.get(clave, 0) + 1
+                fecha = det.get('CbteFch') or hoy.strftime('%Y%m%d')
+                ultima_fecha = self.fechas.get(clave)
+                respuesta = {
+                    'Concepto': det.get('Concepto'),
+                    'DocTipo': det.get('DocTipo'),
+                    'DocNro': det.get('DocNro'),
+                    'CbteDesde': det.get('CbteDesde'),
+                    'CbteHasta': det.get('CbteHasta'),
+                    'CbteFch': fecha,
+                    'Resultado': 'R',
+                    'Observaciones': [],
+                    'CAE': None,
+                    'CAEFchVto': None,
+                }
+                if det.get('CbteDesde') != esperado or (ultima_fecha and fecha < ultima_fecha):
+                    respuesta['Observaciones'].append({'Code': 10016, 'Msg': MSG_10016})
+                    self.contadores['rechazo:10016'] += 1
+                else:
+                    self._cae += 1
+                    respuesta['Resultado'] = 'A'
+                    respuesta['CAE'] = str(self._cae)
+                    respuesta['CAEFchVto'] = (hoy + timedelta(days=self.config.cae_dias_vigencia)).strftime('%Y%m%d')
+                    self.ultimos[clave] = esperado
+                    self.fechas[clave] = fecha
+                    self.comprobantes[(*clave, esperado)] = {
+                        **det,
+                        'CbteFch': fecha,
+                        'CAE': respuesta['CAE'],
+                        'CAEFchVto': respuesta['CAEFchVto'],
+                        'FchProceso': datetime.now().strftime('%Y%m%d%H%M%S'),
+                    }
+                    self.contadores['autorizados'] += 1
+                respuestas.append(respuesta)
+
+        resultados = {r['Resultado'] for r in respuestas}
+        return {
+            'Cuit': cuit,
+            'PtoVta': punto_venta,
+            'CbteTipo': tipo_cbte,
+            'FchProceso': datetime.now().strftime('%Y%m%d%H%M%S'),
+            'CantReg': len(respuestas),
+            'Resultado': 'A' if resultados == {'A'} else ('R' if resultados == {'R'} else 'P'),
+            'Detalles': respuestas,
+        }
+
+    def consultar(self, cuit: int, punto_venta: int, tipo_cbte: int, numero: int) -> dict | None:
+        with self._lock:
+            comprobante = self.comprobantes.get((cuit, punto_venta, tipo_cbte, numero))
+            return dict(comprobante) if comprobante else None
+
+
+def _huella_certificado(cms: bytes) -> str:
+    try:
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.serialization import pkcs7
+
+        certs = pkcs7.load_der_pkcs7_certificates(cms)
+        if certs:
+            return hashlib.sha256(certs[0].public_bytes(serialization.Encoding.DER)).hexdigest()
+    except (ValueError, TypeError):
+        pass
+    return hashlib.sha256(cms).hexdigest()
+
+
+def _padron_persona(cuit: str) -> dict:
+    """Datos ficticios pero estables por CUIT."""
+    juridica = cuit[:2] in ('30', '33', '34')
+    monotributo = not juridica and int(cuit[-1]) % 2 == 0
+    return {
+        'tipoPersona': 'JURIDICA' if juridica else 'FISICA',
+        'razonSocial': f'EMPRESA {cuit} SA' if juridica else None,
+        'nombre': None if juridica else 'CONTRIBUYENTE',
+        'apellido': None if juridica else f'SIMULADO {cuit[-4:]}',
+        'direccion': f'CALLE {int(cuit[2:6])} {int(cuit[6:10]) % 9000 + 1}',
+        'localidad': 'CIUDAD AUTONOMA BUENOS AIRES',
+        'provincia': 'CIUDAD AUTONOMA BUENOS AIRES',
+        'monotributo': monotributo,
+    }
+
+
+# ── Serialización SOAP ────────────────────────────────────
+
+def _sobre(cuerpo: str) -> bytes:
+    return (
+        f'<?xml version="1.0" encoding="utf-8"?><soap:Envelope xmlns:soap="{SOAP_ENV}">'
+        f'<soap:Body>{cuerpo}</soap:Body></soap:Envelope>'
+    ).encode('utf-8')
+
+
+def _fault(code: str, message: str) -> bytes:
+    return _sobre(
+        f'<soap:Fault><faultcode>{escape(code)}</faultcode>'
+        f'<faultstring>{escape(message)}</faultstring></soap:Fault>'
+    )
+
+
+def _xml(nombre: str, valor) -> str:
+    if valor is None:
+        return ''
+    if isinstance(valor, dict):
+        return f'<{nombre}>{"".join(_xml(k, v) for k, v in valor.items())}</{nombre}>'
+    if isinstance(valor, list):
+        return ''.join(_xml(nombre, item) for item in valor)
+    return f'<{nombre}>{escape(str(valor))}</{nombre}>'
+
+
+def _errores(errores: list[tuple[int, str]]) -> dict | None:
+    if not errores:
+        return None
+    return {'Err': [{'Code': code, 'Msg': msg} for code, msg in errores]}
+
+
+def _respuesta_wsfe(operacion: str, resultado: dict) -> bytes:
+    return _sobre(
+        f'<{operacion}Response xmlns="{WSFE_NS}">{_xml(f"{operacion}Result", resultado)}</{operacion}Response>'
+    )
+
+
+def _local(tag) -> str:
+    return etree.QName(tag).localname if isinstance(tag, str) else ''
+
+
+def _a_dict(elemento) -> dict | str:
+    """Convierte un elemento XML a dict por nombre local; los repetidos quedan en lista."""
+    hijos = [h for h in elemento if isinstance(h.tag, str)]
+    if not hijos:
+        return (elemento.text or '').strip()
+    data: dict = {}
+    for hijo in hijos:
+        nombre = _local(hijo.tag)
+        valor = _a_dict(hijo)
+        if nombre in data:
+            if not isinstance(data[nombre], list):
+                data[nombre] = [data[nombre]]
+            data[nombre].append(valor)
+        else:
+            data[nombre] = valor
+    return data
+
+
+def _lista(valor) -> list:
+    if valor in (None, ''):
+        return []
+    return valor if isinstance(valor, list) else [valor]
+
+
+def _entero(valor, default: int = 0) -> int:
+    try:
+        return int(float(valor))
+    except (TypeError, ValueError):
+        return default
+
+
+class SimuladorArca:
+    """Servidor HTTP con los tres servicios en un mismo puerto.
+
+    ``base_url`` es la URL a configurar en ``ARCA_SIMULADOR_URL``.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, config: ConfigSimulador | None = None):
+        self.config = config or ConfigSimulador()
+        self.estado = EstadoSimulador(self.config)
+        self._server = ThreadingHTTPServer((host, port), _crear_handler(self))
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def iniciar(self) -> 'SimuladorArca':
+        """Levanta el servidor en un hilo de fondo."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name='arca-simulador', daemon=True)
+        self._thread.start()
+        return self
+
+    def servir(self) -> None:
+        """Atiende pedidos en el hilo actual hasta Ctrl+C."""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+    def detener(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> 'SimuladorArca':
+        return self.iniciar()
+
+    def __exit__(self, *exc) -> None:
+        self.detener()
+
+    # ── Despacho ──────────────────────────────────────────
+
+    def wsdl(self, path: str) -> str | None:
+        documento = {WSAA_PATH: WSAA_WSDL, WSFE_PATH: WSFE_WSDL, PADRON_PATH: PADRON_WSDL}.get(path)
+        return documento.replace('{base_url}', self.base_url) if documento else None
+
+    def atender(self, path: str, cuerpo: bytes) -> tuple[int, bytes]:
+        try:
+            envelope = etree.fromstring(cuerpo)
+            body = next(e for e in envelope if _local(e.tag) == 'Body')
+            pedido = next(e for e in body if isinstance(e.tag, str))
+        except (etree.XMLSyntaxError, StopIteration):
+            return 500, _fault('soap:Client', 'Mensaje SOAP inválido')
+
+        operacion = _local(pedido.tag)
+        datos = _a_dict(pedido)
+        datos = datos if isinstance(datos, dict) else {}
+        self.estado.contar(operacion)
+
+        time.sleep(self.estado.latencia(operacion))
+
+        try:
+            if path == WSAA_PATH and operacion == 'loginCms':
+                ticket = self.estado.login(datos.get('in0', ''))
+                return 200, _sobre(
+                    f'<loginCmsResponse xmlns="{WSAA_NS}"><loginCmsReturn>{escape(ticket)}</loginCmsReturn></loginCmsResponse>'
+                )
+            if path == WSFE_PATH:
+                return 200, self._wsfe(operacion, datos)
+            if path == PADRON_PATH and operacion == 'getPersona_v2':
+                return 200, self._padron(datos)
+        except SoapFault as fault:
+            return 500, _fault(fault.code, fault.message)
+
+        return 500, _fault('soap:Client', f'Operación no soportada: {operacion}')
+
+    def _timeout(self) -> None:
+        self.estado.contar('error:timeout')
+        time.sleep(self.config.timeout_segundos)
+        raise CortarConexion()
+
+    def _wsfe(self, operacion: str, datos: dict) -> bytes:
+        if operacion == 'FEDummy':
+            return _respuesta_wsfe(operacion, {'AppServer': 'OK', 'DbServer': 'OK', 'AuthServer': 'OK'})
+
+        auth = datos.get('Auth') or {}
+        cuit = _entero(auth.get('Cuit') if isinstance(auth, dict) else None)
+        if not isinstance(auth, dict) or not auth.get('Token') or not auth.get('Sign'):
+            return _respuesta_wsfe(operacion, {'Errors': _errores([(600, 'ValidacionDeToken: No validaron las credenciales')])})
+
+        timeout = self.estado.sortear(self.config.tasa_timeout)
+
+        if operacion == 'FECompUltimoAutorizado':
+            if timeout:
+                self._timeout()
+            punto_venta, tipo_cbte = _entero(datos.get('PtoVta')), _entero(datos.get('CbteTipo'))
+            return _respuesta_wsfe(operacion, {
+                'PtoVta': punto_venta,
+                'CbteTipo': tipo_cbte,
+                'CbteNro': self.estado.ultimo_autorizado(cuit, punto_venta, tipo_cbte),
+            })
+
+        if operacion == 'FECAESolicitar':
+            req = datos.get('FeCAEReq') or {}
+            cab = req.get('FeCabReq') or {}
+            cabecera = {'PtoVta': _entero(cab.get('PtoVta')), 'CbteTipo': _entero(cab.get('CbteTipo'))}
+            detalles = [
+                {
+                    **det,
+                    'Concepto': _entero(det.get('Concepto')),
+                    'DocTipo': _entero(det.get('DocTipo')),
+                    'DocNro': _entero(det.get('DocNro')),
+                    'CbteDesde': _entero(det.get('CbteDesde')),
+                    'CbteHasta': _entero(det.get('CbteHasta')),
+                }
+                for det in _lista((req.get('FeDetReq') or {}).get('FECAEDetRequest'))
+            ]
+            resultado = self.estado.solicitar_cae(cuit, cabecera, detalles)
+            if timeout:
+                # ARCA autorizó pero la respuesta nunca llega.
+                self._timeout()
+            detalles_resp = resultado.pop('Detalles')
+            for det in detalles_resp:
+                det['Observaciones'] = {'Obs': det['Observaciones']} if det['Observaciones'] else None
+            return _respuesta_wsfe(operacion, {
+                'FeCabResp': {**resultado, 'Reproceso': 'N'},
+                'FeDetResp': {'FECAEDetResponse': detalles_resp},
+            })
+
+        if operacion == 'FECompConsultar':
+            if timeout:
+                self._timeout()
+            req = datos.get('FeCompConsReq') or {}
+            punto_venta, tipo_cbte = _entero(req.get('PtoVta')), _entero(req.get('CbteTipo'))
+            numero = _entero(req.get('CbteNro'))
+            comprobante = self.estado.consultar(cuit, punto_venta, tipo_cbte, numero)
+            if not comprobante:
+                return _respuesta_wsfe(operacion, {'Errors': _errores([
+                    (602, 'No existen datos en nuestros registros para los parametros ingresados.'),
+                ])})
+            return _respuesta_wsfe(operacion, {'ResultGet': {
+                'Concepto': comprobante['Concepto'],
+                'DocTipo': comprobante['DocTipo'],
+                'DocNro': comprobante['DocNro'],
+                'CbteDesde': numero,
+                'CbteHasta': numero,
+                'CbteFch': comprobante['CbteFch'],
+                'ImpTotal': comprobante.get('ImpTotal', 0),
+                'ImpTotConc': comprobante.get('ImpTotConc', 0),
+                'ImpNeto': comprobante.get('ImpNeto', 0),
+                'ImpOpEx': comprobante.get('ImpOpEx', 0),
+                'ImpTrib': comprobante.get('ImpTrib', 0),
+                'ImpIVA': comprobante.get('ImpIVA', 0),
+                'MonId': comprobante.get('MonId') or 'PES',
+                'MonCotiz': comprobante.get('MonCotiz') or 1,
+                'Resultado': 'A',
+                'CodAutorizacion': comprobante['CAE'],
+                'EmisionTipo': 'CAE',
+                'FchVto': comprobante['CAEFchVto'],
+                'FchProceso': comprobante['FchProceso'],
+                'PtoVta': punto_venta,
+                'CbteTipo': tipo_cbte,
+            }})
+
+        if operacion == 'FEParamGetPtosVenta':
+            return _respuesta_wsfe(operacion, {'Errors': _errores([(602, 'Sin Resultados')])})
+
+        raise SoapFault('soap:Client', f'Operación no soportada: {operacion}')
+
+    def _padron(self, datos: dict) -> bytes:
+        if self.estado.sortear(self.config.tasa_timeout):
+            self._timeout()
+
+        cuit = str(datos.get('idPersona') or '')
+        if cuit in self.config.cuits_inexistentes or len(cuit) != 11 or not cuit.isdigit():
+            raise SoapFault('soap:Server', MSG_PERSONA_INEXISTENTE)
+
+        persona = _padron_persona(cuit)
+        retorno = {
+            'datosGenerales': {
+                'idPersona': cuit,
+                'tipoPersona': persona['tipoPersona'],
+                'estadoClave': 'ACTIVO',
+                'razonSocial': persona['razonSocial'],
+                'nombre': persona['nombre'],
+                'apellido': persona['apellido'],
+                'domicilioFiscal': {
+                    'direccion': persona['direccion'],
+                    'localidad': persona['localidad'],
+                    'descripcionProvincia': persona['provincia'],
+                    'tipoDomicilio': 'FISCAL',
+                },
+            },
+        }
+        if persona['monotributo']:
+            retorno['datosMonotributo'] = {'categoriaMonotributo': {'descripcionCategoria': 'A LOCACIONES DE SERVICIO'}}
+        else:
+            retorno['datosRegimenGeneral'] = {'impuesto': [{'idImpuesto': 30, 'descripcionImpuesto': 'IVA'}]}
+
+        return _sobre(
+            f'<ns2:getPersona_v2Response xmlns:ns2="{PADRON_NS}">{_xml("personaReturn", retorno)}</ns2:getPersona_v2Response>'
+        )
+
+
+def _crear_handler(simulador: SimuladorArca):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            logger.debug('%s - %s', self.address_string(), format % args)
+
+        def _enviar(self, status: int, cuerpo: bytes, content_type: str) -> None:
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def _json(self, status: int, data: dict) -> None:
+            self._enviar(status, json.dumps(data).encode('utf-8'), 'application/json')
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path == '/_simulador/estado':
+                return self._json(200, {'config': simulador.config.to_dict(), **simulador.estado.resumen()})
+            documento = simulador.wsdl(url.path)
+            if documento is None:
+                return self._enviar(404, b'Not found', 'text/plain')
+            self._enviar(200, documento.encode('utf-8'), 'text/xml; charset=utf-8')
+
+        def do_POST(self):
+            url = urlsplit(self.path)
+            cuerpo = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+            if url.path == '/_simulador/config':
+                try:
+                    simulador.config.actualizar(json.loads(cuerpo or b'{}'))
+                except (ValueError, TypeError) as exc:
+                    return self._json(400, {'error': str(exc)})
+                return self._json(200, simulador.config.to_dict())
+            if url.path == '/_simulador/reset':
+                simulador.estado.reset()
+                return self._json(200, {'status': 'ok'})
+
+            try:
+                status, respuesta = simulador.atender(url.path, cuerpo)
+            except CortarConexion:
+                self.close_connection = True
+                return
+            self._enviar(status, respuesta, 'text/xml; charset=utf-8')
+
+    return Handler
@@ -0,0 +1,369 @@
+"""WSDL mínimos que expone el simulador.
+
+Sólo declaran las operaciones que usa ``ArcaClient``. Los tipos anidados son
+``complexType`` con nombre porque ``ArcaWebService`` los indexa por nombre.
+``{base_url}`` se reemplaza por la URL del simulador al servir el documento.
+"""
+
+WSAA_NS = 'http://wsaa.view.sua.dvadac.desein.afip.gov'
+WSFE_NS = 'http://ar.gov.afip.dif.FEV1/'
+PADRON_NS = 'http://a5.soap.ws.server.puc.sr/'
+
+WSAA_PATH = '/ws/services/LoginCms'
+WSFE_PATH = '/wsfev1/service.asmx'
+PADRON_PATH = '/sr-padron/webservices/personaServiceA5'
+
+
+WSAA_WSDL = """<?xml version="1.0" encoding="UTF-8"?>
+<wsdl:definitions xmlns:wsdl="http://schemas.xmlsoap.org/wsdl/"
+    xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+    xmlns:xsd="http://www.w3.org/2001/XMLSchema"
+    xmlns:tns="{ns}" targetNamespace="{ns}">
+  <wsdl:types>
+    <xsd:schema elementFormDefault="qualified" targetNamespace="{ns}">
+      <xsd:element name="loginCms">
+        <xsd:complexType><xsd:sequence>
+          <xsd:element name="in0" type="xsd:string"/>
+        </xsd:sequence></xsd:complexType>
+      </xsd:element>
+      <xsd:element name="loginCmsResponse">
+        <xsd:complexType><xsd:sequence>
+          <xsd:element name="loginCmsReturn" type="xsd:string"/>
+        </xsd:sequence></xsd:complexType>
+      </xsd:element>
+    </xsd:schema>
+  </wsdl:types>
+  <wsdl:message name="loginCmsRequest"><wsdl:part name="parameters" element="tns:loginCms"/></wsdl:message>
+  <wsdl:message name="loginCmsResponse"><wsdl:part name="parameters" element="tns:loginCmsResponse"/></wsdl:message>
+  <wsdl:portType name="LoginCMS">
+    <wsdl:operation name="loginCms">
+      <wsdl:input message="tns:loginCmsRequest"/>
+      <wsdl:output message="tns:loginCmsResponse"/>
+    </wsdl:operation>
+  </wsdl:portType>
+  <wsdl:binding name="LoginCmsSoapBinding" type="tns:LoginCMS">
+    <soap:binding style="document" transport="http://schemas.xmlsoap.org/soap/http"/>
+    <wsdl:operation name="loginCms">
+      <soap:operation soapAction=""/>
+      <wsdl:input><soap:body use="literal"/></wsdl:input>
+      <wsdl:output><soap:body use="literal"/></wsdl:output>
+    </wsdl:operation>
+  </wsdl:binding>
+  <wsdl:service name="LoginCMSService">
+    <wsdl:port name="LoginCms" binding="tns:LoginCmsSoapBinding">
+      <soap:address location="{{base_url}}{path}"/>
+    </wsdl:port>
+  </wsdl:service>
+</wsdl:definitions>
+""".format(ns=WSAA_NS, path=WSAA_PATH)
+
+
+# (operación, [(parámetro, tipo)], tipo del resultado)
+_WSFE_OPERACIONES = [
+    ('FEDummy', [], 'DummyResponse'),
+    ('FECompUltimoAutorizado', [('Auth', 'tns:FEAuthRequest'), ('PtoVta', 'xsd:int'), ('CbteTipo', 'xsd:int')],
+     'FERecuperaLastCbteResponse'),
+    ('FECAESolicitar', [('Auth', 'tns:FEAuthRequest'), ('FeCAEReq', 'tns:FECAERequest')], 'FECAEResponse'),
+    ('FECompConsultar', [('Auth', 'tns:FEAuthRequest'), ('FeCompConsReq', 'tns:FECompConsultaReq')],
+     'FECompConsultaResponse'),
+    ('FEParamGetPtosVenta', [('Auth', 'tns:FEAuthRequest')], 'FEPtoVentaResponse'),
+]
+
+_WSFE_TIPOS = """
+      <xsd:complexType name="FEAuthRequest"><xsd:sequence>
+        <xsd:element name="Token" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="Sign" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="Cuit" type="xsd:long"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="Err"><xsd:sequence>
+        <xsd:element name="Code" type="xsd:int"/>
+        <xsd:element name="Msg" type="xsd:string" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="ArrayOfErr"><xsd:sequence>
+        <xsd:element name="Err" type="tns:Err" minOccurs="0" maxOccurs="unbounded"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="Obs"><xsd:sequence>
+        <xsd:element name="Code" type="xsd:int"/>
+        <xsd:element name="Msg" type="xsd:string" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="ArrayOfObs"><xsd:sequence>
+        <xsd:element name="Obs" type="tns:Obs" minOccurs="0" maxOccurs="unbounded"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="DummyResponse"><xsd:sequence>
+        <xsd:element name="AppServer" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="DbServer" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="AuthServer" type="xsd:string" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="FERecuperaLastCbteResponse"><xsd:sequence>
+        <xsd:element name="PtoVta" type="xsd:int"/>
+        <xsd:element name="CbteTipo" type="xsd:int"/>
+        <xsd:element name="CbteNro" type="xsd:int"/>
+        <xsd:element name="Errors" type="tns:ArrayOfErr" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="FECAECabRequest"><xsd:sequence>
+        <xsd:element name="CantReg" type="xsd:int"/>
+        <xsd:element name="PtoVta" type="xsd:int"/>
+        <xsd:element name="CbteTipo" type="xsd:int"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="AlicIva"><xsd:sequence>
+        <xsd:element name="Id" type="xsd:int"/>
+        <xsd:element name="BaseImp" type="xsd:double"/>
+        <xsd:element name="Importe" type="xsd:double"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="ArrayOfAlicIva"><xsd:sequence>
+        <xsd:element name="AlicIva" type="tns:AlicIva" minOccurs="0" maxOccurs="unbounded"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="CbteAsoc"><xsd:sequence>
+        <xsd:element name="Tipo" type="xsd:int"/>
+        <xsd:element name="PtoVta" type="xsd:int"/>
+        <xsd:element name="Nro" type="xsd:long"/>
+        <xsd:element name="Cuit" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="CbteFch" type="xsd:string" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="ArrayOfCbteAsoc"><xsd:sequence>
+        <xsd:element name="CbteAsoc" type="tns:CbteAsoc" minOccurs="0" maxOccurs="unbounded"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="FECAEDetRequest"><xsd:sequence>
+        <xsd:element name="Concepto" type="xsd:int"/>
+        <xsd:element name="DocTipo" type="xsd:int"/>
+        <xsd:element name="DocNro" type="xsd:long"/>
+        <xsd:element name="CbteDesde" type="xsd:long"/>
+        <xsd:element name="CbteHasta" type="xsd:long"/>
+        <xsd:element name="CbteFch" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="ImpTotal" type="xsd:double"/>
+        <xsd:element name="ImpTotConc" type="xsd:double"/>
+        <xsd:element name="ImpNeto" type="xsd:double"/>
+        <xsd:element name="ImpOpEx" type="xsd:double"/>
+        <xsd:element name="ImpTrib" type="xsd:double"/>
+        <xsd:element name="ImpIVA" type="xsd:double"/>
+        <xsd:element name="FchServDesde" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="FchServHasta" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="FchVtoPago" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="MonId" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="MonCotiz" type="xsd:double" minOccurs="0"/>
+        <xsd:element name="CondicionIVAReceptorId" type="xsd:int" minOccurs="0"/>
+        <xsd:element name="CbtesAsoc" type="tns:ArrayOfCbteAsoc" minOccurs="0"/>
+        <xsd:element name="Iva" type="tns:ArrayOfAlicIva" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="ArrayOfFECAEDetRequest"><xsd:sequence>
+        <xsd:element name="FECAEDetRequest" type="tns:FECAEDetRequest" minOccurs="0" maxOccurs="unbounded"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="FECAERequest"><xsd:sequence>
+        <xsd:element name="FeCabReq" type="tns:FECAECabRequest"/>
+        <xsd:element name="FeDetReq" type="tns:ArrayOfFECAEDetRequest"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="FECAECabResponse"><xsd:sequence>
+        <xsd:element name="Cuit" type="xsd:long"/>
+        <xsd:element name="PtoVta" type="xsd:int"/>
+        <xsd:element name="CbteTipo" type="xsd:int"/>
+        <xsd:element name="FchProceso" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="CantReg" type="xsd:int"/>
+        <xsd:element name="Resultado" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="Reproceso" type="xsd:string" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="FECAEDetResponse"><xsd:sequence>
+        <xsd:element name="Concepto" type="xsd:int"/>
+        <xsd:element name="DocTipo" type="xsd:int"/>
+        <xsd:element name="DocNro" type="xsd:long"/>
+        <xsd:element name="CbteDesde" type="xsd:long"/>
+        <xsd:element name="CbteHasta" type="xsd:long"/>
+        <xsd:element name="CbteFch" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="Resultado" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="Observaciones" type="tns:ArrayOfObs" minOccurs="0"/>
+        <xsd:element name="CAE" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="CAEFchVto" type="xsd:string" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="ArrayOfFECAEDetResponse"><xsd:sequence>
+        <xsd:element name="FECAEDetResponse" type="tns:FECAEDetResponse" minOccurs="0" maxOccurs="unbounded"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="FECAEResponse"><xsd:sequence>
+        <xsd:element name="FeCabResp" type="tns:FECAECabResponse" minOccurs="0"/>
+        <xsd:element name="FeDetResp" type="tns:ArrayOfFECAEDetResponse" minOccurs="0"/>
+        <xsd:element name="Errors" type="tns:ArrayOfErr" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="FECompConsultaReq"><xsd:sequence>
+        <xsd:element name="CbteTipo" type="xsd:int"/>
+        <xsd:element name="CbteNro" type="xsd:long"/>
+        <xsd:element name="PtoVta" type="xsd:int"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="FECompConsResponse"><xsd:sequence>
+        <xsd:element name="Concepto" type="xsd:int"/>
+        <xsd:element name="DocTipo" type="xsd:int"/>
+        <xsd:element name="DocNro" type="xsd:long"/>
+        <xsd:element name="CbteDesde" type="xsd:long"/>
+        <xsd:element name="CbteHasta" type="xsd:long"/>
+        <xsd:element name="CbteFch" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="ImpTotal" type="xsd:double"/>
+        <xsd:element name="ImpTotConc" type="xsd:double"/>
+        <xsd:element name="ImpNeto" type="xsd:double"/>
+        <xsd:element name="ImpOpEx" type="xsd:double"/>
+        <xsd:element name="ImpTrib" type="xsd:double"/>
+        <xsd:element name="ImpIVA" type="xsd:double"/>
+        <xsd:element name="MonId" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="MonCotiz" type="xsd:double" minOccurs="0"/>
+        <xsd:element name="Resultado" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="CodAutorizacion" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="EmisionTipo" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="FchVto" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="FchProceso" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="PtoVta" type="xsd:int"/>
+        <xsd:element name="CbteTipo" type="xsd:int"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="FECompConsultaResponse"><xsd:sequence>
+        <xsd:element name="ResultGet" type="tns:FECompConsResponse" minOccurs="0"/>
+        <xsd:element name="Errors" type="tns:ArrayOfErr" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="PtoVenta"><xsd:sequence>
+        <xsd:element name="Nro" type="xsd:int"/>
+        <xsd:element name="EmisionTipo" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="Bloqueado" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="FchBaja" type="xsd:string" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="ArrayOfPtoVenta"><xsd:sequence>
+        <xsd:element name="PtoVenta" type="tns:PtoVenta" minOccurs="0" maxOccurs="unbounded"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="FEPtoVentaResponse"><xsd:sequence>
+        <xsd:element name="ResultGet" type="tns:ArrayOfPtoVenta" minOccurs="0"/>
+        <xsd:element name="Errors" type="tns:ArrayOfErr" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+"""
+
+
+def _wsfe_wsdl() -> str:
+    elementos = []
+    mensajes = []
+    port = []
+    binding = []
+    for operacion, parametros, resultado in _WSFE_OPERACIONES:
+        campos = ''.join(
+            f'<xsd:element name="{nombre}" type="{tipo}" minOccurs="0"/>' for nombre, tipo in parametros
+        )
+        elementos.append(
+            f'<xsd:element name="{operacion}"><xsd:complexType><xsd:sequence>{campos}'
+            f'</xsd:sequence></xsd:complexType></xsd:element>'
+            f'<xsd:element name="{operacion}Response"><xsd:complexType><xsd:sequence>'
+            f'<xsd:element name="{operacion}Result" type="tns:{resultado}" minOccurs="0"/>'
+            f'</xsd:sequence></xsd:complexType></xsd:element>'
+        )
+        mensajes.append(
+            f'<wsdl:message name="{operacion}SoapIn"><wsdl:part name="parameters" element="tns:{operacion}"/></wsdl:message>'
+            f'<wsdl:message name="{operacion}SoapOut"><wsdl:part name="parameters" element="tns:{operacion}Response"/></wsdl:message>'
+        )
+        port.append(
+            f'<wsdl:operation name="{operacion}"><wsdl:input message="tns:{operacion}SoapIn"/>'
+            f'<wsdl:output message="tns:{operacion}SoapOut"/></wsdl:operation>'
+        )
+        binding.append(
+            f'<wsdl:operation name="{operacion}"><soap:operation soapAction="{WSFE_NS}{operacion}" style="document"/>'
+            f'<wsdl:input><soap:body use="literal"/></wsdl:input><wsdl:output><soap:body use="literal"/></wsdl:output>'
+            f'</wsdl:operation>'
+        )
+
+    return f"""<?xml version="1.0" encoding="utf-8"?>
+<wsdl:definitions xmlns:wsdl="http://schemas.xmlsoap.org/wsdl/"
+    xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+    xmlns:xsd="http://www.w3.org/2001/XMLSchema"
+    xmlns:tns="{WSFE_NS}" targetNamespace="{WSFE_NS}">
+  <wsdl:types>
+    <xsd:schema elementFormDefault="qualified" targetNamespace="{WSFE_NS}">
+      {''.join(elementos)}
+      {_WSFE_TIPOS}
+    </xsd:schema>
+  </wsdl:types>
+  {''.join(mensajes)}
+  <wsdl:portType name="ServiceSoap">{''.join(port)}</wsdl:portType>
+  <wsdl:binding name="ServiceSoap" type="tns:ServiceSoap">
+    <soap:binding transport="http://schemas.xmlsoap.org/soap/http"/>
+    {''.join(binding)}
+  </wsdl:binding>
+  <wsdl:service name="Service">
+    <wsdl:port name="ServiceSoap" binding="tns:ServiceSoap">
+      <soap:address location="{{base_url}}{WSFE_PATH}"/>
+    </wsdl:port>
+  </wsdl:service>
+</wsdl:definitions>
+"""
+
+
+WSFE_WSDL = _wsfe_wsdl()
+
+
+PADRON_WSDL = """<?xml version="1.0" encoding="UTF-8"?>
+<wsdl:definitions xmlns:wsdl="http://schemas.xmlsoap.org/wsdl/"
+    xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+    xmlns:xsd="http://www.w3.org/2001/XMLSchema"
+    xmlns:tns="{ns}" targetNamespace="{ns}">
+  <wsdl:types>
+    <xsd:schema targetNamespace="{ns}">
+      <xsd:element name="getPersona_v2">
+        <xsd:complexType><xsd:sequence>
+          <xsd:element name="token" type="xsd:string" minOccurs="0"/>
+          <xsd:element name="sign" type="xsd:string" minOccurs="0"/>
+          <xsd:element name="cuitRepresentada" type="xsd:long"/>
+          <xsd:element name="idPersona" type="xsd:long"/>
+        </xsd:sequence></xsd:complexType>
+      </xsd:element>
+      <xsd:element name="getPersona_v2Response">
+        <xsd:complexType><xsd:sequence>
+          <xsd:element name="personaReturn" type="tns:personaReturn" minOccurs="0"/>
+        </xsd:sequence></xsd:complexType>
+      </xsd:element>
+      <xsd:complexType name="domicilio"><xsd:sequence>
+        <xsd:element name="direccion" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="localidad" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="codPostal" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="descripcionProvincia" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="tipoDomicilio" type="xsd:string" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="datosGenerales"><xsd:sequence>
+        <xsd:element name="idPersona" type="xsd:long"/>
+        <xsd:element name="tipoPersona" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="estadoClave" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="razonSocial" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="nombre" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="apellido" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="domicilioFiscal" type="tns:domicilio" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="impuesto"><xsd:sequence>
+        <xsd:element name="idImpuesto" type="xsd:int"/>
+        <xsd:element name="descripcionImpuesto" type="xsd:string" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="datosRegimenGeneral"><xsd:sequence>
+        <xsd:element name="impuesto" type="tns:impuesto" minOccurs="0" maxOccurs="unbounded"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="categoria"><xsd:sequence>
+        <xsd:element name="descripcionCategoria" type="xsd:string" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="datosMonotributo"><xsd:sequence>
+        <xsd:element name="categoriaMonotributo" type="tns:categoria" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="personaReturn"><xsd:sequence>
+        <xsd:element name="datosGenerales" type="tns:datosGenerales" minOccurs="0"/>
+        <xsd:element name="datosMonotributo" type="tns:datosMonotributo" minOccurs="0"/>
+        <xsd:element name="datosRegimenGeneral" type="tns:datosRegimenGeneral" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+    </xsd:schema>
+  </wsdl:types>
+  <wsdl:message name="getPersona_v2"><wsdl:part name="parameters" element="tns:getPersona_v2"/></wsdl:message>
+  <wsdl:message name="getPersona_v2Response"><wsdl:part name="parameters" element="tns:getPersona_v2Response"/></wsdl:message>
+  <wsdl:portType name="PersonaServiceA5">
+    <wsdl:operation name="getPersona_v2">
+      <wsdl:input message="tns:getPersona_v2"/>
+      <wsdl:output message="tns:getPersona_v2Response"/>
+    </wsdl:operation>
+  </wsdl:portType>
+  <wsdl:binding name="PersonaServiceA5PortBinding" type="tns:PersonaServiceA5">
+    <soap:binding style="document" transport="http://schemas.xmlsoap.org/soap/http"/>
+    <wsdl:operation name="getPersona_v2">
+      <soap:operation soapAction=""/>
+      <wsdl:input><soap:body use="literal"/></wsdl:input>
+      <wsdl:output><soap:body use="literal"/></wsdl:output>
+    </wsdl:operation>
+  </wsdl:binding>
+  <wsdl:service name="PersonaServiceA5">
+    <wsdl:port name="PersonaServiceA5Port" binding="tns:PersonaServiceA5PortBinding">
+      <soap:address location="{{base_url}}{path}"/>
+    </wsdl:port>
+  </wsdl:service>
+</wsdl:definitions>
+""".format(ns=PADRON_NS, path=PADRON_PATH)
@@ -1,11 +1,23 @@
+import os
+
+from arca_integration.client import simulador_url
 from flask import Flask
 from flask_cors import CORS
 
 from .extensions import db, jwt, migrate, init_celery
 from .config import Config
+from .services.limitador_arca import init_limitador_arca
+
+
+def _verificar_simulador_arca() -> None:
+    """El simulador de ARCA nunca debe atender un despliegue de producción."""
+    flask_env = (os.getenv('FLASK_ENV') or '').strip().lower()
+    if flask_env.startswith('prod') and simulador_url():
+        raise RuntimeError('ARCA_SIMULADOR_URL está definida con FLASK_ENV=production: quitala del entorno')
 
 
 def create_app(config_class=Config):
+    _verificar_simulador_arca()
     app = Flask(__name__)
     app.config.from_object(config_class)
 
@@ -14,6 +26,7 @@ def create_app(config_class=Config):
     jwt.init_app(app)
     migrate.init_app(app, db)
     init_celery(app)
+    init_limitador_arca(app)
     CORS(app, origins=app.config['CORS_ORIGINS'].split(','))
 
     # Register blueprints
@@ -31,6 +44,7 @@ def create_app(config_class=Config):
     from .api.downloads import downloads_bp
     from .api.help import help_bp
     from .api.arca_status import arca_status_bp
+    from .api.metricas import metricas_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
@@ -46,5 +60,6 @@ def create_app(config_class=Config):
     app.register_blueprint(downloads_bp, url_prefix='/api/downloads')
     app.register_blueprint(help_bp, url_prefix='/api/help')
     app.register_blueprint(arca_status_bp, url_prefix='/api/arca')
+    app.register_blueprint(metricas_bp)
 
     return app
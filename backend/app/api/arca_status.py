@@ -1,10 +1,8 @@
-import ssl
 import time
-import urllib.request
-from urllib.error import URLError
 
 from flask import Blueprint, jsonify
 
+from ..services.circuito_arca import registrar_sondeo, sondear_url
 from ..utils.decorators import tenant_required
 
 arca_status_bp = Blueprint('arca_status', __name__)
@@ -23,38 +21,16 @@ _cache = {
 CACHE_TTL = 60  # seconds
 
 
-def _create_ssl_context():
-    ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-    ctx.set_ciphers('DEFAULT@SECLEVEL=1')
-    ctx.check_hostname = False
-    ctx.verify_mode = ssl.CERT_NONE
-    return ctx
-
-
-def _check_service(url, ctx):
-    try:
-        response = urllib.request.urlopen(url, context=ctx, timeout=5)
-        if response.status < 500:
-            return 'operational'
-        return 'degraded'
-    except URLError as e:
-        # Check if it's an HTTP error with a status code
-        if hasattr(e, 'code') and e.code >= 500:
-            return 'degraded'
-        return 'down'
-    except Exception:
-        return 'down'
-
-
 def _get_status():
     now = time.time()
     if _cache['result'] and (now - _cache['timestamp']) < CACHE_TTL:
         return _cache['result']
 
-    ctx = _create_ssl_context()
     services = []
     for svc in SERVICES:
-        status = _check_service(svc['url'], ctx)
+        status = sondear_url(svc['url'])
+        # Las URLs son las de producción: el sondeo alimenta ese circuito.
+        registrar_sondeo(svc['key'], 'production', status)
         services.append({
             'name': svc['name'],
             'key': svc['key'],
@@ -1,12 +1,14 @@
 from flask import Blueprint, request, jsonify, g
 from ..models.auditoria import AuditLog
 from ..utils import permission_required
+from ..services.replica import solo_lectura
 
 audit_bp = Blueprint('audit', __name__)
 
 
 @audit_bp.route('', methods=['GET'])
 @permission_required('auditoria:ver')
+@solo_lectura
 def list_audit_logs():
     """Listar logs de auditoría del tenant."""
     page = request.args.get('page', 1, type=int)
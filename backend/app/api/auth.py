@@ -142,11 +142,12 @@ def change_password():
     if len(new_password) < 8:
         return jsonify({'error': 'La contraseña debe tener al menos 8 caracteres'}), 400
 
-    if not g.current_user.check_password(current_password):
+    usuario = db.session.get(Usuario, g.current_user.id)
+    if not usuario or not usuario.check_password(current_password):
         return jsonify({'error': 'Contraseña actual incorrecta'}), 401
 
-    g.current_user.set_password(new_password)
-    g.current_user.password_changed_at = datetime.utcnow()
+    usuario.set_password(new_password)
+    usuario.password_changed_at = datetime.utcnow()
 
     log_action('password:cambio')
     db.session.commit()
@@ -1,7 +1,11 @@
+from datetime import datetime
+from uuid import UUID
+
 from flask import Blueprint, request, jsonify, g
 from ..extensions import db
-from ..models import Facturador
-from ..services.encryption import decrypt_certificate
+from ..models import Facturador, Lote
+from ..services.audit import log_action
+from ..services.encryption import get_facturador_credentials
 from ..utils import permission_required
 
 comprobantes_bp = Blueprint('comprobantes', __name__)
@@ -36,8 +40,7 @@ def consultar_comprobante():
         from arca_integration import ArcaClient
         from arca_integration.services import WSFEService
 
-        cert = decrypt_certificate(facturador.cert_encrypted)
-        key = decrypt_certificate(facturador.key_encrypted)
+        cert, key = get_facturador_credentials(facturador)
 
         client = ArcaClient(
             cuit=facturador.cuit,
@@ -94,8 +97,7 @@ def ultimo_autorizado():
     try:
         from arca_integration import ArcaClient
 
-        cert = decrypt_certificate(facturador.cert_encrypted)
-        key = decrypt_certificate(facturador.key_encrypted)
+        cert, key = get_facturador_credentials(facturador)
 
         client = ArcaClient(
             cuit=facturador.cuit,
@@ -120,3 +122,106 @@ def ultimo_autorizado():
             'success': False,
             'error': f'Error al consultar: {str(e)}'
         }), 400
+
+
+@comprobantes_bp.route('/reconciliar', methods=['POST'])
+@permission_required('comprobantes:consultar')
+def reconciliar():
+    """Verificar contra ARCA las facturas autorizadas de un lote, facturador o rango de fechas."""
+    data = request.get_json(silent=True) or {}
+
+    lote_id = data.get('lote_id')
+    facturador_id = data.get('facturador_id')
+    fecha_desde = data.get('fecha_desde')
+    fecha_hasta = data.get('fecha_hasta')
+
+    if not any([lote_id, facturador_id, fecha_desde, fecha_hasta]):
+        return jsonify({'error': 'Indicá lote_id, facturador_id o un rango de fechas'}), 400
+
+    for field in ('lote_id', 'facturador_id'):
+        if data.get(field):
+            try:
+                UUID(str(data[field]))
+            except (ValueError, TypeError):
+                return jsonify({'error': f'{field} inválido'}), 400
+
+    for field in ('fecha_desde', 'fecha_hasta'):
+        if data.get(field):
+            try:
+                datetime.strptime(str(data[field]), '%Y-%m-%d')
+            except ValueError:
+                return jsonify({'error': f"Campo '{field}' debe tener formato YYYY-MM-DD"}), 400
+
+    if lote_id and not Lote.query.filter_by(id=UUID(str(lote_id)), tenant_id=g.tenant_id).first():
+        return jsonify({'error': 'Lote no encontrado'}), 404
+
+    if facturador_id and not Facturador.query.filter_by(id=UUID(str(facturador_id)), tenant_id=g.tenant_id).first():
+        return jsonify({'error': 'Facturador no encontrado'}), 404
+
+    from ..tasks.reconciliacion import reconciliar_facturas
+    task = reconciliar_facturas.delay(
+        str(g.tenant_id),
+        lote_id=str(lote_id) if lote_id else None,
+        facturador_id=str(facturador_id) if facturador_id else None,
+        fecha_desde=fecha_desde,
+        fecha_hasta=fecha_hasta,
+    )
+
+    log_action('comprobantes:reconciliar', detalle={
+        'lote_id': lote_id,
+        'facturador_id': facturador_id,
+        'fecha_desde': fecha_desde,
+        'fecha_hasta': fecha_hasta,
+    })
+    db.session.commit()
+
+    return jsonify({
+        'message': 'Reconciliación iniciada',
+        'task_id': task.id,
+    }), 202
+
+
+@comprobantes_bp.route('/importar-externos', methods=['POST'])
+@permission_required('facturar:importar')
+def importar_externos():
+    """Importar comprobantes emitidos fuera del sistema para un facturador, punto de venta y tipo."""
+    data = request.get_json(silent=True) or {}
+
+    facturador_id = data.get('facturador_id')
+    tipo_comprobante = data.get('tipo_comprobante')
+
+    if not facturador_id or not tipo_comprobante:
+        return jsonify({'error': 'facturador_id y tipo_comprobante son requeridos'}), 400
+
+    try:
+        facturador_uuid = UUID(str(facturador_id))
+        tipo_comprobante = int(tipo_comprobante)
+        punto_venta = int(data['punto_venta']) if data.get('punto_venta') else None
+    except (ValueError, TypeError):
+        return jsonify({'error': 'Parámetros inválidos'}), 400
+
+    facturador = Facturador.query.filter_by(id=facturador_uuid, tenant_id=g.tenant_id).first()
+    if not facturador:
+        return jsonify({'error': 'Facturador no encontrado'}), 404
+
+    if not facturador.cert_encrypted or not facturador.key_encrypted:
+        return jsonify({'error': 'El facturador no tiene certificados cargados'}), 400
+
+    from ..tasks.reconciliacion import importar_comprobantes_externos
+    task = importar_comprobantes_externos.delay(
+        str(g.tenant_id),
+        str(facturador.id),
+        tipo_comprobante,
+        punto_venta=punto_venta,
+    )
+
+    log_action('comprobantes:importar_externos', recurso='facturador', recurso_id=facturador.id, detalle={
+        'tipo_comprobante': tipo_comprobante,
+        'punto_venta': punto_venta or facturador.punto_venta,
+    })
+    db.session.commit()
+
+    return jsonify({
+        'message': 'Importación de comprobantes externos iniciada',
+        'task_id': task.id,
+    }), 202
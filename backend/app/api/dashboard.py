@@ -7,12 +7,14 @@ from sqlalchemy import func
 from ..extensions import db
 from ..models import Factura, Facturador, Receptor
 from ..utils import permission_required
+from ..services.replica import solo_lectura
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
 
 @dashboard_bp.route('/stats', methods=['GET'])
 @permission_required('dashboard:ver')
+@solo_lectura
 def get_stats():
     month_param = (request.args.get('month') or '').strip()
     historico = (request.args.get('historico', 'false') or '').lower() == 'true'
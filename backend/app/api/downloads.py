@@ -1,6 +1,12 @@
-from flask import Blueprint, g, jsonify, make_response
+import io
+import unicodedata
+from datetime import datetime
+from urllib.parse import quote
+
+from flask import Blueprint, Response, current_app, g, jsonify, request, send_file
 
 from ..models import DownloadArtifact
+from ..services.almacenamiento import AlmacenError, AlmacenLocal, get_almacen
 from ..utils import permission_required
 
 downloads_bp = Blueprint('downloads', __name__)
@@ -17,7 +23,81 @@ def download_zip(task_id):
     if not artifact:
         return jsonify({'error': 'Archivo no encontrado para esta tarea'}), 404
 
-    response = make_response(artifact.file_data)
-    response.headers['Content-Type'] = artifact.mime_type or 'application/octet-stream'
-    response.headers['Content-Disposition'] = f'attachment; filename="{artifact.filename}"'
+    if artifact.expires_at and artifact.expires_at < datetime.utcnow():
+        return jsonify({'error': 'El archivo venció. Generalo nuevamente.'}), 410
+
+    mime_type = artifact.mime_type or 'application/octet-stream'
+
+    if not artifact.storage_key:
+        # Registros anteriores al almacenamiento externo.
+        return send_file(
+            io.BytesIO(artifact.file_data or b''),
+            mimetype=mime_type,
+            as_attachment=True,
+            download_name=artifact.filename,
+            conditional=True,
+        )
+
+    almacen = get_almacen()
+    try:
+        if isinstance(almacen, AlmacenLocal):
+            return _servir_local(almacen, artifact, mime_type)
+        return _servir_streaming(almacen, artifact, mime_type)
+    except AlmacenError:
+        return jsonify({'error': 'Archivo no encontrado para esta tarea'}), 404
+
+
+def _adjunto(response, filename):
+    """``Content-Disposition`` como lo arma ``send_file``: nombres no ASCII con RFC 5987."""
+    try:
+        filename.encode('ascii')
+        nombres = {'filename': filename}
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
+        nombres = {'filename': simple, 'filename*': f"UTF-8''{quote(filename, safe='!#$&+-.^_`|~')}"}
+    response.headers.set('Content-Disposition', 'attachment', **nombres)
+
+
+def _servir_local(almacen, artifact, mime_type):
+    prefijo = current_app.config.get('DOWNLOADS_X_ACCEL_PREFIX')
+    if prefijo:
+        # nginx sirve el archivo (location internal) con sendfile y Range.
+        almacen.tamano(artifact.storage_key)
+        response = Response(status=200, mimetype=mime_type)
+        response.headers['X-Accel-Redirect'] = f"{prefijo.rstrip('/')}/{artifact.storage_key}"
+        _adjunto(response, artifact.filename)
+        return response
+
+    ruta = almacen.ruta(artifact.storage_key)
+    almacen.tamano(artifact.storage_key)
+    return send_file(
+        ruta,
+        mimetype=mime_type,
+        as_attachment=True,
+        download_name=artifact.filename,
+        conditional=True,
+    )
+
+
+def _servir_streaming(almacen, artifact, mime_type):
+    tamano = artifact.size_bytes if artifact.size_bytes is not None else almacen.tamano(artifact.storage_key)
+    rango = request.range.range_for_length(tamano) if request.range else None
+
+    if request.range and rango is None:
+        response = Response(status=416)
+        response.headers['Content-Range'] = f'bytes */{tamano}'
+        return response
+
+    inicio, fin = rango if rango else (0, tamano)
+    response = Response(
+        almacen.leer(artifact.storage_key, inicio, fin),
+        status=206 if rango else 200,
+        mimetype=mime_type,
+        direct_passthrough=True,
+    )
+    response.headers['Content-Length'] = str(fin - inicio)
+    response.headers['Accept-Ranges'] = 'bytes'
+    _adjunto(response, artifact.filename)
+    if rango:
+        response.headers['Content-Range'] = f'bytes {inicio}-{fin - 1}/{tamano}'
     return response
@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify, g
 from ..extensions import db
 from ..models import EmailConfig
-from ..services.encryption import encrypt_certificate
+from ..services.encryption import encrypt_certificate, invalidate_email_config_secrets
 from ..services.email_service import (
     test_smtp_connection,
     send_test_email,
@@ -100,6 +100,7 @@ def update_config():
     log_action('email:configurar', recurso='email_config', recurso_id=config.id,
                detalle={'smtp_host': config.smtp_host, 'from_email': config.from_email})
     db.session.commit()
+    invalidate_email_config_secrets(config.id)
 
     result = config.to_dict()
     result['configured'] = True
@@ -2,13 +2,21 @@ from datetime import date, datetime
 
 from flask import Blueprint, request, jsonify, g
 from ..extensions import db
-from ..models import Facturador
-from ..services.encryption import encrypt_certificate, decrypt_certificate
+from ..models import Caea, FacturaCaeaInforme, Facturador
+from ..services.encryption import (
+    encrypt_certificate,
+    get_facturador_credentials,
+    invalidate_facturador_secrets,
+)
 from ..utils import permission_required
 from ..services.audit import log_action
+from ..services.padron import buscar_padron_cacheado, consultar_padron_cacheado
+from ..services.parametros_arca import PARAMETROS, obtener_parametro
 
 facturadores_bp = Blueprint('facturadores', __name__)
 
+MODOS_AUTORIZACION = ('cae', 'caea')
+
 
 def _parse_fecha_inicio_actividades(raw_value):
     if raw_value in (None, ''):
@@ -165,6 +173,9 @@ def update_facturador(facturador_id):
         if existing:
             return jsonify({'error': 'Ya existe un facturador con ese CUIT, punto de venta y ambiente'}), 400
 
+    if 'modo_autorizacion' in data and data['modo_autorizacion'] not in MODOS_AUTORIZACION:
+        return jsonify({'error': 'modo_autorizacion debe ser cae o caea'}), 400
+
     # Campos actualizables
     if 'razon_social' in data:
         facturador.razon_social = data['razon_social']
@@ -185,6 +196,8 @@ def update_facturador(facturador_id):
         facturador.ambiente = nuevo_ambiente
     if 'activo' in data:
         facturador.activo = data['activo']
+    if 'modo_autorizacion' in data:
+        facturador.modo_autorizacion = data['modo_autorizacion']
 
     log_action('facturador:editar', recurso='facturador', recurso_id=facturador.id)
     db.session.commit()
@@ -241,6 +254,7 @@ def upload_certificados(facturador_id):
         log_action('facturador:certificados', recurso='facturador', recurso_id=facturador.id,
                    detalle={'cuit': facturador.cuit})
         db.session.commit()
+        invalidate_facturador_secrets(facturador.id)
 
         return jsonify({
             'message': 'Certificados cargados exitosamente',
@@ -269,8 +283,7 @@ def test_conexion(facturador_id):
     try:
         from arca_integration import ArcaClient
 
-        cert = decrypt_certificate(facturador.cert_encrypted)
-        key = decrypt_certificate(facturador.key_encrypted)
+        cert, key = get_facturador_credentials(facturador)
 
         client = ArcaClient(
             cuit=facturador.cuit,
@@ -298,6 +311,80 @@ def test_conexion(facturador_id):
         }), 400
 
 
+@facturadores_bp.route('/<uuid:facturador_id>/caea', methods=['GET'])
+@permission_required('facturadores:ver')
+def get_caea(facturador_id):
+    """CAEAs obtenidos por el facturador y estado del informe a ARCA."""
+    facturador = Facturador.query.filter_by(
+        id=facturador_id,
+        tenant_id=g.tenant_id
+    ).first()
+
+    if not facturador:
+        return jsonify({'error': 'Facturador no encontrado'}), 404
+
+    caeas = Caea.query.filter_by(facturador_id=facturador.id).order_by(
+        Caea.periodo.desc(),
+        Caea.orden.desc(),
+    ).limit(24).all()
+
+    informes = db.session.query(
+        FacturaCaeaInforme.estado,
+        db.func.count(FacturaCaeaInforme.factura_id),
+    ).filter(
+        FacturaCaeaInforme.facturador_id == facturador.id,
+    ).group_by(FacturaCaeaInforme.estado).all()
+
+    return jsonify({
+        'modo_autorizacion': facturador.modo_autorizacion,
+        'caeas': [caea.to_dict() for caea in caeas],
+        'informes': {estado: count for estado, count in informes},
+    }), 200
+
+
+@facturadores_bp.route('/<uuid:facturador_id>/parametros/<tipo>', methods=['GET'])
+@permission_required('facturadores:ver')
+def get_parametros_arca(facturador_id, tipo):
+    """Datos de referencia de WSFE (FEParamGet*) servidos desde cache."""
+    if tipo not in PARAMETROS:
+        return jsonify({'error': f'Tipo de parámetro inválido. Opciones: {", ".join(sorted(PARAMETROS))}'}), 400
+
+    arg = None
+    if tipo == 'cotizacion':
+        arg = (request.args.get('moneda') or '').strip().upper()
+        if not arg:
+            return jsonify({'error': 'moneda es requerida'}), 400
+    elif tipo == 'condicion_iva_receptor':
+        arg = (request.args.get('clase') or '').strip().upper() or None
+
+    facturador = Facturador.query.filter_by(
+        id=facturador_id,
+        tenant_id=g.tenant_id
+    ).first()
+
+    if not facturador:
+        return jsonify({'error': 'Facturador no encontrado'}), 404
+
+    if not facturador.cert_encrypted or not facturador.key_encrypted:
+        return jsonify({'error': 'El facturador no tiene certificados cargados'}), 400
+
+    try:
+        from arca_integration import ArcaClient
+
+        cert, key = get_facturador_credentials(facturador)
+        client = ArcaClient(
+            cuit=facturador.cuit,
+            cert=cert,
+            key=key,
+            ambiente=facturador.ambiente
+        )
+        data = obtener_parametro(client, tipo, arg)
+    except Exception as e:
+        return jsonify({'error': f'Error al consultar ARCA: {str(e)}'}), 502
+
+    return jsonify({'tipo': tipo, 'data': data}), 200
+
+
 @facturadores_bp.route('/consultar-cuit', methods=['POST'])
 @permission_required('facturadores:ver')
 def consultar_cuit():
@@ -321,17 +408,18 @@ def consultar_cuit():
         if not facturador or not facturador.cert_encrypted:
             return jsonify({'error': 'Se requiere un facturador con certificados para consultar'}), 400
 
-        cert = decrypt_certificate(facturador.cert_encrypted)
-        key = decrypt_certificate(facturador.key_encrypted)
+        result = buscar_padron_cacheado(cuit, facturador.ambiente)
+        if result is None:
+            cert, key = get_facturador_credentials(facturador)
 
-        client = ArcaClient(
-            cuit=facturador.cuit,
-            cert=cert,
-            key=key,
-            ambiente=facturador.ambiente
-        )
+            client = ArcaClient(
+                cuit=facturador.cuit,
+                cert=cert,
+                key=key,
+                ambiente=facturador.ambiente
+            )
 
-        result = client.consultar_padron(cuit)
+            result = consultar_padron_cacheado(client, cuit, facturador.ambiente)
 
         return jsonify({
             'success': True,
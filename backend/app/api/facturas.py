@@ -13,14 +13,17 @@ from ..services.comprobante_rules import (
 )
 from ..services.comprobante_filename import build_comprobante_pdf_filename
 from ..services.csv_parser import parse_csv
+from ..services.historial_arca import intercambios_de_factura
 from ..services.audit import log_action
 from ..utils import permission_required
+from ..services.replica import solo_lectura
 
 facturas_bp = Blueprint('facturas', __name__)
 
 
 @facturas_bp.route('', methods=['GET'])
 @permission_required('facturas:ver')
+@solo_lectura
 def list_facturas():
     """Listar facturas del tenant con filtros."""
     page = request.args.get('page', 1, type=int)
@@ -170,6 +173,7 @@ def update_factura(factura_id):
         for idx, item_data in enumerate(parsed['items']):
             item = FacturaItem(
                 factura_id=factura.id,
+                fecha_emision=factura.fecha_emision,
                 descripcion=item_data['descripcion'],
                 cantidad=item_data['cantidad'],
                 precio_unitario=item_data['precio_unitario'],
@@ -199,6 +203,26 @@ def update_factura(factura_id):
     return jsonify(factura.to_dict(include_items=True)), 200
 
 
+@facturas_bp.route('/<uuid:factura_id>/arca-historial', methods=['GET'])
+@permission_required('facturas:ver')
+def get_arca_historial(factura_id):
+    """Intercambios con ARCA de la factura (request/response de cada intento)."""
+    factura = Factura.query.filter_by(
+        id=factura_id,
+        tenant_id=g.tenant_id
+    ).first()
+
+    if not factura:
+        return jsonify({'error': 'Factura no encontrada'}), 404
+
+    return jsonify({
+        'factura_id': str(factura.id),
+        'intercambios': intercambios_de_factura(factura),
+        # Request guardado para informar comprobantes CAEA.
+        'arca_request': factura.arca_request,
+    }), 200
+
+
 @facturas_bp.route('/<uuid:factura_id>/comprobante-html', methods=['GET'])
 @permission_required('facturas:comprobante')
 def get_comprobante_html(factura_id):
@@ -562,6 +586,7 @@ def create_factura():
         for idx, item_data in enumerate(parsed_items):
             item = FacturaItem(
                 factura_id=factura.id,
+                fecha_emision=factura.fecha_emision,
                 descripcion=item_data['descripcion'],
                 cantidad=item_data['cantidad'],
                 precio_unitario=item_data['precio_unitario'],
@@ -670,6 +695,7 @@ def create_factura_from_data(data: dict, lote_id: str, tenant_id: str, facturado
         for idx, item_data in enumerate(data['items']):
             item = FacturaItem(
                 factura_id=factura.id,
+                fecha_emision=factura.fecha_emision,
                 descripcion=item_data['descripcion'],
                 cantidad=item_data['cantidad'],
                 precio_unitario=item_data['precio_unitario'],
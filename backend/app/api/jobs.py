@@ -1,15 +1,19 @@
-from flask import Blueprint, jsonify
+import json
+import time
+
+import redis
+from flask import Blueprint, Response, current_app, jsonify
 from celery.result import AsyncResult
 from ..extensions import celery
+from ..services.progress import subscribe_progress
 from ..utils import tenant_required
 
 jobs_bp = Blueprint('jobs', __name__)
 
+TERMINAL_STATES = {'SUCCESS', 'FAILURE', 'REVOKED'}
 
-@jobs_bp.route('/<task_id>/status', methods=['GET'])
-@tenant_required
-def get_job_status(task_id):
-    """Obtener el estado de una tarea de Celery."""
+
+def _build_job_status(task_id: str) -> dict:
     task = AsyncResult(task_id, app=celery)
 
     response = {
@@ -35,4 +39,78 @@ def get_job_status(task_id):
     elif task.status == 'FAILURE':
         response['error'] = str(task.result)
 
-    return jsonify(response), 200
+    return response
+
+
+@jobs_bp.route('/<task_id>/status', methods=['GET'])
+@tenant_required
+def get_job_status(task_id):
+    """Obtener el estado de una tarea de Celery."""
+    return jsonify(_build_job_status(task_id)), 200
+
+
+def _sse_event(payload: dict) -> str:
+    return f'data: {json.dumps(payload, separators=(",", ":"))}\n\n'
+
+
+@jobs_bp.route('/<task_id>/stream', methods=['GET'])
+@tenant_required
+def stream_job_status(task_id):
+    """Stream SSE del progreso de una tarea (lote, ZIP o emails).
+
+    Emite el estado actual al conectar y luego cada evento publicado por la
+    tarea. Cierra al llegar a un estado final o tras PROGRESS_STREAM_MAX_SECONDS
+    (el cliente reconecta). Si Redis no está disponible responde 503 y el
+    cliente vuelve al polling de /status.
+    """
+    if not current_app.config.get('PROGRESS_STREAM_ENABLED', True):
+        return jsonify({'error': 'Stream de progreso deshabilitado'}), 404
+
+    heartbeat = current_app.config.get('PROGRESS_STREAM_HEARTBEAT_SECONDS', 15)
+    max_seconds = current_app.config.get('PROGRESS_STREAM_MAX_SECONDS', 300)
+
+    # Suscribirse antes de leer el estado inicial para no perder eventos.
+    try:
+        pubsub = subscribe_progress(task_id)
+    except redis.RedisError:
+        return jsonify({'error': 'Stream de progreso no disponible'}), 503
+
+    initial = _build_job_status(task_id)
+
+    def generate():
+        try:
+            yield _sse_event(initial)
+            if initial['status'] in TERMINAL_STATES:
+                return
+
+            deadline = time.monotonic() + max_seconds
+            while time.monotonic() < deadline:
+                message = pubsub.get_message(timeout=heartbeat)
+                if not message:
+                    # Heartbeat + verificación por si el aviso final se perdió.
+                    status = _build_job_status(task_id)
+                    if status['status'] in TERMINAL_STATES:
+                        yield _sse_event(status)
+                        return
+                    yield ': keepalive\n\n'
+                    continue
+
+                payload = json.loads(message['data'])
+                if payload.get('finished'):
+                    yield _sse_event(_build_job_status(task_id))
+                    return
+
+                yield _sse_event({'task_id': task_id, **payload})
+        except redis.RedisError:
+            return
+        finally:
+            pubsub.close()
+
+    return Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+        },
+    )
@@ -7,6 +7,9 @@ from ..extensions import db, celery
 from ..models import Lote, Factura, Facturador, EmailConfig
 from ..utils import permission_required
 from ..services.audit import log_action
+from ..services.autorizaciones import aplicar_autorizaciones_pendientes
+from ..services.planificador import encolar_lote
+from ..services.replica import posicion_primaria, replica_configurada, solo_lectura
 
 lotes_bp = Blueprint('lotes', __name__)
 
@@ -20,6 +23,7 @@ def _facturador_datos_fiscales_completos(facturador: Facturador) -> bool:
 
 @lotes_bp.route('', methods=['GET'])
 @permission_required('facturas:ver')
+@solo_lectura
 def list_lotes():
     """Listar lotes del tenant."""
     page = request.args.get('page', 1, type=int)
@@ -79,13 +83,27 @@ def get_lote(lote_id):
 
     stats = {estado: count for estado, count in facturas_stats}
 
-    lote_dict = lote.to_dict()
+    programados, proximo_reintento = db.session.query(
+        db.func.count(Factura.id),
+        db.func.min(Factura.proximo_reintento),
+    ).filter(
+        Factura.tenant_id == g.tenant_id,
+        Factura.lote_id == lote_id,
+        Factura.estado == 'pendiente',
+        Factura.proximo_reintento.isnot(None),
+    ).one()
+
+    lote_dict = lote.to_dict(include_perfil=True)
     lote_dict['stats'] = {
         'pendientes': stats.get('pendiente', 0),
         'autorizadas': stats.get('autorizado', 0),
         'errores': stats.get('error', 0),
         'borradores': stats.get('borrador', 0)
     }
+    lote_dict['reintentos'] = {
+        'programados': programados,
+        'proximo': proximo_reintento.isoformat() if proximo_reintento else None,
+    }
 
     return jsonify(lote_dict), 200
 
@@ -112,6 +130,9 @@ def facturar_lote(lote_id):
         lote.estado = 'error'
         db.session.flush()
 
+    # Reflejar CAEs ya obtenidos antes de resetear errores, para no re-emitir
+    aplicar_autorizaciones_pendientes(g.tenant_id, lote.id)
+
     # Verificar que hay facturas reintentables
     facturas_reintentables = Factura.query.filter(
         Factura.tenant_id == g.tenant_id,
@@ -122,16 +143,18 @@ def facturar_lote(lote_id):
     if facturas_reintentables == 0:
         return jsonify({'error': 'No hay facturas pendientes o con error en este lote'}), 400
 
-    # Resetear facturas en error para permitir reintento
-    Factura.query.filter_by(
-        tenant_id=g.tenant_id,
-        lote_id=lote_id,
-        estado='error'
+    # Resetear facturas en error (y reintentos programados) para reintentar ya
+    Factura.query.filter(
+        Factura.tenant_id == g.tenant_id,
+        Factura.lote_id == lote_id,
+        Factura.estado.in_(['pendiente', 'error']),
     ).update(
         {
             Factura.estado: 'pendiente',
             Factura.error_codigo: None,
             Factura.error_mensaje: None,
+            Factura.reintentos: 0,
+            Factura.proximo_reintento: None,
         },
         synchronize_session=False,
     )
@@ -201,21 +224,17 @@ def facturar_lote(lote_id):
 
     # Actualizar estado del lote
     lote.estado = 'procesando'
+    lote.pausado_por = None
     log_action('lote:facturar', recurso='lote', recurso_id=lote.id,
                detalle={'etiqueta': lote.etiqueta, 'facturas_pendientes': facturas_pendientes})
     db.session.commit()
 
-    # Disparar tarea de Celery
-    from ..tasks.facturacion import procesar_lote
-    task = procesar_lote.delay(str(lote_id), str(g.tenant_id))
-
-    # Guardar task_id
-    lote.celery_task_id = task.id
-    db.session.commit()
+    # Disparar tarea de Celery (primer turno, vía el planificador)
+    task_id = encolar_lote(lote)
 
     return jsonify({
         'message': 'Proceso de facturación iniciado',
-        'task_id': task.id,
+        'task_id': task_id,
         'lote': lote.to_dict(),
         'facturador': {
             'id': str(facturador.id),
@@ -351,6 +370,7 @@ def email_preview_lote(lote_id):
 
 @lotes_bp.route('/<uuid:lote_id>/comprobantes-zip-preview', methods=['GET'])
 @permission_required('facturas:comprobante')
+@solo_lectura
 def comprobantes_zip_preview(lote_id):
     """Obtener cantidad de comprobantes autorizados para ZIP por lote."""
     lote = Lote.query.filter_by(
@@ -395,7 +415,8 @@ def generar_comprobantes_zip(lote_id):
         return jsonify({'error': 'El lote no tiene comprobantes autorizados para descargar'}), 400
 
     from ..tasks.downloads import generar_comprobantes_zip_lote
-    task = generar_comprobantes_zip_lote.delay(str(lote.id), str(g.tenant_id))
+    posicion = posicion_primaria() if replica_configurada() else None
+    task = generar_comprobantes_zip_lote.delay(str(lote.id), str(g.tenant_id), posicion_replica=posicion)
 
     log_action(
         'facturas:comprobante',
@@ -0,0 +1,20 @@
+import hmac
+
+from flask import Blueprint, Response, current_app, request
+
+from ..services.metricas import generar_respuesta
+
+metricas_bp = Blueprint('metricas', __name__)
+
+
+@metricas_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Métricas en formato Prometheus. Con METRICS_TOKEN exige ``Authorization: Bearer <token>``."""
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        recibido = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(recibido, token):
+            return Response('unauthorized\n', status=401, mimetype='text/plain')
+
+    body, content_type = generar_respuesta()
+    return Response(body, content_type=content_type)
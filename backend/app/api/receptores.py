@@ -1,9 +1,12 @@
+from uuid import UUID
+
 from flask import Blueprint, request, jsonify, g
 import csv
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from ..extensions import db
 from ..models import Receptor, Facturador, Factura
-from ..services.encryption import decrypt_certificate
+from ..services.encryption import get_facturador_credentials
+from ..services.padron import buscar_padron_cacheado, consultar_padron_cacheado
 from ..services.receptores_csv_parser import parse_receptores_csv
 from ..utils import permission_required
 from ..services.audit import log_action
@@ -196,6 +199,13 @@ def import_receptores():
     if 'file' not in request.files:
         return jsonify({'error': 'Archivo CSV requerido'}), 400
 
+    facturador_id = (request.form.get('facturador_id') or '').strip() or None
+    if facturador_id:
+        try:
+            facturador_id = UUID(facturador_id)
+        except ValueError:
+            return jsonify({'error': 'facturador_id inválido'}), 400
+
     file = request.files['file']
     try:
         rows, errors = parse_receptores_csv(file.read())
@@ -266,13 +276,55 @@ def import_receptores():
         db.session.rollback()
         return jsonify({'error': 'Error al guardar los receptores en la base de datos'}), 500
 
-    return jsonify({
+    response = {
         'procesados': procesados,
         'creados': creados,
         'actualizados': actualizados,
         'omitidos': omitidos,
         'errores': errors
-    }), 200
+    }
+
+    if (request.form.get('enriquecer') or '').strip().lower() in ('1', 'true', 'si', 'sí'):
+        response['enriquecimiento'] = _iniciar_enriquecimiento(
+            [existing_by_doc[row['doc_nro']] for row in rows],
+            facturador_id,
+        )
+
+    return jsonify(response), 200
+
+
+def _receptor_incompleto(receptor: Receptor) -> bool:
+    if receptor.doc_tipo not in (80, 86, 87):
+        return False
+    return (
+        receptor.condicion_iva_id is None
+        or not receptor.direccion
+        or not receptor.razon_social
+        or receptor.razon_social.startswith('CUIT ')
+    )
+
+
+def _iniciar_enriquecimiento(receptores: list[Receptor], facturador_id: UUID | None) -> dict:
+    """Encola la consulta de padrón de los receptores importados incompletos."""
+    from ..tasks.receptores import enriquecer_receptores_padron
+
+    ids = sorted({str(receptor.id) for receptor in receptores if _receptor_incompleto(receptor)})
+    if not ids:
+        return {'total': 0, 'task_id': None}
+
+    query = Facturador.query.filter(
+        Facturador.tenant_id == g.tenant_id,
+        Facturador.activo.is_(True),
+        Facturador.cert_encrypted.isnot(None),
+    )
+    if facturador_id:
+        query = query.filter(Facturador.id == facturador_id)
+    facturador = query.first()
+    if not facturador:
+        return {'total': len(ids), 'task_id': None, 'error': 'Se requiere un facturador con certificados para consultar'}
+
+    task = enriquecer_receptores_padron.delay(str(g.tenant_id), ids, str(facturador.id))
+    return {'total': len(ids), 'task_id': task.id}
 
 
 @receptores_bp.route('/consultar-cuit', methods=['POST'])
@@ -298,17 +350,18 @@ def consultar_cuit():
         if not facturador or not facturador.cert_encrypted:
             return jsonify({'error': 'Se requiere un facturador con certificados para consultar'}), 400
 
-        cert = decrypt_certificate(facturador.cert_encrypted)
-        key = decrypt_certificate(facturador.key_encrypted)
+        result = buscar_padron_cacheado(cuit, facturador.ambiente)
+        if result is None:
+            cert, key = get_facturador_credentials(facturador)
 
-        client = ArcaClient(
-            cuit=facturador.cuit,
-            cert=cert,
-            key=key,
-            ambiente=facturador.ambiente
-        )
+            client = ArcaClient(
+                cuit=facturador.cuit,
+                cert=cert,
+                key=key,
+                ambiente=facturador.ambiente
+            )
 
-        result = client.consultar_padron(cuit)
+            result = consultar_padron_cacheado(client, cuit, facturador.ambiente)
 
         if not result.get('success'):
             return jsonify({
@@ -4,6 +4,7 @@ from ..models import Usuario
 from ..utils import permission_required
 from ..services.permissions import ROLE_PERMISSIONS, ROLES
 from ..services.audit import log_action
+from ..services.auth_cache import invalidate_user
 
 usuarios_bp = Blueprint('usuarios', __name__)
 
@@ -135,6 +136,7 @@ def update_usuario(usuario_id):
 
     log_action('usuario:editar', recurso='usuario', recurso_id=usuario.id)
     db.session.commit()
+    invalidate_user(usuario.id)
 
     return jsonify(usuario.to_dict()), 200
 
@@ -157,6 +159,7 @@ def toggle_active(usuario_id):
     log_action(action, recurso='usuario', recurso_id=usuario.id,
                detalle={'email': usuario.email})
     db.session.commit()
+    invalidate_user(usuario.id)
 
     return jsonify(usuario.to_dict()), 200
 
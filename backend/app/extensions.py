@@ -1,19 +1,111 @@
+from contextvars import ContextVar
+
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
 from celery import Celery
+from sqlalchemy.sql import Select
+
+BIND_REPLICA = 'replica'
+
+# True dentro de services.replica.leer_de_replica (handlers @solo_lectura,
+# tareas de reportes).
+lecturas_en_replica: ContextVar[bool] = ContextVar('lecturas_en_replica', default=False)
+
+
+class RoutingSession(Session):
+    """Manda a la réplica los SELECT hechos dentro de ``leer_de_replica``.
 
-db = SQLAlchemy()
+    Escrituras, ``SELECT ... FOR UPDATE``, SQL textual y cualquier lectura
+    posterior a un flush en ese mismo bloque siguen yendo a la primaria.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and lecturas_en_replica.get()
+            and not self._flushing
+            and not self.info.get('escrituras')
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+            and BIND_REPLICA in self._db.engines
+        ):
+            return self._db.engines[BIND_REPLICA]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 migrate = Migrate()
 
 celery = Celery('tasks')
 
+# Una cola por tipo de trabajo, cada una con su perfil de worker (ver
+# docker-compose.yml): los renders de Chromium y el SMTP no le quitan
+# procesos a la emisión contra ARCA.
+COLAS_TAREAS = {
+    'emision': [
+        'app.tasks.facturacion.procesar_lote',
+        'app.tasks.caea.informar_caea',
+        'app.tasks.reconciliacion.reconciliar_facturas',
+        'app.tasks.reconciliacion.importar_comprobantes_externos',
+        'app.tasks.receptores.enriquecer_receptores_padron',
+    ],
+    'render': [
+        'app.tasks.downloads.generar_comprobantes_zip_lote',
+    ],
+    'email': [
+        'app.tasks.email.enviar_factura_email',
+        'app.tasks.email.enviar_emails_lote',
+    ],
+    'mantenimiento': [
+        'app.tasks.downloads.limpiar_descargas_vencidas',
+        'app.tasks.historial_arca.archivar_historial_arca',
+        'app.tasks.particiones.crear_particiones_factura',
+        'app.tasks.circuito_arca.reanudar_lotes_pausados',
+        'app.tasks.planificador.despachar_turnos',
+        'app.tasks.caea.barrer_informes_caea',
+    ],
+}
+
 
 def init_celery(app):
     celery.conf.broker_url = app.config['CELERY_BROKER_URL']
     celery.conf.result_backend = app.config['CELERY_RESULT_BACKEND']
     celery.conf.broker_connection_retry_on_startup = True
+    celery.conf.task_default_queue = 'mantenimiento'
+    celery.conf.task_routes = {
+        tarea: {'queue': cola}
+        for cola, tareas in COLAS_TAREAS.items()
+        for tarea in tareas
+    }
+    celery.conf.beat_schedule = {
+        'limpiar-descargas-vencidas': {
+            'task': 'app.tasks.downloads.limpiar_descargas_vencidas',
+            'schedule': 3600.0,
+        },
+        'archivar-historial-arca': {
+            'task': 'app.tasks.historial_arca.archivar_historial_arca',
+            'schedule': 24 * 3600.0,
+        },
+        'crear-particiones-factura': {
+            'task': 'app.tasks.particiones.crear_particiones_factura',
+            'schedule': 24 * 3600.0,
+        },
+        'reanudar-lotes-pausados': {
+            'task': 'app.tasks.circuito_arca.reanudar_lotes_pausados',
+            'schedule': float(app.config.get('ARCA_CIRCUITO_SONDEO_SECONDS', 30)),
+        },
+        'despachar-turnos': {
+            'task': 'app.tasks.planificador.despachar_turnos',
+            'schedule': 15.0,
+        },
+        'barrer-informes-caea': {
+            'task': 'app.tasks.caea.barrer_informes_caea',
+            'schedule': float(app.config.get('CAEA_INFORME_BARRIDO_SECONDS', 300)),
+        },
+    }
 
     class ContextTask(celery.Task):
         def __call__(self, *args, **kwargs):
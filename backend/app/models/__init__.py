@@ -3,10 +3,14 @@ from .usuario import Usuario
 from .facturador import Facturador
 from .receptor import Receptor
 from .lote import Lote
-from .factura import Factura, FacturaItem
+from .factura import Factura, FacturaItem, FacturaPayload
+from .factura_autorizacion import FacturaAutorizacion, FacturaEmisionEnCurso
+from .caea import Caea, FacturaCaeaInforme
+from .padron_cache import PadronCache
 from .auditoria import AuditLog
 from .email_config import EmailConfig
 from .download_artifact import DownloadArtifact
+from .arca_intercambio import FacturaArcaIntercambio
 
 __all__ = [
     'Tenant',
@@ -16,7 +20,14 @@ __all__ = [
     'Lote',
     'Factura',
     'FacturaItem',
+    'FacturaPayload',
+    'FacturaAutorizacion',
+    'FacturaEmisionEnCurso',
+    'Caea',
+    'FacturaCaeaInforme',
+    'PadronCache',
     'AuditLog',
     'EmailConfig',
     'DownloadArtifact',
+    'FacturaArcaIntercambio',
 ]
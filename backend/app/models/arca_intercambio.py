@@ -0,0 +1,32 @@
+import uuid
+from datetime import datetime
+from ..extensions import db
+
+
+class FacturaArcaIntercambio(db.Model):
+    """Historial append-only de los intercambios con ARCA de cada factura.
+
+    Una fila por intento (FECAESolicitar, FECompConsultar...). Request y
+    response se guardan como JSON comprimido (``codificacion``); se leen con
+    ``app.services.historial_arca``.
+    """
+    __tablename__ = 'factura_arca_intercambio'
+
+    id = db.Column(db.Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = db.Column(db.Uuid(as_uuid=True), db.ForeignKey('tenant.id'), nullable=False)
+    # Sin FK a factura (particionada); se borra con el trigger factura_borrar_dependientes.
+    factura_id = db.Column(db.Uuid(as_uuid=True), nullable=False)
+    lote_id = db.Column(db.Uuid(as_uuid=True), db.ForeignKey('lote.id', ondelete='SET NULL'))
+    operacion = db.Column(db.String(40), nullable=False)
+    resultado = db.Column(db.String(20), nullable=False)  # 'autorizado', 'rechazado', 'error'
+    error_codigo = db.Column(db.String(50))
+    codificacion = db.Column(db.String(10), nullable=False, default='gzip')
+    request_data = db.Column(db.LargeBinary)
+    response_data = db.Column(db.LargeBinary)
+    bytes_originales = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_factura_arca_intercambio_factura', 'factura_id', 'created_at'),
+        db.Index('ix_factura_arca_intercambio_created', 'created_at'),
+    )
@@ -0,0 +1,70 @@
+import uuid
+from datetime import datetime
+from ..extensions import db
+
+
+class Caea(db.Model):
+    """CAEA otorgado por ARCA para un facturador y una quincena.
+
+    Funciona como cache compartida entre workers: se solicita una sola vez por
+    período/orden y luego se reutiliza para autorizar localmente.
+    """
+    __tablename__ = 'caea'
+
+    id = db.Column(db.Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = db.Column(db.Uuid(as_uuid=True), db.ForeignKey('tenant.id'), nullable=False)
+    facturador_id = db.Column(db.Uuid(as_uuid=True), db.ForeignKey('facturador.id', ondelete='CASCADE'), nullable=False)
+    periodo = db.Column(db.Integer, nullable=False)  # YYYYMM
+    orden = db.Column(db.Integer, nullable=False)  # 1 = días 1-15, 2 = días 16-fin de mes
+    codigo = db.Column(db.String(20), nullable=False)
+    fch_vig_desde = db.Column(db.Date)
+    fch_vig_hasta = db.Column(db.Date)
+    fch_tope_inf = db.Column(db.Date)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('facturador_id', 'periodo', 'orden', name='unique_caea_facturador_periodo_orden'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': str(self.id),
+            'facturador_id': str(self.facturador_id),
+            'periodo': self.periodo,
+            'orden': self.orden,
+            'codigo': self.codigo,
+            'fch_vig_desde': self.fch_vig_desde.isoformat() if self.fch_vig_desde else None,
+            'fch_vig_hasta': self.fch_vig_hasta.isoformat() if self.fch_vig_hasta else None,
+            'fch_tope_inf': self.fch_tope_inf.isoformat() if self.fch_tope_inf else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class FacturaCaeaInforme(db.Model):
+    """Seguimiento del informe a ARCA (FECAEARegInformativo) de una factura CAEA.
+
+    Estados: 'pendiente' -> 'enviando' -> 'informado' | 'rechazado'.
+    Ante fallas transitorias vuelve a 'pendiente' con ``proximo_intento_at``;
+    al agotar CAEA_INFORME_MAX_INTENTOS queda en 'error'.
+    """
+    __tablename__ = 'factura_caea_informe'
+
+    # Sin FK a factura (particionada); se borra con el trigger factura_borrar_dependientes.
+    factura_id = db.Column(db.Uuid(as_uuid=True), primary_key=True)
+    tenant_id = db.Column(db.Uuid(as_uuid=True), db.ForeignKey('tenant.id'), nullable=False)
+    facturador_id = db.Column(db.Uuid(as_uuid=True), db.ForeignKey('facturador.id'), nullable=False)
+    caea_id = db.Column(db.Uuid(as_uuid=True), db.ForeignKey('caea.id'), nullable=False)
+    estado = db.Column(db.String(20), nullable=False, default='pendiente')
+    intentos = db.Column(db.Integer, nullable=False, default=0)
+    ultimo_error = db.Column(db.Text)
+    proximo_intento_at = db.Column(db.DateTime)
+    informado_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_factura_caea_informe_facturador_estado', 'facturador_id', 'estado'),
+    )
+
+    caea = db.relationship('Caea')
+    factura = db.relationship('Factura', primaryjoin='foreign(FacturaCaeaInforme.factura_id) == Factura.id')
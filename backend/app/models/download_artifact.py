@@ -12,5 +12,10 @@ class DownloadArtifact(db.Model):
     task_id = db.Column(db.String(255), nullable=False, unique=True, index=True)
     filename = db.Column(db.String(255), nullable=False)
     mime_type = db.Column(db.String(100), nullable=False, default='application/octet-stream')
-    file_data = db.Column(db.LargeBinary, nullable=False)
+    # Sólo registros anteriores al almacenamiento externo; los nuevos usan storage_key.
+    file_data = db.Column(db.LargeBinary, nullable=True)
+    storage_backend = db.Column(db.String(20))
+    storage_key = db.Column(db.String(500))
+    size_bytes = db.Column(db.BigInteger)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, index=True)
@@ -1,6 +1,8 @@
 import uuid
 from datetime import datetime
 from decimal import Decimal
+from sqlalchemy import event
+from sqlalchemy.orm import column_property, foreign, object_session
 from ..extensions import db
 
 
@@ -19,8 +21,10 @@ class Factura(db.Model):
     punto_venta = db.Column(db.Integer, nullable=False)
     numero_comprobante = db.Column(db.BigInteger)
 
-    # Fechas
-    fecha_emision = db.Column(db.Date, nullable=False)
+    # Fechas. fecha_emision es parte de la PK: en PostgreSQL factura está
+    # particionada por mes de fecha_emision y la clave de partición tiene que
+    # estar en la PK (ver app.services.particiones).
+    fecha_emision = db.Column(db.Date, primary_key=True)
     fecha_desde = db.Column(db.Date)
     fecha_hasta = db.Column(db.Date)
     fecha_vto_pago = db.Column(db.Date)
@@ -42,18 +46,20 @@ class Factura(db.Model):
     estado = db.Column(db.String(50), default='borrador')  # 'borrador', 'pendiente', 'autorizado', 'error'
     error_codigo = db.Column(db.String(50))
     error_mensaje = db.Column(db.Text)
+    # Reintentos diferidos de procesar_lote (ver services/reintentos.py)
+    reintentos = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    proximo_reintento = db.Column(db.DateTime)
+
+    # Origen: 'sistema' (emitida acá) o 'externo' (importada desde ARCA, solo lectura)
+    origen = db.Column(db.String(20), nullable=False, default='sistema', server_default='sistema')
 
     # Comprobante asociado (para notas de crédito/débito)
     cbte_asoc_tipo = db.Column(db.Integer)
     cbte_asoc_pto_vta = db.Column(db.Integer)
     cbte_asoc_nro = db.Column(db.BigInteger)
 
-    # ARCA request/response
-    arca_request = db.Column(db.JSON)
-    arca_response = db.Column(db.JSON)
-
-    # Comprobante renderizado (HTML). El PDF se genera on-demand.
-    comprobante_html = db.Column(db.Text)
+    # ARCA request/response y HTML renderizado: viven en factura_payload
+    # (ver propiedades más abajo) para que la fila de factura quede angosta.
 
     # Email
     email_enviado = db.Column(db.Boolean, default=False)
@@ -74,6 +80,62 @@ class Factura(db.Model):
     facturador = db.relationship('Facturador', back_populates='facturas')
     receptor = db.relationship('Receptor', back_populates='facturas')
     items = db.relationship('FacturaItem', back_populates='factura', cascade='all, delete-orphan')
+    # Sin FK: una FK hacia la tabla particionada tendría que incluir
+    # fecha_emision. El ORM borra el payload junto con la factura.
+    payload = db.relationship('FacturaPayload', back_populates='factura', uselist=False,
+                              primaryjoin=lambda: Factura.id == foreign(FacturaPayload.factura_id),
+                              cascade='all, delete-orphan')
+
+    # En PostgreSQL, factura y factura_item están particionadas por mes de
+    # fecha_emision (ver app.services.particiones); estos índices se crean
+    # por partición.
+    __table_args__ = (
+        db.Index('ix_factura_tenant_fecha', 'tenant_id', 'fecha_emision'),
+        db.Index('ix_factura_lote', 'lote_id'),
+        # Numeración local (modo CAEA, huecos de reconciliación).
+        db.Index('ix_factura_numeracion', 'facturador_id', 'punto_venta', 'tipo_comprobante', 'numero_comprobante'),
+    )
+
+    def _get_payload_attr(self, nombre):
+        return getattr(self.payload, nombre) if self.payload is not None else None
+
+    def _set_payload_attr(self, nombre, valor):
+        if self.payload is None:
+            if valor is None:
+                return
+            self.payload = FacturaPayload()
+        setattr(self.payload, nombre, valor)
+
+    @property
+    def arca_request(self):
+        return self._get_payload_attr('arca_request')
+
+    @arca_request.setter
+    def arca_request(self, valor):
+        self._set_payload_attr('arca_request', valor)
+
+    @property
+    def arca_response(self):
+        return self._get_payload_attr('arca_response')
+
+    @arca_response.setter
+    def arca_response(self, valor):
+        self._set_payload_attr('arca_response', valor)
+
+    @property
+    def comprobante_html(self):
+        return self._get_payload_attr('comprobante_html')
+
+    @comprobante_html.setter
+    def comprobante_html(self, valor):
+        self._set_payload_attr('comprobante_html', valor)
+
+    @property
+    def tiene_comprobante_html(self) -> bool:
+        # Sin cargar el payload si no hace falta (listados).
+        if 'payload' in self.__dict__:
+            return bool(self.comprobante_html)
+        return bool(self._tiene_comprobante_html)
 
     def to_dict(self, include_items=False):
         data = {
@@ -100,10 +162,13 @@ class Factura(db.Model):
             'estado': self.estado,
             'error_codigo': self.error_codigo,
             'error_mensaje': self.error_mensaje,
+            'reintentos': self.reintentos or 0,
+            'proximo_reintento': self.proximo_reintento.isoformat() if self.proximo_reintento else None,
+            'origen': self.origen,
             'cbte_asoc_tipo': self.cbte_asoc_tipo,
             'cbte_asoc_pto_vta': self.cbte_asoc_pto_vta,
             'cbte_asoc_nro': self.cbte_asoc_nro,
-            'tiene_comprobante_html': bool(self.comprobante_html),
+            'tiene_comprobante_html': self.tiene_comprobante_html,
             'email_enviado': self.email_enviado or False,
             'email_enviado_at': self.email_enviado_at.isoformat() if self.email_enviado_at else None,
             'email_error': self.email_error,
@@ -120,11 +185,46 @@ class Factura(db.Model):
         return data
 
 
+class FacturaPayload(db.Model):
+    """Datos pesados de una factura, que sólo se leen a demanda.
+
+    ``arca_request``/``arca_response`` (JSON) y el HTML del comprobante
+    ocupan decenas de KB por fila; separados de ``factura`` no agrandan los
+    scans de listados, dashboard y lotes. Se acceden a través de las
+    propiedades homónimas de ``Factura``.
+    """
+    __tablename__ = 'factura_payload'
+
+    factura_id = db.Column(db.Uuid(as_uuid=True), primary_key=True)
+    arca_request = db.Column(db.JSON)
+    arca_response = db.Column(db.JSON)
+    comprobante_html = db.Column(db.Text)
+
+    factura = db.relationship('Factura', back_populates='payload',
+                              primaryjoin=lambda: foreign(FacturaPayload.factura_id) == Factura.id)
+
+
+Factura._tiene_comprobante_html = column_property(
+    db.select(FacturaPayload.factura_id)
+    .where(
+        FacturaPayload.factura_id == Factura.id,
+        FacturaPayload.comprobante_html.isnot(None),
+    )
+    .exists()
+    .correlate_except(FacturaPayload),
+    deferred=False,
+)
+
+
 class FacturaItem(db.Model):
     __tablename__ = 'factura_item'
 
     id = db.Column(db.Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    factura_id = db.Column(db.Uuid(as_uuid=True), db.ForeignKey('factura.id', ondelete='CASCADE'), nullable=False)
+    factura_id = db.Column(db.Uuid(as_uuid=True), nullable=False)
+    # Copia de factura.fecha_emision: clave de partición de factura_item. La
+    # completa el evento before_insert; la FK compuesta
+    # (factura_id, fecha_emision) la mantiene al día con ON UPDATE CASCADE.
+    fecha_emision = db.Column(db.Date, primary_key=True)
     descripcion = db.Column(db.String(500), nullable=False)
     cantidad = db.Column(db.Numeric(15, 4), nullable=False)
     precio_unitario = db.Column(db.Numeric(15, 4), nullable=False)
@@ -137,6 +237,14 @@ class FacturaItem(db.Model):
     # Relationships
     factura = db.relationship('Factura', back_populates='items')
 
+    __table_args__ = (
+        db.ForeignKeyConstraint(
+            ['factura_id', 'fecha_emision'], ['factura.id', 'factura.fecha_emision'],
+            name='factura_item_factura_fkey', ondelete='CASCADE', onupdate='CASCADE',
+        ),
+        db.Index('ix_factura_item_factura', 'factura_id', 'fecha_emision'),
+    )
+
     def to_dict(self):
         return {
             'id': str(self.id),
@@ -150,3 +258,23 @@ class FacturaItem(db.Model):
             'subtotal': float(self.subtotal),
             'orden': self.orden
         }
+
+
+@event.listens_for(FacturaItem, 'before_insert')
+def _completar_fecha_emision(mapper, connection, item):
+    if item.fecha_emision is not None:
+        return
+    factura = item.__dict__.get('factura')
+    if factura is None:
+        session = object_session(item)
+        if session is not None:
+            factura = next((
+                objeto for objeto in session.identity_map.values()
+                if isinstance(objeto, Factura) and objeto.id == item.factura_id
+            ), None)
+    if factura is not None:
+        item.fecha_emision = factura.fecha_emision
+    else:
+        item.fecha_emision = connection.execute(
+            db.select(Factura.fecha_emision).where(Factura.id == item.factura_id)
+        ).scalar_one()
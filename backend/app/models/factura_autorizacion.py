@@ -0,0 +1,53 @@
+import uuid
+from datetime import datetime
+from ..extensions import db
+
+
+class FacturaAutorizacion(db.Model):
+    """Registro append-only de cada CAE obtenido de ARCA.
+
+    Se escribe y commitea apenas llega el CAE, antes de que la fila de
+    ``factura`` se persista en lote. Si el worker muere en el medio, el
+    registro permite recuperar la autorización sin volver a emitir.
+    """
+    __tablename__ = 'factura_autorizacion'
+
+    id = db.Column(db.Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = db.Column(db.Uuid(as_uuid=True), db.ForeignKey('tenant.id'), nullable=False)
+    # Sin FK a factura (particionada); se borra con el trigger factura_borrar_dependientes.
+    factura_id = db.Column(db.Uuid(as_uuid=True), nullable=False)
+    lote_id = db.Column(db.Uuid(as_uuid=True), db.ForeignKey('lote.id'))
+    punto_venta = db.Column(db.Integer, nullable=False)
+    tipo_comprobante = db.Column(db.Integer, nullable=False)
+    numero_comprobante = db.Column(db.BigInteger, nullable=False)
+    cae = db.Column(db.String(20), nullable=False)
+    cae_vencimiento = db.Column(db.Date)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_factura_autorizacion_factura', 'factura_id'),
+        db.Index('ix_factura_autorizacion_lote', 'lote_id'),
+    )
+
+
+class FacturaEmisionEnCurso(db.Model):
+    """Marca durable de una emisión enviada a ARCA sin resultado confirmado.
+
+    Se commitea antes de ``FECAESolicitar`` con el número asignado y la huella
+    del request. Si el proceso muere antes de registrar el resultado, al
+    reanudar se consulta el comprobante en ARCA en lugar de volver a emitirlo.
+    """
+    __tablename__ = 'factura_emision_en_curso'
+
+    factura_id = db.Column(db.Uuid(as_uuid=True), primary_key=True)  # sin FK, ver FacturaAutorizacion
+    tenant_id = db.Column(db.Uuid(as_uuid=True), db.ForeignKey('tenant.id'), nullable=False)
+    lote_id = db.Column(db.Uuid(as_uuid=True), db.ForeignKey('lote.id'))
+    punto_venta = db.Column(db.Integer, nullable=False)
+    tipo_comprobante = db.Column(db.Integer, nullable=False)
+    numero_comprobante = db.Column(db.BigInteger, nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_factura_emision_en_curso_lote', 'lote_id'),
+    )
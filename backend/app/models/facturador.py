@@ -18,6 +18,8 @@ class Facturador(db.Model):
     cert_encrypted = db.Column(db.LargeBinary)
     key_encrypted = db.Column(db.LargeBinary)
     ambiente = db.Column(db.String(20), default='testing')
+    # 'cae' (FECAESolicitar por factura) o 'caea' (CAEA quincenal + informe posterior)
+    modo_autorizacion = db.Column(db.String(10), nullable=False, default='cae', server_default='cae')
     activo = db.Column(db.Boolean, default=True)
     ingresos_brutos = db.Column(db.String(50), nullable=True)
     fecha_inicio_actividades = db.Column(db.Date, nullable=True)
@@ -44,6 +46,7 @@ class Facturador(db.Model):
             'fecha_inicio_actividades': self.fecha_inicio_actividades.isoformat() if self.fecha_inicio_actividades else None,
             'punto_venta': self.punto_venta,
             'ambiente': self.ambiente,
+            'modo_autorizacion': self.modo_autorizacion,
             'activo': self.activo,
             'ingresos_brutos': self.ingresos_brutos,
             'fecha_inicio_actividades': self.fecha_inicio_actividades.isoformat() if self.fecha_inicio_actividades else None,
@@ -11,20 +11,24 @@ class Lote(db.Model):
     facturador_id = db.Column(db.Uuid(as_uuid=True), db.ForeignKey('facturador.id'))
     etiqueta = db.Column(db.String(255))
     tipo = db.Column(db.String(50), nullable=False)  # 'factura', 'nota_credito', 'nota_debito'
-    estado = db.Column(db.String(50), default='pendiente')  # 'pendiente', 'procesando', 'completado', 'error'
+    estado = db.Column(db.String(50), default='pendiente')  # 'pendiente', 'procesando', 'pausado', 'completado', 'error'
+    # Circuito de ARCA (servicio:ambiente) abierto que pausó el lote
+    pausado_por = db.Column(db.String(64))
     total_facturas = db.Column(db.Integer, default=0)
     facturas_ok = db.Column(db.Integer, default=0)
     facturas_error = db.Column(db.Integer, default=0)
     celery_task_id = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     processed_at = db.Column(db.DateTime)
+    # Desglose de tiempos del último procesamiento (ver services/perfil_lote.py)
+    perfil = db.Column(db.JSON)
 
     # Relationships
     tenant = db.relationship('Tenant', back_populates='lotes')
     facturador = db.relationship('Facturador', back_populates='lotes')
     facturas = db.relationship('Factura', back_populates='lote', lazy='dynamic')
 
-    def to_dict(self, include_facturas=False):
+    def to_dict(self, include_facturas=False, include_perfil=False):
         data = {
             'id': str(self.id),
             'tenant_id': str(self.tenant_id),
@@ -32,6 +36,7 @@ class Lote(db.Model):
             'etiqueta': self.etiqueta,
             'tipo': self.tipo,
             'estado': self.estado,
+            'pausado_por': self.pausado_por,
             'total_facturas': self.total_facturas,
             'facturas_ok': self.facturas_ok,
             'facturas_error': self.facturas_error,
@@ -47,6 +52,8 @@ class Lote(db.Model):
                 'punto_venta': self.facturador.punto_venta,
                 'ambiente': self.facturador.ambiente,
             }
+        if include_perfil:
+            data['perfil'] = self.perfil
         if include_facturas:
             data['facturas'] = [f.to_dict() for f in self.facturas]
         return data
@@ -0,0 +1,26 @@
+from datetime import datetime
+from ..extensions import db
+
+
+class PadronCache(db.Model):
+    """Resultado de la constancia de inscripción (padrón ARCA) por CUIT.
+
+    Compartido entre tenants: el padrón es información pública. Guarda tanto
+    respuestas encontradas como "persona no encontrada" (cache negativo), cada
+    una con su vencimiento. Los errores de conexión no se cachean.
+    """
+    __tablename__ = 'padron_cache'
+
+    cuit = db.Column(db.String(11), primary_key=True)
+    ambiente = db.Column(db.String(20), primary_key=True)
+    encontrado = db.Column(db.Boolean, nullable=False)
+    data = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    consultado_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    def to_result(self) -> dict:
+        """Mismo formato que ``ArcaClient.consultar_padron``."""
+        if self.encontrado:
+            return {'success': True, 'data': dict(self.data or {})}
+        return {'success': False, 'error': self.error or 'Persona no encontrada'}
@@ -0,0 +1,273 @@
+"""Almacenamiento de archivos generados (ZIPs de comprobantes) fuera de Postgres.
+
+Dos backends con la misma interfaz, elegidos con ``DOWNLOADS_STORAGE``:
+
+- ``local``: directorio compartido entre API y worker (``DOWNLOADS_LOCAL_DIR``).
+  Se escribe a un temporal y se renombra al cerrar, así nunca se sirve un
+  archivo a medio escribir. La API lo entrega con ``send_file`` (sendfile +
+  Range) o delega en nginx con ``X-Accel-Redirect``.
+- ``s3``: cualquier servicio compatible con S3 (AWS, MinIO, R2). Se sube en
+  partes (multipart) a medida que se escribe y se lee por rangos.
+
+Las escrituras son por streaming: ``abrir_escritura`` devuelve un objeto tipo
+archivo (no seekable) que ``zipfile`` puede usar directamente.
+"""
+
+import io
+import os
+import tempfile
+import threading
+
+from flask import current_app
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class AlmacenError(RuntimeError):
+    pass
+
+
+class _EscrituraLocal(io.RawIOBase):
+    def __init__(self, destino: str):
+        self._destino = destino
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        fd, self._temporal = tempfile.mkstemp(dir=os.path.dirname(destino), prefix='.parcial-')
+        self._archivo = os.fdopen(fd, 'wb')
+        self.bytes_escritos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        escritos = self._archivo.write(data)
+        self.bytes_escritos += escritos
+        return escritos
+
+    def close(self):
+        if self.closed:
+            return
+        self._archivo.close()
+        os.replace(self._temporal, self._destino)
+        super().close()
+
+    def abortar(self):
+        if not self.closed:
+            self._archivo.close()
+            super().close()
+        if os.path.exists(self._temporal):
+            os.unlink(self._temporal)
+
+
+class AlmacenLocal:
+    nombre = 'local'
+
+    def __init__(self, directorio: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.directorio = os.path.abspath(directorio)
+        self.chunk_size = chunk_size
+
+    def ruta(self, clave: str) -> str:
+        ruta = os.path.abspath(os.path.join(self.directorio, clave))
+        if not ruta.startswith(self.directorio + os.sep):
+            raise AlmacenError(f'Clave de almacenamiento inválida: {clave}')
+        return ruta
+
+    def abrir_escritura(self, clave: str) -> _EscrituraLocal:
+        return _EscrituraLocal(self.ruta(clave))
+
+    def tamano(self, clave: str) -> int:
+        try:
+            return os.path.getsize(self.ruta(clave))
+        except FileNotFoundError as exc:
+            raise AlmacenError(f'Archivo inexistente: {clave}') from exc
+
+    def leer(self, clave: str, inicio: int = 0, fin: int | None = None):
+        """Itera el contenido en bloques; ``fin`` es exclusivo."""
+        try:
+            archivo = open(self.ruta(clave), 'rb')
+        except FileNotFoundError as exc:
+            raise AlmacenError(f'Archivo inexistente: {clave}') from exc
+
+        def _bloques():
+            with archivo:
+                archivo.seek(inicio)
+                restante = None if fin is None else fin - inicio
+                while restante is None or restante > 0:
+                    bloque = archivo.read(self.chunk_size if restante is None else min(self.chunk_size, restante))
+                    if not bloque:
+                        return
+                    if restante is not None:
+                        restante -= len(bloque)
+                    yield bloque
+
+        return _bloques()
+
+    def eliminar(self, clave: str) -> None:
+        try:
+            os.unlink(self.ruta(clave))
+        except FileNotFoundError:
+            pass
+
+
+class _EscrituraS3(io.RawIOBase):
+    def __init__(self, almacen: 'AlmacenS3', clave: str):
+        self._almacen = almacen
+        self._clave = almacen.clave_objeto(clave)
+        self._buffer = bytearray()
+        self._partes = []
+        self._upload_id = None
+        self.bytes_escritos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer.extend(data)
+        self.bytes_escritos += len(data)
+        if len(self._buffer) >= self._almacen.part_size:
+            self._subir_parte()
+        return len(data)
+
+    def _subir_parte(self):
+        client = self._almacen.client
+        if self._upload_id is None:
+            self._upload_id = client.create_multipart_upload(
+                Bucket=self._almacen.bucket, Key=self._clave,
+            )['UploadId']
+        numero = len(self._partes) + 1
+        respuesta = client.upload_part(
+            Bucket=self._almacen.bucket,
+            Key=self._clave,
+            UploadId=self._upload_id,
+            PartNumber=numero,
+            Body=bytes(self._buffer),
+        )
+        self._partes.append({'ETag': respuesta['ETag'], 'PartNumber': numero})
+        self._buffer.clear()
+
+    def close(self):
+        if self.closed:
+            return
+        client = self._almacen.client
+        if self._upload_id is None:
+            # Archivo chico: un solo PUT.
+            client.put_object(Bucket=self._almacen.bucket, Key=self._clave, Body=bytes(self._buffer))
+        else:
+            if self._buffer:
+                self._subir_parte()
+            client.complete_multipart_upload(
+                Bucket=self._almacen.bucket,
+                Key=self._clave,
+                UploadId=self._upload_id,
+                MultipartUpload={'Parts': self._partes},
+            )
+        super().close()
+
+    def abortar(self):
+        if self._upload_id is not None:
+            self._almacen.client.abort_multipart_upload(
+                Bucket=self._almacen.bucket, Key=self._clave, UploadId=self._upload_id,
+            )
+        self._buffer.clear()
+        if not self.closed:
+            super().close()
+
+
+class AlmacenS3:
+    nombre = 's3'
+
+    def __init__(self, bucket: str, prefijo: str = '', client=None, endpoint_url: str | None = None,
+                 region: str | None = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.bucket = bucket
+        self.prefijo = prefijo.strip('/')
+        self.chunk_size = chunk_size
+        self.part_size = max(S3_MIN_PART_SIZE, chunk_size)
+        if client is None:
+            try:
+                import boto3
+            except ImportError as exc:
+                raise RuntimeError(
+                    'boto3 no esta instalado. Ejecuta pip install -r requirements.txt '
+                    'o usa DOWNLOADS_STORAGE=local.'
+                ) from exc
+            client = boto3.client('s3', endpoint_url=endpoint_url or None, region_name=region or None)
+        self.client = client
+
+    def clave_objeto(self, clave: str) -> str:
+        return f'{self.prefijo}/{clave}' if self.prefijo else clave
+
+    def abrir_escritura(self, clave: str) -> _EscrituraS3:
+        return _EscrituraS3(self, clave)
+
+    def tamano(self, clave: str) -> int:
+        try:
+            return int(self.client.head_object(Bucket=self.bucket, Key=self.clave_objeto(clave))['ContentLength'])
+        except Exception as exc:
+            raise AlmacenError(f'Archivo inexistente: {clave}') from exc
+
+    def leer(self, clave: str, inicio: int = 0, fin: int | None = None):
+        kwargs = {'Bucket': self.bucket, 'Key': self.clave_objeto(clave)}
+        if inicio or fin is not None:
+            kwargs['Range'] = f'bytes={inicio}-{"" if fin is None else fin - 1}'
+        try:
+            body = self.client.get_object(**kwargs)['Body']
+        except Exception as exc:
+            raise AlmacenError(f'Archivo inexistente: {clave}') from exc
+
+        def _bloques():
+            try:
+                while True:
+                    bloque = body.read(self.chunk_size)
+                    if not bloque:
+                        return
+                    yield bloque
+            finally:
+                body.close()
+
+        return _bloques()
+
+    def eliminar(self, clave: str) -> None:
+        try:
+            self.client.delete_object(Bucket=self.bucket, Key=self.clave_objeto(clave))
+        except Exception as exc:
+            # ClientError/BotoCoreError de botocore: el llamador sólo conoce AlmacenError.
+            raise AlmacenError(f'No se pudo eliminar {clave}: {exc}') from exc
+
+
+_almacenes: dict[tuple, object] = {}
+_lock = threading.Lock()
+
+
+def get_almacen():
+    """Backend configurado en la app actual (una instancia por configuración y proceso)."""
+    config = current_app.config
+    tipo = (config.get('DOWNLOADS_STORAGE') or 'local').strip().lower()
+    chunk_size = int(config.get('DOWNLOADS_CHUNK_SIZE', DEFAULT_CHUNK_SIZE))
+
+    if tipo == 'local':
+        clave = ('local', config.get('DOWNLOADS_LOCAL_DIR'), chunk_size)
+    elif tipo == 's3':
+        clave = (
+            's3',
+            config.get('DOWNLOADS_S3_BUCKET'),
+            config.get('DOWNLOADS_S3_PREFIX', ''),
+            config.get('DOWNLOADS_S3_ENDPOINT_URL'),
+            config.get('DOWNLOADS_S3_REGION'),
+            chunk_size,
+        )
+    else:
+        raise AlmacenError(f'DOWNLOADS_STORAGE inválido: {tipo}')
+
+    with _lock:
+        almacen = _almacenes.get(clave)
+        if almacen is None:
+            if tipo == 'local':
+                almacen = AlmacenLocal(clave[1], chunk_size=chunk_size)
+            else:
+                if not clave[1]:
+                    raise AlmacenError('Falta DOWNLOADS_S3_BUCKET')
+                almacen = AlmacenS3(clave[1], prefijo=clave[2], endpoint_url=clave[3], region=clave[4],
+                                    chunk_size=chunk_size)
+            _almacenes[clave] = almacen
+    return almacen
+
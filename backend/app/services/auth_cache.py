@@ -0,0 +1,91 @@
+"""Cache en proceso del usuario autenticado.
+
+Los decoradores de ``utils/decorators.py`` consultan ``Usuario`` en cada request.
+Este módulo guarda un snapshot liviano (activo, rol, tenant, restricción de
+dashboard y permisos resueltos) con TTL corto para que el camino de auth no
+haga SQL en el caso común.
+
+La invalidación es explícita desde ``api/usuarios.py``. En despliegues con
+varios procesos, los demás workers ven el cambio a lo sumo tras el TTL.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from uuid import UUID
+
+from flask import current_app
+
+from .permissions import get_user_permissions
+
+
+DEFAULT_TTL_SECONDS = 30
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Snapshot inmutable de los datos de un usuario necesarios para autorizar."""
+    id: UUID
+    tenant_id: UUID
+    rol: str
+    activo: bool
+    restringir_dashboard_sensible: bool
+    permisos: frozenset
+
+    @classmethod
+    def from_usuario(cls, usuario) -> 'CachedUser':
+        return cls(
+            id=usuario.id,
+            tenant_id=usuario.tenant_id,
+            rol=usuario.rol,
+            activo=bool(usuario.activo),
+            restringir_dashboard_sensible=bool(usuario.restringir_dashboard_sensible),
+            permisos=frozenset(get_user_permissions(usuario.rol)),
+        )
+
+    def has_permission(self, permission: str) -> bool:
+        return permission in self.permisos
+
+
+_entries: dict[UUID, tuple[float, CachedUser]] = {}
+_lock = threading.Lock()
+
+
+def _ttl_seconds() -> float:
+    return float(current_app.config.get('AUTH_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS))
+
+
+def get_cached_user(user_id: UUID) -> CachedUser | None:
+    """Retorna el snapshot si existe y no expiró."""
+    with _lock:
+        entry = _entries.get(user_id)
+        if not entry:
+            return None
+
+        expires_at, cached = entry
+        if expires_at <= time.monotonic():
+            _entries.pop(user_id, None)
+            return None
+
+        return cached
+
+
+def cache_user(usuario) -> CachedUser:
+    """Construye el snapshot del usuario y lo guarda si el TTL está habilitado."""
+    cached = CachedUser.from_usuario(usuario)
+    ttl = _ttl_seconds()
+    if ttl > 0:
+        with _lock:
+            _entries[cached.id] = (time.monotonic() + ttl, cached)
+    return cached
+
+
+def invalidate_user(user_id: UUID) -> None:
+    """Descarta el snapshot de un usuario (edición, activación/desactivación)."""
+    with _lock:
+        _entries.pop(user_id, None)
+
+
+def clear_auth_cache() -> None:
+    with _lock:
+        _entries.clear()
@@ -0,0 +1,212 @@
+"""Journal durable de CAEs obtenidos durante el procesamiento de lotes.
+
+``procesar_lote`` commitea las filas de ``factura`` en tandas para reducir
+round-trips. Para no perder nunca un CAE, cada autorización se registra antes
+en ``factura_autorizacion`` sobre una conexión propia que commitea al instante,
+independiente de la transacción en curso de la sesión.
+
+Si el worker cae entre el registro y el commit de la tanda, la factura queda
+``pendiente`` en la base pero con su CAE en el journal. ``aplicar_autorizaciones_pendientes``
+recupera esas facturas y debe ejecutarse antes de volver a emitir el lote.
+
+Antes de cada ``FECAESolicitar`` se commitea además una marca en
+``factura_emision_en_curso`` con el número asignado y la huella del request.
+Mientras la marca exista no se sabe si ARCA autorizó el comprobante:
+``reconciliar_emisiones_en_curso`` lo consulta con ``FECompConsultar`` y sólo
+deja re-emitir cuando ARCA confirma que ese número no corresponde a la factura.
+"""
+
+import hashlib
+import logging
+import uuid
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from arca_integration.exceptions import ArcaError
+
+from ..extensions import db
+from ..models import Factura, FacturaAutorizacion, FacturaEmisionEnCurso
+from .historial_arca import registrar_intercambio
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_fecha(value) -> date | None:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not value:
+        return None
+
+    raw = str(value).strip()
+    for fmt in ('%Y-%m-%d', '%Y%m%d'):
+        try:
+            return datetime.strptime(raw, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def registrar_autorizacion(factura: Factura, cae: str, cae_vencimiento, numero_comprobante: int) -> None:
+    """Persiste el CAE de una factura en el journal y lo commitea de inmediato."""
+    row = {
+        'id': uuid.uuid4(),
+        'tenant_id': factura.tenant_id,
+        'factura_id': factura.id,
+        'lote_id': factura.lote_id,
+        'punto_venta': factura.punto_venta,
+        'tipo_comprobante': factura.tipo_comprobante,
+        'numero_comprobante': int(numero_comprobante),
+        'cae': str(cae),
+        'cae_vencimiento': _parse_fecha(cae_vencimiento),
+        'created_at': datetime.utcnow(),
+    }
+    marcas = FacturaEmisionEnCurso.__table__
+    with db.engine.begin() as conn:
+        conn.execute(FacturaAutorizacion.__table__.insert(), [row])
+        conn.execute(marcas.delete().where(marcas.c.factura_id == factura.id))
+
+
+def aplicar_autorizaciones_pendientes(tenant_id, lote_id=None) -> int:
+    """Marca como autorizadas las facturas con CAE en el journal que no lo reflejan.
+
+    No commitea: el llamador decide cuándo cerrar la transacción.
+    Retorna la cantidad de facturas recuperadas.
+    """
+    query = db.session.query(FacturaAutorizacion, Factura).join(
+        Factura, Factura.id == FacturaAutorizacion.factura_id
+    ).filter(
+        FacturaAutorizacion.tenant_id == tenant_id,
+        Factura.estado != 'autorizado',
+    )
+    if lote_id is not None:
+        query = query.filter(Factura.lote_id == lote_id)
+
+    recuperadas = set()
+    for registro, factura in query.order_by(FacturaAutorizacion.created_at.asc()).all():
+        factura.estado = 'autorizado'
+        factura.cae = registro.cae
+        factura.cae_vencimiento = registro.cae_vencimiento
+        factura.numero_comprobante = registro.numero_comprobante
+        factura.error_codigo = None
+        factura.error_mensaje = None
+        recuperadas.add(factura.id)
+
+    if recuperadas:
+        db.session.flush()
+    return len(recuperadas)
+
+
+def huella_comprobante(doc_tipo, doc_nro, fecha_cbte, imp_total) -> str:
+    """Huella de los datos que ARCA devuelve en ``FECompConsultar``.
+
+    Permite comparar el request enviado con el comprobante autorizado bajo el
+    mismo número sin guardar el request completo en la marca.
+    """
+    try:
+        total = Decimal(str(imp_total)).quantize(Decimal('0.01'))
+    except (InvalidOperation, TypeError, ValueError):
+        total = imp_total
+    nro = str(doc_nro or '0').replace('-', '').strip()
+    canon = f'{int(doc_tipo or 0)}|{int(nro) if nro.isdigit() else nro}|{str(fecha_cbte or "").strip()}|{total}'
+    return hashlib.sha256(canon.encode('utf-8')).hexdigest()
+
+
+def huella_request(request_data: dict) -> str:
+    det = request_data['FeCAEReq']['FeDetReq']['FECAEDetRequest'][0]
+    return huella_comprobante(det.get('DocTipo'), det.get('DocNro'), det.get('CbteFch'), det.get('ImpTotal'))
+
+
+def registrar_emision_en_curso(factura: Factura, numero_comprobante: int, request_data: dict) -> None:
+    """Commitea la marca de emisión en curso antes de enviar el request a ARCA."""
+    marcas = FacturaEmisionEnCurso.__table__
+    row = {
+        'factura_id': factura.id,
+        'tenant_id': factura.tenant_id,
+        'lote_id': factura.lote_id,
+        'punto_venta': factura.punto_venta,
+        'tipo_comprobante': factura.tipo_comprobante,
+        'numero_comprobante': int(numero_comprobante),
+        'request_hash': huella_request(request_data),
+        'created_at': datetime.utcnow(),
+    }
+    with db.engine.begin() as conn:
+        conn.execute(marcas.delete().where(marcas.c.factura_id == factura.id))
+        conn.execute(marcas.insert(), [row])
+
+
+def descartar_emision_en_curso(factura_id) -> None:
+    """Elimina la marca cuando ARCA respondió sin autorizar."""
+    marcas = FacturaEmisionEnCurso.__table__
+    with db.engine.begin() as conn:
+        conn.execute(marcas.delete().where(marcas.c.factura_id == factura_id))
+
+
+def reconciliar_emisiones_en_curso(client, facturas: list[Factura]) -> dict:
+    """Resuelve contra ARCA las emisiones que quedaron sin resultado.
+
+    Retorna ``{factura_id: result}`` con el mismo formato que ``procesar_factura``:
+    ``success=True`` si ARCA tiene el comprobante con la misma huella, o
+    ``error_code='emision_sin_confirmar'`` si no se pudo consultar (la factura
+    no debe re-emitirse todavía). Las facturas ausentes del resultado pueden
+    emitirse normalmente.
+    """
+    ids = [factura.id for factura in facturas]
+    if not ids:
+        return {}
+
+    marcas = FacturaEmisionEnCurso.query.filter(FacturaEmisionEnCurso.factura_id.in_(ids)).all()
+    por_id = {factura.id: factura for factura in facturas}
+    resultados = {}
+
+    for marca in marcas:
+        try:
+            consulta = client.fe_comp_consultar(
+                tipo_cbte=marca.tipo_comprobante,
+                punto_venta=marca.punto_venta,
+                numero=int(marca.numero_comprobante),
+            )
+        except (ArcaError, ConnectionError, TimeoutError, OSError, RuntimeError, ValueError) as exc:
+            logger.warning('No se pudo reconciliar la emisión de la factura %s: %s', marca.factura_id, exc)
+            resultados[marca.factura_id] = {
+                'success': False,
+                'error_code': 'emision_sin_confirmar',
+                'error_message': (
+                    f'Emisión previa del comprobante {marca.numero_comprobante} sin confirmar en ARCA: {exc}'
+                ),
+            }
+            continue
+
+        encontrado = isinstance(consulta, dict) and consulta.get('encontrado') and consulta.get('cae')
+        if encontrado and huella_comprobante(
+            consulta.get('doc_tipo'),
+            consulta.get('doc_nro'),
+            consulta.get('fecha_cbte'),
+            consulta.get('imp_total'),
+        ) == marca.request_hash:
+            registrar_intercambio(
+                por_id[marca.factura_id],
+                'FECompConsultar',
+                'autorizado',
+                request={
+                    'tipo_cbte': marca.tipo_comprobante,
+                    'punto_venta': marca.punto_venta,
+                    'numero': int(marca.numero_comprobante),
+                },
+                response=consulta,
+            )
+            resultados[marca.factura_id] = {
+                'success': True,
+                'cae': consulta['cae'],
+                'cae_vencimiento': _parse_fecha(consulta.get('cae_vto')),
+                'numero_comprobante': int(marca.numero_comprobante),
+                'response': consulta,
+                'reconciliada': True,
+            }
+            continue
+
+        # ARCA no tiene ese número o pertenece a otro comprobante: es seguro re-emitir.
+        descartar_emision_en_curso(marca.factura_id)
+
+    return resultados
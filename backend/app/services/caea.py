@@ -0,0 +1,152 @@
+"""Autorización por CAEA (Código de Autorización Electrónico Anticipado).
+
+En modo CAEA el facturador obtiene un código por quincena con
+``FECAEASolicitar`` y autoriza sus comprobantes localmente: la numeración se
+resuelve en la base y no hay round-trip a ARCA por factura. Los comprobantes
+se informan después, en bloques, con ``FECAEARegInformativo`` (ver
+``app.tasks.caea.informar_caea``).
+"""
+
+import logging
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy.exc import IntegrityError
+
+from ..extensions import db
+from ..models import Caea, Factura, FacturaCaeaInforme
+
+logger = logging.getLogger(__name__)
+
+# Cache por proceso: (facturador_id, periodo, orden) -> id del CAEA
+_caea_cache: dict = {}
+
+
+def periodo_orden(fecha: date) -> tuple[int, int]:
+    """Período YYYYMM y orden de quincena (1: días 1-15, 2: 16-fin de mes)."""
+    return fecha.year * 100 + fecha.month, 1 if fecha.day <= 15 else 2
+
+
+def _parse_fecha(value) -> date | None:
+    if isinstance(value, date):
+        return value
+    if not value:
+        return None
+    for fmt in ('%Y-%m-%d', '%Y%m%d'):
+        try:
+            return datetime.strptime(str(value).strip(), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _buscar_caea(facturador_id, periodo: int, orden: int) -> Caea | None:
+    return Caea.query.filter_by(facturador_id=facturador_id, periodo=periodo, orden=orden).first()
+
+
+def obtener_caea_vigente(client, facturador, fecha: date) -> Caea:
+    """Devuelve el CAEA de la quincena de ``fecha``, solicitándolo a ARCA una sola vez.
+
+    Orden de búsqueda: cache en memoria, tabla ``caea`` y por último ARCA. El
+    alta se commitea en una conexión propia para que otros workers lo vean
+    de inmediato; si dos workers lo solicitan a la vez, gana el primero.
+    """
+    from arca_integration.services import WSFEService
+
+    periodo, orden = periodo_orden(fecha)
+    key = (facturador.id, periodo, orden)
+
+    caea_id = _caea_cache.get(key)
+    if caea_id is not None:
+        caea = db.session.get(Caea, caea_id)
+        if caea is not None:
+            return caea
+
+    caea = _buscar_caea(facturador.id, periodo, orden)
+    if caea is None:
+        result = WSFEService(client).obtener_caea(periodo, orden)
+        if not result.get('success'):
+            raise ValueError(f'No se pudo obtener el CAEA {periodo}/{orden}: {result.get("error_message")}')
+
+        row = {
+            'id': uuid.uuid4(),
+            'tenant_id': facturador.tenant_id,
+            'facturador_id': facturador.id,
+            'periodo': periodo,
+            'orden': orden,
+            'codigo': str(result['caea']),
+            'fch_vig_desde': _parse_fecha(result.get('fch_vig_desde')),
+            'fch_vig_hasta': _parse_fecha(result.get('fch_vig_hasta')),
+            'fch_tope_inf': _parse_fecha(result.get('fch_tope_inf')),
+            'created_at': datetime.utcnow(),
+        }
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(Caea.__table__.insert(), [row])
+        except IntegrityError:
+            logger.info('CAEA %s/%s del facturador %s ya registrado por otro worker', periodo, orden, facturador.id)
+
+        caea = _buscar_caea(facturador.id, periodo, orden)
+        if caea is None:
+            raise ValueError(f'No se pudo registrar el CAEA {periodo}/{orden}')
+
+    _caea_cache[key] = caea.id
+    return caea
+
+
+class NumeradorCaea:
+    """Asigna números de comprobante localmente para un facturador en modo CAEA.
+
+    El próximo número es el mayor entre el último autorizado en ARCA (se
+    consulta una vez por punto de venta/tipo), el último registrado en la base
+    (los comprobantes CAEA aún no informados no figuran en ARCA) y el último
+    asignado en esta ejecución. La consulta local usa ``ix_factura_numeracion``
+    y ve lo que otros workers commitearon; el llamador debe tener bloqueada la
+    secuencia del facturador.
+    """
+
+    def __init__(self, client, facturador):
+        self.client = client
+        self.facturador = facturador
+        self._ultimos_arca: dict[tuple[int, int], int] = {}
+        self._ultimos: dict[tuple[int, int], int] = {}
+
+    def _ultimo_local(self, punto_venta: int, tipo_cbte: int) -> int:
+        ultimo = db.session.query(db.func.max(Factura.numero_comprobante)).filter(
+            Factura.facturador_id == self.facturador.id,
+            Factura.punto_venta == punto_venta,
+            Factura.tipo_comprobante == tipo_cbte,
+        ).scalar()
+        return int(ultimo or 0)
+
+    def siguiente(self, punto_venta: int, tipo_cbte: int) -> int:
+        key = (int(punto_venta), int(tipo_cbte))
+        if key not in self._ultimos_arca:
+            ultimo_arca = self.client.fe_comp_ultimo_autorizado(punto_venta=punto_venta, tipo_cbte=tipo_cbte)
+            self._ultimos_arca[key] = int(ultimo_arca or 0)
+
+        numero = max(
+            self._ultimos_arca[key],
+            self._ultimos.get(key, 0),
+            self._ultimo_local(punto_venta, tipo_cbte),
+        ) + 1
+        self._ultimos[key] = numero
+        return numero
+
+    def devolver(self, punto_venta: int, tipo_cbte: int, numero: int) -> None:
+        """Libera el último número asignado si la factura no llegó a autorizarse."""
+        key = (int(punto_venta), int(tipo_cbte))
+        if self._ultimos.get(key) == numero:
+            self._ultimos[key] = numero - 1
+
+
+def encolar_informe(factura: Factura, caea: Caea) -> None:
+    """Registra la factura como pendiente de informar (en la transacción en curso)."""
+    db.session.add(FacturaCaeaInforme(
+        factura_id=factura.id,
+        tenant_id=factura.tenant_id,
+        facturador_id=factura.facturador_id,
+        caea_id=caea.id,
+        estado='pendiente',
+        intentos=0,
+    ))
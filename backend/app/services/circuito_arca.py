@@ -0,0 +1,244 @@
+"""Circuit breaker compartido por servicio de ARCA (wsaa, wsfe, padron) y ambiente.
+
+El estado vive en Redis para que todos los workers lo vean:
+
+- ``cerrado``: las llamadas pasan. Cada llamada SOAP que falla sin respuesta
+  del servicio (timeout, conexión) suma una falla; una respuesta la resetea.
+  Los errores locales (validación de zeep, certificado, firma) no cuentan.
+  Con ``ARCA_CIRCUITO_UMBRAL_FALLAS`` fallas dentro de
+  ``ARCA_CIRCUITO_VENTANA_SECONDS`` el circuito se abre.
+- ``abierto``: durante ``ARCA_CIRCUITO_ENFRIAMIENTO_SECONDS`` no se intenta.
+  ``procesar_lote`` deja las facturas pendientes y pausa el lote.
+- ``semiabierto``: vencido el enfriamiento, un único llamador por vez (el que
+  toma la prueba) puede intentar. Si responde, el circuito se cierra; si
+  falla, vuelve a abrirse.
+
+Se alimenta de las llamadas reales (observador de ``ArcaClient``) y de los
+sondeos de WSDL (``/api/arca/status`` y la tarea ``reanudar_lotes_pausados``,
+que además reanuda los lotes pausados cuando el circuito se cierra). Sin Redis
+el circuito no corta nada.
+"""
+
+import logging
+import os
+import ssl
+import urllib.request
+from urllib.error import URLError
+
+import redis
+from arca_integration import registrar_observador
+from flask import current_app, has_app_context
+
+from .progress import get_redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_PREFIX = 'arca:circuito:'
+
+CERRADO = 'cerrado'
+ABIERTO = 'abierto'
+SEMIABIERTO = 'semiabierto'
+
+# Servicios que usa la emisión: si alguno está abierto, el lote se pausa.
+SERVICIOS_EMISION = ('wsaa', 'wsfe')
+
+# Resultados de ArcaClient que prueban que el servicio respondió, y los que
+# indican que no se lo pudo alcanzar.
+_RESULTADOS_CON_RESPUESTA = {'ok', 'fault', 'ta_valido'}
+_RESULTADOS_SIN_RESPUESTA = {'timeout', 'conexion'}
+
+# El flag "disparado" marca un circuito abierto que todavía no volvió a
+# responder; dura lo suficiente para no perderse entre sondeos.
+_DISPARADO_TTL_SECONDS = 24 * 3600
+
+
+def _config(name: str, default):
+    if has_app_context():
+        return current_app.config.get(name, default)
+    return default
+
+
+def habilitado() -> bool:
+    return bool(_config('ARCA_CIRCUITO_HABILITADO', False))
+
+
+def _clave(servicio: str, ambiente: str, parte: str) -> str:
+    return f'{REDIS_PREFIX}{servicio}:{ambiente}:{parte}'
+
+
+def nombre_circuito(servicio: str, ambiente: str) -> str:
+    return f'{servicio}:{ambiente}'
+
+
+def separar_circuito(circuito: str) -> tuple[str, str]:
+    servicio, _, ambiente = circuito.partition(':')
+    return servicio, ambiente
+
+
+def _leer_estado(cliente, servicio: str, ambiente: str) -> str:
+    abierto, disparado = cliente.mget(
+        _clave(servicio, ambiente, 'abierto'),
+        _clave(servicio, ambiente, 'disparado'),
+    )
+    if abierto is not None:
+        return ABIERTO
+    if disparado is not None:
+        return SEMIABIERTO
+    return CERRADO
+
+
+def estado(servicio: str, ambiente: str) -> str:
+    if not habilitado():
+        return CERRADO
+    try:
+        return _leer_estado(get_redis(), servicio, ambiente)
+    except redis.RedisError as exc:
+        logger.debug('Circuito ARCA sin Redis: %s', exc)
+        return CERRADO
+
+
+def permitir(servicio: str, ambiente: str) -> bool:
+    """True si se puede llamar al servicio.
+
+    En ``semiabierto`` sólo lo permite a quien toma la prueba.
+    """
+    if not habilitado():
+        return True
+    try:
+        cliente = get_redis()
+        actual = _leer_estado(cliente, servicio, ambiente)
+        if actual == CERRADO:
+            return True
+        if actual == ABIERTO:
+            return False
+        enfriamiento = int(_config('ARCA_CIRCUITO_ENFRIAMIENTO_SECONDS', 60))
+        return bool(cliente.set(_clave(servicio, ambiente, 'prueba'), '1', nx=True, ex=max(1, enfriamiento)))
+    except redis.RedisError as exc:
+        logger.debug('Circuito ARCA sin Redis: %s', exc)
+        return True
+
+
+def circuito_abierto(ambiente: str, servicios=SERVICIOS_EMISION) -> str | None:
+    """Primer circuito de ``servicios`` que no deja pasar (``servicio:ambiente``)."""
+    for servicio in servicios:
+        if not permitir(servicio, ambiente):
+            return nombre_circuito(servicio, ambiente)
+    return None
+
+
+def _abrir(cliente, servicio: str, ambiente: str) -> None:
+    enfriamiento = int(_config('ARCA_CIRCUITO_ENFRIAMIENTO_SECONDS', 60))
+    pipe = cliente.pipeline(transaction=False)
+    pipe.set(_clave(servicio, ambiente, 'abierto'), '1', ex=max(1, enfriamiento))
+    pipe.set(_clave(servicio, ambiente, 'disparado'), '1', ex=_DISPARADO_TTL_SECONDS)
+    pipe.delete(_clave(servicio, ambiente, 'fallas'), _clave(servicio, ambiente, 'prueba'))
+    pipe.execute()
+    logger.warning('Circuito ARCA abierto: %s', nombre_circuito(servicio, ambiente))
+
+
+def registrar_exito(servicio: str, ambiente: str) -> None:
+    if not habilitado():
+        return
+    try:
+        cliente = get_redis()
+        pipe = cliente.pipeline(transaction=False)
+        pipe.delete(_clave(servicio, ambiente, 'fallas'))
+        pipe.exists(_clave(servicio, ambiente, 'disparado'))
+        _borradas, disparado = pipe.execute()
+        if disparado:
+            cliente.delete(
+                _clave(servicio, ambiente, 'abierto'),
+                _clave(servicio, ambiente, 'disparado'),
+                _clave(servicio, ambiente, 'prueba'),
+            )
+            logger.warning('Circuito ARCA cerrado: %s', nombre_circuito(servicio, ambiente))
+    except redis.RedisError as exc:
+        logger.debug('Circuito ARCA sin Redis: %s', exc)
+
+
+def registrar_falla(servicio: str, ambiente: str) -> None:
+    if not habilitado():
+        return
+    try:
+        cliente = get_redis()
+        actual = _leer_estado(cliente, servicio, ambiente)
+        if actual == ABIERTO:
+            return
+        if actual == SEMIABIERTO:
+            # Falló la prueba: otro período de enfriamiento.
+            _abrir(cliente, servicio, ambiente)
+            return
+
+        clave = _clave(servicio, ambiente, 'fallas')
+        pipe = cliente.pipeline(transaction=False)
+        pipe.incr(clave)
+        pipe.expire(clave, max(1, int(_config('ARCA_CIRCUITO_VENTANA_SECONDS', 60))))
+        fallas, _ = pipe.execute()
+        if fallas >= int(_config('ARCA_CIRCUITO_UMBRAL_FALLAS', 5)):
+            _abrir(cliente, servicio, ambiente)
+    except redis.RedisError as exc:
+        logger.debug('Circuito ARCA sin Redis: %s', exc)
+
+
+def _observar_llamada(servicio: str, metodo: str, resultado: str, duracion: float, ambiente: str) -> None:
+    if resultado in _RESULTADOS_CON_RESPUESTA:
+        registrar_exito(servicio, ambiente)
+    elif resultado in _RESULTADOS_SIN_RESPUESTA:
+        registrar_falla(servicio, ambiente)
+
+
+registrar_observador(_observar_llamada)
+
+
+def _create_ssl_context():
+    ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    ctx.set_ciphers('DEFAULT@SECLEVEL=1')
+    ctx.check_hostname = False
+    ctx.verify_mode = ssl.CERT_NONE
+    return ctx
+
+
+def sondear_url(url: str, timeout: float = 5) -> str:
+    """GET del WSDL: ``operational``, ``degraded`` (5xx) o ``down``."""
+    try:
+        response = urllib.request.urlopen(url, context=_create_ssl_context(), timeout=timeout)
+        if response.status < 500:
+            return 'operational'
+        return 'degraded'
+    except URLError as e:
+        # Check if it's an HTTP error with a status code
+        if hasattr(e, 'code') and e.code >= 500:
+            return 'degraded'
+        return 'down'
+    except Exception:
+        return 'down'
+
+
+def registrar_sondeo(servicio: str, ambiente: str, resultado: str) -> None:
+    if resultado == 'operational':
+        registrar_exito(servicio, ambiente)
+    else:
+        registrar_falla(servicio, ambiente)
+
+
+def url_sondeo(servicio: str, ambiente: str) -> str | None:
+    """WSDL que se consulta para probar el servicio (respeta ``ARCA_SIMULADOR_URL``)."""
+    from arca_arg import settings
+
+    simulador = (os.getenv('ARCA_SIMULADOR_URL') or '').strip().rstrip('/')
+    if simulador:
+        rutas = {
+            'wsaa': '/ws/services/LoginCms?wsdl',
+            'wsfe': '/wsfev1/service.asmx?WSDL',
+            'padron': '/sr-padron/webservices/personaServiceA5?wsdl',
+        }
+        ruta = rutas.get(servicio)
+        return f'{simulador}{ruta}' if ruta else None
+
+    produccion = ambiente == 'production'
+    urls = {
+        'wsaa': settings.WSDL_WSAA_PROD if produccion else settings.WSDL_WSAA_HOM,
+        'wsfe': settings.WSDL_FEV1_PROD if produccion else settings.WSDL_FEV1_HOM,
+        'padron': settings.WSDL_CONSTANCIA_PROD if produccion else settings.WSDL_CONSTANCIA_HOM,
+    }
+    return urls.get(servicio)
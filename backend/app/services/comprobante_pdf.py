@@ -1,3 +1,6 @@
+from .metricas import PDF_RENDER_SEGUNDOS, medir
+
+
 def html_to_pdf_bytes(html: str) -> bytes:
     try:
         from playwright.sync_api import sync_playwright
@@ -7,7 +10,7 @@ def html_to_pdf_bytes(html: str) -> bytes:
             'python -m playwright install chromium.'
         ) from exc
 
-    with sync_playwright() as playwright:
+    with medir(PDF_RENDER_SEGUNDOS), sync_playwright() as playwright:
         browser = playwright.chromium.launch(
             headless=True,
             args=['--no-sandbox', '--disable-dev-shm-usage'],
@@ -7,8 +7,9 @@ from email.mime.base import MIMEBase
 from email.mime.text import MIMEText
 from email import encoders
 
-from .encryption import decrypt_certificate
+from .encryption import get_smtp_password
 from .comprobante_filename import build_comprobante_pdf_filename
+from .metricas import SMTP_ENVIO_SEGUNDOS, medir
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +22,7 @@ DEFAULT_PREVIEW_SAMPLE_DATA = {
 
 def get_smtp_connection(config):
     """Crea conexión SMTP autenticada desde config del tenant."""
-    password = decrypt_certificate(config.smtp_password_encrypted).decode('utf-8')
+    password = get_smtp_password(config)
 
     if config.smtp_use_tls:
         server = smtplib.SMTP(config.smtp_host, config.smtp_port, timeout=15)
@@ -81,11 +82,12 @@ def send_email(config, to_email, subject, html_body, attachments=None):
             part.add_header('Content-Disposition', 'attachment', filename=filename)
             msg.attach(part)
 
-    server = get_smtp_connection(config)
-    try:
-        server.sendmail(config.from_email, to_email, msg.as_string())
-    finally:
-        server.quit()
+    with medir(SMTP_ENVIO_SEGUNDOS):
+        server = get_smtp_connection(config)
+        try:
+            server.sendmail(config.from_email, to_email, msg.as_string())
+        finally:
+            server.quit()
 
 
 def send_comprobante_email(factura, custom_asunto=None, custom_body=None,
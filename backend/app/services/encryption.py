@@ -1,21 +1,35 @@
+import base64
+import hashlib
 import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
 
 from cryptography.fernet import Fernet
 from flask import current_app
 
 
-def get_fernet():
-    key = current_app.config['ENCRYPTION_KEY']
+DEFAULT_SECRET_CACHE_TTL_SECONDS = 300
+DEFAULT_SECRET_CACHE_MAX_ENTRIES = 256
+
+
+@lru_cache(maxsize=8)
+def _build_fernet(key: str) -> Fernet:
     if len(key) < 32:
         key = key.ljust(32, '0')
     elif len(key) > 32:
         key = key[:32]
 
-    import base64
     key_bytes = base64.urlsafe_b64encode(key.encode())
     return Fernet(key_bytes)
 
 
+def get_fernet():
+    """Retorna el cipher del proceso. Se reconstruye solo si cambia ENCRYPTION_KEY."""
+    return _build_fernet(current_app.config['ENCRYPTION_KEY'])
+
+
 def normalize_pem(data: bytes) -> bytes:
     """Normalize PEM data by ensuring proper newlines between header, base64 body, and footer."""
     text = data.decode('utf-8', errors='replace').strip()
@@ -42,3 +56,100 @@ def decrypt_certificate(encrypted_data: bytes) -> bytes:
     """Desencripta un certificado o clave privada. Normaliza PEM tras desencriptar."""
     f = get_fernet()
     return normalize_pem(f.decrypt(encrypted_data))
+
+
+class SecretStore:
+    """Store en memoria, acotado y con TTL, de material desencriptado.
+
+    Las claves combinan el dueño del secreto (facturador o config de email)
+    con un hash del ciphertext, así un secreto re-encriptado nunca devuelve
+    el valor anterior. ``invalidate`` descarta todas las entradas de un dueño.
+    """
+
+    def __init__(self):
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float, max_entries: int):
+        if ttl <= 0 or max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, owner):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == owner]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_secret_store = SecretStore()
+
+
+def _ciphertext_digest(encrypted_data: bytes) -> str:
+    return hashlib.sha256(encrypted_data).hexdigest()
+
+
+def decrypt_cached(owner: tuple, encrypted_data: bytes) -> bytes:
+    """Desencripta ``encrypted_data`` reutilizando el resultado mientras siga vigente."""
+    key = (owner, _ciphertext_digest(encrypted_data))
+    cached = _secret_store.get(key)
+    if cached is not None:
+        return cached
+
+    value = decrypt_certificate(encrypted_data)
+    _secret_store.set(
+        key,
+        value,
+        ttl=float(current_app.config.get('SECRET_CACHE_TTL_SECONDS', DEFAULT_SECRET_CACHE_TTL_SECONDS)),
+        max_entries=int(current_app.config.get('SECRET_CACHE_MAX_ENTRIES', DEFAULT_SECRET_CACHE_MAX_ENTRIES)),
+    )
+    return value
+
+
+def get_facturador_credentials(facturador) -> tuple[bytes, bytes]:
+    """Retorna (cert, key) desencriptados del facturador."""
+    owner = ('facturador', str(facturador.id))
+    return (
+        decrypt_cached(owner, facturador.cert_encrypted),
+        decrypt_cached(owner, facturador.key_encrypted),
+    )
+
+
+def get_smtp_password(config) -> str:
+    """Retorna la contraseña SMTP desencriptada de una EmailConfig."""
+    owner = ('email_config', str(config.id))
+    return decrypt_cached(owner, config.smtp_password_encrypted).decode('utf-8')
+
+
+def invalidate_facturador_secrets(facturador_id) -> None:
+    _secret_store.invalidate(('facturador', str(facturador_id)))
+
+
+def invalidate_email_config_secrets(config_id) -> None:
+    _secret_store.invalidate(('email_config', str(config_id)))
+
+
+def clear_secret_store() -> None:
+    _secret_store.clear()
@@ -0,0 +1,144 @@
+"""Historial comprimido de los intercambios con ARCA por factura.
+
+Cada intento de ``FECAESolicitar`` (y cada ``FECompConsultar`` que resuelve
+una emisión o importa un comprobante externo) agrega una fila a
+``factura_arca_intercambio`` con el request y el response serializados a JSON
+y comprimidos con gzip. Nada se sobreescribe: un reintento es una fila nueva.
+
+Retención: las filas con más de ``ARCA_HISTORIAL_DIAS_EN_BASE`` días se
+mueven al almacenamiento de archivos (el mismo de las descargas) como JSONL
+comprimido por tenant, o se borran si ``ARCA_HISTORIAL_ARCHIVAR`` es falso.
+"""
+
+import gzip
+import json
+import uuid
+from datetime import datetime
+
+from ..extensions import db
+from ..models import FacturaArcaIntercambio
+from .almacenamiento import get_almacen
+
+CODIFICACION = 'gzip'
+PREFIJO_ARCHIVO = 'historial-arca'
+
+
+def comprimir(valor) -> tuple[bytes | None, int]:
+    """JSON compacto + gzip. Devuelve ``(datos, bytes sin comprimir)``."""
+    if valor is None:
+        return None, 0
+    crudo = json.dumps(valor, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+    return gzip.compress(crudo, compresslevel=6, mtime=0), len(crudo)
+
+
+def descomprimir(datos: bytes | None, codificacion: str = CODIFICACION):
+    if datos is None:
+        return None
+    if codificacion != CODIFICACION:
+        raise ValueError(f'Codificación de historial desconocida: {codificacion}')
+    return json.loads(gzip.decompress(datos))
+
+
+def fila_intercambio(tenant_id, factura_id, lote_id, operacion: str, resultado: str,
+                     request=None, response=None, error_codigo: str | None = None) -> dict:
+    """Valores de una fila de ``factura_arca_intercambio`` (para ``db.insert`` en bloque)."""
+    request_data, bytes_request = comprimir(request)
+    response_data, bytes_response = comprimir(response)
+    return {
+        'id': uuid.uuid4(),
+        'tenant_id': tenant_id,
+        'factura_id': factura_id,
+        'lote_id': lote_id,
+        'operacion': operacion,
+        'resultado': resultado,
+        'error_codigo': (error_codigo or None) and str(error_codigo)[:50],
+        'codificacion': CODIFICACION,
+        'request_data': request_data,
+        'response_data': response_data,
+        'bytes_originales': bytes_request + bytes_response,
+        'created_at': datetime.utcnow(),
+    }
+
+
+def registrar_intercambio(factura, operacion: str, resultado: str, request=None, response=None,
+                          error_codigo: str | None = None) -> FacturaArcaIntercambio:
+    """Agrega el intento a la sesión; se persiste con el commit de la factura."""
+    intercambio = FacturaArcaIntercambio(**fila_intercambio(
+        factura.tenant_id, factura.id, factura.lote_id, operacion, resultado,
+        request=request, response=response, error_codigo=error_codigo,
+    ))
+    db.session.add(intercambio)
+    return intercambio
+
+
+def _to_dict(intercambio: FacturaArcaIntercambio, intento: int | None = None) -> dict:
+    comprimidos = len(intercambio.request_data or b'') + len(intercambio.response_data or b'')
+    data = {
+        'id': str(intercambio.id),
+        'factura_id': str(intercambio.factura_id),
+        'lote_id': str(intercambio.lote_id) if intercambio.lote_id else None,
+        'operacion': intercambio.operacion,
+        'resultado': intercambio.resultado,
+        'error_codigo': intercambio.error_codigo,
+        'created_at': intercambio.created_at.isoformat(),
+        'bytes_originales': intercambio.bytes_originales,
+        'bytes_comprimidos': comprimidos,
+        'request': descomprimir(intercambio.request_data, intercambio.codificacion),
+        'response': descomprimir(intercambio.response_data, intercambio.codificacion),
+    }
+    if intento is not None:
+        data['intento'] = intento
+    return data
+
+
+def intercambios_de_factura(factura) -> list[dict]:
+    """Historial de la factura en orden cronológico, ya descomprimido."""
+    intercambios = FacturaArcaIntercambio.query.filter_by(
+        factura_id=factura.id,
+        tenant_id=factura.tenant_id,
+    ).order_by(FacturaArcaIntercambio.created_at.asc()).all()
+    return [_to_dict(intercambio, intento) for intento, intercambio in enumerate(intercambios, start=1)]
+
+
+def archivar_intercambios(antes_de: datetime, archivar: bool = True, limite: int = 5000) -> dict:
+    """Saca de la base hasta ``limite`` filas anteriores a ``antes_de``.
+
+    Con ``archivar`` se escriben antes en el almacenamiento, un
+    ``.jsonl.gz`` por tenant y ejecución bajo ``historial-arca/<tenant>/``.
+    """
+    intercambios = FacturaArcaIntercambio.query.filter(
+        FacturaArcaIntercambio.created_at < antes_de,
+    ).order_by(
+        FacturaArcaIntercambio.tenant_id.asc(),
+        FacturaArcaIntercambio.created_at.asc(),
+    ).limit(limite).all()
+    if not intercambios:
+        return {'eliminados': 0, 'archivos': []}
+
+    archivos = []
+    if archivar:
+        por_tenant: dict = {}
+        for intercambio in intercambios:
+            por_tenant.setdefault(intercambio.tenant_id, []).append(intercambio)
+
+        almacen = get_almacen()
+        for tenant_id, filas in por_tenant.items():
+            clave = f'{PREFIJO_ARCHIVO}/{tenant_id}/{antes_de:%Y%m%d}-{uuid.uuid4().hex[:12]}.jsonl.gz'
+            destino = almacen.abrir_escritura(clave)
+            try:
+                with gzip.GzipFile(fileobj=destino, mode='wb', mtime=0) as archivo:
+                    for intercambio in filas:
+                        linea = json.dumps(_to_dict(intercambio), ensure_ascii=False, separators=(',', ':'))
+                        archivo.write(linea.encode('utf-8') + b'\n')
+                destino.close()
+            except Exception:
+                destino.abortar()
+                raise
+            archivos.append(clave)
+
+    ids = [intercambio.id for intercambio in intercambios]
+    FacturaArcaIntercambio.query.filter(
+        FacturaArcaIntercambio.id.in_(ids),
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return {'eliminados': len(ids), 'archivos': archivos}
@@ -0,0 +1,53 @@
+"""Límite distribuido de llamadas a ARCA por certificado (CUIT), ambiente y servicio.
+
+Configura el ``LimitadorArca`` de ``arca_integration`` con Redis como estado
+compartido: todos los workers y la API respetan la misma tasa y la misma
+cantidad de llamadas simultáneas por CUIT, sin cambios en los llamadores
+(cada operación SOAP de ``ArcaClient`` pasa por el limitador).
+
+- ``wsfe``: ``ARCA_LIMITE_WSFE_POR_SEGUNDO`` y ``ARCA_LIMITE_CONCURRENCIA``.
+- ``wsaa``: ``ARCA_LIMITE_WSAA_POR_SEGUNDO`` y una sola llamada por vez, para
+  no pedir dos TA a la vez ("ya posee un TA válido").
+- ``padron``: ``PADRON_CONSULTAS_POR_SEGUNDO`` y ``ARCA_LIMITE_CONCURRENCIA``.
+
+Una llamada que no consigue lugar en ``ARCA_LIMITE_ESPERA_MAXIMA_SECONDS``
+falla con ``ArcaLimiteError`` y ``procesar_lote`` la reprograma como error de
+red. Sin Redis las llamadas siguen sin límite.
+"""
+
+from arca_integration import LimitadorArca, LimiteServicio, configurar_limitador
+
+from . import progress
+
+
+def _obtener_redis():
+    return progress.get_redis()
+
+
+def crear_limitador(config) -> LimitadorArca:
+    concurrencia = int(config.get('ARCA_LIMITE_CONCURRENCIA', 4))
+    return LimitadorArca(
+        _obtener_redis,
+        {
+            'wsaa': LimiteServicio(
+                por_segundo=float(config.get('ARCA_LIMITE_WSAA_POR_SEGUNDO', 0.5)),
+                concurrencia=1,
+            ),
+            'wsfe': LimiteServicio(
+                por_segundo=float(config.get('ARCA_LIMITE_WSFE_POR_SEGUNDO', 10)),
+                concurrencia=concurrencia,
+            ),
+            'padron': LimiteServicio(
+                por_segundo=float(config.get('PADRON_CONSULTAS_POR_SEGUNDO', 5)),
+                concurrencia=concurrencia,
+            ),
+        },
+        espera_maxima=float(config.get('ARCA_LIMITE_ESPERA_MAXIMA_SECONDS', 30)),
+    )
+
+
+def init_limitador_arca(app) -> None:
+    if app.config.get('ARCA_LIMITE_HABILITADO', False):
+        configurar_limitador(crear_limitador(app.config))
+    else:
+        configurar_limitador(None)
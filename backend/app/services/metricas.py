@@ -0,0 +1,189 @@
+"""Métricas Prometheus de la API y los workers Celery.
+
+Se registran siempre (el costo es incrementar contadores en memoria):
+
+- latencia de cada operación SOAP contra ARCA (WSAA, WSFE, padrón) por
+  servicio, método y resultado, informada por ``ArcaClient``;
+- facturas autorizadas y con error (``rate()`` da facturas por segundo);
+- duración de lotes, render de PDF y envío SMTP;
+- duración de tareas Celery y profundidad de las colas en Redis.
+
+Con varios procesos (gunicorn, Celery prefork) hay que definir
+``PROMETHEUS_MULTIPROC_DIR``: cada proceso escribe sus valores en ese
+directorio y el endpoint los agrega al responder. La API expone ``/metrics``;
+el worker levanta un servidor HTTP propio en ``METRICS_WORKER_PORT``.
+"""
+
+import logging
+import os
+import shutil
+import time
+from contextlib import contextmanager
+
+from celery.signals import task_postrun, task_prerun, worker_init, worker_process_shutdown, worker_ready
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from arca_integration import registrar_observador
+
+from ..extensions import COLAS_TAREAS
+from .progress import get_redis
+
+logger = logging.getLogger(__name__)
+
+ARCA_LLAMADA_SEGUNDOS = Histogram(
+    'facturador_arca_llamada_segundos',
+    'Duración de las operaciones SOAP contra ARCA',
+    ['servicio', 'metodo', 'resultado', 'ambiente'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60),
+)
+FACTURAS_PROCESADAS = Counter(
+    'facturador_facturas_procesadas_total',
+    'Facturas procesadas en lotes, por resultado (autorizada/error)',
+    ['resultado'],
+)
+LOTE_DURACION_SEGUNDOS = Histogram(
+    'facturador_lote_duracion_segundos',
+    'Duración de procesar_lote',
+    ['estado'],
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600),
+)
+PDF_RENDER_SEGUNDOS = Histogram(
+    'facturador_pdf_render_segundos',
+    'Duración de html_to_pdf_bytes',
+    ['resultado'],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+)
+SMTP_ENVIO_SEGUNDOS = Histogram(
+    'facturador_smtp_envio_segundos',
+    'Duración del envío SMTP de un email (conexión incluida)',
+    ['resultado'],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+)
+CELERY_TAREA_SEGUNDOS = Histogram(
+    'facturador_celery_tarea_segundos',
+    'Duración de las tareas Celery',
+    ['tarea', 'estado'],
+    buckets=(0.1, 0.5, 1, 5, 15, 60, 300, 900, 3600),
+)
+
+_inicios_tareas: dict[str, float] = {}
+
+
+def _observar_llamada_arca(servicio: str, metodo: str, resultado: str, duracion: float, ambiente: str) -> None:
+    ARCA_LLAMADA_SEGUNDOS.labels(servicio, metodo, resultado, ambiente).observe(duracion)
+
+
+registrar_observador(_observar_llamada_arca)
+
+
+def registrar_facturas(resultado: str, cantidad: int = 1) -> None:
+    if cantidad:
+        FACTURAS_PROCESADAS.labels(resultado).inc(cantidad)
+
+
+@contextmanager
+def medir(histograma: Histogram):
+    """Observa la duración del bloque con ``resultado`` = ok / error."""
+    inicio = time.perf_counter()
+    resultado = 'ok'
+    try:
+        yield
+    except Exception:
+        resultado = 'error'
+        raise
+    finally:
+        histograma.labels(resultado).observe(time.perf_counter() - inicio)
+
+
+class _ColasCelery:
+    """Profundidad de las colas Celery (LLEN en el broker Redis) al momento del scrape."""
+
+    def describe(self):
+        # Sin describe() el registry llamaría a collect() (y a Redis) al registrarse.
+        return []
+
+    def collect(self):
+        familia = GaugeMetricFamily(
+            'facturador_celery_cola_pendientes',
+            'Mensajes pendientes en cada cola Celery',
+            labels=['cola'],
+        )
+        colas = os.environ.get('METRICS_CELERY_QUEUES') or ','.join(COLAS_TAREAS)
+        try:
+            client = get_redis()
+            for cola in (nombre.strip() for nombre in colas.split(',')):
+                if cola:
+                    familia.add_metric([cola], client.llen(cola))
+        except Exception:
+            logger.debug('No se pudo leer la profundidad de las colas Celery', exc_info=True)
+        yield familia
+
+
+_colas_celery = _ColasCelery()
+REGISTRY.register(_colas_celery)
+
+
+def registry_para_exponer() -> CollectorRegistry:
+    """Registry con las métricas de todos los procesos (multiproceso) o las del proceso actual."""
+    if not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(_colas_celery)
+    return registry
+
+
+def generar_respuesta() -> tuple[bytes, str]:
+    return generate_latest(registry_para_exponer()), CONTENT_TYPE_LATEST
+
+
+@task_prerun.connect
+def _tarea_iniciada(task_id=None, **_kwargs):
+    if task_id:
+        _inicios_tareas[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _tarea_finalizada(task_id=None, task=None, state=None, **_kwargs):
+    inicio = _inicios_tareas.pop(task_id, None)
+    if inicio is None or task is None:
+        return
+    CELERY_TAREA_SEGUNDOS.labels(task.name, state or 'UNKNOWN').observe(time.perf_counter() - inicio)
+
+
+@worker_init.connect
+def _preparar_directorio_multiproceso(**_kwargs):
+    directorio = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directorio:
+        shutil.rmtree(directorio, ignore_errors=True)
+        os.makedirs(directorio, exist_ok=True)
+
+
+@worker_ready.connect
+def _iniciar_servidor_worker(sender=None, **_kwargs):
+    """En el proceso principal del worker, expone las métricas agregadas por HTTP."""
+    puerto = int(os.environ.get('METRICS_WORKER_PORT', '0') or 0)
+    if not puerto:
+        return
+    try:
+        start_http_server(puerto, registry=registry_para_exponer())
+        logger.info('Métricas del worker en :%s/metrics', puerto)
+    except OSError:
+        logger.warning('No se pudo abrir el puerto de métricas %s', puerto, exc_info=True)
+
+
+@worker_process_shutdown.connect
+def _proceso_worker_terminado(pid=None, **_kwargs):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid or os.getpid())
@@ -0,0 +1,180 @@
+"""Cache persistente del padrón de ARCA (constancia de inscripción).
+
+Las consultas de padrón son lentas y se repiten: el mismo CUIT aparece en
+muchas facturas y en cada click de "consultar CUIT". ``padron_cache`` guarda
+el resultado por CUIT/ambiente con vencimiento (``PADRON_CACHE_TTL_SECONDS``)
+y también los "no encontrado" (``PADRON_CACHE_NEGATIVE_TTL_SECONDS``).
+
+``prefetch_padron`` resuelve en paralelo los CUIT sin cache vigente antes de
+emitir, para que el loop de ``procesar_lote`` no espere al padrón. La tasa de
+consultas por certificado la controla el limitador de ``ArcaClient``
+(``PADRON_CONSULTAS_POR_SEGUNDO``, ver ``app.services.limitador_arca``).
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from arca_integration.constants import CONDICIONES_IVA
+from arca_integration.exceptions import ArcaError
+from flask import current_app
+
+from ..extensions import db
+from ..models import PadronCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_NEGATIVE_TTL_SECONDS = 24 * 3600
+DEFAULT_PREFETCH_CONCURRENCIA = 4
+
+ERRORES_PADRON = (ArcaError, ConnectionError, TimeoutError, OSError, RuntimeError, ValueError)
+
+
+def normalizar_cuit(value) -> str | None:
+    """CUIT de 11 dígitos sin separadores, o None si no es válido."""
+    cuit = str(value or '').replace('-', '').replace(' ', '').strip()
+    if len(cuit) != 11 or not cuit.isdigit():
+        return None
+    return cuit
+
+
+def normalizar_texto(value: str) -> str:
+    return ' '.join(value.lower().replace('–', '-').split())
+
+
+def condicion_iva_id_desde_nombre(nombre: str) -> int | None:
+    """Convierte nombre de condición IVA a ID."""
+    if not nombre:
+        return None
+    normalized = normalizar_texto(nombre)
+    for cond_id, desc in CONDICIONES_IVA.items():
+        if normalizar_texto(desc) == normalized:
+            return cond_id
+    return None
+
+
+def cambios_padron_receptor(receptor, data: dict) -> dict:
+    """Campos del receptor a completar con datos de padrón (sin pisar datos cargados)."""
+    cambios = {}
+    condicion_iva = data.get('condicion_iva')
+    if condicion_iva and receptor.condicion_iva_id is None:
+        cambios['condicion_iva_id'] = condicion_iva_id_desde_nombre(condicion_iva)
+
+    if data.get('razon_social') and (
+        not receptor.razon_social or receptor.razon_social.startswith('CUIT ')
+    ):
+        cambios['razon_social'] = data['razon_social']
+
+    if data.get('direccion') and not receptor.direccion:
+        cambios['direccion'] = data['direccion']
+
+    return {campo: valor for campo, valor in cambios.items() if valor is not None}
+
+
+def _vigentes(cuits: list[str], ambiente: str) -> dict[str, PadronCache]:
+    if not cuits:
+        return {}
+    rows = PadronCache.query.filter(
+        PadronCache.cuit.in_(cuits),
+        PadronCache.ambiente == ambiente,
+        PadronCache.expires_at > datetime.utcnow(),
+    ).all()
+    return {row.cuit: row for row in rows}
+
+
+def _guardar(resultados: dict[str, dict], ambiente: str) -> None:
+    """Upsert de resultados de padrón en una conexión propia."""
+    if not resultados:
+        return
+
+    ahora = datetime.utcnow()
+    ttl = current_app.config.get('PADRON_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS)
+    ttl_negativo = current_app.config.get('PADRON_CACHE_NEGATIVE_TTL_SECONDS', DEFAULT_NEGATIVE_TTL_SECONDS)
+
+    rows = []
+    for cuit, result in resultados.items():
+        encontrado = bool(result.get('success'))
+        rows.append({
+            'cuit': cuit,
+            'ambiente': ambiente,
+            'encontrado': encontrado,
+            'data': result.get('data') if encontrado else None,
+            'error': None if encontrado else (result.get('error') or 'Persona no encontrada'),
+            'consultado_at': ahora,
+            'expires_at': ahora + timedelta(seconds=ttl if encontrado else ttl_negativo),
+        })
+
+    table = PadronCache.__table__
+    with db.engine.begin() as conn:
+        conn.execute(table.delete().where(
+            table.c.ambiente == ambiente,
+            table.c.cuit.in_(list(resultados)),
+        ))
+        conn.execute(table.insert(), rows)
+
+
+def buscar_padron_cacheado(cuit: str, ambiente: str) -> dict | None:
+    """Resultado vigente del cache, o None si hay que consultar ARCA."""
+    cuit = normalizar_cuit(cuit) or cuit
+    cached = _vigentes([cuit], ambiente).get(cuit)
+    return cached.to_result() if cached is not None else None
+
+
+def consultar_padron_cacheado(client, cuit: str, ambiente: str) -> dict:
+    """``client.consultar_padron`` con cache persistente.
+
+    Devuelve el mismo formato que el cliente. Los errores de conexión se
+    propagan sin cachearse.
+    """
+    cuit = normalizar_cuit(cuit) or cuit
+    cached = buscar_padron_cacheado(cuit, ambiente)
+    if cached is not None:
+        return cached
+
+    result = client.consultar_padron(cuit)
+    _guardar({cuit: result}, ambiente)
+    return result
+
+
+def prefetch_padron(client, cuits, ambiente: str, on_progress=None) -> dict[str, dict]:
+    """Resuelve en paralelo los CUIT sin cache vigente.
+
+    Retorna ``{cuit: resultado}`` para todos los CUIT con dato disponible
+    (cacheado o recién consultado). Los que fallan quedan afuera y se
+    reintentan en la próxima consulta. ``on_progress(resueltos)`` se invoca
+    desde el hilo llamador a medida que avanzan las consultas.
+    """
+    normalizados = sorted({c for c in (normalizar_cuit(cuit) for cuit in cuits) if c})
+    if not normalizados:
+        return {}
+
+    resultados = {cuit: row.to_result() for cuit, row in _vigentes(normalizados, ambiente).items()}
+    faltantes = [cuit for cuit in normalizados if cuit not in resultados]
+    if on_progress:
+        on_progress(len(resultados))
+    if not faltantes:
+        return resultados
+
+    # Inicializa el TA del padrón una vez antes de consultar en paralelo.
+    _ = client.ws_constancia
+
+    def _consultar(cuit):
+        try:
+            return cuit, client.consultar_padron(cuit)
+        except ERRORES_PADRON as exc:
+            logger.warning('Prefetch de padrón falló para %s: %s', cuit, exc)
+            return cuit, None
+
+    concurrencia = max(1, int(current_app.config.get('PADRON_PREFETCH_CONCURRENCIA', DEFAULT_PREFETCH_CONCURRENCIA)))
+    nuevos = {}
+    with ThreadPoolExecutor(max_workers=min(concurrencia, len(faltantes))) as executor:
+        for index, (cuit, result) in enumerate(executor.map(_consultar, faltantes), start=1):
+            if result is not None:
+                nuevos[cuit] = result
+            if on_progress:
+                on_progress(len(resultados) + index)
+
+    _guardar(nuevos, ambiente)
+    resultados.update(nuevos)
+    return resultados
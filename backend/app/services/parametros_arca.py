@@ -0,0 +1,160 @@
+"""Cache de datos de referencia de WSFE (FEParamGet*).
+
+Tipos de comprobante, alícuotas, monedas, condiciones de IVA, puntos de venta y
+cotizaciones cambian poco: se consultan a ARCA una vez y se sirven desde
+memoria. Hay dos niveles:
+
+- memoria del proceso (sin I/O en el caso común),
+- Redis, compartido entre workers, para que un proceso nuevo no repita la
+  consulta SOAP.
+
+Cada tipo tiene su TTL (ver ``PARAMETROS_ARCA_*_TTL_SECONDS``). Si Redis no
+está disponible se sigue con el cache en memoria y ARCA.
+"""
+
+import json
+import logging
+import threading
+import time
+from decimal import Decimal
+
+import redis
+from flask import current_app
+
+from .progress import get_redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_PREFIX = 'arca:param:'
+
+# tipo -> (método de ArcaClient, config del TTL, TTL por defecto, alcance)
+# alcance 'ambiente': igual para todos los CUIT; 'cuit': propio de cada CUIT.
+PARAMETROS = {
+    'tipos_cbte': ('fe_param_get_tipos_cbte', 'PARAMETROS_ARCA_TTL_SECONDS', 86400, 'ambiente'),
+    'tipos_iva': ('fe_param_get_tipos_iva', 'PARAMETROS_ARCA_TTL_SECONDS', 86400, 'ambiente'),
+    'tipos_doc': ('fe_param_get_tipos_doc', 'PARAMETROS_ARCA_TTL_SECONDS', 86400, 'ambiente'),
+    'monedas': ('fe_param_get_tipos_monedas', 'PARAMETROS_ARCA_TTL_SECONDS', 86400, 'ambiente'),
+    'condicion_iva_receptor': (
+        'fe_param_get_condicion_iva_receptor', 'PARAMETROS_ARCA_TTL_SECONDS', 86400, 'ambiente',
+    ),
+    'ptos_venta': ('fe_param_get_ptos_venta', 'PARAMETROS_ARCA_PTOS_VENTA_TTL_SECONDS', 3600, 'cuit'),
+    'cotizacion': ('fe_param_get_cotizacion', 'PARAMETROS_ARCA_COTIZACION_TTL_SECONDS', 900, 'ambiente'),
+}
+
+_entries: dict[str, tuple[float, object]] = {}
+_lock = threading.Lock()
+_key_locks: dict[str, threading.Lock] = {}
+
+
+def _cache_key(client, tipo: str, arg=None) -> str:
+    _metodo, _ttl_config, _ttl_default, alcance = PARAMETROS[tipo]
+    parts = [tipo, client.ambiente]
+    if alcance == 'cuit':
+        parts.append(client.cuit)
+    if arg is not None:
+        parts.append(str(arg))
+    return ':'.join(parts)
+
+
+def _ttl_seconds(tipo: str) -> int:
+    _metodo, ttl_config, ttl_default, _alcance = PARAMETROS[tipo]
+    return int(current_app.config.get(ttl_config, ttl_default))
+
+
+def _memoria_get(key: str):
+    with _lock:
+        entry = _entries.get(key)
+        if not entry:
+            return None
+        expires_at, data = entry
+        if expires_at <= time.monotonic():
+            _entries.pop(key, None)
+            return None
+        return data
+
+
+def _memoria_set(key: str, data, ttl: float) -> None:
+    if ttl <= 0:
+        return
+    with _lock:
+        _entries[key] = (time.monotonic() + ttl, data)
+
+
+def _redis_get(key: str):
+    try:
+        pipe = get_redis().pipeline()
+        pipe.get(REDIS_PREFIX + key)
+        pipe.ttl(REDIS_PREFIX + key)
+        raw, ttl = pipe.execute()
+    except redis.RedisError as exc:
+        logger.debug('Cache de parámetros ARCA sin Redis: %s', exc)
+        return None, 0
+    if raw is None:
+        return None, 0
+    return json.loads(raw), max(int(ttl or 0), 0)
+
+
+def _redis_set(key: str, data, ttl: int) -> None:
+    if ttl <= 0:
+        return
+    try:
+        get_redis().setex(REDIS_PREFIX + key, ttl, json.dumps(data, separators=(',', ':')))
+    except redis.RedisError as exc:
+        logger.debug('No se pudo guardar el parámetro ARCA %s en Redis: %s', key, exc)
+
+
+def obtener_parametro(client, tipo: str, arg=None):
+    """Devuelve el parámetro ``tipo`` desde cache, consultando ARCA sólo si expiró."""
+    key = _cache_key(client, tipo, arg)
+    data = _memoria_get(key)
+    if data is not None:
+        return data
+
+    with _lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    # Un solo hilo por clave consulta ARCA; el resto espera y lee el cache.
+    with key_lock:
+        data = _memoria_get(key)
+        if data is not None:
+            return data
+
+        data, ttl_restante = _redis_get(key)
+        if data is not None:
+            _memoria_set(key, data, ttl_restante)
+            return data
+
+        metodo = PARAMETROS[tipo][0]
+        data = getattr(client, metodo)(arg) if arg is not None else getattr(client, metodo)()
+
+        ttl = _ttl_seconds(tipo)
+        _redis_set(key, data, ttl)
+        _memoria_set(key, data, ttl)
+        return data
+
+
+def invalidar_parametros() -> None:
+    """Vacía el cache en memoria del proceso (Redis expira por TTL)."""
+    with _lock:
+        _entries.clear()
+
+
+def obtener_cotizacion(client, moneda: str) -> Decimal:
+    """Última cotización de ``moneda`` informada por ARCA."""
+    data = obtener_parametro(client, 'cotizacion', moneda)
+    return Decimal(str(data['mon_cotiz']))
+
+
+def punto_venta_habilitado(client, punto_venta: int) -> bool | None:
+    """Indica si el punto de venta está activo para el CUIT.
+
+    Retorna ``None`` cuando ARCA no informa puntos de venta (habitual en
+    homologación): en ese caso no se puede validar.
+    """
+    puntos = obtener_parametro(client, 'ptos_venta')
+    if not puntos:
+        return None
+    for punto in puntos:
+        if int(punto['nro']) == int(punto_venta):
+            return not punto['bloqueado'] and not punto['fch_baja']
+    return False
@@ -0,0 +1,86 @@
+"""Particiones mensuales de ``factura`` y ``factura_item`` (PostgreSQL).
+
+La migración ``f1c9e4a7b3d6`` convierte ambas tablas en particionadas por
+rango de ``fecha_emision``: una partición por mes (``factura_pAAAAMM`` y
+``factura_item_pAAAAMM``) más una ``DEFAULT`` para fechas sin partición. La
+función SQL ``crear_particion_factura(mes)`` crea el par de particiones de un
+mes y les mueve las filas que hayan caído en la ``DEFAULT``.
+
+En otros motores (los tests corren sobre SQLite) las tablas son comunes y
+todo esto no hace nada.
+"""
+
+import json
+from datetime import date
+
+from sqlalchemy import text
+
+from ..extensions import db
+
+PARTICION_DEFAULT = 'factura_default'
+
+
+def _es_postgres() -> bool:
+    return db.engine.dialect.name == 'postgresql'
+
+
+def factura_particionada() -> bool:
+    if not _es_postgres():
+        return False
+    return bool(db.session.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('factura'))"
+    )).scalar())
+
+
+def _sumar_meses(valor: date, meses: int) -> date:
+    indice = valor.year * 12 + valor.month - 1 + meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def asegurar_particiones(meses_adelante: int = 3, hoy: date | None = None) -> list[str]:
+    """Crea las particiones que falten hasta ``meses_adelante`` meses después
+    del actual y las de los meses que tengan filas en la partición DEFAULT.
+
+    Devuelve los nombres de las particiones de ``factura`` creadas.
+    """
+    if not factura_particionada():
+        return []
+
+    hoy = hoy or date.today()
+    meses = {_sumar_meses(hoy, desplazamiento) for desplazamiento in range(meses_adelante + 1)}
+    meses.update(
+        fila[0] for fila in db.session.execute(text(
+            f"SELECT DISTINCT date_trunc('month', fecha_emision)::date FROM {PARTICION_DEFAULT}"
+        ))
+    )
+
+    creadas = []
+    for mes in sorted(meses):
+        if db.session.execute(text('SELECT crear_particion_factura(:mes)'), {'mes': mes}).scalar():
+            creadas.append(f'factura_p{mes:%Y%m}')
+        db.session.commit()
+    return creadas
+
+
+def _relaciones(plan: dict) -> set[str]:
+    relaciones = set()
+    if 'Relation Name' in plan:
+        relaciones.add(plan['Relation Name'])
+    for subplan in plan.get('Plans', []):
+        relaciones |= _relaciones(subplan)
+    return relaciones
+
+
+def particiones_consultadas(consulta) -> list[str]:
+    """Tablas que recorre el plan de ``consulta`` (una query de SQLAlchemy).
+
+    Sirve para verificar el pruning: una consulta acotada por fecha sólo
+    debería tocar las particiones de esos meses.
+    """
+    if hasattr(consulta, 'statement'):
+        consulta = consulta.statement
+    sql = str(consulta.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+    resultado = db.session.connection().exec_driver_sql(f'EXPLAIN (FORMAT JSON) {sql}').scalar()
+    if isinstance(resultado, str):
+        resultado = json.loads(resultado)
+    return sorted(_relaciones(resultado[0]['Plan']))
@@ -0,0 +1,167 @@
+"""Desglose de tiempos de ``procesar_lote`` por etapa.
+
+``PerfilLote`` acumula cuánto tiempo se fue en cada etapa (login WSAA,
+consulta de numeración, FECAESolicitar, padrón, commits...) por factura y
+para el lote completo. Las llamadas SOAP se atribuyen solas: mientras el
+perfil está activo, el observador de ``ArcaClient`` registra cada operación
+en la etapa que le corresponde.
+
+El resumen (``to_dict``) se guarda en ``Lote.perfil`` y tiene, por etapa,
+total, cantidad y p50/p95; además las facturas más lentas con su desglose.
+"""
+
+import heapq
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from arca_integration import registrar_observador
+
+# Operación SOAP -> etapa del perfil.
+ETAPAS_SOAP = {
+    'loginCms': 'wsaa',
+    'init': 'wsaa',
+    'FECompUltimoAutorizado': 'ultimo_autorizado',
+    'FECAESolicitar': 'fecae_solicitar',
+    'FECompConsultar': 'consulta_comprobante',
+    'getPersona_v2': 'padron',
+}
+
+_perfil_activo: ContextVar['PerfilLote | None'] = ContextVar('perfil_lote', default=None)
+
+
+def _percentil(valores: list[float], percentil: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, math.ceil(percentil / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+def _ms(segundos: float) -> float:
+    return round(segundos * 1000, 1)
+
+
+class PerfilLote:
+    def __init__(self, max_facturas_lentas: int = 10):
+        self.max_facturas_lentas = max_facturas_lentas
+        self._inicio = time.perf_counter()
+        self._fin = None
+        # etapa -> duraciones (una por factura, o por ocurrencia fuera de una factura)
+        self._muestras: dict[str, list[float]] = {}
+        self._reintentos = 0
+        self._facturas: list[float] = []
+        self._lentas: list[tuple[float, str, dict]] = []
+        self._factura_actual: dict[str, float] | None = None
+        self._factura_id = None
+        self._factura_inicio = 0.0
+        self._token = None
+
+    def registrar(self, etapa: str, segundos: float) -> None:
+        if self._factura_actual is not None:
+            self._factura_actual[etapa] = self._factura_actual.get(etapa, 0.0) + segundos
+        else:
+            self._muestras.setdefault(etapa, []).append(segundos)
+
+    @contextmanager
+    def etapa(self, nombre: str):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(nombre, time.perf_counter() - inicio)
+
+    def registrar_reintento(self) -> None:
+        """Cuenta una factura reprogramada (el reintento no espera en el worker)."""
+        self._reintentos += 1
+
+    def iniciar_factura(self, factura_id) -> None:
+        self.terminar_factura()
+        self._factura_actual = {}
+        self._factura_id = str(factura_id)
+        self._factura_inicio = time.perf_counter()
+
+    def terminar_factura(self) -> None:
+        etapas = self._factura_actual
+        if etapas is None:
+            return
+        total = time.perf_counter() - self._factura_inicio
+        self._factura_actual = None
+        for etapa, segundos in etapas.items():
+            self._muestras.setdefault(etapa, []).append(segundos)
+        self._facturas.append(total)
+
+        entrada = (total, self._factura_id, etapas)
+        if len(self._lentas) < self.max_facturas_lentas:
+            heapq.heappush(self._lentas, entrada)
+        elif self._lentas and total > self._lentas[0][0]:
+            heapq.heapreplace(self._lentas, entrada)
+
+    def activar(self) -> None:
+        """Atribuye a este perfil las llamadas SOAP del contexto actual."""
+        self._token = _perfil_activo.set(self)
+
+    def finalizar(self) -> None:
+        self.terminar_factura()
+        if self._fin is None:
+            self._fin = time.perf_counter()
+        if self._token is not None:
+            _perfil_activo.reset(self._token)
+            self._token = None
+
+    def to_dict(self) -> dict:
+        total = (self._fin or time.perf_counter()) - self._inicio
+        etapas = {
+            etapa: {
+                'total_ms': _ms(sum(valores)),
+                'cantidad': len(valores),
+                'p50_ms': _ms(_percentil(valores, 50)),
+                'p95_ms': _ms(_percentil(valores, 95)),
+                'max_ms': _ms(max(valores)),
+            }
+            for etapa, valores in sorted(self._muestras.items(), key=lambda item: -sum(item[1]))
+        }
+        medido = sum(sum(valores) for valores in self._muestras.values())
+        return {
+            'total_ms': _ms(total),
+            'sin_atribuir_ms': _ms(max(0.0, total - medido)),
+            'reintentos': self._reintentos,
+            'facturas': {
+                'cantidad': len(self._facturas),
+                'p50_ms': _ms(_percentil(self._facturas, 50)),
+                'p95_ms': _ms(_percentil(self._facturas, 95)),
+                'max_ms': _ms(max(self._facturas, default=0.0)),
+            },
+            'etapas': etapas,
+            'facturas_lentas': [
+                {
+                    'factura_id': factura_id,
+                    'total_ms': _ms(segundos),
+                    'etapas': {etapa: _ms(valor) for etapa, valor in desglose.items()},
+                }
+                for segundos, factura_id, desglose in sorted(self._lentas, reverse=True)
+            ],
+        }
+
+
+def perfil_activo() -> PerfilLote | None:
+    return _perfil_activo.get()
+
+
+def _observar_llamada(servicio: str, metodo: str, resultado: str, duracion: float, ambiente: str) -> None:
+    perfil = _perfil_activo.get()
+    if perfil is None:
+        return
+    if metodo in ETAPAS_SOAP:
+        etapa = ETAPAS_SOAP[metodo]
+    elif metodo.startswith('FEParamGet'):
+        etapa = 'parametros'
+    elif metodo.startswith('FECAEA'):
+        etapa = 'caea'
+    else:
+        etapa = servicio
+    perfil.registrar(etapa, duracion)
+
+
+registrar_observador(_observar_llamada)
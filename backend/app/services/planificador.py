@@ -0,0 +1,272 @@
+"""Planificador de turnos de ``procesar_lote`` con reparto justo entre tenants.
+
+Cada ejecución de ``procesar_lote`` emite a lo sumo
+``FACTURACION_FACTURAS_POR_TURNO`` facturas (un turno); si el lote tiene más,
+el siguiente turno vuelve a pasar por acá. Los turnos no van directo a Celery:
+esperan en una cola por tenant en Redis y se despachan con deficit round-robin
+(DRR), con a lo sumo ``FACTURACION_TURNOS_SIMULTANEOS`` en curso. Así un lote
+de 20.000 facturas avanza de a turnos y el lote chico de otro tenant entra en
+la próxima vuelta, en vez de esperar a que el grande termine.
+
+DRR: los tenants con turnos en cola forman un anillo. Cada uno tiene un
+crédito en facturas (``quantum = FACTURACION_FACTURAS_POR_TURNO x peso``,
+pesos opcionales en ``FACTURACION_PESOS_TENANT``); un turno sale si su costo
+(facturas pendientes, hasta un turno) entra en el crédito, y si no el tenant
+recibe otro quantum y pasa al final del anillo. Un tenant que llega al anillo
+empieza con un quantum, de modo que su primer turno sale en cuanto le toca.
+
+Cada lugar en curso vence a los ``TURNO_TTL_SECONDS`` por si el worker muere;
+el turno lo renueva mientras corre (``LugarTurno``), así un turno lento no
+pierde su lugar. La tarea ``despachar_turnos`` vuelve a despachar
+periódicamente.
+
+Un turno con ``no_antes_de`` (el reintento diferido de un lote) espera en
+``CLAVE_DIFERIDOS`` y pasa a la cola de su tenant cuando llega la hora. Sin
+Redis (o con el planificador deshabilitado) los turnos se encolan directo en
+Celery, con ``countdown`` si son diferidos.
+"""
+
+import json
+import logging
+import time
+import uuid
+from datetime import datetime
+
+import redis
+from flask import current_app
+
+from ..extensions import db
+from ..models import Factura
+from .progress import get_redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_PREFIX = 'planificador:'
+CLAVE_ANILLO = f'{REDIS_PREFIX}anillo'
+CLAVE_EN_ANILLO = f'{REDIS_PREFIX}en_anillo'
+CLAVE_CREDITO = f'{REDIS_PREFIX}credito'
+CLAVE_EN_CURSO = f'{REDIS_PREFIX}en_curso'
+CLAVE_DIFERIDOS = f'{REDIS_PREFIX}diferidos'
+CLAVE_LOCK = f'{REDIS_PREFIX}lock'
+
+TURNO_TTL_SECONDS = 15 * 60
+TURNO_RENOVACION_SECONDS = 60
+
+
+def habilitado() -> bool:
+    return bool(current_app.config.get('FACTURACION_PLANIFICADOR_HABILITADO', False))
+
+
+def facturas_por_turno() -> int:
+    return int(current_app.config.get('FACTURACION_FACTURAS_POR_TURNO', 0) or 0)
+
+
+def _clave_cola(tenant_id) -> str:
+    return f'{REDIS_PREFIX}cola:{tenant_id}'
+
+
+def _texto(valor) -> str:
+    return valor.decode() if isinstance(valor, bytes) else valor
+
+
+def pesos_tenant() -> dict[str, float]:
+    """``FACTURACION_PESOS_TENANT``: ``<tenant_id>:<peso>`` separados por coma."""
+    pesos = {}
+    for item in (current_app.config.get('FACTURACION_PESOS_TENANT') or '').split(','):
+        tenant_id, _, peso = item.strip().rpartition(':')
+        if not tenant_id:
+            continue
+        try:
+            pesos[tenant_id] = max(float(peso), 0.1)
+        except ValueError:
+            logger.warning('Peso de tenant inválido en FACTURACION_PESOS_TENANT: %s', item)
+    return pesos
+
+
+def _quantum(tenant_id: str, pesos: dict[str, float]) -> float:
+    return max(facturas_por_turno(), 1) * pesos.get(tenant_id, 1.0)
+
+
+def _pendientes(lote, hasta: datetime | None = None) -> int:
+    return Factura.query.filter_by(
+        tenant_id=lote.tenant_id,
+        lote_id=lote.id,
+        estado='pendiente',
+    ).filter(
+        db.or_(Factura.proximo_reintento.is_(None), Factura.proximo_reintento <= (hasta or datetime.utcnow())),
+    ).count()
+
+
+def encolar_lote(lote, continuacion: bool = False, no_antes_de: datetime | None = None) -> str:
+    """Encola el próximo turno de ``lote`` y devuelve su ``task_id``.
+
+    El ``celery_task_id`` del lote queda commiteado antes de que el turno
+    pueda despacharse. ``continuacion`` marca un turno siguiente de un lote
+    ya en proceso: la ejecución se descarta si mientras tanto otra la
+    reemplazó (ver ``reintento`` en ``procesar_lote``). ``no_antes_de``
+    (UTC) difiere el turno hasta esa hora.
+    """
+    from ..tasks.facturacion import procesar_lote
+
+    args = [str(lote.id), str(lote.tenant_id)]
+    if not habilitado() and not continuacion and no_antes_de is None:
+        task = procesar_lote.delay(*args)
+        lote.celery_task_id = task.id
+        db.session.commit()
+        return task.id
+
+    task_id = str(uuid.uuid4())
+    costo = max(1, min(_pendientes(lote, no_antes_de), facturas_por_turno() or 1))
+    lote.celery_task_id = task_id
+    db.session.commit()
+
+    if habilitado():
+        turno = {'args': args, 'task_id': task_id, 'costo': costo, 'continuacion': continuacion}
+        try:
+            cliente = get_redis()
+            with cliente.lock(CLAVE_LOCK, timeout=30, blocking_timeout=10):
+                if no_antes_de is not None and no_antes_de > datetime.utcnow():
+                    turno['tenant_id'] = str(lote.tenant_id)
+                    cliente.zadd(CLAVE_DIFERIDOS, {json.dumps(turno): _epoch(no_antes_de)})
+                else:
+                    _agregar_turno(cliente, str(lote.tenant_id), json.dumps(turno))
+                _despachar(cliente)
+            return task_id
+        except redis.RedisError as exc:
+            logger.warning('Planificador sin Redis, turno del lote %s directo a Celery: %s', lote.id, exc)
+
+    procesar_lote.apply_async(
+        args=args,
+        kwargs={'reintento': continuacion},
+        task_id=task_id,
+        countdown=_espera(no_antes_de),
+    )
+    return task_id
+
+
+def _epoch(momento: datetime) -> float:
+    return (momento - datetime(1970, 1, 1)).total_seconds()
+
+
+def _espera(no_antes_de: datetime | None) -> int | None:
+    if no_antes_de is None:
+        return None
+    return max(1, int((no_antes_de - datetime.utcnow()).total_seconds()) + 1)
+
+
+def _agregar_turno(cliente, tenant_id: str, turno: str) -> None:
+    cliente.rpush(_clave_cola(tenant_id), turno)
+    if cliente.sadd(CLAVE_EN_ANILLO, tenant_id):
+        cliente.rpush(CLAVE_ANILLO, tenant_id)
+        cliente.hset(CLAVE_CREDITO, tenant_id, _quantum(tenant_id, pesos_tenant()))
+
+
+def _sacar_del_anillo(cliente, tenant_id: str) -> None:
+    cliente.lpop(CLAVE_ANILLO)
+    cliente.srem(CLAVE_EN_ANILLO, tenant_id)
+    cliente.hdel(CLAVE_CREDITO, tenant_id)
+
+
+def _liberar_diferidos(cliente) -> None:
+    """Pasa a la cola de su tenant los turnos diferidos que ya llegaron a su hora."""
+    for miembro in cliente.zrangebyscore(CLAVE_DIFERIDOS, '-inf', time.time()):
+        turno = json.loads(_texto(miembro))
+        _agregar_turno(cliente, turno.pop('tenant_id'), json.dumps(turno))
+        cliente.zrem(CLAVE_DIFERIDOS, miembro)
+
+
+def _despachar(cliente) -> list[str]:
+    """Despacha turnos mientras haya lugar (con el lock tomado)."""
+    from ..tasks.facturacion import procesar_lote
+
+    maximo = int(current_app.config.get('FACTURACION_TURNOS_SIMULTANEOS', 4))
+    _liberar_diferidos(cliente)
+    cliente.zremrangebyscore(CLAVE_EN_CURSO, '-inf', time.time())
+    en_curso = cliente.zcard(CLAVE_EN_CURSO)
+    pesos = pesos_tenant()
+    despachados = []
+
+    while en_curso < maximo:
+        tenant_id = cliente.lindex(CLAVE_ANILLO, 0)
+        if tenant_id is None:
+            break
+        tenant_id = _texto(tenant_id)
+        cola = _clave_cola(tenant_id)
+        siguiente = cliente.lindex(cola, 0)
+        if siguiente is None:
+            _sacar_del_anillo(cliente, tenant_id)
+            continue
+
+        turno = json.loads(_texto(siguiente))
+        credito = float(_texto(cliente.hget(CLAVE_CREDITO, tenant_id)) or 0)
+        if credito < turno['costo']:
+            # Agotó su crédito en esta vuelta: otro quantum y al final del anillo.
+            cliente.hset(CLAVE_CREDITO, tenant_id, credito + _quantum(tenant_id, pesos))
+            cliente.lpop(CLAVE_ANILLO)
+            cliente.rpush(CLAVE_ANILLO, tenant_id)
+            continue
+
+        cliente.lpop(cola)
+        cliente.zadd(CLAVE_EN_CURSO, {turno['task_id']: time.time() + TURNO_TTL_SECONDS})
+        en_curso += 1
+        procesar_lote.apply_async(
+            args=turno['args'],
+            kwargs={'reintento': turno['continuacion']},
+            task_id=turno['task_id'],
+        )
+        despachados.append(turno['task_id'])
+        if cliente.llen(cola):
+            cliente.hset(CLAVE_CREDITO, tenant_id, credito - turno['costo'])
+        else:
+            _sacar_del_anillo(cliente, tenant_id)
+
+    return despachados
+
+
+def despachar() -> list[str]:
+    """Despacha los turnos en cola que entren en el límite de turnos en curso."""
+    if not habilitado():
+        return []
+    try:
+        cliente = get_redis()
+        with cliente.lock(CLAVE_LOCK, timeout=30, blocking_timeout=10):
+            return _despachar(cliente)
+    except redis.RedisError as exc:
+        logger.warning('Planificador sin Redis: %s', exc)
+        return []
+
+
+class LugarTurno:
+    """Renueva el vencimiento del lugar en curso de un turno mientras corre.
+
+    ``renovar`` se llama seguido (una vez por factura) y sólo escribe en Redis
+    cada ``TURNO_RENOVACION_SECONDS``. Un lugar que ya venció no se recrea:
+    otro turno pudo haberlo ocupado.
+    """
+
+    def __init__(self, task_id: str | None):
+        self.task_id = task_id
+        self._renovado = time.monotonic()
+
+    def renovar(self) -> None:
+        if not self.task_id or time.monotonic() - self._renovado < TURNO_RENOVACION_SECONDS:
+            return
+        self._renovado = time.monotonic()
+        if not habilitado():
+            return
+        try:
+            get_redis().zadd(CLAVE_EN_CURSO, {self.task_id: time.time() + TURNO_TTL_SECONDS}, xx=True)
+        except redis.RedisError as exc:
+            logger.warning('Planificador sin Redis: %s', exc)
+
+
+def terminar_turno(task_id: str | None) -> None:
+    """Libera el lugar del turno que terminó y despacha el siguiente."""
+    if not habilitado() or not task_id:
+        return
+    try:
+        get_redis().zrem(CLAVE_EN_CURSO, task_id)
+    except redis.RedisError as exc:
+        logger.warning('Planificador sin Redis: %s', exc)
+        return
+    despachar()
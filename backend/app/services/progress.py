@@ -0,0 +1,142 @@
+"""Publicación de progreso de tareas Celery sobre Redis pub/sub.
+
+Las tareas largas (``procesar_lote``, ``generar_comprobantes_zip_lote``,
+``enviar_emails_lote``) reportan avance con ``ProgressReporter``, que limita
+la frecuencia de escritura: publica cuando pasaron ``PROGRESS_PUBLISH_INTERVAL_MS``
+o avanzaron ``PROGRESS_PUBLISH_EVERY_N`` items, lo que ocurra primero.
+
+Cada publicación actualiza el estado Celery (para el polling de
+``/api/jobs/<id>/status``) y emite el mismo payload en el canal
+``job-progress:<task_id>``, que consume el endpoint SSE ``/api/jobs/<id>/stream``.
+"""
+
+import json
+import logging
+import os
+import time
+
+import redis
+from celery.signals import task_postrun
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = 'job-progress:'
+
+DEFAULT_PUBLISH_INTERVAL_MS = 500
+DEFAULT_PUBLISH_EVERY_N = 25
+
+STREAMED_TASKS = {
+    'app.tasks.facturacion.procesar_lote',
+    'app.tasks.downloads.generar_comprobantes_zip_lote',
+    'app.tasks.email.enviar_emails_lote',
+    'app.tasks.reconciliacion.reconciliar_facturas',
+    'app.tasks.reconciliacion.importar_comprobantes_externos',
+    'app.tasks.receptores.enriquecer_receptores_padron',
+}
+
+_clients: dict[str, redis.Redis] = {}
+
+
+def _config(name: str, default):
+    if has_app_context():
+        return current_app.config.get(name, default)
+    return default
+
+
+def _redis_url() -> str:
+    if has_app_context():
+        return current_app.config['REDIS_URL']
+    return os.environ.get('REDIS_URL', 'redis://localhost:6379/1')
+
+
+def get_redis() -> redis.Redis:
+    """Cliente Redis compartido por proceso (el pool interno es thread-safe)."""
+    url = _redis_url()
+    client = _clients.get(url)
+    if client is None:
+        client = redis.Redis.from_url(url, socket_connect_timeout=2, socket_timeout=5)
+        _clients[url] = client
+    return client
+
+
+def progress_channel(task_id: str) -> str:
+    return f'{CHANNEL_PREFIX}{task_id}'
+
+
+def publish_progress(task_id: str, payload: dict) -> bool:
+    """Publica un evento de progreso. Retorna False si Redis no está disponible."""
+    if not _config('PROGRESS_STREAM_ENABLED', True):
+        return False
+
+    try:
+        get_redis().publish(progress_channel(task_id), json.dumps(payload, separators=(',', ':')))
+        return True
+    except redis.RedisError as exc:
+        logger.warning('No se pudo publicar progreso task_id=%s: %s', task_id, exc)
+        return False
+
+
+def subscribe_progress(task_id: str):
+    """Abre una suscripción al canal de progreso de la tarea.
+
+    Lanza ``redis.RedisError`` si Redis no está disponible.
+    """
+    pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(progress_channel(task_id))
+    return pubsub
+
+
+class ProgressReporter:
+    """Reporta progreso de una tarea con escritura limitada en frecuencia."""
+
+    def __init__(self, task, total: int, interval_ms: int | None = None, every_n: int | None = None):
+        self.task = task
+        self.total = total
+        self.interval = (
+            interval_ms if interval_ms is not None
+            else _config('PROGRESS_PUBLISH_INTERVAL_MS', DEFAULT_PUBLISH_INTERVAL_MS)
+        ) / 1000
+        self.every_n = max(1, every_n if every_n is not None else _config('PROGRESS_PUBLISH_EVERY_N', DEFAULT_PUBLISH_EVERY_N))
+        self._last_emit_at = None
+        self._last_emit_current = 0
+        self._publish_enabled = True
+
+    @property
+    def task_id(self) -> str | None:
+        request = getattr(self.task, 'request', None)
+        return getattr(request, 'id', None)
+
+    def update(self, current: int, force: bool = False, **extra) -> bool:
+        """Registra el avance. Retorna True si efectivamente se emitió."""
+        now = time.monotonic()
+        if not force and current < self.total and self._last_emit_at is not None:
+            elapsed = now - self._last_emit_at
+            advanced = current - self._last_emit_current
+            if elapsed < self.interval and advanced < self.every_n:
+                return False
+
+        meta = {
+            'current': current,
+            'total': self.total,
+            'percent': int((current / self.total) * 100) if self.total else 100,
+            **extra,
+        }
+        self.task.update_state(state='PROGRESS', meta=meta)
+
+        task_id = self.task_id
+        if task_id and self._publish_enabled:
+            # Si Redis falla una vez, no insistir en cada item: queda el polling.
+            self._publish_enabled = publish_progress(task_id, {'status': 'PROGRESS', 'progress': meta})
+
+        self._last_emit_at = now
+        self._last_emit_current = current
+        return True
+
+
+@task_postrun.connect
+def _publish_task_finished(sender=None, task_id=None, state=None, **_kwargs):
+    """Avisa a los streams abiertos que la tarea terminó (el resultado ya está guardado)."""
+    if not task_id or getattr(sender, 'name', None) not in STREAMED_TASKS:
+        return
+    publish_progress(task_id, {'status': state, 'finished': True})
@@ -0,0 +1,60 @@
+"""Reintentos diferidos de facturas en ``procesar_lote``.
+
+Un error transitorio no se espera con ``sleep`` dentro del worker: la factura
+queda ``pendiente`` con ``reintentos`` y ``proximo_reintento``, y al terminar
+la pasada el lote se vuelve a encolar (``countdown``) para cuando venza el
+primer reintento. Mientras tanto el worker atiende otros lotes.
+
+Backoff exponencial con jitter por clase de error:
+
+- ``wsaa_ta``: WSAA responde "ya posee un TA válido" (otro proceso tiene el ticket).
+- ``secuencia``: 10016 / número o fecha fuera de secuencia.
+- ``red``: timeouts y errores de conexión con ARCA.
+
+Agotados ``FACTURACION_REINTENTOS_MAX`` intentos, la factura queda en error
+como antes.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+# clase -> (demora base, demora máxima) en segundos
+CLASES = {
+    'wsaa_ta': (5, 120),
+    'secuencia': (1, 30),
+    'red': (10, 300),
+}
+
+DEFAULT_REINTENTOS_MAX = 5
+
+
+def demora(clase: str, intento: int, aleatorio=random.random) -> float:
+    """Segundos hasta el reintento ``intento`` (1, 2, ...).
+
+    Mitad fija y mitad aleatoria del backoff, para que las facturas de
+    varios lotes que fallaron juntas no vuelvan todas en el mismo instante.
+    """
+    base, tope = CLASES[clase]
+    maximo = min(tope, base * 2 ** max(0, intento - 1))
+    return maximo / 2 + aleatorio() * maximo / 2
+
+
+def programar_reintento(factura, clase: str, result: dict, ahora: datetime | None = None) -> bool:
+    """Deja la factura pendiente con su próximo reintento.
+
+    Devuelve False si ya agotó los intentos (el llamador la marca en error).
+    """
+    maximo = int(current_app.config.get('FACTURACION_REINTENTOS_MAX', DEFAULT_REINTENTOS_MAX))
+    intento = (factura.reintentos or 0) + 1
+    if intento > maximo:
+        return False
+
+    ahora = ahora or datetime.utcnow()
+    factura.estado = 'pendiente'
+    factura.reintentos = intento
+    factura.proximo_reintento = ahora + timedelta(seconds=demora(clase, intento))
+    factura.error_codigo = result.get('error_code')
+    factura.error_mensaje = result.get('error_message')
+    return True
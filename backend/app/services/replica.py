@@ -0,0 +1,143 @@
+"""Lecturas en la réplica de PostgreSQL (``DATABASE_REPLICA_URL``).
+
+Con la réplica configurada existe el bind ``replica`` en ``SQLALCHEMY_BINDS``.
+Los handlers marcados con ``@solo_lectura`` y las tareas de reportes que
+abren ``leer_de_replica()`` mandan sus SELECT ahí (``RoutingSession``); el
+resto de las consultas, y todas las escrituras, van a la primaria.
+
+Read-your-writes: cada commit con escrituras hecho dentro de un request
+autenticado guarda en Redis la posición del WAL de la primaria para ese
+usuario durante ``DATABASE_REPLICA_LECTURA_PROPIA_SEGUNDOS``. Mientras la
+marca exista, sus lecturas usan la réplica sólo si ya reprodujo esa
+posición. Sin Redis, o sin forma de comparar posiciones, se lee de la
+primaria.
+"""
+
+import logging
+from contextlib import contextmanager
+from functools import wraps
+
+import redis
+from flask import current_app, g, has_request_context
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..extensions import BIND_REPLICA, RoutingSession, db, lecturas_en_replica
+from .progress import get_redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_PREFIX = 'replica:escritura:'
+
+
+def replica_configurada() -> bool:
+    return BIND_REPLICA in (current_app.config.get('SQLALCHEMY_BINDS') or {})
+
+
+def posicion_primaria() -> str | None:
+    """Posición actual del WAL de la primaria (``None`` fuera de PostgreSQL)."""
+    engine = db.engines[None]
+    if engine.dialect.name != 'postgresql':
+        return None
+    with engine.connect() as conn:
+        return conn.execute(text('SELECT pg_current_wal_lsn()::text')).scalar()
+
+
+def replica_alcanzo(posicion: str | None) -> bool:
+    """True si la réplica ya reprodujo ``posicion`` del WAL de la primaria."""
+    engine = db.engines[BIND_REPLICA]
+    if not posicion or engine.dialect.name != 'postgresql':
+        return False
+    try:
+        with engine.connect() as conn:
+            return bool(conn.execute(
+                text('SELECT pg_last_wal_replay_lsn() >= CAST(:posicion AS pg_lsn)'),
+                {'posicion': posicion},
+            ).scalar())
+    except SQLAlchemyError as exc:  # Réplica caída: se sigue con la primaria.
+        logger.warning('No se pudo consultar la réplica: %s', exc)
+        return False
+
+
+@contextmanager
+def leer_de_replica(posicion_minima: str | None = None):
+    """Manda a la réplica los SELECT del bloque.
+
+    Con ``posicion_minima`` (ver ``posicion_primaria``) sólo si la réplica ya
+    la alcanzó. Devuelve si efectivamente se usa la réplica.
+    """
+    usar = replica_configurada() and (posicion_minima is None or replica_alcanzo(posicion_minima))
+    db.session.info.pop('escrituras', None)
+    token = lecturas_en_replica.set(usar)
+    try:
+        yield usar
+    finally:
+        lecturas_en_replica.reset(token)
+        db.session.info.pop('escrituras', None)
+
+
+def _clave_usuario(user_id) -> str:
+    return f'{REDIS_PREFIX}{user_id}'
+
+
+def _posicion_pendiente() -> str | None:
+    """Posición que la réplica debe alcanzar para el usuario del request.
+
+    ``None`` si no escribió nada reciente; ``''`` si no se puede saber.
+    """
+    usuario = g.get('current_user')
+    if usuario is None:
+        return None
+    try:
+        marca = get_redis().get(_clave_usuario(usuario.id))
+    except redis.RedisError as exc:
+        logger.debug('Read-your-writes sin Redis: %s', exc)
+        return ''
+    if marca is None:
+        return None
+    return marca.decode() if isinstance(marca, bytes) else marca
+
+
+def solo_lectura(f):
+    """Handler de sólo lectura: sus SELECT pueden ir a la réplica.
+
+    Va debajo de ``@permission_required`` para que el usuario se cargue de
+    la primaria y ya esté en ``g`` al revisar sus escrituras recientes.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not replica_configurada():
+            return f(*args, **kwargs)
+        with leer_de_replica(_posicion_pendiente()):
+            return f(*args, **kwargs)
+
+    return decorated_function
+
+
+def _registrar_escritura():
+    usuario = g.get('current_user')
+    if usuario is None:
+        return
+    ttl = current_app.config.get('DATABASE_REPLICA_LECTURA_PROPIA_SEGUNDOS', 30)
+    try:
+        posicion = posicion_primaria() or ''
+        get_redis().setex(_clave_usuario(usuario.id), ttl, posicion)
+    except (redis.RedisError, SQLAlchemyError) as exc:
+        logger.warning('No se pudo marcar la escritura de %s: %s', usuario.id, exc)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _despues_de_flush(session, flush_context):
+    session.info['escrituras'] = True
+    session.info['marcar_escritura'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _despues_de_commit(session):
+    if session.info.pop('marcar_escritura', False) and has_request_context() and replica_configurada():
+        _registrar_escritura()
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _despues_de_rollback(session):
+    session.info.pop('marcar_escritura', None)
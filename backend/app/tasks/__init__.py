@@ -1,5 +1,26 @@
 from .facturacion import procesar_lote
 from .email import enviar_factura_email
-from .downloads import generar_comprobantes_zip_lote
+from .downloads import generar_comprobantes_zip_lote, limpiar_descargas_vencidas
+from .reconciliacion import reconciliar_facturas, importar_comprobantes_externos
+from .caea import barrer_informes_caea, informar_caea
+from .receptores import enriquecer_receptores_padron
+from .historial_arca import archivar_historial_arca
+from .particiones import crear_particiones_factura
+from .circuito_arca import reanudar_lotes_pausados
+from .planificador import despachar_turnos
 
-__all__ = ['procesar_lote', 'enviar_factura_email', 'generar_comprobantes_zip_lote']
+__all__ = [
+    'procesar_lote',
+    'enviar_factura_email',
+    'generar_comprobantes_zip_lote',
+    'limpiar_descargas_vencidas',
+    'reconciliar_facturas',
+    'importar_comprobantes_externos',
+    'informar_caea',
+    'barrer_informes_caea',
+    'enriquecer_receptores_padron',
+    'archivar_historial_arca',
+    'crear_particiones_factura',
+    'reanudar_lotes_pausados',
+    'despachar_turnos',
+]
@@ -0,0 +1,272 @@
+import logging
+from datetime import date, datetime, timedelta
+
+import redis
+from arca_integration.exceptions import ArcaError
+from celery import shared_task
+from flask import current_app
+
+from ..extensions import db
+from ..models import Caea, Factura, FacturaCaeaInforme, Facturador
+from ..services.encryption import get_facturador_credentials
+from ..services.progress import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Un informe en 'enviando' más allá de este plazo se considera interrumpido.
+ENVIANDO_TIMEOUT = timedelta(minutes=10)
+# Una sola ejecución de informar_caea por facturador; el lock vence por si el worker muere.
+LOCK_INFORME_SECONDS = 15 * 60
+
+
+def _filtro_a_enviar(ahora: datetime):
+    """Informes pendientes ya vencidos o en 'enviando' de una ejecución interrumpida."""
+    return db.or_(
+        db.and_(
+            FacturaCaeaInforme.estado == 'pendiente',
+            db.or_(
+                FacturaCaeaInforme.proximo_intento_at.is_(None),
+                FacturaCaeaInforme.proximo_intento_at <= ahora,
+            ),
+        ),
+        db.and_(
+            FacturaCaeaInforme.estado == 'enviando',
+            FacturaCaeaInforme.updated_at < ahora - ENVIANDO_TIMEOUT,
+        ),
+    )
+
+
+def _informes_a_enviar(facturador_id, ahora: datetime) -> list[FacturaCaeaInforme]:
+    query = FacturaCaeaInforme.query.join(
+        Factura, Factura.id == FacturaCaeaInforme.factura_id
+    ).join(
+        Caea, Caea.id == FacturaCaeaInforme.caea_id
+    ).filter(
+        FacturaCaeaInforme.facturador_id == facturador_id,
+        _filtro_a_enviar(ahora),
+    ).order_by(
+        # Primero los CAEA más cerca de su fecha tope de informe.
+        Caea.fch_tope_inf.is_(None),
+        Caea.fch_tope_inf.asc(),
+        FacturaCaeaInforme.caea_id.asc(),
+        Factura.punto_venta.asc(),
+        Factura.tipo_comprobante.asc(),
+        Factura.numero_comprobante.asc(),
+    )
+    # Dos ejecuciones simultáneas no deben tomar los mismos comprobantes.
+    return query.with_for_update(skip_locked=True, of=FacturaCaeaInforme).all()
+
+
+def _detalle_informe(factura: Factura) -> dict | None:
+    try:
+        return factura.arca_request['FeCAEReq']['FeDetReq']['FECAEDetRequest'][0]
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def _reprogramar(informe: FacturaCaeaInforme, mensaje: str, ahora: datetime) -> str:
+    """Vuelve el informe a 'pendiente' con backoff exponencial, o a 'error' si se agotaron los intentos."""
+    informe.ultimo_error = mensaje
+    if informe.intentos >= current_app.config.get('CAEA_INFORME_MAX_INTENTOS', 8):
+        informe.estado = 'error'
+        informe.proximo_intento_at = None
+        return 'error'
+
+    backoff = current_app.config.get('CAEA_INFORME_BACKOFF_SECONDS', 60)
+    informe.estado = 'pendiente'
+    informe.proximo_intento_at = ahora + timedelta(seconds=backoff * 2 ** max(informe.intentos - 1, 0))
+    return 'reprogramado'
+
+
+@shared_task(bind=True)
+def informar_caea(self, facturador_id: str, tenant_id: str):
+    """
+    Informa a ARCA (FECAEARegInformativo) los comprobantes emitidos con CAEA.
+
+    Envía bloques por CAEA/punto de venta/tipo, empezando por el CAEA con la
+    fecha tope de informe más próxima. Cada informe pasa por
+    'pendiente' -> 'enviando' -> 'informado' | 'rechazado'; las fallas
+    transitorias se reprograman con backoff y las retoma ``barrer_informes_caea``.
+    Si ya hay una ejecución para el facturador, esta termina sin hacer nada.
+    """
+    facturador = Facturador.query.filter_by(id=facturador_id, tenant_id=tenant_id).first()
+    if not facturador:
+        return {'error': 'Facturador no encontrado'}
+
+    lock = None
+    try:
+        lock = get_redis().lock(f'caea:informe:{facturador.id}', timeout=LOCK_INFORME_SECONDS)
+        if not lock.acquire(blocking=False):
+            return {'status': 'en_curso', 'processed': 0, 'total': 0}
+    except redis.RedisError as exc:
+        # Sin Redis se sigue: el SKIP LOCKED evita enviar dos veces un mismo informe.
+        logger.warning('Informe CAEA del facturador %s sin lock: %s', facturador.id, exc)
+        lock = None
+
+    try:
+        return _informar(facturador)
+    finally:
+        if lock is not None:
+            try:
+                lock.release()
+            except redis.RedisError:
+                logger.debug('No se pudo liberar el lock del informe CAEA %s', facturador.id, exc_info=True)
+
+
+def _informar(facturador: Facturador) -> dict:
+    from arca_integration import ArcaClient
+    from arca_integration.builders import build_caea_informe
+    from arca_integration.services import WSFEService
+
+    ahora = datetime.utcnow()
+    informes = _informes_a_enviar(facturador.id, ahora)
+    total = len(informes)
+    contadores = {'informado': 0, 'rechazado': 0, 'reprogramado': 0, 'error': 0}
+
+    if informes:
+        # Tomar los comprobantes antes de llamar a ARCA.
+        for informe in informes:
+            informe.estado = 'enviando'
+            informe.intentos += 1
+        db.session.commit()
+
+        batch_size = max(1, current_app.config.get('CAEA_INFORME_BATCH_SIZE', 50))
+        bloques = {}
+        for informe in informes:
+            factura = informe.factura
+            key = (informe.caea_id, factura.punto_venta, factura.tipo_comprobante)
+            bloques.setdefault(key, []).append(informe)
+
+        try:
+            cert, key = get_facturador_credentials(facturador)
+            client = ArcaClient(cuit=facturador.cuit, cert=cert, key=key, ambiente=facturador.ambiente)
+            wsfe = WSFEService(client)
+        except (ArcaError, ConnectionError, TimeoutError, OSError, RuntimeError, ValueError) as e:
+            for informe in informes:
+                contadores[_reprogramar(informe, f'Error de conexión con ARCA: {str(e)}', ahora)] += 1
+            db.session.commit()
+            bloques = {}
+
+        for (_caea_id, punto_venta, tipo_cbte), grupo in bloques.items():
+            for start in range(0, len(grupo), batch_size):
+                chunk = grupo[start:start + batch_size]
+
+                enviables = []
+                for informe in chunk:
+                    if _detalle_informe(informe.factura) is None:
+                        informe.estado = 'error'
+                        informe.ultimo_error = 'La factura no tiene el request del comprobante registrado'
+                        contadores['error'] += 1
+                    else:
+                        enviables.append(informe)
+                if not enviables:
+                    db.session.commit()
+                    continue
+
+                try:
+                    result = wsfe.informar_caea(build_caea_informe(
+                        punto_venta=punto_venta,
+                        tipo_cbte=tipo_cbte,
+                        caea=enviables[0].caea.codigo,
+                        det_requests=[_detalle_informe(informe.factura) for informe in enviables],
+                    ))
+                except (ArcaError, ConnectionError, TimeoutError, OSError, RuntimeError, ValueError) as e:
+                    logger.warning('Falló el informe CAEA del facturador %s: %s', facturador.id, e)
+                    result = {'success': False, 'error_message': str(e)}
+
+                momento = datetime.utcnow()
+                for informe in enviables:
+                    detalle = result.get('resultados', {}).get(int(informe.factura.numero_comprobante))
+                    if not result.get('success') or detalle is None:
+                        mensaje = result.get('error_message') or 'ARCA no devolvió resultado para el comprobante'
+                        contadores[_reprogramar(informe, mensaje, momento)] += 1
+                    elif detalle['aprobado']:
+                        informe.estado = 'informado'
+                        informe.informado_at = momento
+                        informe.ultimo_error = None
+                        contadores['informado'] += 1
+                    else:
+                        informe.estado = 'rechazado'
+                        informe.ultimo_error = detalle.get('mensaje') or 'Comprobante rechazado por ARCA'
+                        contadores['rechazado'] += 1
+                db.session.commit()
+
+    return {
+        'status': 'completed',
+        'processed': total,
+        'total': total,
+        'informados': contadores['informado'],
+        'rechazados': contadores['rechazado'],
+        'reprogramados': contadores['reprogramado'],
+        'errores': contadores['error'],
+    }
+
+
+@shared_task
+def barrer_informes_caea():
+    """
+    Encola ``informar_caea`` para los facturadores con informes a enviar
+    (pendientes vencidos o 'enviando' interrumpidos), primero los de fecha
+    tope de informe más próxima.
+
+    Avisa en el log de los informes que agotaron CAEA_INFORME_MAX_INTENTOS y
+    de los que siguen sin informar a CAEA_INFORME_AVISO_DIAS o menos de su
+    ``fch_tope_inf``.
+    """
+    ahora = datetime.utcnow()
+    a_enviar = db.session.query(
+        FacturaCaeaInforme.facturador_id,
+        FacturaCaeaInforme.tenant_id,
+        db.func.min(Caea.fch_tope_inf).label('tope'),
+    ).join(
+        Caea, Caea.id == FacturaCaeaInforme.caea_id
+    ).filter(
+        _filtro_a_enviar(ahora),
+    ).group_by(
+        FacturaCaeaInforme.facturador_id,
+        FacturaCaeaInforme.tenant_id,
+    ).all()
+
+    a_enviar.sort(key=lambda fila: (fila.tope is None, fila.tope or date.max))
+    for fila in a_enviar:
+        informar_caea.delay(str(fila.facturador_id), str(fila.tenant_id))
+
+    en_error = db.session.query(
+        FacturaCaeaInforme.facturador_id,
+        db.func.count(),
+    ).filter(
+        FacturaCaeaInforme.estado == 'error',
+    ).group_by(FacturaCaeaInforme.facturador_id).all()
+    for facturador_id, cantidad in en_error:
+        logger.error(
+            'CAEA: %s informes del facturador %s en error tras agotar los reintentos; requieren revisión',
+            cantidad, facturador_id,
+        )
+
+    aviso = date.today() + timedelta(days=int(current_app.config.get('CAEA_INFORME_AVISO_DIAS', 2)))
+    por_vencer = db.session.query(
+        FacturaCaeaInforme.facturador_id,
+        Caea.codigo,
+        Caea.fch_tope_inf,
+        db.func.count(),
+    ).join(
+        Caea, Caea.id == FacturaCaeaInforme.caea_id
+    ).filter(
+        FacturaCaeaInforme.estado.in_(('pendiente', 'enviando', 'error')),
+        Caea.fch_tope_inf <= aviso,
+    ).group_by(
+        FacturaCaeaInforme.facturador_id,
+        Caea.codigo,
+        Caea.fch_tope_inf,
+    ).all()
+    for facturador_id, codigo, tope, cantidad in por_vencer:
+        logger.error(
+            'CAEA %s del facturador %s: %s informes sin enviar con fecha tope %s',
+            codigo, facturador_id, cantidad, tope.isoformat(),
+        )
+
+    return {
+        'encolados': [str(fila.facturador_id) for fila in a_enviar],
+        'en_error': sum(cantidad for _, cantidad in en_error),
+        'por_vencer': sum(cantidad for *_, cantidad in por_vencer),
+    }
@@ -0,0 +1,72 @@
+import logging
+
+from celery import shared_task
+
+from ..extensions import db
+from ..models import Lote
+from ..services.circuito_arca import (
+    ABIERTO,
+    CERRADO,
+    SEMIABIERTO,
+    estado,
+    permitir,
+    registrar_sondeo,
+    separar_circuito,
+    sondear_url,
+    url_sondeo,
+)
+from ..services.planificador import encolar_lote
+
+logger = logging.getLogger(__name__)
+
+
+def _circuito_cerrado(circuito: str) -> bool:
+    """Estado del circuito, sondeando el WSDL si está semiabierto."""
+    servicio, ambiente = separar_circuito(circuito)
+    actual = estado(servicio, ambiente)
+    if actual == ABIERTO:
+        return False
+    if actual == SEMIABIERTO:
+        url = url_sondeo(servicio, ambiente)
+        # Otro llamador ya tiene la prueba: se verá en el próximo sondeo.
+        if url is None or not permitir(servicio, ambiente):
+            return False
+        registrar_sondeo(servicio, ambiente, sondear_url(url))
+        actual = estado(servicio, ambiente)
+    return actual == CERRADO
+
+
+@shared_task
+def reanudar_lotes_pausados():
+    """Re-encola los lotes pausados por un circuito de ARCA que ya se cerró."""
+    circuitos = [
+        fila[0] for fila in db.session.query(Lote.pausado_por).filter(
+            Lote.estado == 'pausado',
+            Lote.pausado_por.isnot(None),
+        ).distinct()
+    ]
+
+    reanudados = []
+    for circuito in circuitos:
+        if not _circuito_cerrado(circuito):
+            continue
+
+        lotes = [fila[0] for fila in db.session.query(Lote.id).filter(
+            Lote.estado == 'pausado',
+            Lote.pausado_por == circuito,
+        )]
+        for lote_id in lotes:
+            # Condicional: un "facturar" manual puede haberlo reanudado antes.
+            tomado = Lote.query.filter_by(id=lote_id, estado='pausado').update(
+                {Lote.estado: 'procesando', Lote.pausado_por: None},
+                synchronize_session=False,
+            )
+            db.session.commit()
+            if not tomado:
+                continue
+            encolar_lote(db.session.get(Lote, lote_id))
+            reanudados.append(str(lote_id))
+
+        logger.info('Circuito ARCA %s cerrado: %s lotes reanudados', circuito, len(lotes))
+
+    return {'reanudados': reanudados}
@@ -1,78 +1,127 @@
-import io
 import logging
 import zipfile
+from datetime import datetime, timedelta
 
 from celery import shared_task
+from flask import current_app
 
 from ..extensions import db
 from ..models import DownloadArtifact, Factura, Lote
+from ..services.almacenamiento import AlmacenError, get_almacen
 from ..services.comprobante_filename import build_comprobante_pdf_filename
+from ..services.progress import ProgressReporter
+from ..services.replica import leer_de_replica
 
 logger = logging.getLogger(__name__)
 
 
 @shared_task(bind=True)
-def generar_comprobantes_zip_lote(self, lote_id: str, tenant_id: str):
-    lote = Lote.query.filter_by(id=lote_id, tenant_id=tenant_id).first()
-    zip_filename = _build_zip_filename(lote)
-
-    facturas = Factura.query.filter(
-        Factura.tenant_id == tenant_id,
-        Factura.lote_id == lote_id,
-        Factura.estado == 'autorizado',
-    ).order_by(Factura.created_at.asc()).all()
-
-    total = len(facturas)
-    if total == 0:
+def generar_comprobantes_zip_lote(self, lote_id: str, tenant_id: str, posicion_replica: str | None = None):
+    # Las lecturas van a la réplica si ya alcanzó la posición de la primaria
+    # al encolar; el DownloadArtifact se escribe en la primaria.
+    with leer_de_replica(posicion_replica):
+        lote = Lote.query.filter_by(id=lote_id, tenant_id=tenant_id).first()
+        zip_filename = _build_zip_filename(lote)
+
+        facturas = Factura.query.filter(
+            Factura.tenant_id == tenant_id,
+            Factura.lote_id == lote_id,
+            Factura.estado == 'autorizado',
+        ).order_by(Factura.created_at.asc()).all()
+
+        total = len(facturas)
+        if total == 0:
+            return {
+                'status': 'completed',
+                'processed': 0,
+                'total': 0,
+                'filename': zip_filename,
+                'download_ready': False,
+            }
+
+        from ..services.comprobante_pdf import html_to_pdf_bytes
+        from ..services.comprobante_renderer import render_comprobante_html
+
+        used_names = set()
+        processed = 0
+        progress = ProgressReporter(self, total)
+
+        # El ZIP se escribe directo al almacenamiento, sin armarlo entero en memoria.
+        almacen = get_almacen()
+        storage_key = f'{tenant_id}/{self.request.id}.zip'
+        destino = almacen.abrir_escritura(storage_key)
+        try:
+            with zipfile.ZipFile(destino, mode='w', compression=zipfile.ZIP_DEFLATED) as zip_file:
+                for factura in facturas:
+                    html = render_comprobante_html(factura)
+                    pdf_bytes = html_to_pdf_bytes(html)
+                    filename = _unique_name(build_comprobante_pdf_filename(factura), used_names)
+                    zip_file.writestr(filename, pdf_bytes)
+
+                    processed += 1
+                    progress.update(processed)
+            destino.close()
+        except Exception:
+            destino.abortar()
+            raise
+
+        ttl = current_app.config.get('DOWNLOADS_TTL_SECONDS', 86400)
+        artifact = DownloadArtifact(
+            tenant_id=tenant_id,
+            task_id=self.request.id,
+            filename=zip_filename,
+            mime_type='application/zip',
+            storage_backend=almacen.nombre,
+            storage_key=storage_key,
+            size_bytes=destino.bytes_escritos,
+            expires_at=datetime.utcnow() + timedelta(seconds=ttl) if ttl else None,
+        )
+        db.session.add(artifact)
+        db.session.commit()
+
+        logger.info('ZIP de comprobantes generado task_id=%s lote=%s total=%s', self.request.id, lote_id, total)
+
         return {
             'status': 'completed',
-            'processed': 0,
-            'total': 0,
+            'processed': processed,
+            'total': total,
             'filename': zip_filename,
-            'download_ready': False,
+            'download_ready': True,
         }
 
-    from ..services.comprobante_pdf import html_to_pdf_bytes
-    from ..services.comprobante_renderer import render_comprobante_html
-
-    zip_buffer = io.BytesIO()
-    used_names = set()
-    processed = 0
-
-    with zipfile.ZipFile(zip_buffer, mode='w', compression=zipfile.ZIP_DEFLATED) as zip_file:
-        for factura in facturas:
-            html = render_comprobante_html(factura)
-            pdf_bytes = html_to_pdf_bytes(html)
-            filename = _unique_name(build_comprobante_pdf_filename(factura), used_names)
-            zip_file.writestr(filename, pdf_bytes)
-
-            processed += 1
-            self.update_state(state='PROGRESS', meta={
-                'current': processed,
-                'total': total,
-                'percent': int((processed / total) * 100),
-            })
-
-    zip_bytes = zip_buffer.getvalue()
-    artifact = DownloadArtifact(
-        tenant_id=tenant_id,
-        task_id=self.request.id,
-        filename=zip_filename,
-        mime_type='application/zip',
-        file_data=zip_bytes,
-    )
-    db.session.add(artifact)
-    db.session.commit()
 
-    logger.info('ZIP de comprobantes generado task_id=%s lote=%s total=%s', self.request.id, lote_id, total)
+@shared_task
+def limpiar_descargas_vencidas(limite: int = 500):
+    """Borra archivos y registros de descargas vencidas (``DOWNLOADS_TTL_SECONDS``)."""
+    ahora = datetime.utcnow()
+    ttl = current_app.config.get('DOWNLOADS_TTL_SECONDS', 86400)
+    condiciones = [DownloadArtifact.expires_at < ahora]
+    if ttl:
+        # Registros previos a expires_at (o con el ZIP en la base).
+        condiciones.append(db.and_(
+            DownloadArtifact.expires_at.is_(None),
+            DownloadArtifact.created_at < ahora - timedelta(seconds=ttl),
+        ))
+
+    vencidos = DownloadArtifact.query.filter(db.or_(*condiciones)).limit(limite).all()
+    if not vencidos:
+        return {'eliminados': 0}
+
+    almacen = get_almacen()
+    eliminados = 0
+    for artifact in vencidos:
+        if artifact.storage_key:
+            try:
+                almacen.eliminar(artifact.storage_key)
+            except (AlmacenError, OSError) as exc:
+                logger.warning('No se pudo borrar %s del almacenamiento: %s', artifact.storage_key, exc)
+                continue
+        db.session.delete(artifact)
+        eliminados += 1
+    db.session.commit()
 
-    return {
-        'status': 'completed',
-        'processed': processed,
-        'total': total,
-        'filename': zip_filename,
-        'download_ready': True,
-    }
+    logger.info('Descargas vencidas eliminadas: %s', eliminados)
+    return {'eliminados': eliminados}
 
 
 def _build_zip_filename(lote) -> str:
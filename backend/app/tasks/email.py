@@ -1,9 +1,10 @@
 import logging
 import smtplib
-from datetime import datetime
+from datetime import date, datetime
 from celery import shared_task
 from ..extensions import db
 from ..models import Factura, EmailConfig
+from ..services.progress import ProgressReporter
 
 logger = logging.getLogger(__name__)
 
@@ -13,9 +14,16 @@ EMAIL_SEND_DELAY_SECONDS = 3
 @shared_task(bind=True, max_retries=2, default_retry_delay=30)
 def enviar_factura_email(self, factura_id: str, tenant_id: str,
                          custom_asunto=None, custom_body=None,
-                         destinatarios=None, use_factura_overrides=False):
-    """Envía el comprobante PDF por email al receptor de forma async."""
-    factura = Factura.query.filter_by(id=factura_id, tenant_id=tenant_id).first()
+                         destinatarios=None, use_factura_overrides=False, fecha_emision=None):
+    """Envía el comprobante PDF por email al receptor de forma async.
+
+    ``fecha_emision`` (ISO) es opcional: con ella la búsqueda va directo a la
+    partición de la factura.
+    """
+    query = Factura.query.filter_by(id=factura_id, tenant_id=tenant_id)
+    if fecha_emision:
+        query = query.filter_by(fecha_emision=date.fromisoformat(fecha_emision))
+    factura = query.first()
     if not factura:
         logger.error(f'Factura {factura_id} no encontrada para envío de email')
         return {'error': 'Factura no encontrada'}
@@ -97,16 +105,19 @@ def enviar_emails_lote(self, lote_id: str, tenant_id: str, mode: str = 'no_envia
             'skipped': 0,
         }
 
-    for factura in facturas:
+    progress = ProgressReporter(self, total)
+
+    for index, factura in enumerate(facturas, start=1):
         if not factura.receptor or not factura.receptor.email:
             skipped += 1
-            continue
-
-        enviar_factura_email.apply_async(
-            args=[str(factura.id), str(factura.tenant_id)],
-            countdown=dispatched * EMAIL_SEND_DELAY_SECONDS,
-        )
-        dispatched += 1
+        else:
+            enviar_factura_email.apply_async(
+                args=[str(factura.id), str(factura.tenant_id)],
+                countdown=dispatched * EMAIL_SEND_DELAY_SECONDS,
+            )
+            dispatched += 1
+
+        progress.update(index)
 
     return {
         'status': 'completed',
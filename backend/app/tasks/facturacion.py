@@ -3,13 +3,16 @@ import json
 import os
 from datetime import datetime, date
 from contextlib import suppress
+from time import monotonic
 from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
-from time import sleep
 from uuid import UUID
 
 from arca_integration.constants import ALICUOTAS_IVA, CONDICIONES_IVA, TIPO_CBTE_CLASE
 from arca_integration.exceptions import ArcaAuthError, ArcaError, ArcaNetworkError, ArcaValidationError
 from celery import shared_task
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import selectinload
 
 from ..extensions import db
 from ..models import Lote, Factura, Facturador
@@ -18,7 +21,31 @@ from ..services.comprobante_rules import (
     es_comprobante_tipo_b,
     normalizar_importes_para_tipo_c,
 )
-from ..services.encryption import decrypt_certificate
+from ..services.autorizaciones import (
+    aplicar_autorizaciones_pendientes,
+    descartar_emision_en_curso,
+    reconciliar_emisiones_en_curso,
+    registrar_autorizacion,
+    registrar_emision_en_curso,
+)
+from ..services.caea import NumeradorCaea, encolar_informe, obtener_caea_vigente
+from ..services.circuito_arca import circuito_abierto
+from ..services.encryption import get_facturador_credentials
+from ..services.historial_arca import registrar_intercambio
+from ..services.metricas import LOTE_DURACION_SEGUNDOS, registrar_facturas
+from ..services.padron import (
+    cambios_padron_receptor,
+    condicion_iva_id_desde_nombre,
+    consultar_padron_cacheado,
+    normalizar_cuit,
+    prefetch_padron,
+)
+from ..services.parametros_arca import obtener_cotizacion, punto_venta_habilitado
+from ..services.perfil_lote import PerfilLote, perfil_activo
+from ..services.planificador import LugarTurno, encolar_lote, facturas_por_turno, terminar_turno
+from ..services.progress import ProgressReporter
+from ..services.reintentos import programar_reintento
+from .caea import informar_caea
 from .email import EMAIL_SEND_DELAY_SECONDS
 
 logger = logging.getLogger(__name__)
@@ -45,12 +72,106 @@ def _log_facturacion_trace(event: str, **fields):
     logger.info('FACTURACION_TRACE %s', json.dumps(_to_json_safe(payload), ensure_ascii=False, separators=(',', ':')))
 
 
+class _CommitBatcher:
+    """Agrupa los commits de facturas procesadas en tandas.
+
+    Commitea cada ``batch_size`` facturas o cada ``interval_seconds``, lo que
+    ocurra primero. El CAE ya quedó en el journal antes de llegar acá, así que
+    una tanda perdida se recupera con ``aplicar_autorizaciones_pendientes``.
+
+    Los emails se encolan recién después del commit: la tarea de envío lee la
+    factura de la base y necesita verla autorizada.
+    """
+
+    def __init__(self, batch_size: int, interval_seconds: float):
+        self.batch_size = max(1, int(batch_size))
+        self.interval_seconds = max(0.0, float(interval_seconds))
+        self.pending = 0
+        self._opened_at = None
+        self._emails = []
+        self._locked_facturadores = {}
+
+    def add(self) -> None:
+        if self._opened_at is None:
+            self._opened_at = monotonic()
+        self.pending += 1
+        if self.pending >= self.batch_size or monotonic() - self._opened_at >= self.interval_seconds:
+            self.flush()
+
+    def defer_email(self, args: list, kwargs: dict, countdown: int) -> None:
+        self._emails.append((args, kwargs, countdown))
+
+    def lock_facturador(self, tenant_id, facturador_id):
+        """Bloquea la secuencia del facturador una sola vez por transacción."""
+        locked = self._locked_facturadores.get(facturador_id)
+        if locked is None:
+            locked = _lock_facturador_sequence(tenant_id=tenant_id, facturador_id=facturador_id)
+            if locked is not None:
+                self._locked_facturadores[facturador_id] = locked
+        return locked
+
+    def flush(self) -> None:
+        perfil = perfil_activo()
+        started = monotonic()
+        db.session.commit()
+        if perfil is not None:
+            perfil.registrar('db_commit', monotonic() - started)
+        emails, self._emails = self._emails, []
+        self.pending = 0
+        self._opened_at = None
+        self._locked_facturadores = {}
+
+        if emails:
+            from .email import enviar_factura_email
+            for args, kwargs, countdown in emails:
+                enviar_factura_email.apply_async(args=args, kwargs=kwargs, countdown=countdown)
+
+
+def _marcar_facturas_error(facturas: list[Factura], error_mensaje: str, error_codigo: str | None = None) -> int:
+    """Marca en un único UPDATE las facturas todavía pendientes del grupo."""
+    pendientes = [factura for factura in facturas if factura.estado == 'pendiente']
+    if not pendientes:
+        return 0
+    ids = [factura.id for factura in pendientes]
+    # La clave de partición deja el UPDATE en las particiones de esas fechas.
+    fechas = {factura.fecha_emision for factura in pendientes}
+
+    values = {Factura.estado: 'error', Factura.error_mensaje: error_mensaje}
+    if error_codigo is not None:
+        values[Factura.error_codigo] = error_codigo
+
+    Factura.query.filter(
+        Factura.id.in_(ids),
+        Factura.fecha_emision.in_(fechas),
+    ).update(values, synchronize_session=False)
+    for factura in facturas:
+        if factura.id in ids:
+            db.session.expire(factura)
+    registrar_facturas('error', len(ids))
+    return len(ids)
+
+
 @shared_task(bind=True)
-def procesar_lote(self, lote_id: str, tenant_id: str):
+def procesar_lote(self, lote_id: str, tenant_id: str, reintento: bool = False):
     """
-    Procesa todas las facturas pendientes de un lote.
+    Procesa las facturas pendientes de un lote.
     Actualiza el progreso en Celery para polling desde el frontend.
+
+    Cada ejecución emite a lo sumo ``FACTURACION_FACTURAS_POR_TURNO``
+    facturas; el resto sale en otro turno del planificador (ver
+    services/planificador.py). Las facturas con un reintento programado para
+    más adelante se saltean; si quedan, el lote se vuelve a encolar para
+    entonces. Los turnos siguientes y los reintentos llegan con
+    ``reintento=True``.
     """
+    try:
+        return _procesar_lote(self, lote_id, tenant_id, reintento)
+    finally:
+        # Libera el lugar del planificador y despacha el turno siguiente.
+        terminar_turno(getattr(self.request, 'id', None))
+
+
+def _procesar_lote(self, lote_id: str, tenant_id: str, reintento: bool):
     from arca_integration import ArcaClient
     from arca_integration.builders import FacturaBuilder
 
@@ -58,24 +179,53 @@ def procesar_lote(self, lote_id: str, tenant_id: str):
     if not lote:
         return {'error': 'Lote no encontrado'}
 
+    task_id = getattr(self.request, 'id', None)
+    if reintento and (lote.estado != 'procesando' or (task_id and lote.celery_task_id != task_id)):
+        # Un "facturar" manual (o una pausa) reemplazó a esta ejecución programada.
+        return {'status': 'superseded'}
+
+    lote_started = monotonic()
+    perfil = PerfilLote(max_facturas_lentas=current_app.config.get('LOTE_PERFIL_FACTURAS_LENTAS', 10))
+    perfil.activar()
     try:
-        # Obtener facturas pendientes
+        # CAEs de una ejecución anterior que no llegaron a commitearse
+        recuperadas = aplicar_autorizaciones_pendientes(tenant_id, lote_id)
+        if recuperadas:
+            logger.warning('Lote %s: %s facturas recuperadas desde el journal de CAE', lote_id, recuperadas)
+            db.session.commit()
+
+        # Obtener facturas pendientes (sin reintento programado a futuro)
         facturas = Factura.query.filter_by(
             tenant_id=tenant_id,
             lote_id=lote_id,
             estado='pendiente'
+        ).filter(
+            db.or_(Factura.proximo_reintento.is_(None), Factura.proximo_reintento <= datetime.utcnow()),
+        ).options(
+            # El modo CAEA escribe arca_request: una sola consulta al payload.
+            selectinload(Factura.payload),
         ).order_by(
             Factura.facturador_id.asc(),
             Factura.punto_venta.asc(),
             Factura.tipo_comprobante.asc(),
             Factura.fecha_emision.asc(),
             Factura.id.asc(),
-        ).all()
+        )
+        por_turno = facturas_por_turno()
+        if por_turno:
+            facturas = facturas.limit(por_turno)
+        facturas = facturas.all()
 
         total = len(facturas)
         processed = 0
         ok = 0
         errors = 0
+        reprogramadas = 0
+        progress = ProgressReporter(self, total)
+        batcher = _CommitBatcher(
+            batch_size=current_app.config.get('FACTURACION_COMMIT_BATCH_SIZE', 25),
+            interval_seconds=current_app.config.get('FACTURACION_COMMIT_INTERVAL_SECONDS', 2),
+        )
 
         _log_facturacion_trace(
             'lote.start',
@@ -93,6 +243,9 @@ def procesar_lote(self, lote_id: str, tenant_id: str):
             facturas_por_facturador[factura.facturador_id].append(factura)
 
         email_index = 0
+        lugar_turno = LugarTurno(task_id)
+        # Circuito de ARCA abierto que obliga a pausar el lote (ver services/circuito_arca.py)
+        pausado_por = None
 
         for facturador_id, facturas_grupo in facturas_por_facturador.items():
             _log_facturacion_trace(
@@ -118,11 +271,10 @@ def procesar_lote(self, lote_id: str, tenant_id: str):
 
             if error_mensaje:
                 # Marcar todas las facturas de este facturador como error
+                marcadas = _marcar_facturas_error(facturas_grupo, error_mensaje)
+                errors += marcadas
+                processed += len(facturas_grupo)
                 for factura in facturas_grupo:
-                    factura.estado = 'error'
-                    factura.error_mensaje = error_mensaje
-                    errors += 1
-                    processed += 1
                     _log_facturacion_trace(
                         'factura.skip.facturador_invalido',
                         task_id=str(getattr(self.request, 'id', '')),
@@ -131,19 +283,17 @@ def procesar_lote(self, lote_id: str, tenant_id: str):
                         facturador_id=str(facturador_id),
                         reason=error_mensaje,
                     )
-                    self.update_state(state='PROGRESS', meta={
-                        'current': processed,
-                        'total': total,
-                        'percent': int((processed / total) * 100)
-                    })
+                progress.update(processed)
                 continue
 
             if facturador and (not facturador.ingresos_brutos or not facturador.fecha_inicio_actividades):
+                marcadas = _marcar_facturas_error(
+                    facturas_grupo,
+                    'Facturador sin datos de Ingresos Brutos o Fecha de Inicio de Actividades',
+                )
+                errors += marcadas
+                processed += len(facturas_grupo)
                 for factura in facturas_grupo:
-                    factura.estado = 'error'
-                    factura.error_mensaje = 'Facturador sin datos de Ingresos Brutos o Fecha de Inicio de Actividades'
-                    errors += 1
-                    processed += 1
                     _log_facturacion_trace(
                         'factura.skip.sin_datos_iibb',
                         task_id=str(getattr(self.request, 'id', '')),
@@ -151,17 +301,18 @@ def procesar_lote(self, lote_id: str, tenant_id: str):
                         factura_id=str(factura.id),
                         facturador_id=str(facturador_id),
                     )
-                    self.update_state(state='PROGRESS', meta={
-                        'current': processed,
-                        'total': total,
-                        'percent': int((processed / total) * 100)
-                    })
+                progress.update(processed)
                 continue
 
+            # Con WSAA o WSFE caídos no se intenta: las facturas quedan
+            # pendientes y el lote se reanuda cuando el circuito se cierra.
+            pausado_por = circuito_abierto(facturador.ambiente)
+            if pausado_por:
+                break
+
             try:
                 # Desencriptar certificados
-                cert = decrypt_certificate(facturador.cert_encrypted)
-                key = decrypt_certificate(facturador.key_encrypted)
+                cert, key = get_facturador_credentials(facturador)
 
                 # Crear cliente ARCA
                 client = ArcaClient(
@@ -176,8 +327,29 @@ def procesar_lote(self, lote_id: str, tenant_id: str):
                 # FECompUltimoAutorizado -> FECAESolicitar.
                 _ = client.wsfe
 
+                # Puntos de venta dados de baja o bloqueados en ARCA (dato cacheado).
+                facturas_grupo, inhabilitadas = _separar_puntos_venta_inhabilitados(client, facturas_grupo)
+                if inhabilitadas:
+                    errors += len(inhabilitadas)
+                    processed += len(inhabilitadas)
+                    progress.update(processed)
+
+                # Padrón de receptores sin condición IVA, en paralelo y cacheado.
+                with perfil.etapa('padron_prefetch'):
+                    _prefetch_padron_receptores(client, facturador, facturas_grupo)
+
+                # Emisiones interrumpidas en una ejecución anterior: consultar
+                # ARCA antes de volver a pedir CAE para esas facturas.
+                reconciliadas = reconciliar_emisiones_en_curso(client, facturas_grupo)
+
+                # Modo CAEA: numeración y autorización locales, informe diferido.
+                numerador = NumeradorCaea(client, facturador) if facturador.modo_autorizacion == 'caea' else None
+                informes_caea = 0
+
                 # Procesar cada factura
                 for factura in facturas_grupo:
+                    lugar_turno.renovar()
+                    perfil.iniciar_factura(factura.id)
                     try:
                         _log_facturacion_trace(
                             'factura.start',
@@ -189,46 +361,69 @@ def procesar_lote(self, lote_id: str, tenant_id: str):
                             punto_venta=factura.punto_venta,
                         )
 
-                        locked_facturador = _lock_facturador_sequence(
-                            tenant_id=tenant_id,
-                            facturador_id=facturador.id,
-                        )
-                        if not locked_facturador:
-                            raise ValueError('Facturador no encontrado para bloquear secuencia')
-
-                        result = procesar_factura(client, factura, locked_facturador)
-
-                        if _is_retryable_wsaa_error(result):
+                        result = reconciliadas.get(factura.id)
+                        if result is not None:
                             _log_facturacion_trace(
-                                'factura.retry.wsaa',
+                                'factura.reconciliada',
                                 task_id=str(getattr(self.request, 'id', '')),
                                 lote_id=str(lote_id),
                                 factura_id=str(factura.id),
-                                error_message=result.get('error_message'),
+                                success=bool(result.get('success')),
                             )
-                            sleep(5)
-                            result = procesar_factura(client, factura, locked_facturador)
+                        elif numerador is not None:
+                            if not batcher.lock_facturador(tenant_id, facturador.id):
+                                raise ValueError('Facturador no encontrado para bloquear secuencia')
+
+                            result = autorizar_factura_caea(client, factura, facturador, numerador)
+                        else:
+                            locked_facturador = batcher.lock_facturador(tenant_id, facturador.id)
+                            if not locked_facturador:
+                                raise ValueError('Facturador no encontrado para bloquear secuencia')
 
-                        if _is_retryable_sequence_error(result):
-                            _log_facturacion_trace(
-                                'factura.retry.secuencia',
-                                task_id=str(getattr(self.request, 'id', '')),
-                                lote_id=str(lote_id),
-                                factura_id=str(factura.id),
-                                error_code=result.get('error_code'),
-                                error_message=result.get('error_message'),
-                            )
-                            _sync_factura_date_with_last_authorized(client, factura)
-                            sleep(1)
                             result = procesar_factura(client, factura, locked_facturador)
 
+                            if _is_retryable_sequence_error(result):
+                                # El reintento sale con la fecha ya alineada al último autorizado.
+                                _sync_factura_date_with_last_authorized(client, factura)
+
+                        if result.get('error_code') == 'arca_conexion':
+                            pausado_por = circuito_abierto(facturador.ambiente)
+                            if pausado_por:
+                                # Queda pendiente; si llegó a enviarse, al reanudar
+                                # se reconcilia con ARCA antes de re-emitir.
+                                perfil.terminar_factura()
+                                break
+
+                        if result.get('success') and result.get('caea') is not None:
+                            # El número no salió del sistema: alcanza con la
+                            # transacción de la tanda, sin journal.
+                            encolar_informe(factura, result['caea'])
+                            informes_caea += 1
+                            journal_ok = True
+                        elif result.get('success'):
+                            try:
+                                registrar_autorizacion(
+                                    factura,
+                                    cae=result['cae'],
+                                    cae_vencimiento=result['cae_vencimiento'],
+                                    numero_comprobante=result['numero_comprobante'],
+                                )
+                                journal_ok = True
+                            except SQLAlchemyError:
+                                logger.exception('No se pudo registrar el CAE de la factura %s en el journal', factura.id)
+                                journal_ok = False
+
                         if result.get('success'):
+
                             factura.estado = 'autorizado'
+                            factura.error_codigo = None
+                            factura.error_mensaje = None
+                            factura.proximo_reintento = None
                             factura.cae = result['cae']
-                            factura.cae_vencimiento = result['cae_vencimiento']
+                            factura.cae_vencimiento = _parse_any_date(result['cae_vencimiento'])
                             factura.numero_comprobante = result['numero_comprobante']
-                            factura.arca_response = _to_json_safe(result.get('response'))
                             ok += 1
+                            registrar_facturas('autorizada')
 
                             _log_facturacion_trace(
                                 'factura.success',
@@ -243,27 +438,48 @@ def procesar_lote(self, lote_id: str, tenant_id: str):
                             _use_overrides = _has_factura_overrides(factura)
 
                             if _destinatarios:
-                                from .email import enviar_factura_email
-                                enviar_factura_email.apply_async(
+                                batcher.defer_email(
                                     args=[str(factura.id), str(factura.tenant_id)],
-                                    kwargs={'destinatarios': _destinatarios, 'use_factura_overrides': _use_overrides},
+                                    kwargs={
+                                        'destinatarios': _destinatarios,
+                                        'use_factura_overrides': _use_overrides,
+                                        'fecha_emision': factura.fecha_emision.isoformat(),
+                                    },
                                     countdown=email_index * EMAIL_SEND_DELAY_SECONDS,
                                 )
                                 email_index += 1
                             elif factura.receptor and factura.receptor.email:
-                                from .email import enviar_factura_email
-                                enviar_factura_email.apply_async(
+                                batcher.defer_email(
                                     args=[str(factura.id), str(factura.tenant_id)],
-                                    kwargs={'use_factura_overrides': _use_overrides},
+                                    kwargs={
+                                        'use_factura_overrides': _use_overrides,
+                                        'fecha_emision': factura.fecha_emision.isoformat(),
+                                    },
                                     countdown=email_index * EMAIL_SEND_DELAY_SECONDS,
                                 )
                                 email_index += 1
+
+                            if not journal_ok:
+                                # Sin journal, el CAE sólo está a salvo si se commitea ya.
+                                batcher.flush()
+                        elif _reprogramar(factura, result):
+                            reprogramadas += 1
+                            perfil.registrar_reintento()
+                            _log_facturacion_trace(
+                                'factura.retry.programado',
+                                task_id=str(getattr(self.request, 'id', '')),
+                                lote_id=str(lote_id),
+                                factura_id=str(factura.id),
+                                intento=factura.reintentos,
+                                proximo_reintento=factura.proximo_reintento,
+                                error_code=result.get('error_code'),
+                            )
                         else:
                             factura.estado = 'error'
                             factura.error_codigo = result.get('error_code')
                             factura.error_mensaje = result.get('error_message')
-                            factura.arca_response = _to_json_safe(result.get('response'))
                             errors += 1
+                            registrar_facturas('error')
 
                             _log_facturacion_trace(
                                 'factura.error',
@@ -279,6 +495,7 @@ def procesar_lote(self, lote_id: str, tenant_id: str):
                         factura.error_codigo = 'procesamiento_error'
                         factura.error_mensaje = str(e)
                         errors += 1
+                        registrar_facturas('error')
 
                         _log_facturacion_trace(
                             'factura.exception',
@@ -289,14 +506,19 @@ def procesar_lote(self, lote_id: str, tenant_id: str):
                         )
 
                     processed += 1
-                    db.session.commit()
+                    batcher.add()
+                    perfil.terminar_factura()
 
                     # Actualizar progreso
-                    self.update_state(state='PROGRESS', meta={
-                        'current': processed,
-                        'total': total,
-                        'percent': int((processed / total) * 100)
-                    })
+                    progress.update(processed)
+
+                batcher.flush()
+
+                if informes_caea:
+                    informar_caea.delay(str(facturador.id), str(tenant_id))
+
+                if pausado_por:
+                    break
 
             except (
                 ArcaAuthError,
@@ -317,13 +539,23 @@ def procesar_lote(self, lote_id: str, tenant_id: str):
                     facturador_id=str(facturador_id),
                     error_message=str(e),
                 )
-                for factura in facturas_grupo:
-                    factura.estado = 'error'
-                    factura.error_codigo = 'conexion_arca'
-                    factura.error_mensaje = f'Error de conexión: {str(e)}'
-                    errors += 1
-                    processed += 1
-                db.session.commit()
+                # Las ya autorizadas de este grupo quedan como están.
+                batcher.flush()
+                pausado_por = circuito_abierto(facturador.ambiente)
+                if pausado_por:
+                    break
+                restantes = [factura for factura in facturas_grupo if factura.estado == 'pendiente']
+                clase = _clase_reintento_excepcion(e)
+                if clase:
+                    error = {'error_code': 'conexion_arca', 'error_message': f'Error de conexión: {str(e)}'}
+                    diferidas = [factura for factura in restantes if programar_reintento(factura, clase, error)]
+                    reprogramadas += len(diferidas)
+                    restantes = [factura for factura in restantes if factura not in diferidas]
+                    processed += len(diferidas)
+                errors += _marcar_facturas_error(restantes, f'Error de conexión: {str(e)}', 'conexion_arca')
+                processed += len(restantes)
+                batcher.flush()
+                progress.update(processed)
 
         # Actualizar lote
         stats = db.session.query(
@@ -335,12 +567,101 @@ def procesar_lote(self, lote_id: str, tenant_id: str):
         ).group_by(Factura.estado).all()
         stats_map = {estado: count for estado, count in stats}
 
+        proximo_reintento = db.session.query(db.func.min(Factura.proximo_reintento)).filter(
+            Factura.tenant_id == tenant_id,
+            Factura.lote_id == lote_id,
+            Factura.estado == 'pendiente',
+        ).scalar()
+
+        # Turno completo: puede haber más facturas listas para otro turno.
+        otro_turno = bool(por_turno) and total >= por_turno and not pausado_por and db.session.query(
+            Factura.id,
+        ).filter(
+            Factura.tenant_id == tenant_id,
+            Factura.lote_id == lote_id,
+            Factura.estado == 'pendiente',
+            db.or_(Factura.proximo_reintento.is_(None), Factura.proximo_reintento <= datetime.utcnow()),
+        ).first() is not None
+
         lote.total_facturas = sum(stats_map.values())
-        lote.estado = 'completado'
         lote.facturas_ok = stats_map.get('autorizado', 0)
         lote.facturas_error = stats_map.get('error', 0)
-        lote.processed_at = datetime.utcnow()
+        if pausado_por:
+            lote.estado = 'pausado'
+            lote.pausado_por = pausado_por
+        elif otro_turno or proximo_reintento is not None:
+            # Sigue 'procesando': la próxima pasada la hace otra ejecución encolada.
+            lote.pausado_por = None
+        else:
+            lote.estado = 'completado'
+            lote.pausado_por = None
+            lote.processed_at = datetime.utcnow()
+        perfil.terminar_factura()
+        lote.perfil = perfil.to_dict()
         db.session.commit()
+        LOTE_DURACION_SEGUNDOS.labels(lote.estado).observe(monotonic() - lote_started)
+
+        if otro_turno:
+            siguiente_id = encolar_lote(lote, continuacion=True)
+            _log_facturacion_trace(
+                'lote.turno.siguiente',
+                task_id=str(getattr(self.request, 'id', '')),
+                lote_id=str(lote_id),
+                tenant_id=str(tenant_id),
+                siguiente_task_id=siguiente_id,
+                processed=processed,
+            )
+            return {
+                'status': 'continued',
+                'siguiente_task_id': siguiente_id,
+                'processed': processed,
+                'total': total,
+                'ok': ok,
+                'errors': errors,
+                'reprogramadas': reprogramadas,
+            }
+
+        if not pausado_por and proximo_reintento is not None:
+            # Pasa por el planificador como un turno diferido hasta el reintento.
+            countdown = max(1, int((proximo_reintento - datetime.utcnow()).total_seconds()) + 1)
+            siguiente_id = encolar_lote(lote, continuacion=True, no_antes_de=proximo_reintento)
+            _log_facturacion_trace(
+                'lote.retry.programado',
+                task_id=str(getattr(self.request, 'id', '')),
+                lote_id=str(lote_id),
+                tenant_id=str(tenant_id),
+                siguiente_task_id=siguiente_id,
+                reprogramadas=reprogramadas,
+                countdown=countdown,
+            )
+            return {
+                'status': 'retry_scheduled',
+                'proximo_reintento': proximo_reintento.isoformat(),
+                'processed': processed,
+                'total': total,
+                'ok': ok,
+                'errors': errors,
+                'reprogramadas': reprogramadas,
+            }
+
+        if pausado_por:
+            logger.warning('Lote %s pausado: circuito ARCA %s abierto', lote_id, pausado_por)
+            _log_facturacion_trace(
+                'lote.paused',
+                task_id=str(getattr(self.request, 'id', '')),
+                lote_id=str(lote_id),
+                tenant_id=str(tenant_id),
+                circuito=pausado_por,
+                processed=processed,
+            )
+            return {
+                'status': 'paused',
+                'pausado_por': pausado_por,
+                'processed': processed,
+                'total': total,
+                'ok': ok,
+                'errors': errors,
+            }
 
         _log_facturacion_trace(
             'lote.completed',
@@ -373,8 +694,13 @@ def procesar_lote(self, lote_id: str, tenant_id: str):
         if lote_fallback:
             lote_fallback.estado = 'error'
             lote_fallback.processed_at = datetime.utcnow()
+            perfil.terminar_factura()
+            lote_fallback.perfil = perfil.to_dict()
             db.session.commit()
+        LOTE_DURACION_SEGUNDOS.labels('error').observe(monotonic() - lote_started)
         raise
+    finally:
+        perfil.finalizar()
 
 
 def _has_factura_overrides(factura: Factura) -> bool:
@@ -402,11 +728,144 @@ def _resolver_destinatarios_email(factura: Factura) -> list[str] | None:
     return destinatarios if destinatarios else None
 
 
+def _separar_puntos_venta_inhabilitados(client, facturas: list[Factura]) -> tuple[list[Factura], list[Factura]]:
+    """Marca en error las facturas cuyo punto de venta ARCA informa inhabilitado.
+
+    Si ARCA no informa puntos de venta o la consulta falla, no se descarta nada.
+    """
+    inhabilitados = set()
+    for punto_venta in {factura.punto_venta for factura in facturas}:
+        try:
+            if punto_venta_habilitado(client, punto_venta) is False:
+                inhabilitados.add(punto_venta)
+        except (ArcaError, ConnectionError, TimeoutError, OSError) as e:
+            logger.warning('No se pudieron validar los puntos de venta en ARCA: %s', e)
+            return facturas, []
+
+    if not inhabilitados:
+        return facturas, []
+
+    validas, invalidas = [], []
+    for factura in facturas:
+        (invalidas if factura.punto_venta in inhabilitados else validas).append(factura)
+    for punto_venta in inhabilitados:
+        _marcar_facturas_error(
+            [factura for factura in invalidas if factura.punto_venta == punto_venta],
+            f'El punto de venta {punto_venta} no está habilitado en ARCA',
+            'punto_venta_inhabilitado',
+        )
+    return validas, invalidas
+
+
+def _construir_request_factura(client, factura: Factura, numero_comprobante: int) -> dict:
+    """Arma el request FECAESolicitar de una factura con el número indicado."""
+    from arca_integration.builders import FacturaBuilder
+
+    # Construir request de factura
+    builder = FacturaBuilder()
+    builder.set_comprobante(
+        tipo=factura.tipo_comprobante,
+        punto_venta=factura.punto_venta,
+        numero=numero_comprobante,
+        concepto=factura.concepto
+    )
+    builder.set_fechas(
+        emision=factura.fecha_emision,
+        desde=factura.fecha_desde,
+        hasta=factura.fecha_hasta,
+        vto_pago=factura.fecha_vto_pago
+    )
+    # Factura B: DocTipo=99 (Consumidor Final), DocNro=0
+    if es_comprobante_tipo_b(factura.tipo_comprobante):
+        builder.set_receptor(doc_tipo=99, doc_nro='0')
+    else:
+        builder.set_receptor(
+            doc_tipo=factura.receptor.doc_tipo,
+            doc_nro=factura.receptor.doc_nro
+        )
+
+    _autocompletar_condicion_iva_receptor(client, factura)
+    condicion_iva_receptor_id = _resolve_condicion_iva_receptor_id(factura)
+
+    # RG 5616: CondicionIVAReceptorId es obligatorio para A, B y C
+    if condicion_iva_receptor_id is None:
+        raise ValueError(
+            f'No se pudo determinar la condicion IVA del receptor {factura.receptor.doc_nro}. '
+            'Completa la condicion IVA del receptor desde el modulo Receptores.'
+        )
+
+    # Para Factura B: siempre usar condición 5 (Consumidor Final)
+    if es_comprobante_tipo_b(factura.tipo_comprobante):
+        condicion_iva_receptor_id = 5
+    
+    builder.set_condicion_iva_receptor(condicion_iva_receptor_id)
+    
+    importe_neto, importe_iva, importe_total = normalizar_importes_para_tipo_c(
+        factura.tipo_comprobante,
+        factura.importe_neto,
+        factura.importe_iva,
+        factura.importe_total,
+    )
+
+    factura.importe_neto = importe_neto
+    factura.importe_iva = importe_iva
+    factura.importe_total = importe_total
+
+    builder.set_importes(
+        total=importe_total,
+        neto=importe_neto,
+        iva=importe_iva,
+    )
+    cotizacion = factura.cotizacion or Decimal('1')
+    if factura.moneda and factura.moneda != 'PES' and cotizacion == Decimal('1'):
+        # Moneda extranjera sin cotización cargada: última de ARCA (cacheada).
+        cotizacion = obtener_cotizacion(client, factura.moneda)
+        factura.cotizacion = cotizacion
+
+    builder.set_moneda(
+        moneda=factura.moneda,
+        cotizacion=cotizacion
+    )
+
+    # Agregar comprobante asociado si existe
+    if factura.cbte_asoc_tipo:
+        builder.set_comprobante_asociado(
+            tipo=factura.cbte_asoc_tipo,
+            punto_venta=factura.cbte_asoc_pto_vta,
+            numero=factura.cbte_asoc_nro
+        )
+
+    # Agregar IVA (soporta múltiples alícuotas por item)
+    if (
+        not es_comprobante_tipo_c(factura.tipo_comprobante)
+        and importe_iva > Decimal('0')
+    ):
+        iva_items = _build_iva_from_items(factura)
+
+        if iva_items:
+            for iva_item in iva_items:
+                builder.add_iva(
+                    alicuota_id=iva_item['Id'],
+                    base_imponible=iva_item['BaseImp'],
+                    importe=iva_item['Importe'],
+                )
+        else:
+            # Fallback para facturas sin items detallados - usar valores normalizados
+            builder.add_iva(
+                alicuota_id=5,
+                base_imponible=importe_neto,
+                importe=importe_iva
+            )
+
+    return builder.build()
+
+
 def procesar_factura(client, factura: Factura, facturador: Facturador) -> dict:
     """Procesa una factura individual con ARCA."""
-    from arca_integration.builders import FacturaBuilder
     from arca_integration.services import WSFEService
 
+    request_data = None
+    enviado = False
     try:
         _log_facturacion_trace(
             'factura.build_request.start',
@@ -424,97 +883,7 @@ def procesar_factura(client, factura: Factura, facturador: Facturador) -> dict:
         )
         numero_comprobante = ultimo + 1
 
-        # Construir request de factura
-        builder = FacturaBuilder()
-        builder.set_comprobante(
-            tipo=factura.tipo_comprobante,
-            punto_venta=factura.punto_venta,
-            numero=numero_comprobante,
-            concepto=factura.concepto
-        )
-        builder.set_fechas(
-            emision=factura.fecha_emision,
-            desde=factura.fecha_desde,
-            hasta=factura.fecha_hasta,
-            vto_pago=factura.fecha_vto_pago
-        )
-        # Factura B: DocTipo=99 (Consumidor Final), DocNro=0
-        if es_comprobante_tipo_b(factura.tipo_comprobante):
-            builder.set_receptor(doc_tipo=99, doc_nro='0')
-        else:
-            builder.set_receptor(
-                doc_tipo=factura.receptor.doc_tipo,
-                doc_nro=factura.receptor.doc_nro
-            )
-
-        _autocompletar_condicion_iva_receptor(client, factura)
-        condicion_iva_receptor_id = _resolve_condicion_iva_receptor_id(factura)
-
-        # RG 5616: CondicionIVAReceptorId es obligatorio para A, B y C
-        if condicion_iva_receptor_id is None:
-            raise ValueError(
-                f'No se pudo determinar la condicion IVA del receptor {factura.receptor.doc_nro}. '
-                'Completa la condicion IVA del receptor desde el modulo Receptores.'
-            )
-
-        # Para Factura B: siempre usar condición 5 (Consumidor Final)
-        if es_comprobante_tipo_b(factura.tipo_comprobante):
-            condicion_iva_receptor_id = 5
-        
-        builder.set_condicion_iva_receptor(condicion_iva_receptor_id)
-        
-        importe_neto, importe_iva, importe_total = normalizar_importes_para_tipo_c(
-            factura.tipo_comprobante,
-            factura.importe_neto,
-            factura.importe_iva,
-            factura.importe_total,
-        )
-
-        factura.importe_neto = importe_neto
-        factura.importe_iva = importe_iva
-        factura.importe_total = importe_total
-
-        builder.set_importes(
-            total=importe_total,
-            neto=importe_neto,
-            iva=importe_iva,
-        )
-        builder.set_moneda(
-            moneda=factura.moneda,
-            cotizacion=(factura.cotizacion or Decimal('1'))
-        )
-
-        # Agregar comprobante asociado si existe
-        if factura.cbte_asoc_tipo:
-            builder.set_comprobante_asociado(
-                tipo=factura.cbte_asoc_tipo,
-                punto_venta=factura.cbte_asoc_pto_vta,
-                numero=factura.cbte_asoc_nro
-            )
-
-        # Agregar IVA (soporta múltiples alícuotas por item)
-        if (
-            not es_comprobante_tipo_c(factura.tipo_comprobante)
-            and importe_iva > Decimal('0')
-        ):
-            iva_items = _build_iva_from_items(factura)
-
-            if iva_items:
-                for iva_item in iva_items:
-                    builder.add_iva(
-                        alicuota_id=iva_item['Id'],
-                        base_imponible=iva_item['BaseImp'],
-                        importe=iva_item['Importe'],
-                    )
-            else:
-                # Fallback para facturas sin items detallados - usar valores normalizados
-                builder.add_iva(
-                    alicuota_id=5,
-                    base_imponible=importe_neto,
-                    importe=importe_iva
-                )
-
-        request_data = builder.build()
+        request_data = _construir_request_factura(client, factura, numero_comprobante)
 
         _log_facturacion_trace(
             'factura.build_request.done',
@@ -524,8 +893,16 @@ def procesar_factura(client, factura: Factura, facturador: Facturador) -> dict:
             punto_venta=factura.punto_venta,
         )
 
-        # Guardar request
-        factura.arca_request = _to_json_safe(request_data)
+        # Marca durable antes de enviar: si el proceso muere sin registrar el
+        # resultado, la próxima ejecución consulta ARCA en vez de re-emitir.
+        try:
+            registrar_emision_en_curso(factura, numero_comprobante, request_data)
+        except SQLAlchemyError as e:
+            return {
+                'success': False,
+                'error_code': 'procesamiento_error',
+                'error_message': f'No se pudo registrar la emisión en curso: {str(e)}',
+            }
 
         # Enviar a ARCA
         wsfe = WSFEService(client)
@@ -535,6 +912,7 @@ def procesar_factura(client, factura: Factura, facturador: Facturador) -> dict:
             method='FECAESolicitar',
             wsid='wsfe',
         )
+        enviado = True
         response = wsfe.autorizar(request_data)
 
         _log_facturacion_trace(
@@ -544,6 +922,19 @@ def procesar_factura(client, factura: Factura, facturador: Facturador) -> dict:
             error_code=response.get('error_code'),
         )
 
+        registrar_intercambio(
+            factura,
+            'FECAESolicitar',
+            'autorizado' if response.get('cae') else 'rechazado',
+            request=_to_json_safe(request_data),
+            response=_to_json_safe(response),
+            error_codigo=response.get('error_code'),
+        )
+
+        if not response.get('cae'):
+            # ARCA respondió sin autorizar: el número no quedó tomado.
+            descartar_emision_en_curso(factura.id)
+
         if response.get('cae'):
             return {
                 'success': True,
@@ -561,29 +952,71 @@ def procesar_factura(client, factura: Factura, facturador: Facturador) -> dict:
             }
 
     except ArcaValidationError as e:
-        return {
-            'success': False,
-            'error_code': 'arca_validacion',
-            'error_message': str(e),
-        }
+        error = {'error_code': 'arca_validacion', 'error_message': str(e)}
     except (ArcaAuthError, ArcaNetworkError, ConnectionError, TimeoutError, OSError) as e:
-        return {
-            'success': False,
-            'error_code': 'arca_conexion',
-            'error_message': f'Error de conexión con ARCA: {str(e)}',
-        }
+        error = {'error_code': 'arca_conexion', 'error_message': f'Error de conexión con ARCA: {str(e)}'}
     except ArcaError as e:
-        return {
-            'success': False,
-            'error_code': 'arca_error',
-            'error_message': f'Error de integración con ARCA: {str(e)}',
-        }
+        error = {'error_code': 'arca_error', 'error_message': f'Error de integración con ARCA: {str(e)}'}
     except (InvalidOperation, ValueError, TypeError, RuntimeError) as e:
+        error = {'error_code': 'procesamiento_error', 'error_message': str(e)}
+
+    if enviado:
+        # El request salió hacia ARCA: queda el intento aunque no haya respuesta.
+        registrar_intercambio(
+            factura,
+            'FECAESolicitar',
+            'error',
+            request=_to_json_safe(request_data),
+            response={'error': error['error_message']},
+            error_codigo=error['error_code'],
+        )
+    return {'success': False, **error}
+
+
+def autorizar_factura_caea(client, factura: Factura, facturador: Facturador, numerador: NumeradorCaea) -> dict:
+    """Autoriza una factura localmente con el CAEA vigente de su quincena.
+
+    No consulta ARCA por factura: el número sale de ``numerador`` y el request
+    queda guardado en ``arca_request`` para informarlo luego con
+    FECAEARegInformativo.
+    """
+    numero_comprobante = None
+    try:
+        caea = obtener_caea_vigente(client, facturador, factura.fecha_emision)
+        numero_comprobante = numerador.siguiente(factura.punto_venta, factura.tipo_comprobante)
+        request_data = _construir_request_factura(client, factura, numero_comprobante)
+        factura.arca_request = _to_json_safe(request_data)
+
+        _log_facturacion_trace(
+            'factura.caea.autorizada',
+            factura_id=str(factura.id),
+            numero_comprobante=numero_comprobante,
+            caea=caea.codigo,
+        )
+
         return {
-            'success': False,
-            'error_code': 'procesamiento_error',
-            'error_message': str(e)
+            'success': True,
+            'cae': caea.codigo,
+            'cae_vencimiento': caea.fch_vig_hasta,
+            'numero_comprobante': numero_comprobante,
+            'caea': caea,
+            'response': {
+                'modo': 'caea',
+                'caea': caea.codigo,
+                'periodo': caea.periodo,
+                'orden': caea.orden,
+            },
         }
+    except (ArcaAuthError, ArcaNetworkError, ConnectionError, TimeoutError, OSError) as e:
+        error = {'error_code': 'arca_conexion', 'error_message': f'Error de conexión con ARCA: {str(e)}'}
+    except ArcaError as e:
+        error = {'error_code': 'arca_error', 'error_message': f'Error de integración con ARCA: {str(e)}'}
+    except (InvalidOperation, ValueError, TypeError, RuntimeError) as e:
+        error = {'error_code': 'procesamiento_error', 'error_message': str(e)}
+
+    if numero_comprobante is not None:
+        numerador.devolver(factura.punto_venta, factura.tipo_comprobante, numero_comprobante)
+    return {'success': False, **error}
 
 
 def _is_retryable_wsaa_error(result: dict) -> bool:
@@ -607,6 +1040,31 @@ def _is_retryable_sequence_error(result: dict) -> bool:
     return code == '10016' or 'proximo a autorizar' in message or 'fecompultimoautorizado' in message
 
 
+def _clase_reintento(result: dict) -> str | None:
+    """Clase de backoff de un resultado fallido (ver services/reintentos.py)."""
+    if _is_retryable_wsaa_error(result):
+        return 'wsaa_ta'
+    if _is_retryable_sequence_error(result):
+        return 'secuencia'
+    if isinstance(result, dict) and not result.get('success') and result.get('error_code') == 'arca_conexion':
+        return 'red'
+    return None
+
+
+def _clase_reintento_excepcion(exc: Exception) -> str | None:
+    """Clase de backoff de un error al conectar el facturador (login WSAA / WSDL)."""
+    if _is_retryable_wsaa_error({'success': False, 'error_message': str(exc)}):
+        return 'wsaa_ta'
+    if isinstance(exc, (ArcaNetworkError, ConnectionError, TimeoutError, OSError)):
+        return 'red'
+    return None
+
+
+def _reprogramar(factura: Factura, result: dict) -> bool:
+    clase = _clase_reintento(result)
+    return clase is not None and programar_reintento(factura, clase, result)
+
+
 def _lock_facturador_sequence(tenant_id, facturador_id):
     query = Facturador.query.filter_by(id=facturador_id, tenant_id=tenant_id)
     with suppress(Exception):
@@ -779,10 +1237,9 @@ def _resolve_condicion_iva_receptor_id(factura: Factura) -> int | None:
             if cond_id in CONDICIONES_IVA:
                 return cond_id
 
-        normalized = _normalize_text(raw)
-        for cond_id, desc in CONDICIONES_IVA.items():
-            if _normalize_text(desc) == normalized:
-                return cond_id
+        cond_id = condicion_iva_id_desde_nombre(raw)
+        if cond_id is not None:
+            return cond_id
 
     # Fallback por tipo de documento
     if receptor.doc_tipo in (96, 99):
@@ -795,19 +1252,48 @@ def _resolve_condicion_iva_receptor_id(factura: Factura) -> int | None:
     return 5
 
 
-def _get_condicion_iva_id_from_name(nombre: str) -> int | None:
-    """Convierte nombre de condición IVA a ID."""
-    if not nombre:
-        return None
-    normalized = _normalize_text(nombre)
-    for cond_id, desc in CONDICIONES_IVA.items():
-        if _normalize_text(desc) == normalized:
-            return cond_id
-    return None
+def _aplicar_padron_a_receptor(receptor, data: dict) -> None:
+    for campo, valor in cambios_padron_receptor(receptor, data).items():
+        setattr(receptor, campo, valor)
+
 
+def _prefetch_padron_receptores(client, facturador: Facturador, facturas: list[Factura]) -> int:
+    """Resuelve en paralelo el padrón de los receptores sin condición IVA.
 
-def _normalize_text(value: str) -> str:
-    return ' '.join(value.lower().replace('–', '-').split())
+    Se ejecuta antes del loop de emisión. Retorna la cantidad de receptores
+    completados; si el padrón no responde, el loop sigue como antes.
+    """
+    receptores = {}
+    for factura in facturas:
+        receptor = factura.receptor
+        if (
+            receptor is not None
+            and receptor.condicion_iva_id is None
+            and receptor.doc_tipo in (80, 86, 87)
+            and normalizar_cuit(receptor.doc_nro)
+        ):
+            receptores.setdefault(normalizar_cuit(receptor.doc_nro), []).append(receptor)
+
+    if not receptores:
+        return 0
+
+    try:
+        resultados = prefetch_padron(client, list(receptores), facturador.ambiente)
+    except (ArcaError, ConnectionError, TimeoutError, OSError, RuntimeError, ValueError) as exc:
+        logger.warning('Prefetch de padrón omitido para el facturador %s: %s', facturador.id, exc)
+        return 0
+
+    completados = 0
+    for cuit, result in resultados.items():
+        if not result.get('success'):
+            continue
+        for receptor in receptores.get(cuit, []):
+            _aplicar_padron_a_receptor(receptor, result.get('data') or {})
+            completados += 1
+
+    if completados:
+        db.session.flush()
+    return completados
 
 
 def _autocompletar_condicion_iva_receptor(client, factura: Factura) -> None:
@@ -823,29 +1309,17 @@ def _autocompletar_condicion_iva_receptor(client, factura: Factura) -> None:
     if receptor.doc_tipo not in (80, 86, 87):
         return
 
-    doc = (receptor.doc_nro or '').replace('-', '').replace(' ', '')
-    if not doc.isdigit() or len(doc) != 11:
+    doc = normalizar_cuit(receptor.doc_nro)
+    if not doc:
         return
 
     try:
-        result = client.consultar_padron(doc)
+        # Normalmente ya resuelto por el prefetch del lote: no hay SOAP acá.
+        result = consultar_padron_cacheado(client, doc, factura.facturador.ambiente)
         if not result.get('success'):
             return
 
-        data = result.get('data') or {}
-        condicion_iva = data.get('condicion_iva')
-        if condicion_iva:
-            # Guardar nombre en campo legacy y resolver ID
-            receptor.condicion_iva_id = _get_condicion_iva_id_from_name(condicion_iva)
-
-        if data.get('razon_social') and (
-            not receptor.razon_social or receptor.razon_social.startswith('CUIT ')
-        ):
-            receptor.razon_social = data['razon_social']
-
-        if data.get('direccion') and not receptor.direccion:
-            receptor.direccion = data['direccion']
-
+        _aplicar_padron_a_receptor(receptor, result.get('data') or {})
         db.session.flush()
     except (
         ArcaAuthError,
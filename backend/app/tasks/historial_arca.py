@@ -0,0 +1,32 @@
+import logging
+from datetime import datetime, timedelta
+
+from celery import shared_task
+from flask import current_app
+
+from ..services.historial_arca import archivar_intercambios
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def archivar_historial_arca(limite: int = 5000, max_tandas: int = 20):
+    """Aplica la retención del historial ARCA (``ARCA_HISTORIAL_DIAS_EN_BASE``)."""
+    dias = current_app.config.get('ARCA_HISTORIAL_DIAS_EN_BASE', 180)
+    if not dias:
+        return {'eliminados': 0, 'archivos': []}
+
+    antes_de = datetime.utcnow() - timedelta(days=dias)
+    archivar = current_app.config.get('ARCA_HISTORIAL_ARCHIVAR', True)
+    eliminados = 0
+    archivos = []
+    for _ in range(max_tandas):
+        resultado = archivar_intercambios(antes_de, archivar=archivar, limite=limite)
+        eliminados += resultado['eliminados']
+        archivos.extend(resultado['archivos'])
+        if resultado['eliminados'] < limite:
+            break
+
+    logger.info('Historial ARCA anterior a %s: %s intercambios fuera de la base (%s archivos)',
+                antes_de.date(), eliminados, len(archivos))
+    return {'eliminados': eliminados, 'archivos': archivos}
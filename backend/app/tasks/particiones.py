@@ -0,0 +1,18 @@
+import logging
+
+from celery import shared_task
+from flask import current_app
+
+from ..services.particiones import asegurar_particiones
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def crear_particiones_factura():
+    """Crea por adelantado las particiones mensuales de factura/factura_item."""
+    meses = current_app.config.get('FACTURA_PARTICIONES_MESES_ADELANTE', 3)
+    creadas = asegurar_particiones(meses_adelante=meses)
+    if creadas:
+        logger.info('Particiones de factura creadas: %s', ', '.join(creadas))
+    return {'creadas': creadas}
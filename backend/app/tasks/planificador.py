@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from ..services.planificador import despachar
+
+
+@shared_task
+def despachar_turnos():
+    """Despacha turnos en cola que quedaron sin lugar (worker caído, lock ocupado)."""
+    return {'despachados': despachar()}
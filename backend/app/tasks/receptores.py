@@ -0,0 +1,85 @@
+import logging
+
+from celery import shared_task
+
+from ..extensions import db
+from ..models import Facturador, Receptor
+from ..services.encryption import get_facturador_credentials
+from ..services.padron import cambios_padron_receptor, normalizar_cuit, prefetch_padron
+from ..services.progress import ProgressReporter
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True)
+def enriquecer_receptores_padron(self, tenant_id: str, receptor_ids: list[str], facturador_id: str):
+    """
+    Completa razón social, domicilio y condición IVA de receptores desde padrón.
+
+    Consulta en paralelo los CUIT sin cache vigente (acotado por
+    PADRON_PREFETCH_CONCURRENCIA; la tasa por certificado la aplica el
+    limitador de ArcaClient) y escribe los cambios con un UPDATE masivo por
+    clave primaria.
+    """
+    from arca_integration import ArcaClient
+
+    facturador = Facturador.query.filter_by(id=facturador_id, tenant_id=tenant_id).first()
+    if not facturador or not facturador.cert_encrypted:
+        return {'error': 'Facturador sin certificados'}
+
+    receptores = Receptor.query.filter(
+        Receptor.tenant_id == tenant_id,
+        Receptor.id.in_(receptor_ids),
+    ).all()
+
+    por_cuit = {}
+    for receptor in receptores:
+        cuit = normalizar_cuit(receptor.doc_nro)
+        if cuit and receptor.doc_tipo in (80, 86, 87):
+            por_cuit.setdefault(cuit, []).append(receptor)
+
+    total = len(por_cuit)
+    progress = ProgressReporter(self, total)
+
+    resultados = {}
+    if por_cuit:
+        cert, key = get_facturador_credentials(facturador)
+        client = ArcaClient(
+            cuit=facturador.cuit,
+            cert=cert,
+            key=key,
+            ambiente=facturador.ambiente
+        )
+        resultados = prefetch_padron(
+            client,
+            list(por_cuit),
+            facturador.ambiente,
+            on_progress=progress.update,
+        )
+
+    rows = []
+    no_encontrados = 0
+    for cuit, result in resultados.items():
+        if not result.get('success'):
+            no_encontrados += 1
+            continue
+        for receptor in por_cuit[cuit]:
+            cambios = cambios_padron_receptor(receptor, result.get('data') or {})
+            if cambios:
+                rows.append({'id': receptor.id, **cambios})
+
+    # UPDATE masivo por clave primaria (un executemany por combinación de campos).
+    for campos in {tuple(sorted(row)) for row in rows}:
+        db.session.execute(db.update(Receptor), [row for row in rows if tuple(sorted(row)) == campos])
+    db.session.commit()
+
+    progress.update(total, force=True)
+
+    return {
+        'status': 'completed',
+        'processed': total,
+        'total': total,
+        'enriquecidos': len(rows),
+        'no_encontrados': no_encontrados,
+        'errores': total - len(resultados),
+    }
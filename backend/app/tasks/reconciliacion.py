@@ -0,0 +1,545 @@
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from arca_integration.exceptions import ArcaError
+from celery import shared_task
+from flask import current_app
+
+from ..extensions import db
+from ..models import (
+    Factura,
+    FacturaArcaIntercambio,
+    FacturaAutorizacion,
+    FacturaEmisionEnCurso,
+    Facturador,
+    Receptor,
+)
+from ..services.autorizaciones import aplicar_autorizaciones_pendientes
+from ..services.encryption import get_facturador_credentials
+from ..services.historial_arca import fila_intercambio
+from ..services.progress import ProgressReporter
+from .facturacion import _lock_facturador_sequence, _parse_any_date, _to_json_safe
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCIA_POR_CUIT = 4
+MAX_NUMEROS_FALTANTES = 500
+DEFAULT_MAX_SINCRONIZACION = 2000
+
+
+def _to_decimal(value) -> Decimal | None:
+    if value is None:
+        return None
+    try:
+        return Decimal(str(value)).quantize(Decimal('0.01'))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _comparar_con_arca(local: dict, arca: dict) -> list[dict]:
+    """Compara CAE, total y fecha de un comprobante propio contra lo que informa ARCA."""
+    diferencias = []
+
+    if str(local['cae'] or '') != str(arca.get('cae') or ''):
+        diferencias.append({'campo': 'cae', 'local': local['cae'], 'arca': arca.get('cae')})
+
+    total_local = _to_decimal(local['importe_total'])
+    total_arca = _to_decimal(arca.get('imp_total'))
+    if total_local != total_arca:
+        diferencias.append({
+            'campo': 'importe_total',
+            'local': float(total_local) if total_local is not None else None,
+            'arca': float(total_arca) if total_arca is not None else None,
+        })
+
+    fecha_local = local['fecha_emision']
+    fecha_arca = _parse_any_date(arca.get('fecha_cbte'))
+    if fecha_local != fecha_arca:
+        diferencias.append({
+            'campo': 'fecha_emision',
+            'local': fecha_local.isoformat() if fecha_local else None,
+            'arca': fecha_arca.isoformat() if fecha_arca else None,
+        })
+
+    return diferencias
+
+
+def _numeros_faltantes(numeros: list[int]) -> list[int]:
+    """Huecos en la numeración propia entre el menor y el mayor número conocido."""
+    if not numeros:
+        return []
+
+    presentes = set(numeros)
+    faltantes = []
+    for numero in range(min(presentes), max(presentes) + 1):
+        if numero not in presentes:
+            faltantes.append(numero)
+            if len(faltantes) >= MAX_NUMEROS_FALTANTES:
+                break
+    return faltantes
+
+
+def _consultar(client, local: dict) -> tuple[dict, dict | None, str | None]:
+    try:
+        arca = client.fe_comp_consultar(
+            tipo_cbte=local['tipo_comprobante'],
+            punto_venta=local['punto_venta'],
+            numero=local['numero_comprobante'],
+        )
+        return local, arca, None
+    except (ArcaError, ConnectionError, TimeoutError, OSError, RuntimeError, ValueError) as exc:
+        return local, None, str(exc)
+
+
+@shared_task(bind=True)
+def reconciliar_facturas(
+    self,
+    tenant_id: str,
+    lote_id: str | None = None,
+    facturador_id: str | None = None,
+    fecha_desde: str | None = None,
+    fecha_hasta: str | None = None,
+):
+    """
+    Verifica contra ARCA (FECompConsultar) las facturas autorizadas del alcance
+    indicado: un lote, un facturador y/o un rango de fechas de emisión.
+
+    Las consultas de cada CUIT corren en paralelo con un máximo de
+    RECONCILIACION_CONCURRENCIA_POR_CUIT. Los facturadores se recorren de a uno
+    porque arca_arg configura el TA a nivel de módulo.
+    """
+    from arca_integration import ArcaClient
+
+    query = Factura.query.filter(
+        Factura.tenant_id == tenant_id,
+        Factura.estado == 'autorizado',
+        Factura.numero_comprobante.isnot(None),
+    )
+    if lote_id:
+        query = query.filter(Factura.lote_id == lote_id)
+    if facturador_id:
+        query = query.filter(Factura.facturador_id == facturador_id)
+    if fecha_desde:
+        query = query.filter(Factura.fecha_emision >= _parse_any_date(fecha_desde))
+    if fecha_hasta:
+        query = query.filter(Factura.fecha_emision <= _parse_any_date(fecha_hasta))
+
+    # Se extraen valores planos: los hilos de consulta no tocan la sesión.
+    rows = query.with_entities(
+        Factura.id,
+        Factura.facturador_id,
+        Factura.punto_venta,
+        Factura.tipo_comprobante,
+        Factura.numero_comprobante,
+        Factura.cae,
+        Factura.importe_total,
+        Factura.fecha_emision,
+    ).order_by(
+        Factura.facturador_id.asc(),
+        Factura.punto_venta.asc(),
+        Factura.tipo_comprobante.asc(),
+        Factura.numero_comprobante.asc(),
+    ).all()
+
+    por_facturador: dict = {}
+    for row in rows:
+        por_facturador.setdefault(row.facturador_id, []).append({
+            'factura_id': str(row.id),
+            'punto_venta': row.punto_venta,
+            'tipo_comprobante': row.tipo_comprobante,
+            'numero_comprobante': int(row.numero_comprobante),
+            'cae': row.cae,
+            'importe_total': row.importe_total,
+            'fecha_emision': row.fecha_emision,
+        })
+
+    total = len(rows)
+    processed = 0
+    coincidencias = 0
+    diferencias = []
+    no_encontradas = []
+    errores = []
+    faltantes = []
+    progress = ProgressReporter(self, total)
+    concurrencia = max(1, int(current_app.config.get(
+        'RECONCILIACION_CONCURRENCIA_POR_CUIT', DEFAULT_CONCURRENCIA_POR_CUIT
+    )))
+
+    for grupo_facturador_id, locales in por_facturador.items():
+        secuencias: dict = {}
+        for local in locales:
+            secuencias.setdefault((local['punto_venta'], local['tipo_comprobante']), []).append(
+                local['numero_comprobante']
+            )
+        for (punto_venta, tipo_comprobante), numeros in secuencias.items():
+            huecos = _numeros_faltantes(numeros)
+            if huecos:
+                faltantes.append({
+                    'facturador_id': str(grupo_facturador_id),
+                    'punto_venta': punto_venta,
+                    'tipo_comprobante': tipo_comprobante,
+                    'numeros': huecos,
+                })
+
+        facturador = Facturador.query.filter_by(id=grupo_facturador_id, tenant_id=tenant_id).first()
+        try:
+            if not facturador or not facturador.cert_encrypted or not facturador.key_encrypted:
+                raise ValueError('Facturador sin certificados')
+
+            cert, key = get_facturador_credentials(facturador)
+            client = ArcaClient(cuit=facturador.cuit, cert=cert, key=key, ambiente=facturador.ambiente)
+            # Obtener el TA antes de abrir los hilos.
+            _ = client.wsfe
+        except (ArcaError, ConnectionError, TimeoutError, OSError, RuntimeError, ValueError) as exc:
+            for local in locales:
+                errores.append({'factura_id': local['factura_id'], 'error': str(exc)})
+            processed += len(locales)
+            progress.update(processed)
+            continue
+
+        with ThreadPoolExecutor(max_workers=concurrencia) as executor:
+            futures = [executor.submit(_consultar, client, local) for local in locales]
+            for future in as_completed(futures):
+                local, arca, error = future.result()
+                processed += 1
+
+                referencia = {
+                    'factura_id': local['factura_id'],
+                    'facturador_id': str(grupo_facturador_id),
+                    'punto_venta': local['punto_venta'],
+                    'tipo_comprobante': local['tipo_comprobante'],
+                    'numero_comprobante': local['numero_comprobante'],
+                }
+
+                if error:
+                    errores.append({**referencia, 'error': error})
+                elif not isinstance(arca, dict) or not arca.get('encontrado'):
+                    no_encontradas.append(referencia)
+                else:
+                    campos = _comparar_con_arca(local, arca)
+                    if campos:
+                        diferencias.append({**referencia, 'diferencias': campos})
+                    else:
+                        coincidencias += 1
+
+                progress.update(processed)
+
+    logger.info(
+        'Reconciliación tenant=%s: %s facturas, %s diferencias, %s no encontradas, %s errores',
+        tenant_id, total, len(diferencias), len(no_encontradas), len(errores),
+    )
+
+    return {
+        'status': 'completed',
+        'processed': processed,
+        'total': total,
+        'ok': coincidencias,
+        'diferencias': diferencias,
+        'no_encontradas': no_encontradas,
+        'numeros_faltantes': faltantes,
+        'errores': errores,
+    }
+
+
+def _resolver_receptores(tenant_id, documentos: set[tuple[int, str]]) -> tuple[dict, dict]:
+    """Mapea (doc_tipo, doc_nro) -> receptor_id creando los receptores que falten.
+
+    Un receptor sólo se reutiliza si coinciden tipo y número de documento. Si
+    el número ya existe con otro tipo (``unique_tenant_doc_nro`` impide crear
+    otro), el documento va al segundo diccionario con el motivo.
+    """
+    if not documentos:
+        return {}, {}
+
+    existentes = Receptor.query.filter(
+        Receptor.tenant_id == tenant_id,
+        Receptor.doc_nro.in_({doc_nro for _, doc_nro in documentos}),
+    ).all()
+    por_doc = {receptor.doc_nro: receptor for receptor in existentes}
+
+    resueltos = {}
+    conflictos = {}
+    nuevos = []
+    for doc_tipo, doc_nro in sorted(documentos):
+        receptor = por_doc.get(doc_nro)
+        if receptor is None:
+            receptor = Receptor(
+                tenant_id=tenant_id,
+                doc_tipo=doc_tipo,
+                doc_nro=doc_nro,
+                razon_social='Consumidor Final' if doc_tipo == 99 else f'CUIT {doc_nro}',
+                condicion_iva_id=5 if doc_tipo == 99 else None,
+            )
+            por_doc[doc_nro] = receptor
+            nuevos.append(receptor)
+        elif int(receptor.doc_tipo or 80) != doc_tipo:
+            conflictos[(doc_tipo, doc_nro)] = (
+                f'El documento {doc_nro} ya existe con tipo {receptor.doc_tipo} (ARCA informa tipo {doc_tipo})'
+            )
+            continue
+        resueltos[(doc_tipo, doc_nro)] = receptor
+
+    if nuevos:
+        db.session.add_all(nuevos)
+        db.session.flush()
+
+    return {documento: receptor.id for documento, receptor in resueltos.items()}, conflictos
+
+
+def _documento(arca: dict) -> tuple[int, str]:
+    return int(arca.get('doc_tipo') or 99), str(arca.get('doc_nro') or '0')
+
+
+def _huecos_locales(tenant_id, facturador_id, punto_venta: int, tipo_comprobante: int, limite: int) -> list[int]:
+    """Números sin factura local entre el menor y el mayor número conocido.
+
+    Los calcula la base con ``LEAD`` sobre la numeración, sin traer todos los
+    números: un comprobante que no se pudo importar queda como hueco y la
+    próxima ejecución lo vuelve a consultar aunque ya haya números mayores.
+    """
+    siguiente = db.func.lead(Factura.numero_comprobante).over(order_by=Factura.numero_comprobante)
+    numeracion = db.session.query(
+        Factura.numero_comprobante.label('numero'),
+        siguiente.label('siguiente'),
+    ).filter(
+        Factura.tenant_id == tenant_id,
+        Factura.facturador_id == facturador_id,
+        Factura.punto_venta == punto_venta,
+        Factura.tipo_comprobante == tipo_comprobante,
+        Factura.numero_comprobante.isnot(None),
+    ).subquery()
+
+    rangos = db.session.query(numeracion.c.numero, numeracion.c.siguiente).filter(
+        numeracion.c.siguiente > numeracion.c.numero + 1,
+    ).order_by(numeracion.c.numero.asc())
+
+    huecos = []
+    for numero, siguiente_numero in rangos:
+        for hueco in range(int(numero) + 1, int(siguiente_numero)):
+            huecos.append(hueco)
+            if len(huecos) >= limite:
+                return huecos
+    return huecos
+
+
+def _numeros_propios(tenant_id, facturador_id, punto_venta: int, tipo_comprobante: int, numeros) -> set[int]:
+    """Números ya usados por este sistema: facturas, journal de CAEs y emisiones en curso."""
+    if not numeros:
+        return set()
+    numeros = list(numeros)
+    filtros_factura = (
+        Factura.tenant_id == tenant_id,
+        Factura.facturador_id == facturador_id,
+    )
+    propios = {
+        int(numero) for (numero,) in db.session.query(Factura.numero_comprobante).filter(
+            *filtros_factura,
+            Factura.punto_venta == punto_venta,
+            Factura.tipo_comprobante == tipo_comprobante,
+            Factura.numero_comprobante.in_(numeros),
+        )
+    }
+    for modelo in (FacturaAutorizacion, FacturaEmisionEnCurso):
+        propios.update(
+            int(numero) for (numero,) in db.session.query(modelo.numero_comprobante).join(
+                Factura, Factura.id == modelo.factura_id
+            ).filter(
+                *filtros_factura,
+                modelo.punto_venta == punto_venta,
+                modelo.tipo_comprobante == tipo_comprobante,
+                modelo.numero_comprobante.in_(numeros),
+            )
+        )
+    return propios
+
+
+def _factura_externa_row(tenant_id, facturador_id, numero: int, arca: dict, receptor_id) -> dict:
+    importe_total = _to_decimal(arca.get('imp_total')) or Decimal('0')
+    importe_iva = _to_decimal(arca.get('imp_iva')) or Decimal('0')
+    importe_neto = _to_decimal(arca.get('imp_neto'))
+    if importe_neto is None:
+        importe_neto = importe_total - importe_iva
+
+    return {
+        'id': uuid.uuid4(),
+        'tenant_id': tenant_id,
+        'facturador_id': facturador_id,
+        'receptor_id': receptor_id,
+        'tipo_comprobante': int(arca.get('tipo_cbte')),
+        'concepto': int(arca.get('concepto') or 1),
+        'punto_venta': int(arca.get('punto_venta')),
+        'numero_comprobante': numero,
+        'fecha_emision': _parse_any_date(arca.get('fecha_cbte')),
+        'importe_total': importe_total,
+        'importe_neto': importe_neto,
+        'importe_iva': importe_iva,
+        'moneda': arca.get('mon_id') or 'PES',
+        'cotizacion': Decimal(str(arca.get('mon_cotiz') or 1)),
+        'cae': arca.get('cae'),
+        'cae_vencimiento': _parse_any_date(arca.get('cae_vto')),
+        'estado': 'autorizado',
+        'origen': 'externo',
+        'created_at': datetime.utcnow(),
+    }
+
+
+@shared_task(bind=True)
+def importar_comprobantes_externos(
+    self,
+    tenant_id: str,
+    facturador_id: str,
+    tipo_comprobante: int,
+    punto_venta: int | None = None,
+):
+    """
+    Importa como facturas de solo lectura los comprobantes que ARCA tiene
+    autorizados y que no existen localmente (emitidos desde otro sistema con
+    el mismo punto de venta): los huecos de la numeración propia y los números
+    por encima del mayor conocido, hasta FECompUltimoAutorizado.
+
+    Consulta los candidatos en paralelo y los inserta en bloque con
+    origen='externo'. Un número que no se pudo importar (error de consulta,
+    sin fecha o receptor ambiguo) sigue siendo un hueco y se reintenta en la
+    próxima ejecución. Antes de insertar se toma el lock de la secuencia del
+    facturador y se descartan los números que mientras tanto obtuvo este
+    sistema (journal de CAEs y emisiones en curso). Cada ejecución importa a
+    lo sumo SINCRONIZACION_MAX_COMPROBANTES; se puede relanzar para continuar.
+    """
+    from arca_integration import ArcaClient
+
+    facturador = Facturador.query.filter_by(id=facturador_id, tenant_id=tenant_id).first()
+    if not facturador:
+        return {'error': 'Facturador no encontrado'}
+    if not facturador.cert_encrypted or not facturador.key_encrypted:
+        return {'error': 'Facturador sin certificados'}
+
+    punto_venta = int(punto_venta or facturador.punto_venta)
+    tipo_comprobante = int(tipo_comprobante)
+    secuencia = (facturador.tenant_id, facturador.id, punto_venta, tipo_comprobante)
+
+    # CAEs propios que aún no llegaron a la factura no deben confundirse con externos.
+    if aplicar_autorizaciones_pendientes(tenant_id):
+        db.session.commit()
+
+    mayor_conocido = db.session.query(db.func.max(Factura.numero_comprobante)).filter(
+        Factura.tenant_id == tenant_id,
+        Factura.facturador_id == facturador.id,
+        Factura.punto_venta == punto_venta,
+        Factura.tipo_comprobante == tipo_comprobante,
+    ).scalar() or 0
+
+    cert, key = get_facturador_credentials(facturador)
+    client = ArcaClient(cuit=facturador.cuit, cert=cert, key=key, ambiente=facturador.ambiente)
+    ultimo = int(client.fe_comp_ultimo_autorizado(punto_venta=punto_venta, tipo_cbte=tipo_comprobante) or 0)
+
+    limite = max(1, int(current_app.config.get('SINCRONIZACION_MAX_COMPROBANTES', DEFAULT_MAX_SINCRONIZACION)))
+    huecos = [n for n in _huecos_locales(*secuencia, limite=limite + 1) if n <= ultimo]
+    en_curso = {
+        int(numero) for (numero,) in db.session.query(FacturaEmisionEnCurso.numero_comprobante).join(
+            Factura, Factura.id == FacturaEmisionEnCurso.factura_id
+        ).filter(
+            FacturaEmisionEnCurso.tenant_id == tenant_id,
+            Factura.facturador_id == facturador.id,
+            FacturaEmisionEnCurso.punto_venta == punto_venta,
+            FacturaEmisionEnCurso.tipo_comprobante == tipo_comprobante,
+        ).all()
+    }
+    candidatos = [
+        n for n in huecos + list(range(int(mayor_conocido) + 1, ultimo + 1))
+        if n not in en_curso
+    ]
+    numeros = candidatos[:limite]
+
+    total = len(numeros)
+    processed = 0
+    progress = ProgressReporter(self, total)
+    concurrencia = max(1, int(current_app.config.get(
+        'RECONCILIACION_CONCURRENCIA_POR_CUIT', DEFAULT_CONCURRENCIA_POR_CUIT
+    )))
+
+    encontrados = {}
+    no_encontrados = []
+    errores = []
+
+    with ThreadPoolExecutor(max_workers=concurrencia) as executor:
+        futures = [
+            executor.submit(_consultar, client, {
+                'tipo_comprobante': tipo_comprobante,
+                'punto_venta': punto_venta,
+                'numero_comprobante': numero,
+            })
+            for numero in numeros
+        ]
+        for future in as_completed(futures):
+            local, arca, error = future.result()
+            numero = local['numero_comprobante']
+            processed += 1
+
+            if error:
+                errores.append({'numero_comprobante': numero, 'error': error})
+            elif not isinstance(arca, dict) or not arca.get('encontrado') or not arca.get('cae'):
+                no_encontrados.append(numero)
+            elif not _parse_any_date(arca.get('fecha_cbte')):
+                errores.append({'numero_comprobante': numero, 'error': 'ARCA no informó la fecha del comprobante'})
+            else:
+                encontrados[numero] = arca
+
+            progress.update(processed)
+
+    # Con la secuencia bloqueada ningún procesar_lote obtiene CAEs nuevos del
+    # facturador hasta el commit: lo que ya obtuvo está en el journal o en curso.
+    _lock_facturador_sequence(tenant_id=facturador.tenant_id, facturador_id=facturador.id)
+    propios = _numeros_propios(*secuencia, encontrados)
+    for numero in propios:
+        encontrados.pop(numero, None)
+
+    receptores, conflictos = _resolver_receptores(
+        facturador.tenant_id,
+        {_documento(arca) for arca in encontrados.values()},
+    )
+    for numero, arca in list(encontrados.items()):
+        if _documento(arca) in conflictos:
+            errores.append({'numero_comprobante': numero, 'error': conflictos[_documento(arca)]})
+            del encontrados[numero]
+
+    importados = sorted(encontrados.items())
+    rows = [
+        _factura_externa_row(facturador.tenant_id, facturador.id, numero, arca, receptores[_documento(arca)])
+        for numero, arca in importados
+    ]
+    if rows:
+        db.session.execute(db.insert(Factura), rows)
+        db.session.execute(db.insert(FacturaArcaIntercambio), [
+            fila_intercambio(
+                facturador.tenant_id,
+                row['id'],
+                None,
+                'FECompConsultar',
+                'autorizado',
+                request={'tipo_cbte': tipo_comprobante, 'punto_venta': row['punto_venta'], 'numero': numero},
+                response=_to_json_safe(arca),
+            )
+            for row, (numero, arca) in zip(rows, importados)
+        ])
+    db.session.commit()
+
+    logger.info(
+        'Importación externa facturador=%s pv=%s tipo=%s: %s importados de %s consultados',
+        facturador.id, punto_venta, tipo_comprobante, len(rows), total,
+    )
+
+    return {
+        'status': 'completed',
+        'processed': processed,
+        'total': total,
+        'importados': len(rows),
+        'mayor_conocido': int(mayor_conocido),
+        'ultimo_autorizado': ultimo,
+        'huecos': len(huecos),
+        'pendientes': len(candidatos) - total,
+        'no_encontrados': sorted(no_encontrados),
+        'errores': sorted(errores, key=lambda e: e['numero_comprobante']),
+    }
@@ -2,11 +2,17 @@ from functools import wraps
 from uuid import UUID
 from flask import g, jsonify
 from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from ..extensions import db
 from ..models import Usuario
+from ..services.auth_cache import cache_user, get_cached_user
 
 
 def _load_user():
-    """Carga usuario desde JWT y lo setea en g. Retorna (usuario, error_response)."""
+    """Carga usuario desde JWT y lo setea en g. Retorna (usuario, error_response).
+
+    ``g.current_user`` es un ``CachedUser`` (snapshot de solo lectura); los
+    handlers que necesiten modificar el usuario deben cargar el modelo.
+    """
     verify_jwt_in_request()
 
     user_id = get_jwt_identity()
@@ -15,10 +21,12 @@ def _load_user():
     except (TypeError, ValueError):
         return None, (jsonify({'error': 'Token inválido'}), 401)
 
-    usuario = Usuario.query.get(user_id)
-
-    if not usuario:
-        return None, (jsonify({'error': 'Usuario no encontrado'}), 404)
+    usuario = get_cached_user(user_id)
+    if usuario is None:
+        db_usuario = db.session.get(Usuario, user_id)
+        if not db_usuario:
+            return None, (jsonify({'error': 'Usuario no encontrado'}), 404)
+        usuario = cache_user(db_usuario)
 
     if not usuario.activo:
         return None, (jsonify({'error': 'Usuario desactivado'}), 403)
@@ -73,9 +81,8 @@ def permission_required(*permissions):
             if error:
                 return error
 
-            from ..services.permissions import has_permission
             for perm in permissions:
-                if not has_permission(usuario.rol, perm):
+                if not usuario.has_permission(perm):
                     return jsonify({'error': 'Permiso insuficiente'}), 403
 
             return f(*args, **kwargs)
@@ -0,0 +1,70 @@
+"""Render de comprobantes: HTML, PDF y ZIP de lote."""
+
+import time
+import uuid
+
+import pytest
+
+from app.models import DownloadArtifact, Factura
+from app.services.comprobante_renderer import render_comprobante_html
+from app.tasks.downloads import generar_comprobantes_zip_lote
+
+
+class _SilentProgress:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def update(self, *args, **kwargs):
+        return False
+
+
+def test_render_comprobante_html(sembrar, bench_n, registrar):
+    lote = sembrar(bench_n, estado='autorizado')
+    facturas = Factura.query.filter_by(lote_id=lote.id).all()
+
+    inicio = time.perf_counter()
+    total_bytes = sum(len(render_comprobante_html(factura)) for factura in facturas)
+    segundos = time.perf_counter() - inicio
+
+    registrar('render_comprobante_html', len(facturas), segundos, kb_por_unidad=round(total_bytes / 1024 / len(facturas), 1))
+
+
+def test_html_to_pdf_bytes(request, sembrar, pdf_backend, registrar):
+    if pdf_backend != 'chromium':
+        pytest.skip('Chromium de Playwright no está instalado')
+
+    from app.services.comprobante_pdf import html_to_pdf_bytes
+
+    cantidad = request.config.getoption('--bench-pdf-n')
+    lote = sembrar(cantidad, estado='autorizado')
+    htmls = [render_comprobante_html(factura) for factura in Factura.query.filter_by(lote_id=lote.id)]
+
+    inicio = time.perf_counter()
+    total_bytes = sum(len(html_to_pdf_bytes(html)) for html in htmls)
+    segundos = time.perf_counter() - inicio
+
+    registrar('html_to_pdf_bytes', len(htmls), segundos, kb_por_unidad=round(total_bytes / 1024 / len(htmls), 1))
+
+
+def test_generar_comprobantes_zip_lote(sembrar, bench_n, pdf_o_stub, monkeypatch, registrar):
+    monkeypatch.setattr('app.tasks.downloads.ProgressReporter', _SilentProgress)
+    lote = sembrar(bench_n, estado='autorizado')
+    task_id = str(uuid.uuid4())
+
+    generar_comprobantes_zip_lote.push_request(id=task_id)
+    try:
+        inicio = time.perf_counter()
+        result = generar_comprobantes_zip_lote.run(lote.id, lote.tenant_id)
+        segundos = time.perf_counter() - inicio
+    finally:
+        generar_comprobantes_zip_lote.pop_request()
+
+    assert result['processed'] == bench_n
+    artifact = DownloadArtifact.query.filter_by(task_id=task_id).one()
+    registrar(
+        'generar_comprobantes_zip_lote',
+        bench_n,
+        segundos,
+        pdf=pdf_o_stub,
+        zip_mb=round(artifact.size_bytes / 1024 / 1024, 2),
+    )
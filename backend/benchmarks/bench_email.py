@@ -0,0 +1,49 @@
+"""Envío de emails de un lote contra un SMTP local que descarta los mensajes."""
+
+import time
+import uuid
+
+import pytest
+
+from app.models import EmailConfig
+from app.tasks.email import enviar_emails_lote, enviar_factura_email
+
+from .smtp_sink import SmtpSink
+
+
+class _SilentProgress:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def update(self, *args, **kwargs):
+        return False
+
+
+@pytest.fixture
+def smtp_sink():
+    with SmtpSink() as sink:
+        yield sink
+
+
+def test_enviar_emails_lote(sembrar, bench_n, pdf_o_stub, smtp_sink, monkeypatch, registrar):
+    lote = sembrar(bench_n, estado='autorizado', con_email=True)
+    EmailConfig.query.filter_by(tenant_id=lote.tenant_id).update({'smtp_port': smtp_sink.port})
+
+    # Sin worker: cada envío se ejecuta en el momento, sin el countdown entre mensajes.
+    monkeypatch.setattr('app.tasks.email.ProgressReporter', _SilentProgress)
+    monkeypatch.setattr(enviar_factura_email, 'apply_async',
+                        lambda args, **kwargs: enviar_factura_email.run(uuid.UUID(args[0]), lote.tenant_id))
+
+    inicio = time.perf_counter()
+    result = enviar_emails_lote.run(lote.id, lote.tenant_id)
+    segundos = time.perf_counter() - inicio
+
+    assert result['dispatched'] == bench_n
+    assert smtp_sink.mensajes == bench_n
+    registrar(
+        'enviar_emails_lote',
+        bench_n,
+        segundos,
+        pdf=pdf_o_stub,
+        kb_por_mensaje=round(smtp_sink.bytes / 1024 / smtp_sink.mensajes, 1),
+    )
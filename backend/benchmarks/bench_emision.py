@@ -0,0 +1,68 @@
+"""Throughput de ``procesar_lote`` contra el simulador local de ARCA."""
+
+import time
+
+import pytest
+
+from arca_integration.simulador import ConfigSimulador, SimuladorArca, generar_certificado_prueba
+
+from app.models import Factura
+from app.services import parametros_arca
+from app.tasks.facturacion import procesar_lote
+
+from .conftest import CUIT_FACTURADOR
+
+
+class _SilentProgress:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def update(self, *args, **kwargs):
+        return False
+
+
+@pytest.fixture
+def simulador(request, monkeypatch, tmp_path):
+    latencia = request.config.getoption('--bench-latencia-ms')
+    config = ConfigSimulador(latencia_ms=latencia, jitter_ms=latencia / 5, semilla=1)
+    with SimuladorArca(config=config) as sim:
+        monkeypatch.setenv('ARCA_SIMULADOR_URL', sim.base_url)
+        monkeypatch.setenv('ARCA_TA_CACHE_DIR', str(tmp_path / 'ta'))
+        yield sim
+
+
+@pytest.fixture
+def emision_aislada(monkeypatch):
+    """Sin Redis ni Celery: progreso, cache de parámetros y emails quedan en memoria."""
+    despachados = []
+    monkeypatch.setattr('app.tasks.facturacion.ProgressReporter', _SilentProgress)
+    monkeypatch.setattr(parametros_arca, '_redis_get', lambda _key: (None, 0))
+    monkeypatch.setattr(parametros_arca, '_redis_set', lambda *args: None)
+    monkeypatch.setattr('app.tasks.email.enviar_factura_email.apply_async',
+                        lambda *args, **kwargs: despachados.append(kwargs))
+    parametros_arca.invalidar_parametros()
+    return despachados
+
+
+def test_procesar_lote(sembrar, bench_n, simulador, emision_aislada, registrar):
+    lote = sembrar(bench_n, cert=generar_certificado_prueba(CUIT_FACTURADOR))
+
+    inicio = time.perf_counter()
+    result = procesar_lote.run(lote.id, lote.tenant_id)
+    segundos = time.perf_counter() - inicio
+
+    assert result['ok'] == bench_n
+    assert Factura.query.filter_by(lote_id=lote.id, estado='autorizado').count() == bench_n
+
+    contadores = simulador.estado.contadores
+    llamadas_soap = sum(
+        cantidad for operacion, cantidad in contadores.items()
+        if ':' not in operacion and operacion != 'autorizados'
+    )
+    registrar(
+        'procesar_lote',
+        bench_n,
+        segundos,
+        llamadas_soap=llamadas_soap,
+        soap_por_factura=round(llamadas_soap / bench_n, 3),
+    )
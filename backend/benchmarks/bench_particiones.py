@@ -0,0 +1,199 @@
+"""Pruning de particiones de ``factura`` en las consultas del dashboard y el listado.
+
+Necesita un PostgreSQL 15+ con las migraciones aplicadas (``flask db
+upgrade``), indicado en ``BENCHMARK_PARTICIONES_URL``; sin eso se saltea.
+Siembra ``--bench-particiones-filas`` facturas (default 20 millones, con un
+ítem cada una) repartidas en cinco años para un tenant ``bench-particiones``.
+La siembra se hace una vez: si el tenant ya tiene esa cantidad se reutiliza.
+
+Para cada consulta se registra qué particiones recorre el plan y la mediana
+de cinco ejecuciones.
+"""
+
+import os
+import statistics
+import time
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import func, text
+
+from app import create_app
+from app.api.dashboard import _next_month, _sub_months
+from app.extensions import db
+from app.models import Factura, Facturador, Receptor, Tenant
+from app.services.particiones import factura_particionada, particiones_consultadas
+
+from .conftest import BenchmarkConfig, CUIT_FACTURADOR
+
+URL = os.environ.get('BENCHMARK_PARTICIONES_URL')
+SLUG = 'bench-particiones'
+DIAS = 5 * 365
+TANDA = 1_000_000
+
+pytestmark = pytest.mark.skipif(not URL, reason='BENCHMARK_PARTICIONES_URL no está definida')
+
+SEMBRAR_FACTURAS = text("""
+    INSERT INTO factura (id, tenant_id, facturador_id, receptor_id, tipo_comprobante, concepto, punto_venta,
+                         numero_comprobante, fecha_emision, importe_neto, importe_iva, importe_total,
+                         moneda, cotizacion, estado, origen, email_enviado, created_at)
+    SELECT gen_random_uuid(), :tenant_id, :facturador_id,
+           (CAST(:receptores AS uuid[]))[1 + g % :n_receptores],
+           6, 1, 1, g, CURRENT_DATE - (g % :dias),
+           1000, 210, 1210, 'PES', 1,
+           CASE g % 10 WHEN 0 THEN 'error' WHEN 1 THEN 'pendiente' ELSE 'autorizado' END,
+           'sistema', false, now()
+    FROM generate_series(:desde, :hasta) AS g
+""")
+SEMBRAR_ITEMS = text("""
+    INSERT INTO factura_item (id, factura_id, fecha_emision, descripcion, cantidad, precio_unitario,
+                              alicuota_iva_id, importe_iva, importe_neto, subtotal, orden)
+    SELECT gen_random_uuid(), f.id, f.fecha_emision, 'Servicio mensual', 1, 1000, 5, 210, 1000, 1210, 0
+    FROM factura f
+    WHERE f.tenant_id = :tenant_id AND f.numero_comprobante BETWEEN :desde AND :hasta
+""")
+
+
+class ParticionesConfig(BenchmarkConfig):
+    SQLALCHEMY_DATABASE_URI = URL
+
+
+@pytest.fixture(scope='module')
+def base_particionada(request):
+    app = create_app(ParticionesConfig)
+    with app.app_context():
+        if not factura_particionada():
+            pytest.skip('factura no está particionada: aplicar las migraciones en esa base')
+        filas = request.config.getoption('--bench-particiones-filas')
+        yield _sembrar(filas)
+        db.session.remove()
+
+
+def _sembrar(filas: int) -> Tenant:
+    tenant = Tenant.query.filter_by(slug=SLUG).first()
+    if tenant is None:
+        tenant = Tenant(nombre='Benchmark particiones', slug=SLUG, activo=True)
+        db.session.add(tenant)
+        db.session.flush()
+        db.session.add(Facturador(
+            tenant_id=tenant.id, cuit=CUIT_FACTURADOR, razon_social='Benchmark SA', punto_venta=1,
+            condicion_iva='IVA Responsable Inscripto', fecha_inicio_actividades=date(2020, 1, 1),
+            ambiente='testing', activo=True,
+        ))
+        db.session.add_all(
+            Receptor(tenant_id=tenant.id, doc_tipo=80, doc_nro=f'30{index:08d}1', razon_social=f'Cliente {index} SA',
+                     condicion_iva_id=1, activo=True)
+            for index in range(1000)
+        )
+        db.session.commit()
+
+    existentes = Factura.query.filter_by(tenant_id=tenant.id).count()
+    if existentes >= filas:
+        return tenant
+
+    facturador = Facturador.query.filter_by(tenant_id=tenant.id).one()
+    receptores = [str(r.id) for r in Receptor.query.filter_by(tenant_id=tenant.id)]
+    for desde in range(existentes + 1, filas + 1, TANDA):
+        params = {
+            'tenant_id': str(tenant.id),
+            'facturador_id': str(facturador.id),
+            'receptores': receptores,
+            'n_receptores': len(receptores),
+            'dias': DIAS,
+            'desde': desde,
+            'hasta': min(desde + TANDA - 1, filas),
+        }
+        db.session.execute(SEMBRAR_FACTURAS, params)
+        db.session.execute(SEMBRAR_ITEMS, params)
+        db.session.commit()
+
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        conn.execute(text('ANALYZE factura'))
+        conn.execute(text('ANALYZE factura_item'))
+    return tenant
+
+
+def _consultas(tenant_id) -> dict:
+    """Mismas formas que ``api/dashboard.get_stats`` y ``api/facturas.list_facturas``."""
+    hoy = date.today()
+    inicio_mes = hoy.replace(day=1)
+    fin_mes = _next_month(inicio_mes)
+    inicio_12 = _sub_months(inicio_mes, 11)
+    hace_30_dias = hoy - timedelta(days=30)
+
+    del_mes = Factura.query.filter(
+        Factura.tenant_id == tenant_id,
+        Factura.fecha_emision >= inicio_mes,
+        Factura.fecha_emision < fin_mes,
+    )
+    return {
+        'dashboard_facturas_mes': (
+            del_mes.with_entities(func.count(Factura.id)),
+            {inicio_mes},
+        ),
+        'dashboard_total_mes': (
+            del_mes.with_entities(func.sum(Factura.importe_total)).filter(Factura.estado == 'autorizado'),
+            {inicio_mes},
+        ),
+        'dashboard_12_meses': (
+            db.session.query(
+                func.extract('year', Factura.fecha_emision).label('year'),
+                func.extract('month', Factura.fecha_emision).label('month'),
+                func.count(Factura.id),
+                func.coalesce(func.sum(Factura.importe_total), 0),
+            ).filter(
+                Factura.tenant_id == tenant_id,
+                Factura.estado == 'autorizado',
+                Factura.fecha_emision >= inicio_12,
+                Factura.fecha_emision < fin_mes,
+            ).group_by('year', 'month'),
+            {_sub_months(inicio_mes, n) for n in range(12)},
+        ),
+        'listado_rango_fechas': (
+            Factura.query.filter_by(tenant_id=tenant_id).filter(
+                Factura.fecha_emision >= hace_30_dias.isoformat(),
+                Factura.fecha_emision <= hoy.isoformat(),
+            ).order_by(
+                Factura.fecha_emision.desc(),
+                Factura.numero_comprobante.desc().nullslast(),
+            ).limit(50),
+            {hace_30_dias.replace(day=1), inicio_mes},
+        ),
+    }
+
+
+def _mediana_ms(consulta, repeticiones: int = 5) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        consulta.all()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos)
+
+
+@pytest.mark.parametrize('nombre', [
+    'dashboard_facturas_mes', 'dashboard_total_mes', 'dashboard_12_meses', 'listado_rango_fechas',
+])
+def test_consultas_podan_particiones(base_particionada, nombre, registrar):
+    consulta, meses = _consultas(base_particionada.id)[nombre]
+    esperadas = {f'factura_p{mes:%Y%m}' for mes in meses}
+
+    recorridas = particiones_consultadas(consulta)
+
+    assert recorridas and set(recorridas) <= esperadas, recorridas
+    total = db.session.execute(text(
+        "SELECT count(*) FROM pg_inherits WHERE inhparent = 'factura'::regclass"
+    )).scalar()
+    registrar(f'particiones_{nombre}', 1, _mediana_ms(consulta),
+              particiones_recorridas=len(recorridas), particiones_totales=total)
+
+
+def test_listado_sin_fechas(base_particionada, registrar):
+    """Listado por defecto: sin fechas no hay pruning; se registra como referencia."""
+    consulta = Factura.query.filter_by(tenant_id=base_particionada.id).order_by(
+        Factura.fecha_emision.desc(),
+        Factura.numero_comprobante.desc().nullslast(),
+    ).limit(50)
+
+    registrar('particiones_listado_sin_fechas', 1, _mediana_ms(consulta),
+              particiones_recorridas=len(particiones_consultadas(consulta)))
@@ -0,0 +1,233 @@
+"""Fixtures y recolección de métricas de los benchmarks.
+
+Se corren con ``python scripts/benchmark_report.py`` (o
+``python -m pytest benchmarks -o python_files='bench_*.py' --bench-json=...``).
+Cada benchmark registra una métrica con ``registrar`` y al final de la sesión
+se escribe un JSON comparable entre commits.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from app import create_app
+from app.config import TestingConfig
+from app.extensions import db as _db
+from app.models import EmailConfig, Facturador, Factura, FacturaItem, Lote, Receptor, Tenant
+from app.services.encryption import encrypt_certificate
+
+CUIT_FACTURADOR = '20123456786'
+
+_resultados: list[dict] = []
+_contexto: dict = {}
+
+
+def pytest_addoption(parser):
+    grupo = parser.getgroup('benchmarks')
+    grupo.addoption('--bench-n', type=int, default=int(os.environ.get('BENCHMARK_N', '200')),
+                    help='facturas por benchmark')
+    grupo.addoption('--bench-pdf-n', type=int, default=int(os.environ.get('BENCHMARK_PDF_N', '20')),
+                    help='PDFs a renderizar en el benchmark de html_to_pdf_bytes')
+    grupo.addoption('--bench-latencia-ms', type=float, default=float(os.environ.get('BENCHMARK_LATENCIA_MS', '0')),
+                    help='latencia media del simulador ARCA')
+    grupo.addoption('--bench-particiones-filas', type=int,
+                    default=int(os.environ.get('BENCHMARK_PARTICIONES_FILAS', '20000000')),
+                    help='facturas a sembrar en el benchmark de particiones (PostgreSQL)')
+    grupo.addoption('--bench-json', default=os.environ.get('BENCHMARK_JSON'),
+                    help='archivo donde escribir los resultados')
+
+
+class BenchmarkConfig(TestingConfig):
+    SQLALCHEMY_DATABASE_URI = os.environ.get('BENCHMARK_DATABASE_URL', 'sqlite:///:memory:')
+
+
+@pytest.fixture(scope='session')
+def app():
+    return create_app(BenchmarkConfig)
+
+
+@pytest.fixture
+def db(app):
+    with app.app_context():
+        _db.create_all()
+        yield _db
+        _db.session.rollback()
+        _db.drop_all()
+
+
+@pytest.fixture(scope='session')
+def bench_n(request) -> int:
+    return request.config.getoption('--bench-n')
+
+
+@pytest.fixture(scope='session')
+def pdf_backend(app) -> str:
+    """'chromium' si Playwright puede generar PDFs; si no, 'stub'."""
+    from app.services.comprobante_pdf import html_to_pdf_bytes
+
+    try:
+        html_to_pdf_bytes('<html><body>ok</body></html>')
+    except Exception:  # Playwright sin navegador instalado.
+        backend = 'stub'
+    else:
+        backend = 'chromium'
+    _contexto['pdf'] = backend
+    return backend
+
+
+@pytest.fixture
+def pdf_o_stub(pdf_backend, monkeypatch):
+    """Con 'stub', reemplaza ``html_to_pdf_bytes`` por un PDF fijo para medir el resto del flujo."""
+    if pdf_backend == 'stub':
+        pdf = b'%PDF-1.4\n' + os.urandom(48 * 1024) + b'\n%%EOF\n'
+        monkeypatch.setattr('app.services.comprobante_pdf.html_to_pdf_bytes', lambda _html: pdf)
+    return pdf_backend
+
+
+@pytest.fixture
+def registrar(request):
+    def _registrar(nombre: str, unidades: int, segundos: float, **extra) -> dict:
+        metrica = {
+            'benchmark': nombre,
+            'unidades': unidades,
+            'segundos': round(segundos, 4),
+            'por_segundo': round(unidades / segundos, 2) if segundos else None,
+            'ms_por_unidad': round(segundos * 1000 / unidades, 3) if unidades else None,
+            **extra,
+        }
+        _resultados.append(metrica)
+        return metrica
+
+    return _registrar
+
+
+@pytest.fixture
+def sembrar(db):
+    """Crea tenant, facturador, receptores y un lote con ``n`` facturas."""
+
+    def _sembrar(n: int, estado: str = 'pendiente', con_email: bool = False, cert=None) -> Lote:
+        tenant = Tenant(nombre='Benchmark', slug=f'bench-{uuid.uuid4().hex[:8]}', activo=True)
+        db.session.add(tenant)
+        db.session.flush()
+
+        facturador = Facturador(
+            tenant_id=tenant.id,
+            cuit=CUIT_FACTURADOR,
+            razon_social='Benchmark SA',
+            punto_venta=1,
+            condicion_iva='IVA Responsable Inscripto',
+            ingresos_brutos='901-123456-7',
+            fecha_inicio_actividades=date(2020, 1, 1),
+            ambiente='testing',
+            activo=True,
+        )
+        if cert:
+            facturador.cert_encrypted = encrypt_certificate(cert[0])
+            facturador.key_encrypted = encrypt_certificate(cert[1])
+        db.session.add(facturador)
+
+        receptores = [
+            Receptor(
+                tenant_id=tenant.id,
+                doc_tipo=80,
+                doc_nro=f'30{index:08d}1',
+                razon_social=f'Cliente {index} SA',
+                condicion_iva_id=1,
+                direccion=f'Calle {index}',
+                email=f'cliente{index}@bench.test' if con_email else None,
+                activo=True,
+            )
+            for index in range(max(1, n // 10))
+        ]
+        db.session.add_all(receptores)
+
+        lote = Lote(tenant_id=tenant.id, etiqueta='Lote benchmark', tipo='factura', estado='pendiente',
+                    total_facturas=n)
+        db.session.add(lote)
+        db.session.flush()
+
+        hoy = date.today()
+        for index in range(n):
+            factura = Factura(
+                tenant_id=tenant.id,
+                lote_id=lote.id,
+                facturador_id=facturador.id,
+                receptor_id=receptores[index % len(receptores)].id,
+                tipo_comprobante=1,
+                concepto=1,
+                punto_venta=1,
+                fecha_emision=hoy,
+                importe_neto=Decimal('1000.00'),
+                importe_iva=Decimal('210.00'),
+                importe_total=Decimal('1210.00'),
+                moneda='PES',
+                cotizacion=Decimal('1'),
+                estado=estado,
+            )
+            if estado == 'autorizado':
+                factura.numero_comprobante = index + 1
+                factura.cae = f'{70000000000000 + index}'
+                factura.cae_vencimiento = hoy
+            factura.items.append(FacturaItem(
+                descripcion='Servicio mensual',
+                cantidad=Decimal('1'),
+                precio_unitario=Decimal('1000.00'),
+                alicuota_iva_id=5,
+                importe_neto=Decimal('1000.00'),
+                importe_iva=Decimal('210.00'),
+                subtotal=Decimal('1210.00'),
+            ))
+            db.session.add(factura)
+
+        if con_email:
+            db.session.add(EmailConfig(
+                tenant_id=tenant.id,
+                smtp_host='127.0.0.1',
+                smtp_port=25,
+                smtp_use_tls=False,
+                smtp_user='bench',
+                smtp_password_encrypted=encrypt_certificate(b'bench'),
+                from_email='facturas@bench.test',
+                email_habilitado=True,
+            ))
+
+        db.session.commit()
+        return lote
+
+    return _sembrar
+
+
+def _commit_actual() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def pytest_sessionfinish(session, exitstatus):
+    destino = session.config.getoption('--bench-json')
+    if not destino or not _resultados:
+        return
+
+    reporte = {
+        'commit': _commit_actual(),
+        'fecha': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'base_de_datos': BenchmarkConfig.SQLALCHEMY_DATABASE_URI.split(':', 1)[0],
+        'n': session.config.getoption('--bench-n'),
+        'latencia_arca_ms': session.config.getoption('--bench-latencia-ms'),
+        'pdf': _contexto.get('pdf'),
+        'resultados': _resultados,
+    }
+    Path(destino).write_text(json.dumps(reporte, indent=2, ensure_ascii=False), encoding='utf-8')
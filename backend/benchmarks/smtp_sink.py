@@ -0,0 +1,71 @@
+"""Servidor SMTP mínimo que acepta y descarta mensajes (para benchmarks)."""
+
+import socketserver
+import threading
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    def _responder(self, linea: str) -> None:
+        self.wfile.write(f'{linea}\r\n'.encode('ascii'))
+
+    def handle(self):
+        self._responder('220 sink ESMTP')
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            comando = raw.decode('utf-8', errors='replace').strip().upper()
+
+            if comando.startswith(('EHLO', 'HELO')):
+                self.wfile.write(b'250-sink\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n')
+            elif comando.startswith('AUTH'):
+                self._responder('235 2.7.0 Authentication successful')
+            elif comando.startswith(('MAIL', 'RCPT', 'RSET', 'NOOP')):
+                self._responder('250 OK')
+            elif comando == 'DATA':
+                self._responder('354 End data with <CR><LF>.<CR><LF>')
+                tamano = 0
+                while True:
+                    linea = self.rfile.readline()
+                    if not linea or linea in (b'.\r\n', b'.\n'):
+                        break
+                    tamano += len(linea)
+                self.server.registrar(tamano)
+                self._responder('250 OK queued')
+            elif comando == 'QUIT':
+                self._responder('221 Bye')
+                return
+            else:
+                self._responder('502 Command not implemented')
+
+
+class SmtpSink(socketserver.ThreadingTCPServer):
+    """``with SmtpSink() as sink: sink.port`` — cuenta mensajes y bytes recibidos."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        super().__init__((host, port), _SmtpHandler)
+        self.mensajes = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def registrar(self, tamano: int) -> None:
+        with self._lock:
+            self.mensajes += 1
+            self.bytes += tamano
+
+    def __enter__(self) -> 'SmtpSink':
+        self._thread = threading.Thread(target=self.serve_forever, name='smtp-sink', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+        self.server_close()
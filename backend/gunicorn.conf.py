@@ -0,0 +1,19 @@
+"""Hooks de gunicorn (se carga automáticamente desde el directorio de trabajo)."""
+
+import os
+import shutil
+
+
+def on_starting(server):
+    # Métricas Prometheus multiproceso: empezar con el directorio vacío.
+    directorio = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directorio:
+        shutil.rmtree(directorio, ignore_errors=True)
+        os.makedirs(directorio, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,28 @@
+"""add origen to factura
+
+Revision ID: a2d9c4f7e1b5
+Revises: f1c4e8a2b6d3
+Create Date: 2026-10-19 14:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from migrations.helpers import column_exists
+
+
+revision = 'a2d9c4f7e1b5'
+down_revision = 'f1c4e8a2b6d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not column_exists('factura', 'origen'):
+        op.add_column(
+            'factura',
+            sa.Column('origen', sa.String(length=20), nullable=False, server_default='sistema'),
+        )
+
+
+def downgrade():
+    if column_exists('factura', 'origen'):
+        op.drop_column('factura', 'origen')
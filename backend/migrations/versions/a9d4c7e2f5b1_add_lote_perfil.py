@@ -0,0 +1,25 @@
+"""add lote.perfil
+
+Revision ID: a9d4c7e2f5b1
+Revises: c4f8a2e6d1b3
+Create Date: 2026-10-19 20:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from migrations.helpers import column_exists
+
+
+revision = 'a9d4c7e2f5b1'
+down_revision = 'c4f8a2e6d1b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not column_exists('lote', 'perfil'):
+        op.add_column('lote', sa.Column('perfil', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    if column_exists('lote', 'perfil'):
+        op.drop_column('lote', 'perfil')
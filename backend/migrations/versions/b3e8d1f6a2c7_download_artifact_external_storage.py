@@ -0,0 +1,39 @@
+"""download_artifact: archivos en almacenamiento externo
+
+Revision ID: b3e8d1f6a2c7
+Revises: a9d4c7e2f5b1
+Create Date: 2026-10-19 21:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from migrations.helpers import column_exists
+
+
+revision = 'b3e8d1f6a2c7'
+down_revision = 'a9d4c7e2f5b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not column_exists('download_artifact', 'storage_key'):
+        op.add_column('download_artifact', sa.Column('storage_backend', sa.String(length=20), nullable=True))
+        op.add_column('download_artifact', sa.Column('storage_key', sa.String(length=500), nullable=True))
+        op.add_column('download_artifact', sa.Column('size_bytes', sa.BigInteger(), nullable=True))
+        op.add_column('download_artifact', sa.Column('expires_at', sa.DateTime(), nullable=True))
+        op.create_index('ix_download_artifact_expires_at', 'download_artifact', ['expires_at'], unique=False)
+
+    op.alter_column('download_artifact', 'file_data', existing_type=sa.LargeBinary(), nullable=True)
+
+
+def downgrade():
+    # Los archivos en almacenamiento externo no vuelven a la base.
+    op.execute('DELETE FROM download_artifact WHERE file_data IS NULL')
+    op.alter_column('download_artifact', 'file_data', existing_type=sa.LargeBinary(), nullable=False)
+
+    if column_exists('download_artifact', 'storage_key'):
+        op.drop_index('ix_download_artifact_expires_at', table_name='download_artifact')
+        op.drop_column('download_artifact', 'expires_at')
+        op.drop_column('download_artifact', 'size_bytes')
+        op.drop_column('download_artifact', 'storage_key')
+        op.drop_column('download_artifact', 'storage_backend')
@@ -0,0 +1,92 @@
+"""add caea support
+
+Revision ID: b7e3f9a1c2d4
+Revises: a2d9c4f7e1b5
+Create Date: 2026-10-19 16:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from migrations.helpers import column_exists, table_exists
+
+
+revision = 'b7e3f9a1c2d4'
+down_revision = 'a2d9c4f7e1b5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not column_exists('facturador', 'modo_autorizacion'):
+        op.add_column(
+            'facturador',
+            sa.Column('modo_autorizacion', sa.String(length=10), nullable=False, server_default='cae'),
+        )
+
+    if not table_exists('caea'):
+        op.create_table(
+            'caea',
+            sa.Column('id', sa.Uuid(), nullable=False),
+            sa.Column('tenant_id', sa.Uuid(), nullable=False),
+            sa.Column('facturador_id', sa.Uuid(), nullable=False),
+            sa.Column('periodo', sa.Integer(), nullable=False),
+            sa.Column('orden', sa.Integer(), nullable=False),
+            sa.Column('codigo', sa.String(length=20), nullable=False),
+            sa.Column('fch_vig_desde', sa.Date(), nullable=True),
+            sa.Column('fch_vig_hasta', sa.Date(), nullable=True),
+            sa.Column('fch_tope_inf', sa.Date(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['tenant_id'], ['tenant.id']),
+            sa.ForeignKeyConstraint(['facturador_id'], ['facturador.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('facturador_id', 'periodo', 'orden', name='unique_caea_facturador_periodo_orden'),
+        )
+
+    if not table_exists('factura_caea_informe'):
+        op.create_table(
+            'factura_caea_informe',
+            sa.Column('factura_id', sa.Uuid(), nullable=False),
+            sa.Column('tenant_id', sa.Uuid(), nullable=False),
+            sa.Column('facturador_id', sa.Uuid(), nullable=False),
+            sa.Column('caea_id', sa.Uuid(), nullable=False),
+            sa.Column('estado', sa.String(length=20), nullable=False),
+            sa.Column('intentos', sa.Integer(), nullable=False),
+            sa.Column('ultimo_error', sa.Text(), nullable=True),
+            sa.Column('proximo_intento_at', sa.DateTime(), nullable=True),
+            sa.Column('informado_at', sa.DateTime(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['factura_id'], ['factura.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['tenant_id'], ['tenant.id']),
+            sa.ForeignKeyConstraint(['facturador_id'], ['facturador.id']),
+            sa.ForeignKeyConstraint(['caea_id'], ['caea.id']),
+            sa.PrimaryKeyConstraint('factura_id'),
+        )
+        op.create_index(
+            'ix_factura_caea_informe_facturador_estado',
+            'factura_caea_informe',
+            ['facturador_id', 'estado'],
+            unique=False,
+        )
+
+    # Numeración local en modo CAEA: max(numero) por facturador/pv/tipo.
+    op.create_index(
+        'ix_factura_numeracion',
+        'factura',
+        ['facturador_id', 'punto_venta', 'tipo_comprobante', 'numero_comprobante'],
+        unique=False,
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_factura_numeracion', table_name='factura', if_exists=True)
+
+    if table_exists('factura_caea_informe'):
+        op.drop_index('ix_factura_caea_informe_facturador_estado', table_name='factura_caea_informe')
+        op.drop_table('factura_caea_informe')
+
+    if table_exists('caea'):
+        op.drop_table('caea')
+
+    if column_exists('facturador', 'modo_autorizacion'):
+        op.drop_column('facturador', 'modo_autorizacion')
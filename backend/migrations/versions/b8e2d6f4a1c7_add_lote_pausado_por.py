@@ -0,0 +1,25 @@
+"""add lote.pausado_por
+
+Revision ID: b8e2d6f4a1c7
+Revises: f1c9e4a7b3d6
+Create Date: 2026-10-19 23:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from migrations.helpers import column_exists
+
+
+revision = 'b8e2d6f4a1c7'
+down_revision = 'f1c9e4a7b3d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not column_exists('lote', 'pausado_por'):
+        op.add_column('lote', sa.Column('pausado_por', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    if column_exists('lote', 'pausado_por'):
+        op.drop_column('lote', 'pausado_por')
@@ -0,0 +1,37 @@
+"""add padron_cache
+
+Revision ID: c4f8a2e6d1b3
+Revises: b7e3f9a1c2d4
+Create Date: 2026-10-19 18:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from migrations.helpers import table_exists
+
+
+revision = 'c4f8a2e6d1b3'
+down_revision = 'b7e3f9a1c2d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if table_exists('padron_cache'):
+        return
+
+    op.create_table(
+        'padron_cache',
+        sa.Column('cuit', sa.String(length=11), nullable=False),
+        sa.Column('ambiente', sa.String(length=20), nullable=False),
+        sa.Column('encontrado', sa.Boolean(), nullable=False),
+        sa.Column('data', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('consultado_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('cuit', 'ambiente'),
+    )
+
+
+def downgrade():
+    if table_exists('padron_cache'):
+        op.drop_table('padron_cache')
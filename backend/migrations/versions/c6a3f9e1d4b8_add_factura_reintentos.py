@@ -0,0 +1,30 @@
+"""add factura.reintentos y factura.proximo_reintento
+
+Revision ID: c6a3f9e1d4b8
+Revises: b8e2d6f4a1c7
+Create Date: 2026-10-20 10:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from migrations.helpers import column_exists
+
+
+revision = 'c6a3f9e1d4b8'
+down_revision = 'b8e2d6f4a1c7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # En PostgreSQL 11+ el default constante no reescribe la tabla.
+    if not column_exists('factura', 'reintentos'):
+        op.add_column('factura', sa.Column('reintentos', sa.Integer(), nullable=False, server_default='0'))
+    if not column_exists('factura', 'proximo_reintento'):
+        op.add_column('factura', sa.Column('proximo_reintento', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    if column_exists('factura', 'proximo_reintento'):
+        op.drop_column('factura', 'proximo_reintento')
+    if column_exists('factura', 'reintentos'):
+        op.drop_column('factura', 'reintentos')
@@ -0,0 +1,132 @@
+"""move arca_request, arca_response and comprobante_html to factura_payload
+
+Los datos se copian en tandas de ``FACTURA_PAYLOAD_BATCH_SIZE`` filas
+(default 5000), cada una en su propia transacción, recorriendo ``factura``
+por id. La API puede seguir atendiendo mientras tanto; conviene detener los
+workers (únicos que escriben estos campos) durante el upgrade. Al final se
+bloquea ``factura``, se actualizan las filas ya copiadas que cambiaron después
+de su tanda, se copia lo que haya quedado y se eliminan las columnas.
+
+Revision ID: d7f2a9c4e1b8
+Revises: b3e8d1f6a2c7
+Create Date: 2026-10-19 22:00:00.000000
+"""
+import os
+
+from alembic import op
+import sqlalchemy as sa
+from migrations.helpers import column_exists, table_exists
+
+
+revision = 'd7f2a9c4e1b8'
+down_revision = 'b3e8d1f6a2c7'
+branch_labels = None
+depends_on = None
+
+COLUMNAS = ('arca_request', 'arca_response', 'comprobante_html')
+
+PRIMERA_TANDA = sa.text('SELECT id FROM factura ORDER BY id LIMIT :limite')
+SIGUIENTE_TANDA = sa.text('SELECT id FROM factura WHERE id > :ultimo ORDER BY id LIMIT :limite')
+
+COPIAR_TANDA = sa.text(
+    """
+    INSERT INTO factura_payload (factura_id, arca_request, arca_response, comprobante_html)
+    SELECT f.id, f.arca_request, f.arca_response, f.comprobante_html
+    FROM factura f
+    WHERE f.id IN :ids
+      AND (f.arca_request IS NOT NULL OR f.arca_response IS NOT NULL OR f.comprobante_html IS NOT NULL)
+      AND NOT EXISTS (SELECT 1 FROM factura_payload p WHERE p.factura_id = f.id)
+    """
+).bindparams(sa.bindparam('ids', expanding=True))
+
+# Filas copiadas en una tanda y modificadas después (con ``factura`` bloqueada).
+# JSON no tiene operador de igualdad en PostgreSQL: se compara como texto.
+ACTUALIZAR_COPIADAS_PG = sa.text(
+    """
+    UPDATE factura_payload p SET
+        arca_request = f.arca_request,
+        arca_response = f.arca_response,
+        comprobante_html = f.comprobante_html
+    FROM factura f
+    WHERE f.id = p.factura_id
+      AND (f.arca_request::text IS DISTINCT FROM p.arca_request::text
+           OR f.arca_response::text IS DISTINCT FROM p.arca_response::text
+           OR f.comprobante_html IS DISTINCT FROM p.comprobante_html)
+    """
+)
+
+ACTUALIZAR_COPIADAS = sa.text(
+    """
+    UPDATE factura_payload SET
+        arca_request = (SELECT f.arca_request FROM factura f WHERE f.id = factura_payload.factura_id),
+        arca_response = (SELECT f.arca_response FROM factura f WHERE f.id = factura_payload.factura_id),
+        comprobante_html = (SELECT f.comprobante_html FROM factura f WHERE f.id = factura_payload.factura_id)
+    WHERE EXISTS (SELECT 1 FROM factura f WHERE f.id = factura_payload.factura_id)
+    """
+)
+
+COPIAR_RESTO = sa.text(
+    """
+    INSERT INTO factura_payload (factura_id, arca_request, arca_response, comprobante_html)
+    SELECT f.id, f.arca_request, f.arca_response, f.comprobante_html
+    FROM factura f
+    WHERE (f.arca_request IS NOT NULL OR f.arca_response IS NOT NULL OR f.comprobante_html IS NOT NULL)
+      AND NOT EXISTS (SELECT 1 FROM factura_payload p WHERE p.factura_id = f.id)
+    """
+)
+
+
+def upgrade():
+    if not table_exists('factura_payload'):
+        op.create_table(
+            'factura_payload',
+            sa.Column('factura_id', sa.Uuid(), sa.ForeignKey('factura.id', ondelete='CASCADE'), primary_key=True),
+            sa.Column('arca_request', sa.JSON(), nullable=True),
+            sa.Column('arca_response', sa.JSON(), nullable=True),
+            sa.Column('comprobante_html', sa.Text(), nullable=True),
+        )
+
+    if not all(column_exists('factura', columna) for columna in COLUMNAS):
+        return
+
+    conn = op.get_bind()
+    limite = int(os.environ.get('FACTURA_PAYLOAD_BATCH_SIZE', '5000'))
+    ultimo = None
+    while True:
+        with op.get_context().autocommit_block():
+            if ultimo is None:
+                filas = conn.execute(PRIMERA_TANDA, {'limite': limite})
+            else:
+                filas = conn.execute(SIGUIENTE_TANDA, {'ultimo': ultimo, 'limite': limite})
+            ids = [row[0] for row in filas]
+            if not ids:
+                break
+            conn.execute(COPIAR_TANDA, {'ids': ids})
+        ultimo = ids[-1]
+
+    if conn.dialect.name == 'postgresql':
+        op.execute('LOCK TABLE factura IN SHARE ROW EXCLUSIVE MODE')
+        conn.execute(ACTUALIZAR_COPIADAS_PG)
+    else:
+        conn.execute(ACTUALIZAR_COPIADAS)
+    conn.execute(COPIAR_RESTO)
+    for columna in COLUMNAS:
+        op.drop_column('factura', columna)
+
+
+def downgrade():
+    for columna, tipo in (('arca_request', sa.JSON()), ('arca_response', sa.JSON()), ('comprobante_html', sa.Text())):
+        if not column_exists('factura', columna):
+            op.add_column('factura', sa.Column(columna, tipo, nullable=True))
+
+    if table_exists('factura_payload'):
+        op.execute(
+            """
+            UPDATE factura SET
+                arca_request = (SELECT p.arca_request FROM factura_payload p WHERE p.factura_id = factura.id),
+                arca_response = (SELECT p.arca_response FROM factura_payload p WHERE p.factura_id = factura.id),
+                comprobante_html = (SELECT p.comprobante_html FROM factura_payload p WHERE p.factura_id = factura.id)
+            WHERE EXISTS (SELECT 1 FROM factura_payload p WHERE p.factura_id = factura.id)
+            """
+        )
+        op.drop_table('factura_payload')
@@ -0,0 +1,49 @@
+"""add factura_autorizacion journal
+
+Revision ID: e3b7c1d9a4f2
+Revises: d5a8f2e7c1b9
+Create Date: 2026-10-19 10:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from migrations.helpers import table_exists
+
+
+revision = 'e3b7c1d9a4f2'
+down_revision = 'd5a8f2e7c1b9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if table_exists('factura_autorizacion'):
+        return
+
+    op.create_table(
+        'factura_autorizacion',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('tenant_id', sa.Uuid(), nullable=False),
+        sa.Column('factura_id', sa.Uuid(), nullable=False),
+        sa.Column('lote_id', sa.Uuid(), nullable=True),
+        sa.Column('punto_venta', sa.Integer(), nullable=False),
+        sa.Column('tipo_comprobante', sa.Integer(), nullable=False),
+        sa.Column('numero_comprobante', sa.BigInteger(), nullable=False),
+        sa.Column('cae', sa.String(length=20), nullable=False),
+        sa.Column('cae_vencimiento', sa.Date(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenant.id']),
+        sa.ForeignKeyConstraint(['factura_id'], ['factura.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['lote_id'], ['lote.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_factura_autorizacion_factura', 'factura_autorizacion', ['factura_id'], unique=False)
+    op.create_index('ix_factura_autorizacion_lote', 'factura_autorizacion', ['lote_id'], unique=False)
+
+
+def downgrade():
+    if not table_exists('factura_autorizacion'):
+        return
+
+    op.drop_index('ix_factura_autorizacion_lote', table_name='factura_autorizacion')
+    op.drop_index('ix_factura_autorizacion_factura', table_name='factura_autorizacion')
+    op.drop_table('factura_autorizacion')
@@ -0,0 +1,145 @@
+"""add factura_arca_intercambio (historial ARCA comprimido)
+
+Pasa los ``arca_request``/``arca_response`` existentes de ``factura_payload``
+al historial comprimido, en tandas de ``ARCA_HISTORIAL_BATCH_SIZE`` facturas
+(default 2000) con commit por tanda. ``arca_request`` se conserva en las
+facturas emitidas con CAEA: hace falta para informarlas.
+
+Revision ID: e5c1b7d3f9a2
+Revises: d7f2a9c4e1b8
+Create Date: 2026-10-19 23:00:00.000000
+"""
+import gzip
+import json
+import os
+import uuid
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+from migrations.helpers import table_exists
+
+
+revision = 'e5c1b7d3f9a2'
+down_revision = 'd7f2a9c4e1b8'
+branch_labels = None
+depends_on = None
+
+SELECT_TANDA = """
+    SELECT p.factura_id, f.tenant_id, f.lote_id, f.estado, f.origen, f.error_codigo, f.created_at,
+           p.arca_request, p.arca_response,
+           EXISTS (SELECT 1 FROM factura_caea_informe c WHERE c.factura_id = p.factura_id) AS es_caea
+    FROM factura_payload p
+    JOIN factura f ON f.id = p.factura_id
+    WHERE (p.arca_request IS NOT NULL OR p.arca_response IS NOT NULL) {desde}
+    ORDER BY p.factura_id
+    LIMIT :limite
+"""
+PRIMERA_TANDA = sa.text(SELECT_TANDA.format(desde=''))
+SIGUIENTE_TANDA = sa.text(SELECT_TANDA.format(desde='AND p.factura_id > :ultimo'))
+
+LIMPIAR_PAYLOAD = sa.text(
+    'UPDATE factura_payload SET arca_request = NULL, arca_response = NULL WHERE factura_id IN :ids'
+).bindparams(sa.bindparam('ids', expanding=True))
+LIMPIAR_RESPONSE = sa.text(
+    'UPDATE factura_payload SET arca_response = NULL WHERE factura_id IN :ids'
+).bindparams(sa.bindparam('ids', expanding=True))
+
+
+def _comprimir(valor):
+    if valor is None:
+        return None, 0
+    if isinstance(valor, str):
+        valor = json.loads(valor)
+    crudo = json.dumps(valor, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+    return gzip.compress(crudo, compresslevel=6, mtime=0), len(crudo)
+
+
+def _resultado(estado):
+    return {'autorizado': 'autorizado', 'error': 'rechazado'}.get(estado, 'error')
+
+
+def upgrade():
+    if not table_exists('factura_arca_intercambio'):
+        op.create_table(
+            'factura_arca_intercambio',
+            sa.Column('id', sa.Uuid(), primary_key=True),
+            sa.Column('tenant_id', sa.Uuid(), sa.ForeignKey('tenant.id'), nullable=False),
+            sa.Column('factura_id', sa.Uuid(), sa.ForeignKey('factura.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('lote_id', sa.Uuid(), sa.ForeignKey('lote.id', ondelete='SET NULL'), nullable=True),
+            sa.Column('operacion', sa.String(40), nullable=False),
+            sa.Column('resultado', sa.String(20), nullable=False),
+            sa.Column('error_codigo', sa.String(50), nullable=True),
+            sa.Column('codificacion', sa.String(10), nullable=False, server_default='gzip'),
+            sa.Column('request_data', sa.LargeBinary(), nullable=True),
+            sa.Column('response_data', sa.LargeBinary(), nullable=True),
+            sa.Column('bytes_originales', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+        )
+        op.create_index('ix_factura_arca_intercambio_factura', 'factura_arca_intercambio',
+                        ['factura_id', 'created_at'])
+        op.create_index('ix_factura_arca_intercambio_created', 'factura_arca_intercambio', ['created_at'])
+
+    if not table_exists('factura_payload'):
+        return
+
+    conn = op.get_bind()
+    intercambio = sa.table(
+        'factura_arca_intercambio',
+        *(sa.column(nombre) for nombre in (
+            'id', 'tenant_id', 'factura_id', 'lote_id', 'operacion', 'resultado', 'error_codigo',
+            'codificacion', 'request_data', 'response_data', 'bytes_originales', 'created_at',
+        )),
+    )
+    limite = int(os.environ.get('ARCA_HISTORIAL_BATCH_SIZE', '2000'))
+    ultimo = None
+    while True:
+        with op.get_context().autocommit_block():
+            if ultimo is None:
+                filas = conn.execute(PRIMERA_TANDA, {'limite': limite}).fetchall()
+            else:
+                filas = conn.execute(SIGUIENTE_TANDA, {'ultimo': ultimo, 'limite': limite}).fetchall()
+            if not filas:
+                break
+
+            valores = []
+            for fila in filas:
+                request_data, bytes_request = _comprimir(fila.arca_request)
+                response_data, bytes_response = _comprimir(fila.arca_response)
+                valores.append({
+                    'id': str(uuid.uuid4()),
+                    'tenant_id': fila.tenant_id,
+                    'factura_id': fila.factura_id,
+                    'lote_id': fila.lote_id,
+                    'operacion': 'FECompConsultar' if fila.origen == 'externo' else 'FECAESolicitar',
+                    'resultado': _resultado(fila.estado),
+                    'error_codigo': fila.error_codigo,
+                    'codificacion': 'gzip',
+                    'request_data': request_data,
+                    'response_data': response_data,
+                    'bytes_originales': bytes_request + bytes_response,
+                    'created_at': fila.created_at or datetime.utcnow(),
+                })
+            conn.execute(intercambio.insert(), valores)
+
+            ids = [fila.factura_id for fila in filas if not fila.es_caea]
+            ids_caea = [fila.factura_id for fila in filas if fila.es_caea]
+            if ids:
+                conn.execute(LIMPIAR_PAYLOAD, {'ids': ids})
+            if ids_caea:
+                conn.execute(LIMPIAR_RESPONSE, {'ids': ids_caea})
+        ultimo = filas[-1].factura_id
+
+    with op.get_context().autocommit_block():
+        conn.execute(sa.text(
+            'DELETE FROM factura_payload '
+            'WHERE arca_request IS NULL AND arca_response IS NULL AND comprobante_html IS NULL'
+        ))
+
+
+def downgrade():
+    # El historial no vuelve a factura_payload: sólo se conservaba el último intento.
+    if table_exists('factura_arca_intercambio'):
+        op.drop_index('ix_factura_arca_intercambio_created', table_name='factura_arca_intercambio')
+        op.drop_index('ix_factura_arca_intercambio_factura', table_name='factura_arca_intercambio')
+        op.drop_table('factura_arca_intercambio')
@@ -0,0 +1,45 @@
+"""add factura_emision_en_curso
+
+Revision ID: f1c4e8a2b6d3
+Revises: e3b7c1d9a4f2
+Create Date: 2026-10-19 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from migrations.helpers import table_exists
+
+
+revision = 'f1c4e8a2b6d3'
+down_revision = 'e3b7c1d9a4f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if table_exists('factura_emision_en_curso'):
+        return
+
+    op.create_table(
+        'factura_emision_en_curso',
+        sa.Column('factura_id', sa.Uuid(), nullable=False),
+        sa.Column('tenant_id', sa.Uuid(), nullable=False),
+        sa.Column('lote_id', sa.Uuid(), nullable=True),
+        sa.Column('punto_venta', sa.Integer(), nullable=False),
+        sa.Column('tipo_comprobante', sa.Integer(), nullable=False),
+        sa.Column('numero_comprobante', sa.BigInteger(), nullable=False),
+        sa.Column('request_hash', sa.String(length=64), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['factura_id'], ['factura.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenant.id']),
+        sa.ForeignKeyConstraint(['lote_id'], ['lote.id']),
+        sa.PrimaryKeyConstraint('factura_id'),
+    )
+    op.create_index('ix_factura_emision_en_curso_lote', 'factura_emision_en_curso', ['lote_id'], unique=False)
+
+
+def downgrade():
+    if not table_exists('factura_emision_en_curso'):
+        return
+
+    op.drop_index('ix_factura_emision_en_curso_lote', table_name='factura_emision_en_curso')
+    op.drop_table('factura_emision_en_curso')
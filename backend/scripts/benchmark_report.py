@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Run the throughput benchmarks and render the results as a table / markdown.
+
+Usage:
+    python scripts/benchmark_report.py [--n 200] [--pdf-n 20] [--latencia-ms 0]
+                                       [--json /tmp/benchmark.json]
+                                       [--baseline benchmark-anterior.json]
+                                       [--markdown reporte.md]
+    python scripts/benchmark_report.py --solo-reporte /tmp/benchmark.json --baseline otro.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+LINE_WIDTH = 110
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def hr(char: str = "=") -> None:
+    print(char * LINE_WIDTH)
+
+
+def run_benchmarks(args: argparse.Namespace) -> int:
+    import pytest
+
+    return pytest.main(
+        [
+            str(BACKEND_DIR / "benchmarks"),
+            "-q",
+            "-p", "no:cacheprovider",
+            "-o", "python_files=bench_*.py",
+            "-o", "addopts=",
+            f"--bench-n={args.n}",
+            f"--bench-pdf-n={args.pdf_n}",
+            f"--bench-latencia-ms={args.latencia_ms}",
+            f"--bench-json={args.json}",
+        ]
+    )
+
+
+def load(path: Path) -> dict:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def delta(actual: float | None, anterior: float | None) -> str:
+    if not actual or not anterior:
+        return "-"
+    return f"{(actual - anterior) / anterior * 100:+.1f}%"
+
+
+def build_rows(reporte: dict, baseline: dict | None) -> list[dict]:
+    anteriores = {
+        resultado["benchmark"]: resultado
+        for resultado in (baseline or {}).get("resultados", [])
+    }
+    rows = []
+    for resultado in reporte["resultados"]:
+        anterior = anteriores.get(resultado["benchmark"], {})
+        extras = {
+            key: value
+            for key, value in resultado.items()
+            if key not in {"benchmark", "unidades", "segundos", "por_segundo", "ms_por_unidad"}
+        }
+        rows.append(
+            {
+                "benchmark": resultado["benchmark"],
+                "unidades": resultado["unidades"],
+                "segundos": resultado["segundos"],
+                "por_segundo": resultado["por_segundo"],
+                "ms_por_unidad": resultado["ms_por_unidad"],
+                "delta": delta(resultado["por_segundo"], anterior.get("por_segundo")),
+                "extras": ", ".join(f"{key}={value}" for key, value in extras.items()),
+            }
+        )
+    return rows
+
+
+def encabezado(reporte: dict, baseline: dict | None) -> str:
+    texto = (
+        f"commit {reporte.get('commit') or '?'} | {reporte.get('fecha')} | "
+        f"db {reporte.get('base_de_datos')} | N={reporte.get('n')} | "
+        f"latencia ARCA {reporte.get('latencia_arca_ms')}ms | pdf {reporte.get('pdf') or '-'}"
+    )
+    if baseline:
+        texto += f" | baseline {baseline.get('commit') or '?'}"
+    return texto
+
+
+def print_table(reporte: dict, baseline: dict | None) -> None:
+    rows = build_rows(reporte, baseline)
+
+    hr("=")
+    print(encabezado(reporte, baseline))
+    hr("=")
+    print(f"{'Benchmark':<32} {'N':>6} {'Tiempo':>9} {'Por seg':>10} {'ms/u':>9} {'Δ/seg':>8}  Detalle")
+    hr("-")
+    for row in rows:
+        print(
+            f"{row['benchmark']:<32} {row['unidades']:>6} {row['segundos']:>8.2f}s "
+            f"{row['por_segundo'] or 0:>10.2f} {row['ms_por_unidad'] or 0:>9.2f} {row['delta']:>8}  {row['extras']}"
+        )
+    hr("=")
+
+
+def render_markdown(reporte: dict, baseline: dict | None) -> str:
+    lines = [
+        "# Benchmarks de throughput",
+        "",
+        encabezado(reporte, baseline),
+        "",
+        "| Benchmark | N | Tiempo (s) | Por segundo | ms/unidad | Δ por segundo | Detalle |",
+        "|-----------|--:|-----------:|------------:|----------:|--------------:|---------|",
+    ]
+    for row in build_rows(reporte, baseline):
+        lines.append(
+            f"| {row['benchmark']} | {row['unidades']} | {row['segundos']:.2f} | {row['por_segundo'] or 0:.2f} | "
+            f"{row['ms_por_unidad'] or 0:.2f} | {row['delta']} | {row['extras']} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de throughput del backend")
+    parser.add_argument("--n", type=int, default=200, help="facturas por benchmark")
+    parser.add_argument("--pdf-n", type=int, default=20, help="PDFs para html_to_pdf_bytes")
+    parser.add_argument("--latencia-ms", type=float, default=0.0, help="latencia del simulador ARCA")
+    parser.add_argument("--json", default="/tmp/benchmark.json", help="destino de los resultados")
+    parser.add_argument("--baseline", help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--markdown", help="escribe también el reporte en markdown")
+    parser.add_argument("--solo-reporte", help="no corre los benchmarks; renderiza este JSON")
+    args = parser.parse_args()
+
+    exit_code = 0
+    if args.solo_reporte:
+        json_path = Path(args.solo_reporte)
+    else:
+        exit_code = run_benchmarks(args)
+        json_path = Path(args.json)
+
+    if not json_path.exists():
+        print(f"No se encontró el reporte de benchmarks: {json_path}")
+        return exit_code or 1
+
+    reporte = load(json_path)
+    baseline = None
+    if args.baseline:
+        baseline_path = Path(args.baseline)
+        if baseline_path.exists():
+            baseline = load(baseline_path)
+        else:
+            print(f"No se encontró el baseline: {baseline_path}")
+
+    print_table(reporte, baseline)
+
+    if args.markdown:
+        Path(args.markdown).write_text(render_markdown(reporte, baseline), encoding="utf-8")
+        print(f"Reporte markdown: {args.markdown}")
+
+    return int(exit_code)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
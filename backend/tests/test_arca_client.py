@@ -5,7 +5,10 @@ import tempfile
 import json
 import logging
 
+import pytest
+
 from arca_integration.client import ArcaClient
+from arca_integration.exceptions import ArcaAuthError
 
 
 class _FakeTicket:
@@ -84,6 +87,27 @@ class TestArcaClientTAFallback:
         assert isinstance(ws, _FakeWS)
         assert calls['count'] == 2
 
+    def test_ta_valido_sin_cache_local_falla_sin_esperar(self, monkeypatch):
+        client = ArcaClient(
+            cuit='20123456789',
+            cert=b'cert',
+            key=b'key',
+            ambiente='testing',
+        )
+
+        def _fake_ws(_wsdl, service, enable_logging=False):
+            raise Exception('El CEE ya posee un TA valido para el acceso al WSN solicitado')
+
+        def _sleep(_seconds):
+            raise AssertionError('no debe dormir: procesar_lote reprograma')
+
+        monkeypatch.setattr('arca_integration.client.ArcaWebService', _fake_ws)
+        monkeypatch.setattr(client, '_has_valid_local_ta', lambda _service: False)
+        monkeypatch.setattr(time, 'sleep', _sleep)
+
+        with pytest.raises(ArcaAuthError, match='ya posee un TA valido'):
+            client.wsfe
+
 
 class _FakeResultNode:
     def __init__(self, **kwargs):
@@ -278,3 +302,68 @@ class TestArcaVerboseLogs:
 
         assert isinstance(ws, _FakeWS)
         assert calls['count'] == 2
+
+
+class _FakeWSParametros:
+    token = 'token'
+    sign = 'sign'
+    cuit = '20123456789'
+
+    def __init__(self, results):
+        self.results = results
+        self.calls = []
+
+    def get_type(self, _name):
+        return {}
+
+    def send_request(self, method_name, data):
+        self.calls.append((method_name, data))
+        return self.results[method_name]
+
+
+class TestArcaParametros:
+    def _client(self, results):
+        client = ArcaClient(cuit='20123456789', cert=b'cert', key=b'key', ambiente='testing')
+        client._wsfe = _FakeWSParametros(results)
+        return client
+
+    def test_parses_ptos_venta(self):
+        client = self._client({
+            'FEParamGetPtosVenta': _FakeResultNode(
+                ResultGet=_FakeResultNode(PtoVenta=[
+                    _FakeResultNode(Nro=1, EmisionTipo='CAE - RECE', Bloqueado='N', FchBaja='NULL'),
+                    _FakeResultNode(Nro=2, EmisionTipo='CAEA - RECE', Bloqueado='S', FchBaja='20250101'),
+                ]),
+                Errors=None,
+            ),
+        })
+
+        assert client.fe_param_get_ptos_venta() == [
+            {'nro': 1, 'emision_tipo': 'CAE - RECE', 'bloqueado': False, 'fch_baja': None},
+            {'nro': 2, 'emision_tipo': 'CAEA - RECE', 'bloqueado': True, 'fch_baja': '2025-01-01'},
+        ]
+
+    def test_sin_resultados_returns_empty_list(self):
+        client = self._client({
+            'FEParamGetPtosVenta': _FakeResultNode(
+                ResultGet=None,
+                Errors=_FakeResultNode(Err=[_FakeResultNode(Code=602, Msg='Sin Resultados')]),
+            ),
+        })
+
+        assert client.fe_param_get_ptos_venta() == []
+
+    def test_parses_cotizacion(self):
+        client = self._client({
+            'FEParamGetCotizacion': _FakeResultNode(
+                ResultGet=_FakeResultNode(MonId='DOL', MonCotiz=1050.5, FchCotiz='20260210'),
+                Errors=None,
+            ),
+        })
+
+        assert client.fe_param_get_cotizacion('DOL') == {
+            'mon_id': 'DOL',
+            'mon_cotiz': 1050.5,
+            'fch_cotiz': '2026-02-10',
+        }
+        assert client._wsfe.calls[0][1]['MonId'] == 'DOL'
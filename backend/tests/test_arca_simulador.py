@@ -0,0 +1,181 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from arca_integration import ArcaClient
+from arca_integration.exceptions import ArcaAuthError, ArcaError
+from arca_integration.simulador import ConfigSimulador, SimuladorArca, generar_certificado_prueba
+
+from app import create_app
+from app.config import TestingConfig
+from app.models import Factura, Lote
+from app.services import parametros_arca
+from app.tasks.facturacion import procesar_lote
+
+CUIT = '20123456789'
+
+
+class _SilentProgress:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def update(self, *args, **kwargs):
+        return False
+
+
+@pytest.fixture(scope='module')
+def credenciales():
+    return generar_certificado_prueba(CUIT)
+
+
+@pytest.fixture
+def simulador(monkeypatch, tmp_path):
+    with SimuladorArca(config=ConfigSimulador(latencia_ms=0, jitter_ms=0, timeout_segundos=0.05, semilla=1)) as sim:
+        monkeypatch.setenv('ARCA_SIMULADOR_URL', sim.base_url)
+        monkeypatch.setenv('ARCA_TA_CACHE_DIR', str(tmp_path / 'ta'))
+        yield sim
+
+
+def _request(numero, fecha='20260110'):
+    return {'FeCAEReq': {
+        'FeCabReq': {'CantReg': 1, 'PtoVta': 1, 'CbteTipo': 11},
+        'FeDetReq': {'FECAEDetRequest': [{
+            'Concepto': 1, 'DocTipo': 99, 'DocNro': 0, 'CbteDesde': numero, 'CbteHasta': numero,
+            'CbteFch': fecha, 'ImpTotal': 100.0, 'ImpTotConc': 0.0, 'ImpNeto': 100.0, 'ImpOpEx': 0.0,
+            'ImpTrib': 0.0, 'ImpIVA': 0.0, 'MonId': 'PES', 'MonCotiz': 1.0, 'CondicionIVAReceptorId': 5,
+        }]},
+    }}
+
+
+class TestSimuladorFueraDeProduccion:
+    def test_production_client_ignores_simulator(self, credenciales, monkeypatch, tmp_path):
+        monkeypatch.setenv('ARCA_SIMULADOR_URL', 'http://arca-simulador:8099')
+        monkeypatch.setenv('ARCA_TA_CACHE_DIR', str(tmp_path / 'ta'))
+
+        assert ArcaClient(CUIT, *credenciales, ambiente='testing').simulador_url == 'http://arca-simulador:8099'
+        assert ArcaClient(CUIT, *credenciales, ambiente='production').simulador_url is None
+        monkeypatch.setenv('FLASK_ENV', 'production')
+        assert ArcaClient(CUIT, *credenciales, ambiente='testing').simulador_url is None
+
+    def test_app_refuses_to_start_in_production_with_simulator(self, monkeypatch):
+        monkeypatch.setenv('ARCA_SIMULADOR_URL', 'http://arca-simulador:8099')
+        monkeypatch.setenv('FLASK_ENV', 'production')
+
+        with pytest.raises(RuntimeError, match='ARCA_SIMULADOR_URL'):
+            create_app(TestingConfig)
+
+
+class TestSimuladorWsfe:
+    def test_sequence_cae_and_consulta(self, simulador, credenciales):
+        client = ArcaClient(cuit=CUIT, cert=credenciales[0], key=credenciales[1])
+
+        assert client.fe_comp_ultimo_autorizado(1, 11) == 0
+        autorizado = client.fe_cae_solicitar(_request(1))
+        repetido = client.fe_cae_solicitar(_request(1))
+
+        assert autorizado['resultado'] == 'A' and autorizado['cae']
+        assert repetido['resultado'] == 'R'
+        assert repetido['observaciones'][0]['code'] == 10016
+        assert client.fe_comp_ultimo_autorizado(1, 11) == 1
+        consulta = client.fe_comp_consultar(11, 1, 1)
+        assert consulta['encontrado'] is True
+        assert consulta['cae'] == autorizado['cae']
+        assert client.fe_comp_consultar(11, 1, 2) == {'encontrado': False}
+
+    def test_injected_10016_consumes_next_number(self, simulador, credenciales):
+        simulador.config.tasa_error_10016 = 1.0
+        client = ArcaClient(cuit=CUIT, cert=credenciales[0], key=credenciales[1])
+
+        result = client.fe_cae_solicitar(_request(1))
+
+        assert result['resultado'] == 'R'
+        assert client.fe_comp_ultimo_autorizado(1, 11) == 1
+
+    def test_timeout_after_processing_keeps_cae_in_arca(self, simulador, credenciales):
+        client = ArcaClient(cuit=CUIT, cert=credenciales[0], key=credenciales[1])
+        _ = client.wsfe
+        simulador.config.tasa_timeout = 1.0
+
+        with pytest.raises(ArcaError):
+            client.fe_cae_solicitar(_request(1))
+
+        simulador.config.tasa_timeout = 0.0
+        assert client.fe_comp_consultar(11, 1, 1)['encontrado'] is True
+
+
+class TestSimuladorWsaa:
+    def test_second_login_with_valid_ta_is_rejected(self, simulador, credenciales, monkeypatch, tmp_path):
+        monkeypatch.setattr('arca_integration.client.time.sleep', lambda _s: None)
+        _ = ArcaClient(cuit=CUIT, cert=credenciales[0], key=credenciales[1]).wsfe
+
+        # Otro host sin el TA en su cache local.
+        monkeypatch.setenv('ARCA_TA_CACHE_DIR', str(tmp_path / 'otro'))
+        with pytest.raises(ArcaAuthError, match='ya posee un TA valido'):
+            _ = ArcaClient(cuit=CUIT, cert=credenciales[0], key=credenciales[1]).wsfe
+
+    def test_cached_ta_is_reused(self, simulador, credenciales):
+        _ = ArcaClient(cuit=CUIT, cert=credenciales[0], key=credenciales[1]).wsfe
+        _ = ArcaClient(cuit=CUIT, cert=credenciales[0], key=credenciales[1]).wsfe
+
+        assert simulador.estado.contadores['loginCms'] == 1
+
+
+class TestSimuladorPadron:
+    def test_found_and_missing(self, simulador, credenciales):
+        simulador.config.cuits_inexistentes = {'30999999999'}
+        client = ArcaClient(cuit=CUIT, cert=credenciales[0], key=credenciales[1])
+
+        encontrado = client.consultar_padron('30712345678')
+        inexistente = client.consultar_padron('30999999999')
+
+        assert encontrado['success'] is True
+        assert encontrado['data']['razon_social'] == 'EMPRESA 30712345678 SA'
+        assert encontrado['data']['condicion_iva'] == 'IVA Responsable Inscripto'
+        assert inexistente == {'success': False, 'error': 'Persona no encontrada'}
+
+
+class TestProcesarLoteContraSimulador:
+    def test_lote_is_authorized_end_to_end(self, db, facturador, receptor, simulador, credenciales, monkeypatch):
+        monkeypatch.setattr('app.tasks.facturacion.get_facturador_credentials', lambda _f: credenciales)
+        monkeypatch.setattr('app.tasks.facturacion.ProgressReporter', _SilentProgress)
+        monkeypatch.setattr(parametros_arca, '_redis_get', lambda _key: (None, 0))
+        monkeypatch.setattr(parametros_arca, '_redis_set', lambda *args: None)
+        parametros_arca.invalidar_parametros()
+
+        facturador.cert_encrypted = b'cert'
+        facturador.key_encrypted = b'key'
+        lote = Lote(tenant_id=facturador.tenant_id, etiqueta='Lote simulador', tipo='factura', estado='pendiente')
+        db.session.add(lote)
+        db.session.flush()
+        for _ in range(5):
+            db.session.add(Factura(
+                tenant_id=facturador.tenant_id,
+                lote_id=lote.id,
+                facturador_id=facturador.id,
+                receptor_id=receptor.id,
+                tipo_comprobante=11,
+                concepto=1,
+                punto_venta=1,
+                fecha_emision=date.today(),
+                importe_neto=Decimal('100.00'),
+                importe_iva=Decimal('0'),
+                importe_total=Decimal('100.00'),
+                estado='pendiente',
+            ))
+        db.session.commit()
+
+        result = procesar_lote.run(lote.id, lote.tenant_id)
+
+        assert result['ok'] == 5
+        numeros = sorted(f.numero_comprobante for f in Factura.query.filter_by(lote_id=lote.id))
+        assert numeros == [1, 2, 3, 4, 5]
+        assert simulador.estado.contadores['autorizados'] == 5
+
+        perfil = db.session.get(Lote, lote.id).perfil
+        assert perfil['facturas']['cantidad'] == 5
+        assert perfil['etapas']['fecae_solicitar']['cantidad'] == 5
+        assert perfil['etapas']['wsaa']['cantidad'] == 1
+        assert perfil['reintentos'] == 0
+        assert len(perfil['facturas_lentas']) == 5
+        assert perfil['facturas_lentas'][0]['total_ms'] >= perfil['facturas_lentas'][-1]['total_ms']
@@ -0,0 +1,313 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from arca_integration.exceptions import ArcaNetworkError
+
+from app.models import Caea, Factura, FacturaCaeaInforme, FacturaEmisionEnCurso, Lote
+from app.services.caea import periodo_orden
+from app.tasks.caea import barrer_informes_caea, informar_caea
+from app.tasks.facturacion import procesar_lote
+
+
+class _SilentProgress:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def update(self, *args, **kwargs):
+        return False
+
+
+class _FakeCaeaClient:
+    """Cliente ARCA en memoria para modo CAEA."""
+
+    ultimo = 40
+    solicitudes = 0
+    informes = []
+    informe_resultado = None
+
+    def __init__(self, *args, cuit='20123456789', ambiente='testing', **kwargs):
+        self.cuit = cuit
+        self.ambiente = ambiente
+        self.wsfe = object()
+
+    def fe_param_get_ptos_venta(self):
+        return []
+
+    def fe_comp_ultimo_autorizado(self, punto_venta, tipo_cbte):
+        return _FakeCaeaClient.ultimo
+
+    def fecaea_solicitar(self, periodo, orden):
+        _FakeCaeaClient.solicitudes += 1
+        return {
+            'caea': '31234567890123',
+            'periodo': periodo,
+            'orden': orden,
+            'fch_vig_desde': '20260101',
+            'fch_vig_hasta': '20260115',
+            'fch_tope_inf': '20260123',
+            'observaciones': [],
+            'errores': [],
+        }
+
+    def fecaea_consultar(self, periodo, orden):
+        return {'caea': None, 'errores': []}
+
+    def fecaea_reg_informativo(self, request_data):
+        _FakeCaeaClient.informes.append(request_data)
+        resultado = _FakeCaeaClient.informe_resultado
+        if isinstance(resultado, Exception):
+            raise resultado
+        detalles = request_data['FeCAEARegInfReq']['FeDetReq']['FECAEADetRequest']
+        return {
+            'resultado': 'A',
+            'detalles': [
+                {
+                    'numero_comprobante': det['CbteDesde'],
+                    'resultado': (resultado or {}).get(det['CbteDesde'], 'A'),
+                    'caea': det['CAEA'],
+                    'observaciones': [],
+                }
+                for det in detalles
+            ],
+            'errores': [],
+        }
+
+
+@pytest.fixture
+def fake_caea(monkeypatch):
+    _FakeCaeaClient.ultimo = 40
+    _FakeCaeaClient.solicitudes = 0
+    _FakeCaeaClient.informes = []
+    _FakeCaeaClient.informe_resultado = None
+    encolados = []
+    monkeypatch.setattr('arca_integration.ArcaClient', _FakeCaeaClient)
+    monkeypatch.setattr('app.tasks.facturacion.ProgressReporter', _SilentProgress)
+    monkeypatch.setattr('app.tasks.facturacion.get_facturador_credentials', lambda _f: (b'cert', b'key'))
+    monkeypatch.setattr('app.tasks.caea.get_facturador_credentials', lambda _f: (b'cert', b'key'))
+    monkeypatch.setattr('app.tasks.facturacion.informar_caea.delay', lambda *args: encolados.append(args))
+    monkeypatch.setattr('app.tasks.caea.get_redis', lambda: _RedisFalso())
+    return encolados
+
+
+class _LockFalso:
+    tomados = set()
+
+    def __init__(self, clave):
+        self.clave = clave
+
+    def acquire(self, blocking=True):
+        if self.clave in _LockFalso.tomados:
+            return False
+        _LockFalso.tomados.add(self.clave)
+        return True
+
+    def release(self):
+        _LockFalso.tomados.discard(self.clave)
+
+
+class _RedisFalso:
+    def lock(self, clave, timeout=None):
+        return _LockFalso(clave)
+
+
+@pytest.fixture
+def lote_caea(db, facturador, receptor):
+    facturador.cert_encrypted = b'cert'
+    facturador.key_encrypted = b'key'
+    facturador.modo_autorizacion = 'caea'
+    lote = Lote(tenant_id=facturador.tenant_id, etiqueta='Lote CAEA', tipo='factura', estado='pendiente')
+    db.session.add(lote)
+    db.session.flush()
+
+    for _ in range(3):
+        db.session.add(Factura(
+            tenant_id=facturador.tenant_id,
+            lote_id=lote.id,
+            facturador_id=facturador.id,
+            receptor_id=receptor.id,
+            tipo_comprobante=11,
+            concepto=1,
+            punto_venta=facturador.punto_venta,
+            fecha_emision=date(2026, 1, 10),
+            importe_neto=Decimal('100.00'),
+            importe_iva=Decimal('0'),
+            importe_total=Decimal('100.00'),
+            moneda='PES',
+            cotizacion=Decimal('1'),
+            estado='pendiente',
+        ))
+    db.session.commit()
+    return lote
+
+
+def test_periodo_orden():
+    assert periodo_orden(date(2026, 1, 15)) == (202601, 1)
+    assert periodo_orden(date(2026, 2, 16)) == (202602, 2)
+
+
+class TestProcesarLoteCaea:
+    def test_authorizes_locally_and_queues_informe(self, db, facturador, lote_caea, fake_caea):
+        result = procesar_lote.run(lote_caea.id, lote_caea.tenant_id)
+
+        assert result['ok'] == 3
+        assert _FakeCaeaClient.solicitudes == 1
+        assert Caea.query.count() == 1
+        assert FacturaEmisionEnCurso.query.count() == 0
+
+        facturas = Factura.query.filter_by(lote_id=lote_caea.id).order_by(Factura.numero_comprobante).all()
+        assert [f.numero_comprobante for f in facturas] == [41, 42, 43]
+        assert all(f.estado == 'autorizado' and f.cae == '31234567890123' for f in facturas)
+        assert facturas[0].cae_vencimiento == date(2026, 1, 15)
+
+        assert FacturaCaeaInforme.query.filter_by(estado='pendiente').count() == 3
+        assert fake_caea == [(str(facturador.id), str(lote_caea.tenant_id))]
+
+    def test_local_numbering_continues_after_uninformed_comprobantes(self, db, facturador, receptor, lote_caea, fake_caea):
+        # Comprobante CAEA previo aún no informado: ARCA no lo conoce.
+        db.session.add(Factura(
+            tenant_id=facturador.tenant_id,
+            facturador_id=facturador.id,
+            receptor_id=receptor.id,
+            tipo_comprobante=11,
+            concepto=1,
+            punto_venta=facturador.punto_venta,
+            numero_comprobante=57,
+            fecha_emision=date(2026, 1, 5),
+            importe_neto=Decimal('1.00'),
+            importe_total=Decimal('1.00'),
+            estado='autorizado',
+        ))
+        db.session.commit()
+
+        procesar_lote.run(lote_caea.id, lote_caea.tenant_id)
+
+        numeros = sorted(f.numero_comprobante for f in Factura.query.filter_by(lote_id=lote_caea.id))
+        assert numeros == [58, 59, 60]
+
+
+class TestInformarCaea:
+    def test_informs_in_blocks_and_records_result(self, app, db, facturador, lote_caea, fake_caea, monkeypatch):
+        monkeypatch.setitem(app.config, 'CAEA_INFORME_BATCH_SIZE', 2)
+        procesar_lote.run(lote_caea.id, lote_caea.tenant_id)
+        _FakeCaeaClient.informe_resultado = {43: 'R'}
+
+        result = informar_caea.run(facturador.id, facturador.tenant_id)
+
+        assert result['informados'] == 2
+        assert result['rechazados'] == 1
+        assert len(_FakeCaeaClient.informes) == 2
+        assert FacturaCaeaInforme.query.filter_by(estado='informado').count() == 2
+        rechazado = FacturaCaeaInforme.query.filter_by(estado='rechazado').one()
+        assert rechazado.factura.numero_comprobante == 43
+
+    def test_transient_failure_is_rescheduled_with_backoff(self, app, db, facturador, lote_caea, fake_caea, monkeypatch):
+        monkeypatch.setitem(app.config, 'CAEA_INFORME_BACKOFF_SECONDS', 30)
+        procesar_lote.run(lote_caea.id, lote_caea.tenant_id)
+        fake_caea.clear()
+        _FakeCaeaClient.informe_resultado = ArcaNetworkError('timeout')
+
+        result = informar_caea.run(facturador.id, facturador.tenant_id)
+
+        assert result['reprogramados'] == 3
+        informes = FacturaCaeaInforme.query.all()
+        assert all(i.estado == 'pendiente' and i.intentos == 1 for i in informes)
+        assert all(i.proximo_intento_at > datetime.utcnow() + timedelta(seconds=20) for i in informes)
+
+        # Antes del vencimiento del backoff no se reintenta.
+        assert informar_caea.run(facturador.id, facturador.tenant_id)['total'] == 0
+
+    def test_gives_up_after_max_attempts(self, app, db, facturador, lote_caea, fake_caea, monkeypatch):
+        monkeypatch.setitem(app.config, 'CAEA_INFORME_MAX_INTENTOS', 1)
+        procesar_lote.run(lote_caea.id, lote_caea.tenant_id)
+        _FakeCaeaClient.informe_resultado = ArcaNetworkError('timeout')
+
+        result = informar_caea.run(facturador.id, facturador.tenant_id)
+
+        assert result['errores'] == 3
+        assert FacturaCaeaInforme.query.filter_by(estado='error').count() == 3
+
+    def test_skips_when_another_run_holds_the_facturador_lock(self, db, facturador, lote_caea, fake_caea):
+        procesar_lote.run(lote_caea.id, lote_caea.tenant_id)
+        _LockFalso.tomados = {f'caea:informe:{facturador.id}'}
+
+        result = informar_caea.run(facturador.id, facturador.tenant_id)
+
+        _LockFalso.tomados = set()
+        assert result['status'] == 'en_curso'
+        assert _FakeCaeaClient.informes == []
+        assert FacturaCaeaInforme.query.filter_by(estado='pendiente').count() == 3
+
+
+class TestBarrerInformesCaea:
+    @pytest.fixture
+    def encolados(self, monkeypatch):
+        encolados = []
+        monkeypatch.setattr('app.tasks.caea.informar_caea.delay', lambda *args: encolados.append(args))
+        return encolados
+
+    def test_enqueues_pending_and_stale_sending_by_deadline(
+        self, db, tenant, facturador, lote_caea, fake_caea, encolados
+    ):
+        procesar_lote.run(lote_caea.id, lote_caea.tenant_id)
+        informes = FacturaCaeaInforme.query.all()
+        # Una ejecución murió con el informe tomado hace rato.
+        informes[0].estado = 'enviando'
+        informes[0].updated_at = datetime.utcnow() - timedelta(hours=1)
+        for informe in informes[1:]:
+            informe.estado = 'informado'
+        db.session.commit()
+        encolados.clear()
+
+        result = barrer_informes_caea.run()
+
+        assert result['encolados'] == [str(facturador.id)]
+        assert encolados == [(str(facturador.id), str(tenant.id))]
+
+    def test_recent_sending_and_future_retries_are_left_alone(self, db, facturador, lote_caea, fake_caea, encolados):
+        procesar_lote.run(lote_caea.id, lote_caea.tenant_id)
+        informes = FacturaCaeaInforme.query.all()
+        informes[0].estado = 'enviando'
+        for informe in informes[1:]:
+            informe.proximo_intento_at = datetime.utcnow() + timedelta(minutes=5)
+        db.session.commit()
+        encolados.clear()
+
+        assert barrer_informes_caea.run()['encolados'] == []
+        assert encolados == []
+
+    def test_reports_exhausted_and_near_deadline(self, db, facturador, lote_caea, fake_caea, encolados, caplog):
+        procesar_lote.run(lote_caea.id, lote_caea.tenant_id)
+        informes = FacturaCaeaInforme.query.all()
+        informes[0].estado = 'error'
+        informes[1].estado = 'informado'
+        db.session.commit()
+
+        # El CAEA del fake tiene fecha tope 2026-01-23, ya vencida.
+        result = barrer_informes_caea.run()
+
+        assert result['en_error'] == 1
+        assert result['por_vencer'] == 2
+        assert 'agotar los reintentos' in caplog.text
+        assert '2026-01-23' in caplog.text
+
+
+class TestCaeaEndpoints:
+    def test_update_rejects_unknown_mode(self, client, auth_headers, facturador):
+        response = client.put(
+            f'/api/facturadores/{facturador.id}',
+            headers=auth_headers,
+            json={'modo_autorizacion': 'otro'},
+        )
+        assert response.status_code == 400
+
+    def test_get_caea_summary(self, client, auth_headers, db, facturador, lote_caea, fake_caea):
+        procesar_lote.run(lote_caea.id, lote_caea.tenant_id)
+
+        response = client.get(f'/api/facturadores/{facturador.id}/caea', headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['modo_autorizacion'] == 'caea'
+        assert data['caeas'][0]['codigo'] == '31234567890123'
+        assert data['informes'] == {'pendiente': 3}
@@ -0,0 +1,204 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.models import Lote
+from app.services import circuito_arca
+from app.services.circuito_arca import (
+    ABIERTO,
+    CERRADO,
+    SEMIABIERTO,
+    circuito_abierto,
+    estado,
+    permitir,
+    registrar_exito,
+    registrar_falla,
+)
+from app.tasks.circuito_arca import reanudar_lotes_pausados
+
+
+class _RedisFalso:
+    """Lo mínimo de redis-py que usa el circuito; los TTL se vencen a mano."""
+
+    def __init__(self):
+        self.datos = {}
+
+    def mget(self, *claves):
+        return [self.datos.get(clave) for clave in claves]
+
+    def set(self, clave, valor, nx=False, ex=None):
+        if nx and clave in self.datos:
+            return None
+        self.datos[clave] = valor
+        return True
+
+    def incr(self, clave):
+        self.datos[clave] = int(self.datos.get(clave, 0)) + 1
+        return self.datos[clave]
+
+    def expire(self, clave, _segundos):
+        return clave in self.datos
+
+    def exists(self, clave):
+        return int(clave in self.datos)
+
+    def delete(self, *claves):
+        return sum(self.datos.pop(clave, None) is not None for clave in claves)
+
+    def pipeline(self, transaction=True):
+        return _PipelineFalso(self)
+
+    def vencer(self, parte):
+        for clave in [c for c in self.datos if c.endswith(f':{parte}')]:
+            del self.datos[clave]
+
+
+class _PipelineFalso:
+    def __init__(self, redis):
+        self._redis = redis
+        self._comandos = []
+
+    def __getattr__(self, nombre):
+        def encolar(*args, **kwargs):
+            self._comandos.append((nombre, args, kwargs))
+            return self
+        return encolar
+
+    def execute(self):
+        return [getattr(self._redis, nombre)(*args, **kwargs) for nombre, args, kwargs in self._comandos]
+
+
+@pytest.fixture
+def redis_falso(app, monkeypatch):
+    falso = _RedisFalso()
+    monkeypatch.setattr(circuito_arca, 'get_redis', lambda: falso)
+    monkeypatch.setitem(app.config, 'ARCA_CIRCUITO_HABILITADO', True)
+    monkeypatch.setitem(app.config, 'ARCA_CIRCUITO_UMBRAL_FALLAS', 3)
+    return falso
+
+
+class TestCircuito:
+    def test_se_abre_al_llegar_al_umbral(self, db, redis_falso):
+        registrar_falla('wsfe', 'testing')
+        registrar_falla('wsfe', 'testing')
+        assert estado('wsfe', 'testing') == CERRADO
+
+        registrar_falla('wsfe', 'testing')
+
+        assert estado('wsfe', 'testing') == ABIERTO
+        assert circuito_abierto('testing') == 'wsfe:testing'
+        # Por servicio y ambiente.
+        assert estado('wsfe', 'production') == CERRADO
+        assert estado('wsaa', 'testing') == CERRADO
+
+    def test_una_respuesta_resetea_las_fallas(self, db, redis_falso):
+        registrar_falla('wsfe', 'testing')
+        registrar_falla('wsfe', 'testing')
+        registrar_exito('wsfe', 'testing')
+        registrar_falla('wsfe', 'testing')
+
+        assert estado('wsfe', 'testing') == CERRADO
+
+    def test_semiabierto_deja_pasar_una_sola_prueba(self, db, redis_falso):
+        for _ in range(3):
+            registrar_falla('wsaa', 'testing')
+        redis_falso.vencer('abierto')
+
+        assert estado('wsaa', 'testing') == SEMIABIERTO
+        assert permitir('wsaa', 'testing') is True
+        assert permitir('wsaa', 'testing') is False
+
+    def test_prueba_fallida_reabre_y_exitosa_cierra(self, db, redis_falso):
+        for _ in range(3):
+            registrar_falla('wsaa', 'testing')
+        redis_falso.vencer('abierto')
+
+        registrar_falla('wsaa', 'testing')
+        assert estado('wsaa', 'testing') == ABIERTO
+
+        redis_falso.vencer('abierto')
+        registrar_exito('wsaa', 'testing')
+        assert estado('wsaa', 'testing') == CERRADO
+        assert redis_falso.datos == {}
+
+    def test_observador_solo_cuenta_llamadas_sin_respuesta(self, db, redis_falso):
+        for resultado in ('fault', 'ta_valido', 'timeout', 'conexion', 'ok', 'timeout', 'error'):
+            circuito_arca._observar_llamada('wsfe', 'FECAESolicitar', resultado, 0.1, 'testing')
+
+        assert redis_falso.datos == {'arca:circuito:wsfe:testing:fallas': 1}
+
+    def test_errores_locales_no_abren_el_circuito(self, db, redis_falso):
+        from arca_integration import ArcaClient
+        from zeep.exceptions import ValidationError
+
+        client = ArcaClient(cuit='20-12345678-9', cert=b'cert', key=b'key', ambiente='testing')
+        errores = [
+            ValidationError('Missing element FeCabReq'),
+            ValueError('No se pudo firmar el TRA: clave privada inválida'),
+        ] * 3
+
+        for error in errores:
+            with pytest.raises(type(error)):
+                with client._medir_llamada('wsfe', 'FECAESolicitar'):
+                    raise error
+        assert estado('wsfe', 'testing') == CERRADO
+
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                with client._medir_llamada('wsfe', 'FECAESolicitar'):
+                    raise ConnectionError('Connection refused')
+        assert estado('wsfe', 'testing') == ABIERTO
+
+    def test_deshabilitado_no_corta(self, app, db, redis_falso, monkeypatch):
+        monkeypatch.setitem(app.config, 'ARCA_CIRCUITO_HABILITADO', False)
+        for _ in range(5):
+            registrar_falla('wsfe', 'testing')
+
+        assert permitir('wsfe', 'testing') is True
+        assert redis_falso.datos == {}
+
+
+class TestReanudarLotesPausados:
+    @pytest.fixture
+    def lote_pausado(self, db, tenant):
+        lote = Lote(tenant_id=tenant.id, etiqueta='Pausado', tipo='factura', estado='pausado', pausado_por='wsfe:testing')
+        db.session.add(lote)
+        db.session.commit()
+        return lote
+
+    @pytest.fixture
+    def encolados(self, monkeypatch):
+        encolados = []
+
+        def _delay(lote_id, tenant_id):
+            encolados.append(lote_id)
+            return SimpleNamespace(id='task-1')
+
+        monkeypatch.setattr('app.tasks.facturacion.procesar_lote.delay', _delay)
+        return encolados
+
+    def test_con_el_circuito_abierto_sigue_pausado(self, db, redis_falso, lote_pausado, encolados):
+        for _ in range(3):
+            registrar_falla('wsfe', 'testing')
+
+        assert reanudar_lotes_pausados.run() == {'reanudados': []}
+        assert encolados == []
+
+    def test_sondeo_exitoso_cierra_y_reanuda(self, db, redis_falso, lote_pausado, encolados, monkeypatch):
+        for _ in range(3):
+            registrar_falla('wsfe', 'testing')
+        redis_falso.vencer('abierto')
+        sondeos = []
+        monkeypatch.setattr(
+            'app.tasks.circuito_arca.sondear_url',
+            lambda url: sondeos.append(url) or 'operational',
+        )
+
+        resultado = reanudar_lotes_pausados.run()
+
+        assert resultado == {'reanudados': [str(lote_pausado.id)]}
+        assert sondeos == ['https://wswhomo.afip.gov.ar/wsfev1/service.asmx?WSDL']
+        assert estado('wsfe', 'testing') == CERRADO
+        db.session.refresh(lote_pausado)
+        assert (lote_pausado.estado, lote_pausado.pausado_por) == ('procesando', None)
+        assert lote_pausado.celery_task_id == 'task-1'
@@ -0,0 +1,19 @@
+import app.tasks  # noqa: F401  registra las tareas
+from app.extensions import COLAS_TAREAS, celery
+
+
+def test_todas_las_tareas_tienen_cola(app):
+    registradas = {nombre for nombre in celery.tasks if nombre.startswith('app.tasks.')}
+    ruteadas = {tarea for tareas in COLAS_TAREAS.values() for tarea in tareas}
+
+    assert registradas == ruteadas
+
+
+def test_emision_no_comparte_cola_con_render_ni_email(app):
+    def cola(tarea):
+        return celery.amqp.router.route({}, tarea)['queue'].name
+
+    assert cola('app.tasks.facturacion.procesar_lote') == 'emision'
+    assert cola('app.tasks.downloads.generar_comprobantes_zip_lote') == 'render'
+    assert cola('app.tasks.email.enviar_factura_email') == 'email'
+    assert cola('app.tasks.planificador.despachar_turnos') == 'mantenimiento'
@@ -0,0 +1,33 @@
+import re
+from pathlib import Path
+
+import pytest
+
+yaml = pytest.importorskip('yaml')
+
+RAIZ = Path(__file__).resolve().parents[2]
+ARCHIVOS = sorted(RAIZ.glob('docker-compose*.yml'))
+VARIABLE = re.compile(r'^[A-Z_][A-Z0-9_]*=')
+
+pytestmark = pytest.mark.skipif(not ARCHIVOS, reason='Los docker-compose no están en este checkout')
+
+
+def _servicios(archivo):
+    return (yaml.safe_load(archivo.read_text()) or {}).get('services') or {}
+
+
+@pytest.mark.parametrize('archivo', ARCHIVOS, ids=lambda archivo: archivo.name)
+def test_cada_item_de_environment_es_una_variable(archivo):
+    for nombre, servicio in _servicios(archivo).items():
+        environment = servicio.get('environment')
+        if not isinstance(environment, list):
+            continue
+        for item in environment:
+            # Un item mal indentado se pega al anterior: "A=1 - B=2".
+            assert VARIABLE.match(item) and ' - ' not in item, f'{archivo.name} {nombre}: {item!r}'
+
+
+def test_api_y_workers_comparten_la_cache_de_ta():
+    servicios = _servicios(RAIZ / 'docker-compose.yml')
+    for nombre in ('api', 'worker-emision', 'worker-render', 'worker-email', 'worker-mantenimiento'):
+        assert 'ARCA_TA_CACHE_DIR=/var/lib/arca_ta_cache' in servicios[nombre]['environment'], nombre
@@ -1,4 +1,86 @@
+import io
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+
 from app.models import DownloadArtifact
+from app.services.almacenamiento import AlmacenLocal, AlmacenS3, get_almacen
+
+
+@pytest.fixture
+def almacen_local(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, 'DOWNLOADS_LOCAL_DIR', str(tmp_path))
+    return get_almacen()
+
+
+def _guardar(almacen, db, tenant, task_id, contenido, **kwargs):
+    clave = f'{tenant.id}/{task_id}.zip'
+    with almacen.abrir_escritura(clave) as destino:
+        destino.write(contenido)
+    artifact = DownloadArtifact(
+        tenant_id=tenant.id,
+        task_id=task_id,
+        filename='comprobantes-lote-test.zip',
+        mime_type='application/zip',
+        storage_backend=almacen.nombre,
+        storage_key=clave,
+        size_bytes=len(contenido),
+        **kwargs,
+    )
+    db.session.add(artifact)
+    db.session.commit()
+    return artifact
+
+
+class _BodyFalso(io.BytesIO):
+    pass
+
+
+class _S3Falso:
+    """Cliente S3 mínimo en memoria (sólo las operaciones que usa AlmacenS3)."""
+
+    def __init__(self):
+        self.objetos = {}
+        self.uploads = {}
+        self.llamadas = []
+
+    def put_object(self, Bucket, Key, Body):
+        self.llamadas.append('put_object')
+        self.objetos[(Bucket, Key)] = bytes(Body)
+
+    def create_multipart_upload(self, Bucket, Key):
+        upload_id = f'up-{len(self.uploads) + 1}'
+        self.uploads[upload_id] = {}
+        return {'UploadId': upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.llamadas.append('upload_part')
+        self.uploads[UploadId][PartNumber] = bytes(Body)
+        return {'ETag': f'etag-{PartNumber}'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        partes = self.uploads.pop(UploadId)
+        numeros = [parte['PartNumber'] for parte in MultipartUpload['Parts']]
+        self.objetos[(Bucket, Key)] = b''.join(partes[numero] for numero in numeros)
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId, None)
+
+    def head_object(self, Bucket, Key):
+        return {'ContentLength': len(self.objetos[(Bucket, Key)])}
+
+    def get_object(self, Bucket, Key, Range=None):
+        data = self.objetos[(Bucket, Key)]
+        if Range:
+            inicio, fin = Range.removeprefix('bytes=').split('-')
+            data = data[int(inicio):int(fin) + 1 if fin else None]
+        return {'Body': _BodyFalso(data)}
+
+    def delete_object(self, Bucket, Key):
+        if Key.endswith('denegado.zip'):
+            raise PermissionError('AccessDenied')  # botocore levanta ClientError
+        self.objetos.pop((Bucket, Key), None)
 
 
 class TestDownloads:
@@ -22,3 +104,164 @@ class TestDownloads:
     def test_download_zip_not_found(self, client, auth_headers):
         response = client.get('/api/downloads/task-missing', headers=auth_headers)
         assert response.status_code == 404
+
+    def test_download_desde_almacen_local_con_range(self, client, auth_headers, tenant, db, almacen_local):
+        contenido = bytes(range(256)) * 40
+        _guardar(almacen_local, db, tenant, 'task-local-1', contenido)
+
+        response = client.get('/api/downloads/task-local-1', headers=auth_headers)
+        assert response.status_code == 200
+        assert response.data == contenido
+        assert 'comprobantes-lote-test.zip' in response.headers['Content-Disposition']
+
+        parcial = client.get('/api/downloads/task-local-1', headers={**auth_headers, 'Range': 'bytes=100-199'})
+        assert parcial.status_code == 206
+        assert parcial.data == contenido[100:200]
+        assert parcial.headers['Content-Range'] == f'bytes 100-199/{len(contenido)}'
+
+    def test_download_con_x_accel(self, app, client, auth_headers, tenant, db, almacen_local, monkeypatch):
+        artifact = _guardar(almacen_local, db, tenant, 'task-accel-1', b'ZIP')
+        monkeypatch.setitem(app.config, 'DOWNLOADS_X_ACCEL_PREFIX', '/protected-downloads/')
+
+        response = client.get('/api/downloads/task-accel-1', headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers['X-Accel-Redirect'] == f'/protected-downloads/{artifact.storage_key}'
+        assert response.data == b''
+
+    def test_nombre_no_ascii_usa_rfc_5987(self, app, client, auth_headers, tenant, db, almacen_local, monkeypatch):
+        artifact = _guardar(almacen_local, db, tenant, 'task-accel-2', b'ZIP')
+        artifact.filename = 'comprobantes-año.zip'
+        db.session.commit()
+        monkeypatch.setitem(app.config, 'DOWNLOADS_X_ACCEL_PREFIX', '/protected-downloads/')
+
+        response = client.get('/api/downloads/task-accel-2', headers=auth_headers)
+
+        disposicion = response.headers['Content-Disposition']
+        assert 'filename=comprobantes-ano.zip' in disposicion
+        assert "filename*=UTF-8''comprobantes-a%C3%B1o.zip" in disposicion
+
+    def test_download_vencido(self, client, auth_headers, tenant, db, almacen_local):
+        _guardar(almacen_local, db, tenant, 'task-vencida-1', b'ZIP',
+                 expires_at=datetime.utcnow() - timedelta(minutes=1))
+
+        response = client.get('/api/downloads/task-vencida-1', headers=auth_headers)
+        assert response.status_code == 410
+
+    def test_download_desde_s3_por_rangos(self, app, client, auth_headers, tenant, db, monkeypatch):
+        s3 = _S3Falso()
+        almacen = AlmacenS3('facturas', prefijo='downloads', client=s3, chunk_size=1024)
+        monkeypatch.setattr('app.api.downloads.get_almacen', lambda: almacen)
+        contenido = b'x' * 3000 + b'y' * 3000
+        _guardar(almacen, db, tenant, 'task-s3-1', contenido)
+
+        completo = client.get('/api/downloads/task-s3-1', headers=auth_headers)
+        assert completo.status_code == 200
+        assert completo.data == contenido
+
+        parcial = client.get('/api/downloads/task-s3-1', headers={**auth_headers, 'Range': 'bytes=2990-3009'})
+        assert parcial.status_code == 206
+        assert parcial.data == b'x' * 10 + b'y' * 10
+
+        fuera = client.get('/api/downloads/task-s3-1', headers={**auth_headers, 'Range': 'bytes=9000-9100'})
+        assert fuera.status_code == 416
+
+
+class TestAlmacenamiento:
+    def test_local_no_deja_archivo_si_se_aborta(self, tmp_path):
+        almacen = AlmacenLocal(str(tmp_path))
+        destino = almacen.abrir_escritura('t/parcial.zip')
+        destino.write(b'abc')
+        destino.abortar()
+
+        assert list((tmp_path / 't').iterdir()) == []
+
+    def test_local_rechaza_claves_fuera_del_directorio(self, tmp_path):
+        almacen = AlmacenLocal(str(tmp_path))
+        with pytest.raises(RuntimeError):
+            almacen.ruta('../fuera.zip')
+
+    def test_s3_sube_en_partes_archivos_grandes(self):
+        s3 = _S3Falso()
+        almacen = AlmacenS3('facturas', client=s3)
+        contenido = b'z' * (almacen.part_size + 10)
+
+        with zipfile.ZipFile(almacen.abrir_escritura('grande.zip'), mode='w') as zip_file:
+            zip_file.writestr('a.pdf', contenido)
+
+        assert s3.llamadas == ['upload_part', 'upload_part']
+        with zipfile.ZipFile(io.BytesIO(s3.objetos[('facturas', 'grande.zip')])) as zip_file:
+            assert zip_file.read('a.pdf') == contenido
+
+
+class TestTareasDescargas:
+    def test_zip_se_escribe_en_el_almacen(self, app, db, tenant, facturador, receptor, almacen_local, monkeypatch):
+        from app.models import Factura, Lote
+        from app.tasks import downloads as downloads_tasks
+
+        class _SilentProgress:
+            def __init__(self, *_args, **_kwargs):
+                pass
+
+            def update(self, *_args, **_kwargs):
+                pass
+
+        lote = Lote(tenant_id=tenant.id, etiqueta='Lote zip', tipo='factura', estado='completado', total_facturas=1)
+        db.session.add(lote)
+        db.session.flush()
+        db.session.add(Factura(
+            tenant_id=tenant.id, lote_id=lote.id, facturador_id=facturador.id, receptor_id=receptor.id,
+            tipo_comprobante=6, concepto=1, punto_venta=1, numero_comprobante=7,
+            fecha_emision=datetime.utcnow().date(), importe_total=121, importe_neto=100, importe_iva=21,
+            estado='autorizado', cae='12345678901234',
+        ))
+        db.session.commit()
+
+        monkeypatch.setattr(downloads_tasks, 'ProgressReporter', _SilentProgress)
+        monkeypatch.setattr('app.services.comprobante_pdf.html_to_pdf_bytes', lambda _html: b'%PDF-1.4 test')
+
+        downloads_tasks.generar_comprobantes_zip_lote.push_request(id='task-zip-almacen-1')
+        try:
+            downloads_tasks.generar_comprobantes_zip_lote.run(lote.id, tenant.id)
+        finally:
+            downloads_tasks.generar_comprobantes_zip_lote.pop_request()
+
+        artifact = DownloadArtifact.query.filter_by(task_id='task-zip-almacen-1').one()
+        assert artifact.file_data is None
+        assert artifact.storage_backend == 'local'
+        assert artifact.expires_at > datetime.utcnow()
+        assert artifact.size_bytes == almacen_local.tamano(artifact.storage_key)
+        with zipfile.ZipFile(almacen_local.ruta(artifact.storage_key)) as zip_file:
+            assert [zip_file.read(nombre) for nombre in zip_file.namelist()] == [b'%PDF-1.4 test']
+
+    def test_limpiar_descargas_vencidas(self, db, tenant, almacen_local):
+        from app.tasks.downloads import limpiar_descargas_vencidas
+
+        vencido = _guardar(almacen_local, db, tenant, 'task-vieja', b'old',
+                           expires_at=datetime.utcnow() - timedelta(seconds=1))
+        vigente = _guardar(almacen_local, db, tenant, 'task-nueva', b'new',
+                           expires_at=datetime.utcnow() + timedelta(hours=1))
+        ruta_vencida = almacen_local.ruta(vencido.storage_key)
+
+        resultado = limpiar_descargas_vencidas.run()
+
+        assert resultado == {'eliminados': 1}
+        assert DownloadArtifact.query.filter_by(task_id='task-vieja').first() is None
+        assert DownloadArtifact.query.filter_by(task_id='task-nueva').first() is not None
+        assert almacen_local.tamano(vigente.storage_key) == 3
+        with pytest.raises(FileNotFoundError):
+            open(ruta_vencida, 'rb')
+
+    def test_limpiar_sigue_si_s3_falla_en_un_objeto(self, db, tenant, monkeypatch):
+        from app.tasks.downloads import limpiar_descargas_vencidas
+
+        almacen = AlmacenS3('facturas', client=_S3Falso())
+        monkeypatch.setattr('app.tasks.downloads.get_almacen', lambda: almacen)
+        vencido = datetime.utcnow() - timedelta(seconds=1)
+        _guardar(almacen, db, tenant, 'denegado', b'a', expires_at=vencido)
+        _guardar(almacen, db, tenant, 'borrable', b'b', expires_at=vencido)
+
+        resultado = limpiar_descargas_vencidas.run()
+
+        assert resultado == {'eliminados': 1}
+        assert DownloadArtifact.query.filter_by(task_id='denegado').first() is not None
+        assert DownloadArtifact.query.filter_by(task_id='borrable').first() is None
@@ -0,0 +1,92 @@
+from app.services import encryption
+from app.services.encryption import (
+    clear_secret_store,
+    encrypt_certificate,
+    get_facturador_credentials,
+    get_fernet,
+    get_smtp_password,
+    invalidate_facturador_secrets,
+)
+
+PEM = b'-----BEGIN CERTIFICATE-----\nQUJD\n-----END CERTIFICATE-----\n'
+
+
+class TestFernetCache:
+    def test_get_fernet_reuses_instance(self, app):
+        with app.app_context():
+            assert get_fernet() is get_fernet()
+
+
+class TestSecretStore:
+    def setup_method(self):
+        clear_secret_store()
+
+    def test_credentials_decrypted_once_per_ciphertext(self, db, facturador, monkeypatch):
+        facturador.cert_encrypted = encrypt_certificate(PEM)
+        facturador.key_encrypted = encrypt_certificate(b'clave')
+        db.session.commit()
+
+        calls = {'count': 0}
+        original = encryption.decrypt_certificate
+
+        def _counting_decrypt(value):
+            calls['count'] += 1
+            return original(value)
+
+        monkeypatch.setattr(encryption, 'decrypt_certificate', _counting_decrypt)
+
+        first = get_facturador_credentials(facturador)
+        second = get_facturador_credentials(facturador)
+
+        assert first == second
+        assert first[0] == PEM
+        assert calls['count'] == 2
+
+    def test_new_ciphertext_never_returns_stale_secret(self, db, facturador):
+        facturador.cert_encrypted = encrypt_certificate(PEM)
+        facturador.key_encrypted = encrypt_certificate(b'clave-vieja')
+        db.session.commit()
+        assert get_facturador_credentials(facturador)[1] == b'clave-vieja'
+
+        facturador.key_encrypted = encrypt_certificate(b'clave-nueva')
+        db.session.commit()
+        assert get_facturador_credentials(facturador)[1] == b'clave-nueva'
+
+    def test_invalidate_forces_decrypt(self, db, facturador, monkeypatch):
+        facturador.cert_encrypted = encrypt_certificate(PEM)
+        facturador.key_encrypted = encrypt_certificate(b'clave')
+        db.session.commit()
+        get_facturador_credentials(facturador)
+
+        invalidate_facturador_secrets(facturador.id)
+
+        calls = {'count': 0}
+        original = encryption.decrypt_certificate
+
+        def _counting_decrypt(value):
+            calls['count'] += 1
+            return original(value)
+
+        monkeypatch.setattr(encryption, 'decrypt_certificate', _counting_decrypt)
+        get_facturador_credentials(facturador)
+        assert calls['count'] == 2
+
+    def test_store_is_bounded(self, app):
+        with app.app_context():
+            app.config['SECRET_CACHE_MAX_ENTRIES'] = 2
+            try:
+                for idx in range(3):
+                    encryption.decrypt_cached(('facturador', str(idx)), encrypt_certificate(b'x'))
+                assert len(encryption._secret_store._entries) == 2
+            finally:
+                app.config['SECRET_CACHE_MAX_ENTRIES'] = encryption.DEFAULT_SECRET_CACHE_MAX_ENTRIES
+
+    def test_smtp_password(self, app):
+        class _Config:
+            id = 'cfg-1'
+            smtp_password_encrypted = None
+
+        with app.app_context():
+            config = _Config()
+            config.smtp_password_encrypted = encrypt_certificate(b'secreto')
+            assert get_smtp_password(config) == 'secreto'
@@ -1,8 +1,21 @@
-from datetime import date
+from datetime import date, datetime, timedelta
 from decimal import Decimal
+from types import SimpleNamespace
 
-from app.models import Factura
+import pytest
+
+from arca_integration.exceptions import ArcaNetworkError
+
+from app.models import Factura, FacturaArcaIntercambio, FacturaAutorizacion, FacturaEmisionEnCurso, Lote
+from app.services.autorizaciones import (
+    aplicar_autorizaciones_pendientes,
+    registrar_autorizacion,
+    registrar_emision_en_curso,
+)
+from app.services.historial_arca import intercambios_de_factura
+from app.services.reintentos import demora
 from app.tasks.facturacion import (
+    procesar_lote,
     procesar_factura,
     _is_retryable_sequence_error,
     _sync_factura_date_with_last_authorized,
@@ -142,3 +155,424 @@ class TestFacturacionTask:
 
         assert changed is False
         assert factura.fecha_emision == date(2026, 3, 1)
+
+
+class _FakeLoteClient:
+    """Cliente ARCA en memoria: numera en secuencia y autoriza todo."""
+
+    def __init__(self, *args, cuit='20123456789', ambiente='testing', **kwargs):
+        self.cuit = cuit
+        self.ambiente = ambiente
+        self.wsfe = object()
+
+    def fe_param_get_ptos_venta(self):
+        return []
+
+    def fe_comp_ultimo_autorizado(self, punto_venta, tipo_cbte):
+        return _FakeLoteWSFE.ultimo
+
+    def fe_comp_consultar(self, tipo_cbte, punto_venta, numero):
+        consulta = _FakeLoteWSFE.consultas.get(numero, {'encontrado': False})
+        if isinstance(consulta, Exception):
+            raise consulta
+        return consulta
+
+
+class _FakeLoteWSFE:
+    ultimo = 100
+    consultas = {}
+    emitidos = 0
+
+    def __init__(self, _client):
+        pass
+
+    def autorizar(self, request_data):
+        _FakeLoteWSFE.ultimo += 1
+        _FakeLoteWSFE.emitidos += 1
+        return {
+            'cae': f'7{_FakeLoteWSFE.ultimo:013d}',
+            'cae_vencimiento': '2026-12-31',
+        }
+
+
+class _SilentProgress:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def update(self, *args, **kwargs):
+        return False
+
+
+@pytest.fixture
+def lote_con_facturas(db, facturador, receptor):
+    facturador.cert_encrypted = b'cert'
+    facturador.key_encrypted = b'key'
+    lote = Lote(tenant_id=facturador.tenant_id, etiqueta='Lote batch', tipo='factura', estado='pendiente')
+    db.session.add(lote)
+    db.session.flush()
+
+    facturas = []
+    for _ in range(5):
+        factura = Factura(
+            tenant_id=facturador.tenant_id,
+            lote_id=lote.id,
+            facturador_id=facturador.id,
+            receptor_id=receptor.id,
+            tipo_comprobante=11,
+            concepto=1,
+            punto_venta=facturador.punto_venta,
+            fecha_emision=date(2026, 1, 15),
+            importe_neto=Decimal('100.00'),
+            importe_iva=Decimal('0'),
+            importe_total=Decimal('100.00'),
+            moneda='PES',
+            cotizacion=Decimal('1'),
+            estado='pendiente',
+        )
+        db.session.add(factura)
+        facturas.append(factura)
+    db.session.commit()
+    return lote, facturas
+
+
+def _vencer_reintentos(db, lote):
+    Factura.query.filter(Factura.lote_id == lote.id, Factura.proximo_reintento.isnot(None)).update(
+        {Factura.proximo_reintento: datetime.utcnow() - timedelta(seconds=1)},
+        synchronize_session=False,
+    )
+    db.session.commit()
+
+
+@pytest.fixture
+def fake_arca(monkeypatch):
+    _FakeLoteWSFE.ultimo = 100
+    _FakeLoteWSFE.consultas = {}
+    _FakeLoteWSFE.emitidos = 0
+    monkeypatch.setattr('arca_integration.ArcaClient', _FakeLoteClient)
+    monkeypatch.setattr('arca_integration.services.WSFEService', _FakeLoteWSFE)
+    monkeypatch.setattr('app.tasks.facturacion.ProgressReporter', _SilentProgress)
+    monkeypatch.setattr(
+        'app.tasks.facturacion.get_facturador_credentials',
+        lambda _facturador: (b'cert', b'key'),
+    )
+
+
+@pytest.mark.usefixtures('fake_arca')
+class TestProcesarLoteBatching:
+    def test_commits_in_batches_and_journals_every_cae(self, app, db, lote_con_facturas, monkeypatch):
+        lote, _ = lote_con_facturas
+        monkeypatch.setitem(app.config, 'FACTURACION_COMMIT_BATCH_SIZE', 2)
+        monkeypatch.setitem(app.config, 'FACTURACION_COMMIT_INTERVAL_SECONDS', 60)
+
+        commits = []
+        original_commit = db.session.commit
+
+        def counting_commit():
+            commits.append(1)
+            original_commit()
+
+        monkeypatch.setattr(db.session, 'commit', counting_commit)
+
+        result = procesar_lote.run(lote.id, lote.tenant_id)
+
+        assert result['ok'] == 5
+        # 2 tandas completas + resto del grupo + cierre del lote
+        assert len(commits) == 4
+
+        autorizadas = Factura.query.filter_by(lote_id=lote.id, estado='autorizado').all()
+        assert sorted(f.numero_comprobante for f in autorizadas) == [101, 102, 103, 104, 105]
+        assert all(f.cae_vencimiento == date(2026, 12, 31) for f in autorizadas)
+
+        journal = FacturaAutorizacion.query.filter_by(lote_id=lote.id).all()
+        assert sorted(r.numero_comprobante for r in journal) == [101, 102, 103, 104, 105]
+
+    def test_recovers_cae_from_journal_without_reemitting(self, db, lote_con_facturas):
+        lote, facturas = lote_con_facturas
+        perdida = facturas[0]
+        registrar_autorizacion(perdida, cae='71234567890123', cae_vencimiento='2026-12-31', numero_comprobante=101)
+        _FakeLoteWSFE.ultimo = 101
+
+        assert aplicar_autorizaciones_pendientes(lote.tenant_id, lote.id) == 1
+        db.session.commit()
+
+        result = procesar_lote.run(lote.id, lote.tenant_id)
+
+        assert result['total'] == 4
+        db.session.refresh(perdida)
+        assert perdida.estado == 'autorizado'
+        assert perdida.cae == '71234567890123'
+        assert FacturaAutorizacion.query.filter_by(factura_id=perdida.id).count() == 1
+
+
+@pytest.mark.usefixtures('fake_arca')
+class TestEmisionEnCurso:
+    @staticmethod
+    def _request(factura, numero):
+        return {
+            'FeCAEReq': {
+                'FeDetReq': {
+                    'FECAEDetRequest': [{
+                        'DocTipo': 80,
+                        'DocNro': '30111111111',
+                        'CbteDesde': numero,
+                        'CbteFch': '20260115',
+                        'ImpTotal': 100.0,
+                    }]
+                }
+            }
+        }
+
+    def test_successful_lote_leaves_no_inflight_markers(self, db, lote_con_facturas):
+        lote, _ = lote_con_facturas
+
+        procesar_lote.run(lote.id, lote.tenant_id)
+
+        assert FacturaEmisionEnCurso.query.count() == 0
+
+    def test_resume_recovers_cae_from_arca_instead_of_reemitting(self, db, lote_con_facturas):
+        lote, facturas = lote_con_facturas
+        interrumpida = facturas[0]
+        registrar_emision_en_curso(interrumpida, 101, self._request(interrumpida, 101))
+        _FakeLoteWSFE.ultimo = 101
+        _FakeLoteWSFE.consultas[101] = {
+            'encontrado': True,
+            'doc_tipo': 80,
+            'doc_nro': 30111111111,
+            'fecha_cbte': '20260115',
+            'imp_total': 100,
+            'cae': '75555555555555',
+            'cae_vto': '20261231',
+        }
+
+        result = procesar_lote.run(lote.id, lote.tenant_id)
+
+        assert result['ok'] == 5
+        assert _FakeLoteWSFE.emitidos == 4
+        db.session.refresh(interrumpida)
+        assert interrumpida.estado == 'autorizado'
+        assert interrumpida.cae == '75555555555555'
+        assert interrumpida.numero_comprobante == 101
+        assert FacturaEmisionEnCurso.query.count() == 0
+
+        historial = intercambios_de_factura(interrumpida)
+        assert [h['operacion'] for h in historial] == ['FECompConsultar']
+        assert historial[0]['request']['numero'] == 101
+        assert historial[0]['response']['cae'] == '75555555555555'
+
+    def test_number_not_in_arca_is_reemitted(self, db, lote_con_facturas):
+        lote, facturas = lote_con_facturas
+        registrar_emision_en_curso(facturas[0], 101, self._request(facturas[0], 101))
+
+        result = procesar_lote.run(lote.id, lote.tenant_id)
+
+        assert result['ok'] == 5
+        assert _FakeLoteWSFE.emitidos == 5
+        assert FacturaEmisionEnCurso.query.count() == 0
+
+    def test_unconfirmed_emission_is_not_reemitted(self, db, lote_con_facturas):
+        lote, facturas = lote_con_facturas
+        interrumpida = facturas[0]
+        registrar_emision_en_curso(interrumpida, 101, self._request(interrumpida, 101))
+        _FakeLoteWSFE.consultas[101] = ArcaNetworkError('timeout')
+
+        result = procesar_lote.run(lote.id, lote.tenant_id)
+
+        assert result['errors'] == 1
+        assert _FakeLoteWSFE.emitidos == 4
+        db.session.refresh(interrumpida)
+        assert interrumpida.estado == 'error'
+        assert interrumpida.error_codigo == 'emision_sin_confirmar'
+        assert FacturaEmisionEnCurso.query.filter_by(factura_id=interrumpida.id).count() == 1
+
+
+@pytest.mark.usefixtures('fake_arca')
+class TestHistorialArca:
+    def test_cada_intento_queda_en_el_historial_comprimido(self, db, lote_con_facturas, monkeypatch):
+        lote, facturas = lote_con_facturas
+        autorizar = _FakeLoteWSFE.autorizar
+        intentos = []
+
+        def _autorizar_con_error_de_secuencia(self, request_data):
+            intentos.append(1)
+            if len(intentos) == 1:
+                return {'error_code': '10016', 'error_message': 'El numero o fecha del comprobante no se corresponde'}
+            return autorizar(self, request_data)
+
+        monkeypatch.setattr(_FakeLoteWSFE, 'autorizar', _autorizar_con_error_de_secuencia)
+        monkeypatch.setattr(
+            'app.tasks.facturacion.procesar_lote.apply_async',
+            lambda **kwargs: SimpleNamespace(id='reintento-1'),
+        )
+
+        assert procesar_lote.run(lote.id, lote.tenant_id)['ok'] == 4
+        _vencer_reintentos(db, lote)
+        assert procesar_lote.run(lote.id, lote.tenant_id)['ok'] == 1
+
+        assert FacturaArcaIntercambio.query.count() == 6
+
+        primera = next(f for f in facturas if len(intercambios_de_factura(f)) == 2)
+        historial = intercambios_de_factura(primera)
+        assert [h['intento'] for h in historial] == [1, 2]
+        assert [h['resultado'] for h in historial] == ['rechazado', 'autorizado']
+        assert historial[0]['error_codigo'] == '10016'
+        assert historial[0]['request']['FeCAEReq']['FeDetReq']['FECAEDetRequest'][0]['CbteDesde'] == 101
+        assert historial[1]['response']['cae'] == primera.cae
+
+        # El payload de la factura ya no duplica el intercambio.
+        assert primera.arca_request is None
+        assert primera.arca_response is None
+
+
+@pytest.mark.usefixtures('fake_arca')
+class TestCircuitoArca:
+    def test_circuito_abierto_pausa_sin_intentar(self, db, lote_con_facturas, monkeypatch):
+        lote, _ = lote_con_facturas
+        monkeypatch.setattr('app.tasks.facturacion.circuito_abierto', lambda _ambiente: 'wsfe:testing')
+
+        result = procesar_lote.run(lote.id, lote.tenant_id)
+
+        assert result['status'] == 'paused'
+        assert _FakeLoteWSFE.emitidos == 0
+        db.session.refresh(lote)
+        assert (lote.estado, lote.pausado_por) == ('pausado', 'wsfe:testing')
+        assert Factura.query.filter_by(lote_id=lote.id, estado='pendiente').count() == 5
+
+    def test_falla_con_circuito_abierto_deja_pendientes_y_se_reanuda(self, db, lote_con_facturas, monkeypatch):
+        lote, _ = lote_con_facturas
+        autorizar = _FakeLoteWSFE.autorizar
+        caido = {'wsfe': False}
+        llamadas = []
+
+        def _autorizar(self, request_data):
+            llamadas.append(1)
+            if len(llamadas) == 3:
+                caido['wsfe'] = True
+            if caido['wsfe']:
+                raise ArcaNetworkError('timed out')
+            return autorizar(self, request_data)
+
+        monkeypatch.setattr(_FakeLoteWSFE, 'autorizar', _autorizar)
+        monkeypatch.setattr(
+            'app.tasks.facturacion.circuito_abierto',
+            lambda _ambiente: 'wsfe:testing' if caido['wsfe'] else None,
+        )
+
+        result = procesar_lote.run(lote.id, lote.tenant_id)
+
+        assert (result['status'], result['ok']) == ('paused', 2)
+        assert Factura.query.filter_by(lote_id=lote.id, estado='error').count() == 0
+        assert Factura.query.filter_by(lote_id=lote.id, estado='pendiente').count() == 3
+
+        caido['wsfe'] = False
+        result = procesar_lote.run(lote.id, lote.tenant_id)
+
+        assert result['status'] == 'completed'
+        db.session.refresh(lote)
+        assert (lote.estado, lote.pausado_por, lote.facturas_ok) == ('completado', None, 5)
+
+
+class TestDemoraReintento:
+    def test_backoff_exponencial_con_jitter_y_tope(self):
+        assert demora('secuencia', 1, aleatorio=lambda: 0) == 0.5
+        assert demora('secuencia', 1, aleatorio=lambda: 1) == 1
+        assert demora('red', 3, aleatorio=lambda: 1) == 40
+        assert demora('wsaa_ta', 10, aleatorio=lambda: 1) == 120
+
+
+@pytest.mark.usefixtures('fake_arca')
+class TestReintentosDiferidos:
+    @pytest.fixture
+    def encolados(self, monkeypatch):
+        encolados = []
+
+        def _apply_async(**kwargs):
+            encolados.append(kwargs)
+            return SimpleNamespace(id=f'reintento-{len(encolados)}')
+
+        monkeypatch.setattr('app.tasks.facturacion.procesar_lote.apply_async', _apply_async)
+        return encolados
+
+    @pytest.fixture
+    def red_caida_una_vez(self, monkeypatch):
+        autorizar = _FakeLoteWSFE.autorizar
+        llamadas = []
+
+        def _autorizar(self, request_data):
+            llamadas.append(1)
+            if len(llamadas) == 1:
+                raise ArcaNetworkError('timed out')
+            return autorizar(self, request_data)
+
+        monkeypatch.setattr(_FakeLoteWSFE, 'autorizar', _autorizar)
+
+    @pytest.mark.usefixtures('red_caida_una_vez')
+    def test_error_de_red_reprograma_sin_bloquear_el_lote(self, db, lote_con_facturas, encolados):
+        lote, _ = lote_con_facturas
+        lote.estado = 'procesando'
+        db.session.commit()
+
+        result = procesar_lote.run(lote.id, lote.tenant_id)
+
+        assert (result['status'], result['ok'], result['reprogramadas']) == ('retry_scheduled', 4, 1)
+        diferida = Factura.query.filter_by(lote_id=lote.id, estado='pendiente').one()
+        assert diferida.reintentos == 1
+        assert diferida.proximo_reintento > datetime.utcnow()
+        assert diferida.to_dict()['error_codigo'] == 'arca_conexion'
+        assert encolados[0]['kwargs'] == {'reintento': True}
+        assert 5 <= encolados[0]['countdown'] <= 11
+        db.session.refresh(lote)
+        assert (lote.estado, lote.celery_task_id) == ('procesando', encolados[0]['task_id'])
+
+        # La ejecución programada sólo toma lo vencido.
+        assert procesar_lote.run(lote.id, lote.tenant_id, reintento=True)['total'] == 0
+        _vencer_reintentos(db, lote)
+        result = procesar_lote.run(lote.id, lote.tenant_id, reintento=True)
+
+        assert (result['status'], result['ok']) == ('completed', 1)
+        db.session.refresh(diferida)
+        assert (diferida.estado, diferida.reintentos, diferida.proximo_reintento) == ('autorizado', 1, None)
+        assert diferida.error_codigo is None
+
+    @pytest.mark.usefixtures('red_caida_una_vez')
+    def test_agotados_los_intentos_queda_en_error(self, app, db, lote_con_facturas, encolados, monkeypatch):
+        lote, _ = lote_con_facturas
+        monkeypatch.setitem(app.config, 'FACTURACION_REINTENTOS_MAX', 0)
+
+        result = procesar_lote.run(lote.id, lote.tenant_id)
+
+        assert (result['status'], result['errors']) == ('completed', 1)
+        assert encolados == []
+
+    def test_ejecucion_programada_reemplazada_no_procesa(self, db, lote_con_facturas):
+        lote, _ = lote_con_facturas
+        lote.estado = 'completado'
+        db.session.commit()
+
+        assert procesar_lote.run(lote.id, lote.tenant_id, reintento=True) == {'status': 'superseded'}
+        assert _FakeLoteWSFE.emitidos == 0
+
+
+@pytest.mark.usefixtures('fake_arca')
+class TestTurnos:
+    def test_lote_grande_se_procesa_de_a_turnos(self, app, db, lote_con_facturas, monkeypatch):
+        lote, _ = lote_con_facturas
+        lote.estado = 'procesando'
+        db.session.commit()
+        monkeypatch.setitem(app.config, 'FACTURACION_FACTURAS_POR_TURNO', 2)
+        encolados = []
+        monkeypatch.setattr(
+            'app.tasks.facturacion.procesar_lote.apply_async',
+            lambda **kwargs: encolados.append(kwargs),
+        )
+
+        resultados = [procesar_lote.run(lote.id, lote.tenant_id)]
+        while resultados[-1]['status'] == 'continued':
+            db.session.refresh(lote)
+            assert lote.estado == 'procesando'
+            assert lote.celery_task_id == encolados[-1]['task_id'] == resultados[-1]['siguiente_task_id']
+            assert encolados[-1]['kwargs'] == {'reintento': True}
+            resultados.append(procesar_lote.run(lote.id, lote.tenant_id, reintento=True))
+
+        assert [(r['status'], r['ok']) for r in resultados] == [('continued', 2), ('continued', 2), ('completed', 1)]
+        db.session.refresh(lote)
+        assert (lote.estado, lote.facturas_ok) == ('completado', 5)
@@ -610,3 +610,56 @@ class TestComprobantePdf:
         assert response.status_code == 200
         assert response.headers['Content-Type'] == 'application/pdf'
         assert '20123456789_006_00001_00000042.pdf' in response.headers['Content-Disposition']
+
+
+class TestFacturaPayload:
+    def _factura(self, facturador, receptor, **kwargs):
+        return Factura(
+            tenant_id=facturador.tenant_id,
+            facturador_id=facturador.id,
+            receptor_id=receptor.id,
+            tipo_comprobante=6,
+            concepto=1,
+            punto_venta=1,
+            fecha_emision=date(2026, 1, 15),
+            importe_total=Decimal('1210.00'),
+            importe_neto=Decimal('1000.00'),
+            importe_iva=Decimal('210.00'),
+            estado='autorizado',
+            **kwargs,
+        )
+
+    def test_payload_en_tabla_aparte(self, db, facturador, receptor):
+        from app.models import FacturaPayload
+
+        sin_payload = self._factura(facturador, receptor)
+        con_payload = self._factura(
+            facturador, receptor,
+            arca_request={'FeCAEReq': {}},
+            comprobante_html='<html data-template-version="comprobante-v2"></html>',
+        )
+        db.session.add_all([sin_payload, con_payload])
+        db.session.commit()
+
+        assert FacturaPayload.query.count() == 1
+        db.session.expire_all()
+
+        factura = db.session.get(Factura, (con_payload.id, con_payload.fecha_emision))
+        assert 'payload' not in factura.__dict__
+        assert factura.to_dict()['tiene_comprobante_html'] is True
+        assert 'payload' not in factura.__dict__
+        assert factura.arca_request == {'FeCAEReq': {}}
+        assert factura.arca_response is None
+
+        otra = db.session.get(Factura, (sin_payload.id, sin_payload.fecha_emision))
+        assert otra.to_dict()['tiene_comprobante_html'] is False
+        assert otra.arca_request is None
+
+    def test_listado_no_carga_payload(self, client, auth_headers, db, facturador, receptor):
+        factura = self._factura(facturador, receptor, comprobante_html='<html></html>')
+        db.session.add(factura)
+        db.session.commit()
+
+        response = client.get('/api/facturas', headers=auth_headers)
+        assert response.status_code == 200
+        assert response.get_json()['items'][0]['tiene_comprobante_html'] is True
@@ -0,0 +1,110 @@
+import gzip
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.models import Factura, FacturaArcaIntercambio
+from app.services.almacenamiento import get_almacen
+from app.services.historial_arca import comprimir, descomprimir, registrar_intercambio
+from app.tasks.historial_arca import archivar_historial_arca
+
+
+@pytest.fixture
+def factura(db, facturador, receptor):
+    factura = Factura(
+        tenant_id=facturador.tenant_id,
+        facturador_id=facturador.id,
+        receptor_id=receptor.id,
+        tipo_comprobante=11,
+        concepto=1,
+        punto_venta=1,
+        numero_comprobante=7,
+        fecha_emision=date(2026, 1, 15),
+        importe_neto=Decimal('100.00'),
+        importe_iva=Decimal('0'),
+        importe_total=Decimal('100.00'),
+        estado='autorizado',
+    )
+    db.session.add(factura)
+    db.session.commit()
+    return factura
+
+
+class TestCompresion:
+    def test_ida_y_vuelta(self):
+        valor = {'FeCAEReq': {'FeDetReq': {'FECAEDetRequest': [{'ImpTotal': 100.0, 'Obs': 'ñandú'}] * 20}}}
+        datos, originales = comprimir(valor)
+
+        assert datos[:2] == b'\x1f\x8b'
+        assert len(datos) < originales
+        assert descomprimir(datos) == valor
+
+    def test_codificacion_desconocida(self):
+        with pytest.raises(ValueError):
+            descomprimir(b'x', 'zstd')
+
+
+class TestHistorialEndpoint:
+    def test_devuelve_intentos_descomprimidos(self, client, auth_headers, db, factura):
+        registrar_intercambio(factura, 'FECAESolicitar', 'rechazado', request={'n': 1},
+                              response={'error_code': '10016'}, error_codigo='10016')
+        db.session.flush()
+        registrar_intercambio(factura, 'FECAESolicitar', 'autorizado', request={'n': 2},
+                              response={'cae': '71234567890123'})
+        db.session.commit()
+
+        response = client.get(f'/api/facturas/{factura.id}/arca-historial', headers=auth_headers)
+
+        assert response.status_code == 200
+        intercambios = response.get_json()['intercambios']
+        assert [i['intento'] for i in intercambios] == [1, 2]
+        assert intercambios[0]['error_codigo'] == '10016'
+        assert intercambios[1]['request'] == {'n': 2}
+        assert intercambios[1]['response'] == {'cae': '71234567890123'}
+
+    def test_factura_de_otro_tenant(self, client, auth_headers):
+        response = client.get('/api/facturas/00000000-0000-0000-0000-000000000000/arca-historial',
+                              headers=auth_headers)
+        assert response.status_code == 404
+
+
+class TestRetencion:
+    def _intercambio_viejo(self, db, factura, dias):
+        intercambio = registrar_intercambio(factura, 'FECAESolicitar', 'autorizado',
+                                            request={'dias': dias}, response={'cae': '1'})
+        intercambio.created_at = datetime.utcnow() - timedelta(days=dias)
+        db.session.commit()
+        return intercambio
+
+    def test_archiva_en_almacenamiento_y_borra(self, app, db, factura, tmp_path, monkeypatch):
+        monkeypatch.setitem(app.config, 'DOWNLOADS_LOCAL_DIR', str(tmp_path))
+        monkeypatch.setitem(app.config, 'ARCA_HISTORIAL_DIAS_EN_BASE', 30)
+        self._intercambio_viejo(db, factura, 90)
+        self._intercambio_viejo(db, factura, 45)
+        reciente = self._intercambio_viejo(db, factura, 1)
+
+        resultado = archivar_historial_arca.run(limite=1)
+
+        assert resultado['eliminados'] == 2
+        assert len(resultado['archivos']) == 2
+        assert [i.id for i in FacturaArcaIntercambio.query.all()] == [reciente.id]
+
+        almacen = get_almacen()
+        lineas = []
+        for clave in resultado['archivos']:
+            assert clave.startswith(f'historial-arca/{factura.tenant_id}/')
+            with gzip.open(almacen.ruta(clave), 'rt', encoding='utf-8') as archivo:
+                lineas.extend(json.loads(linea) for linea in archivo)
+        assert sorted(linea['request']['dias'] for linea in lineas) == [45, 90]
+
+    def test_sin_archivar_solo_borra(self, app, db, factura, monkeypatch):
+        monkeypatch.setitem(app.config, 'ARCA_HISTORIAL_ARCHIVAR', False)
+        monkeypatch.setitem(app.config, 'ARCA_HISTORIAL_DIAS_EN_BASE', 30)
+        self._intercambio_viejo(db, factura, 90)
+
+        resultado = archivar_historial_arca.run()
+
+        assert resultado == {'eliminados': 1, 'archivos': []}
+        assert FacturaArcaIntercambio.query.count() == 0
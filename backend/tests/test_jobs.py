@@ -0,0 +1,107 @@
+import json
+
+import redis
+
+from app.services import progress as progress_module
+from app.services.progress import ProgressReporter
+
+
+class _FakeTask:
+    def __init__(self):
+        self.request = type('Req', (), {'id': 'task-1'})()
+        self.states = []
+
+    def update_state(self, state, meta):
+        self.states.append((state, meta))
+
+
+class _FakePubSub:
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.closed = False
+
+    def get_message(self, timeout=None):
+        if self.messages:
+            return {'type': 'message', 'data': json.dumps(self.messages.pop(0))}
+        return None
+
+    def close(self):
+        self.closed = True
+
+
+class TestProgressReporter:
+    def test_throttles_by_items(self, monkeypatch):
+        published = []
+        monkeypatch.setattr(progress_module, 'publish_progress', lambda task_id, payload: published.append(payload) or True)
+        task = _FakeTask()
+
+        reporter = ProgressReporter(task, total=100, interval_ms=60_000, every_n=10)
+        for current in range(1, 101):
+            reporter.update(current)
+
+        emitted = [meta['current'] for _state, meta in task.states]
+        assert emitted == [1, 11, 21, 31, 41, 51, 61, 71, 81, 91, 100]
+        assert len(published) == len(emitted)
+
+    def test_always_emits_last_item(self, monkeypatch):
+        monkeypatch.setattr(progress_module, 'publish_progress', lambda *_args: True)
+        task = _FakeTask()
+
+        reporter = ProgressReporter(task, total=3, interval_ms=60_000, every_n=50)
+        for current in range(1, 4):
+            reporter.update(current)
+
+        assert [meta['current'] for _state, meta in task.states] == [1, 3]
+        assert task.states[-1][1]['percent'] == 100
+
+    def test_stops_publishing_after_redis_failure(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(progress_module, 'publish_progress', lambda *_args: calls.append(1) and False)
+        task = _FakeTask()
+
+        reporter = ProgressReporter(task, total=3, interval_ms=0, every_n=1)
+        for current in range(1, 4):
+            reporter.update(current)
+
+        assert len(calls) == 1
+        assert len(task.states) == 3
+
+
+class TestJobStream:
+    def test_stream_emits_progress_and_final_status(self, client, auth_headers, monkeypatch):
+        pubsub = _FakePubSub([
+            {'status': 'PROGRESS', 'progress': {'current': 5, 'total': 10, 'percent': 50}},
+            {'status': 'SUCCESS', 'finished': True},
+        ])
+        statuses = iter([
+            {'task_id': 'task-1', 'status': 'PROGRESS', 'progress': {'current': 1, 'total': 10, 'percent': 10}},
+            {'task_id': 'task-1', 'status': 'SUCCESS', 'result': {'processed': 10, 'total': 10}},
+        ])
+        monkeypatch.setattr('app.api.jobs.subscribe_progress', lambda _task_id: pubsub)
+        monkeypatch.setattr('app.api.jobs._build_job_status', lambda _task_id: next(statuses))
+
+        response = client.get('/api/jobs/task-1/stream', headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        events = [
+            json.loads(line[len('data: '):])
+            for line in response.get_data(as_text=True).split('\n')
+            if line.startswith('data: ')
+        ]
+        assert [event['status'] for event in events] == ['PROGRESS', 'PROGRESS', 'SUCCESS']
+        assert events[1]['progress']['current'] == 5
+        assert pubsub.closed is True
+
+    def test_stream_returns_503_without_redis(self, client, auth_headers, monkeypatch):
+        def _fail(_task_id):
+            raise redis.ConnectionError('sin redis')
+
+        monkeypatch.setattr('app.api.jobs.subscribe_progress', _fail)
+
+        response = client.get('/api/jobs/task-1/stream', headers=auth_headers)
+        assert response.status_code == 503
+
+    def test_stream_requires_auth(self, client, db):
+        response = client.get('/api/jobs/task-1/stream')
+        assert response.status_code == 401
@@ -0,0 +1,180 @@
+import math
+from contextlib import nullcontext
+
+import pytest
+import redis
+
+from arca_integration import ArcaClient, ArcaLimiteError, LimitadorArca, LimiteServicio, configurar_limitador
+from arca_integration import limitador as modulo_limitador
+from app import create_app
+from app.config import TestingConfig
+
+
+class _RedisFalso:
+    """Emula en Python los dos scripts Lua del limitador, con un reloj manual."""
+
+    def __init__(self):
+        self.ahora_ms = 1_000_000
+        self.buckets = {}
+        self.semaforos = {}
+
+    def avanzar(self, segundos):
+        self.ahora_ms += int(segundos * 1000)
+
+    def register_script(self, fuente):
+        if fuente == modulo_limitador.SCRIPT_TOKEN_BUCKET:
+            return self._token_bucket
+        if fuente == modulo_limitador.SCRIPT_SEMAFORO:
+            return self._semaforo
+        raise AssertionError('script desconocido')
+
+    def _token_bucket(self, keys, args):
+        tasa, capacidad = float(args[0]), float(args[1])
+        tokens, ts = self.buckets.get(keys[0], (capacidad, self.ahora_ms))
+        tokens = min(capacidad, tokens + max(0, self.ahora_ms - ts) * tasa / 1000)
+        espera = 0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            espera = math.ceil((1 - tokens) * 1000 / tasa)
+        self.buckets[keys[0]] = (tokens, self.ahora_ms)
+        return espera
+
+    def _semaforo(self, keys, args):
+        lugar, limite, ttl_ms = args[0], int(args[1]), int(args[2])
+        lugares = self.semaforos.setdefault(keys[0], {})
+        for vencido in [k for k, vence in lugares.items() if vence <= self.ahora_ms]:
+            del lugares[vencido]
+        if len(lugares) < limite:
+            lugares[lugar] = self.ahora_ms + ttl_ms
+            return 1
+        return 0
+
+    def zrem(self, clave, lugar):
+        self.semaforos.get(clave, {}).pop(lugar, None)
+
+
+@pytest.fixture
+def redis_falso():
+    return _RedisFalso()
+
+
+def _limitador(redis_falso, esperas, **limite):
+    def dormir(segundos):
+        esperas.append(segundos)
+        redis_falso.avanzar(segundos)
+
+    return LimitadorArca(
+        lambda: redis_falso,
+        {'wsfe': LimiteServicio(**limite)},
+        espera_maxima=5,
+        dormir=dormir,
+    )
+
+
+class TestLimitadorArca:
+    def test_token_bucket_espera_pasada_la_rafaga(self, redis_falso):
+        esperas = []
+        limitador = _limitador(redis_falso, esperas, por_segundo=2, rafaga=2)
+
+        for _ in range(3):
+            with limitador.llamada('20123456789', 'testing', 'wsfe'):
+                pass
+
+        assert esperas == [0.5]
+
+    def test_la_clave_separa_cuit_y_ambiente(self, redis_falso):
+        esperas = []
+        limitador = _limitador(redis_falso, esperas, por_segundo=1, rafaga=1)
+
+        for cuit, ambiente in [('20123456789', 'testing'), ('20999999999', 'testing'), ('20123456789', 'production')]:
+            with limitador.llamada(cuit, ambiente, 'wsfe'):
+                pass
+
+        assert esperas == []
+        assert set(redis_falso.buckets) == {
+            'arca:limite:20123456789:testing:wsfe:tasa',
+            'arca:limite:20999999999:testing:wsfe:tasa',
+            'arca:limite:20123456789:production:wsfe:tasa',
+        }
+
+    def test_espera_mayor_a_la_maxima_falla_y_libera_el_lugar(self, redis_falso):
+        limitador = _limitador(redis_falso, [], por_segundo=0.1, rafaga=1, concurrencia=2)
+
+        with limitador.llamada('20123456789', 'testing', 'wsfe'):
+            pass
+        with pytest.raises(ArcaLimiteError):
+            with limitador.llamada('20123456789', 'testing', 'wsfe'):
+                pass
+
+        assert redis_falso.semaforos['arca:limite:20123456789:testing:wsfe:concurrencia'] == {}
+
+    def test_concurrencia_limita_llamadas_simultaneas(self, redis_falso):
+        limitador = _limitador(redis_falso, [], concurrencia=1)
+        limitador.espera_maxima = 0.01
+        clave = 'arca:limite:20123456789:testing:wsfe:concurrencia'
+
+        with limitador.llamada('20123456789', 'testing', 'wsfe'):
+            assert len(redis_falso.semaforos[clave]) == 1
+            with pytest.raises(ArcaLimiteError):
+                with limitador.llamada('20123456789', 'testing', 'wsfe'):
+                    pass
+
+        assert redis_falso.semaforos[clave] == {}
+        with limitador.llamada('20123456789', 'testing', 'wsfe'):
+            pass
+
+    def test_sin_redis_no_limita(self):
+        def sin_redis():
+            raise redis.ConnectionError('sin redis')
+
+        limitador = LimitadorArca(sin_redis, {'wsfe': LimiteServicio(por_segundo=1, concurrencia=1)})
+
+        with limitador.llamada('20123456789', 'testing', 'wsfe'):
+            pass
+
+
+class _LimitadorRegistro:
+    def __init__(self, error=None):
+        self.llamadas = []
+        self.error = error
+
+    def llamada(self, cuit, ambiente, servicio):
+        self.llamadas.append((cuit, ambiente, servicio))
+        if self.error:
+            raise self.error
+        return nullcontext()
+
+
+class TestArcaClientLimitado:
+    @pytest.fixture
+    def client(self):
+        yield ArcaClient(cuit='20-12345678-9', cert=b'cert', key=b'key', ambiente='testing')
+        configurar_limitador(None)
+
+    def test_las_llamadas_soap_pasan_por_el_limitador(self, client):
+        registro = _LimitadorRegistro()
+        configurar_limitador(registro)
+
+        class _FakeWS:
+            def send_request(self, method_name, data):
+                return {'ok': True}
+
+        client._send_ws_request(_FakeWS(), 'FECompUltimoAutorizado', 'wsfe', {})
+
+        assert registro.llamadas == [('20123456789', 'testing', 'wsfe')]
+
+    def test_limite_en_wsaa_no_se_convierte_en_error_de_autenticacion(self, client, monkeypatch):
+        configurar_limitador(_LimitadorRegistro(error=ArcaLimiteError('sin lugar')))
+        monkeypatch.setattr(client, '_has_valid_local_ta', lambda service: False)
+
+        with pytest.raises(ArcaLimiteError):
+            client._create_webservice_with_ta_fallback('wsdl', 'wsfe', 'Error WSFE')
+
+
+def test_testing_config_no_configura_limitador():
+    configurar_limitador(_LimitadorRegistro())
+
+    create_app(TestingConfig)
+
+    assert modulo_limitador.limitador_actual() is None
@@ -123,6 +123,20 @@ class TestGetLote:
         assert 'stats' in data
         assert data['stats']['pendientes'] == 2
 
+    def test_get_includes_perfil(self, client, auth_headers, facturador, db):
+        perfil = {'total_ms': 1200.0, 'etapas': {'fecae_solicitar': {'total_ms': 900.0, 'cantidad': 3}}}
+        lote = Lote(tenant_id=facturador.tenant_id, etiqueta='Lote perfil', tipo='factura',
+                    estado='completado', perfil=perfil)
+        db.session.add(lote)
+        db.session.commit()
+
+        response = client.get(f'/api/lotes/{lote.id}', headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.get_json()['perfil'] == perfil
+        listado = client.get('/api/lotes', headers=auth_headers).get_json()
+        assert 'perfil' not in listado['items'][0]
+
     def test_get_not_found(self, client, auth_headers):
         import uuid
         fake_id = str(uuid.uuid4())
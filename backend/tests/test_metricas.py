@@ -0,0 +1,71 @@
+import pytest
+from prometheus_client import REGISTRY
+
+from arca_integration import ArcaClient
+from arca_integration.simulador import ConfigSimulador, SimuladorArca, generar_certificado_prueba
+
+from app.services import metricas
+
+CUIT = '20123456789'
+
+
+def _valor(nombre, **labels):
+    return REGISTRY.get_sample_value(nombre, labels) or 0
+
+
+@pytest.fixture
+def sin_redis(monkeypatch):
+    class _Redis:
+        def llen(self, cola):
+            return {'emision': 7}.get(cola, 0)
+
+    monkeypatch.setattr(metricas, 'get_redis', lambda: _Redis())
+
+
+class TestEndpoint:
+    def test_exposes_prometheus_text(self, client, sin_redis):
+        response = client.get('/metrics')
+
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain')
+        body = response.get_data(as_text=True)
+        assert 'facturador_celery_cola_pendientes{cola="emision"} 7.0' in body
+        assert '# TYPE facturador_arca_llamada_segundos histogram' in body
+
+    def test_token_required_when_configured(self, app, client, sin_redis):
+        app.config['METRICS_TOKEN'] = 'secreto'
+        try:
+            assert client.get('/metrics').status_code == 401
+            ok = client.get('/metrics', headers={'Authorization': 'Bearer secreto'})
+            assert ok.status_code == 200
+        finally:
+            app.config['METRICS_TOKEN'] = ''
+
+
+class TestInstrumentacion:
+    def test_arca_calls_are_observed_by_method_and_result(self, monkeypatch, tmp_path):
+        cert, key = generar_certificado_prueba(CUIT)
+        labels = {'servicio': 'wsfe', 'metodo': 'FECompUltimoAutorizado', 'resultado': 'ok', 'ambiente': 'testing'}
+        antes = _valor('facturador_arca_llamada_segundos_count', **labels)
+        login_antes = _valor('facturador_arca_llamada_segundos_count', servicio='wsaa', metodo='loginCms',
+                             resultado='ok', ambiente='testing')
+
+        with SimuladorArca(config=ConfigSimulador(latencia_ms=0, jitter_ms=0)) as sim:
+            monkeypatch.setenv('ARCA_SIMULADOR_URL', sim.base_url)
+            monkeypatch.setenv('ARCA_TA_CACHE_DIR', str(tmp_path / 'ta'))
+            client = ArcaClient(cuit=CUIT, cert=cert, key=key)
+            client.fe_comp_ultimo_autorizado(1, 11)
+            client.fe_comp_ultimo_autorizado(1, 6)
+
+        assert _valor('facturador_arca_llamada_segundos_count', **labels) == antes + 2
+        assert _valor('facturador_arca_llamada_segundos_count', servicio='wsaa', metodo='loginCms',
+                      resultado='ok', ambiente='testing') == login_antes + 1
+
+    def test_medir_labels_errors(self):
+        antes = _valor('facturador_smtp_envio_segundos_count', resultado='error')
+
+        with pytest.raises(OSError):
+            with metricas.medir(metricas.SMTP_ENVIO_SEGUNDOS):
+                raise OSError('conexión rechazada')
+
+        assert _valor('facturador_smtp_envio_segundos_count', resultado='error') == antes + 1
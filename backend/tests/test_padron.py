@@ -0,0 +1,195 @@
+import io
+from datetime import datetime, timedelta
+
+from arca_integration.exceptions import ArcaNetworkError
+
+from app.models import PadronCache, Receptor
+from app.services.padron import consultar_padron_cacheado, prefetch_padron
+from app.tasks.facturacion import _prefetch_padron_receptores
+from app.tasks.receptores import enriquecer_receptores_padron
+
+
+class _FakePadronClient:
+    def __init__(self, respuestas=None, **kwargs):
+        self.respuestas = respuestas or {}
+        self.consultas = []
+        self.ws_constancia = object()
+
+    def consultar_padron(self, cuit):
+        self.consultas.append(cuit)
+        respuesta = self.respuestas.get(cuit)
+        if isinstance(respuesta, Exception):
+            raise respuesta
+        if respuesta is None:
+            return {'success': False, 'error': 'Persona no encontrada'}
+        return {'success': True, 'data': {'cuit': cuit, **respuesta}}
+
+
+class TestPadronCache:
+    def test_caches_found_and_not_found(self, db):
+        client = _FakePadronClient({'30111111111': {'razon_social': 'Uno SA'}})
+
+        assert consultar_padron_cacheado(client, '30-11111111-1', 'testing')['success'] is True
+        assert consultar_padron_cacheado(client, '30111111111', 'testing')['data']['razon_social'] == 'Uno SA'
+        assert consultar_padron_cacheado(client, '30222222222', 'testing')['success'] is False
+        assert consultar_padron_cacheado(client, '30222222222', 'testing')['success'] is False
+
+        assert client.consultas == ['30111111111', '30222222222']
+        negativo = db.session.get(PadronCache, ('30222222222', 'testing'))
+        assert negativo.encontrado is False
+        assert negativo.expires_at < datetime.utcnow() + timedelta(days=2)
+
+    def test_expired_entry_is_refreshed(self, db):
+        client = _FakePadronClient({'30111111111': {'razon_social': 'Uno SA'}})
+        consultar_padron_cacheado(client, '30111111111', 'testing')
+        db.session.get(PadronCache, ('30111111111', 'testing')).expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+        consultar_padron_cacheado(client, '30111111111', 'testing')
+
+        assert client.consultas == ['30111111111', '30111111111']
+
+    def test_prefetch_skips_cached_and_does_not_cache_errors(self, db):
+        client = _FakePadronClient({
+            '30111111111': {'razon_social': 'Uno SA'},
+            '30333333333': ArcaNetworkError('timeout'),
+        })
+        consultar_padron_cacheado(client, '30111111111', 'testing')
+
+        resultados = prefetch_padron(client, ['30111111111', '30222222222', '30333333333', 'invalido'], 'testing')
+
+        assert set(resultados) == {'30111111111', '30222222222'}
+        assert sorted(client.consultas) == ['30111111111', '30222222222', '30333333333']
+        assert db.session.get(PadronCache, ('30333333333', 'testing')) is None
+
+
+class TestPrefetchReceptores:
+    def test_fills_condicion_iva_before_emission(self, db, facturador, tenant):
+        receptor = Receptor(tenant_id=tenant.id, doc_tipo=80, doc_nro='30444444444', razon_social='CUIT 30444444444')
+        db.session.add(receptor)
+        db.session.commit()
+
+        class _Factura:
+            def __init__(self, receptor):
+                self.receptor = receptor
+
+        client = _FakePadronClient({
+            '30444444444': {'razon_social': 'Cuatro SA', 'condicion_iva': 'IVA Responsable Inscripto'},
+        })
+
+        completados = _prefetch_padron_receptores(client, facturador, [_Factura(receptor), _Factura(receptor)])
+
+        assert completados == 2
+        assert client.consultas == ['30444444444']
+        assert receptor.condicion_iva_id == 1
+        assert receptor.razon_social == 'Cuatro SA'
+
+
+class TestConsultarCuitCache:
+    def test_second_lookup_is_served_from_cache(self, client, auth_headers, facturador, db, monkeypatch):
+        facturador.cert_encrypted = b'cert'
+        facturador.key_encrypted = b'key'
+        db.session.commit()
+
+        consultas = []
+
+        class _FakeClient:
+            def __init__(self, **kwargs):
+                pass
+
+            def consultar_padron(self, cuit):
+                consultas.append(cuit)
+                return {'success': True, 'data': {'cuit': cuit, 'razon_social': 'Cliente SA'}}
+
+        monkeypatch.setattr('app.api.receptores.get_facturador_credentials', lambda _f: (b'cert', b'key'))
+        monkeypatch.setattr('arca_integration.ArcaClient', _FakeClient)
+
+        for _ in range(2):
+            response = client.post('/api/receptores/consultar-cuit', headers=auth_headers, json={'cuit': '30-55555555-5'})
+            assert response.status_code == 200
+            assert response.get_json()['data']['razon_social'] == 'Cliente SA'
+
+        assert consultas == ['30555555555']
+
+
+class _SilentProgress:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def update(self, *args, **kwargs):
+        return False
+
+
+class TestEnriquecerReceptores:
+    def test_fills_missing_fields_without_overwriting(self, db, facturador, tenant, monkeypatch):
+        facturador.cert_encrypted = b'cert'
+        facturador.key_encrypted = b'key'
+        completo = Receptor(tenant_id=tenant.id, doc_tipo=80, doc_nro='30666666666', razon_social='Seis del CSV', condicion_iva_id=6)
+        incompleto = Receptor(tenant_id=tenant.id, doc_tipo=80, doc_nro='30777777777', razon_social='CUIT 30777777777')
+        ausente = Receptor(tenant_id=tenant.id, doc_tipo=80, doc_nro='30888888888', razon_social='CUIT 30888888888')
+        db.session.add_all([completo, incompleto, ausente])
+        db.session.commit()
+
+        fake = _FakePadronClient({
+            '30666666666': {'razon_social': 'Seis SA', 'condicion_iva': 'IVA Responsable Inscripto', 'direccion': 'Calle 6'},
+            '30777777777': {'razon_social': 'Siete SA', 'condicion_iva': 'Responsable Monotributo', 'direccion': 'Calle 7'},
+        })
+        monkeypatch.setattr('arca_integration.ArcaClient', lambda **kwargs: fake)
+        monkeypatch.setattr('app.tasks.receptores.get_facturador_credentials', lambda _f: (b'cert', b'key'))
+        monkeypatch.setattr('app.tasks.receptores.ProgressReporter', _SilentProgress)
+
+        result = enriquecer_receptores_padron.run(
+            tenant.id, [completo.id, incompleto.id, ausente.id], facturador.id,
+        )
+
+        assert result['enriquecidos'] == 2
+        assert result['no_encontrados'] == 1
+        db.session.expire_all()
+        completo = db.session.get(Receptor, completo.id)
+        incompleto = db.session.get(Receptor, incompleto.id)
+        assert (completo.razon_social, completo.condicion_iva_id, completo.direccion) == ('Seis del CSV', 6, 'Calle 6')
+        assert (incompleto.razon_social, incompleto.condicion_iva_id, incompleto.direccion) == ('Siete SA', 6, 'Calle 7')
+        assert db.session.get(Receptor, ausente.id).direccion is None
+
+    def test_import_enqueues_enrichment(self, client, auth_headers, facturador, db, monkeypatch):
+        facturador.cert_encrypted = b'cert'
+        db.session.commit()
+        encolados = []
+
+        class _Task:
+            id = 'task-1'
+
+        def _delay(*args):
+            encolados.append(args)
+            return _Task()
+
+        monkeypatch.setattr('app.tasks.receptores.enriquecer_receptores_padron.delay', _delay)
+        csv_content = "cuit,razon_social\n30-99999999-9,CUIT 30999999999\n"
+
+        response = client.post(
+            '/api/receptores/import',
+            headers=auth_headers,
+            data={'file': (io.BytesIO(csv_content.encode('utf-8')), 'receptores.csv'), 'enriquecer': 'true'},
+            content_type='multipart/form-data',
+        )
+
+        assert response.status_code == 200
+        assert response.get_json()['enriquecimiento'] == {'total': 1, 'task_id': 'task-1'}
+        assert encolados[0][2] == str(facturador.id)
+
+    def test_import_rejects_invalid_facturador_id(self, client, auth_headers, db):
+        csv_content = "cuit,razon_social\n30-99999999-9,CUIT 30999999999\n"
+
+        response = client.post(
+            '/api/receptores/import',
+            headers=auth_headers,
+            data={
+                'file': (io.BytesIO(csv_content.encode('utf-8')), 'receptores.csv'),
+                'enriquecer': 'true',
+                'facturador_id': 'no-es-uuid',
+            },
+            content_type='multipart/form-data',
+        )
+
+        assert response.status_code == 400
+        assert Receptor.query.count() == 0
@@ -0,0 +1,185 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+import redis
+
+from app.models import Factura, Lote
+from app.services import parametros_arca
+from app.services.parametros_arca import invalidar_parametros, obtener_cotizacion, obtener_parametro
+from app.tasks.facturacion import _construir_request_factura, procesar_lote
+
+
+class _FakeParamClient:
+    llamadas = []
+    ptos_venta = []
+
+    def __init__(self, *args, cuit='20123456789', ambiente='testing', **kwargs):
+        self.cuit = cuit
+        self.ambiente = ambiente
+        self.wsfe = object()
+
+    def fe_param_get_tipos_cbte(self):
+        _FakeParamClient.llamadas.append('tipos_cbte')
+        return [{'id': 11, 'desc': 'Factura C', 'fch_desde': '2010-09-17', 'fch_hasta': None}]
+
+    def fe_param_get_cotizacion(self, mon_id):
+        _FakeParamClient.llamadas.append(('cotizacion', mon_id))
+        return {'mon_id': mon_id, 'mon_cotiz': 1050.25, 'fch_cotiz': '2026-02-10'}
+
+    def fe_param_get_ptos_venta(self):
+        _FakeParamClient.llamadas.append('ptos_venta')
+        return _FakeParamClient.ptos_venta
+
+    def fe_comp_ultimo_autorizado(self, punto_venta, tipo_cbte):
+        return 0
+
+    def fe_comp_consultar(self, tipo_cbte, punto_venta, numero):
+        return {'encontrado': False}
+
+
+class _SilentProgress:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def update(self, *args, **kwargs):
+        return False
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self):
+        return _FakePipeline(self)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = (value, ttl)
+
+
+class _FakePipeline:
+    def __init__(self, store):
+        self.store = store
+        self.ops = []
+
+    def get(self, key):
+        self.ops.append(('get', key))
+
+    def ttl(self, key):
+        self.ops.append(('ttl', key))
+
+    def execute(self):
+        results = []
+        for op, key in self.ops:
+            value, ttl = self.store.data.get(key, (None, -2))
+            results.append(value if op == 'get' else ttl)
+        return results
+
+
+@pytest.fixture(autouse=True)
+def _cache_limpio():
+    _FakeParamClient.llamadas = []
+    _FakeParamClient.ptos_venta = []
+    invalidar_parametros()
+    yield
+    invalidar_parametros()
+
+
+def _sin_redis():
+    raise redis.ConnectionError('sin redis')
+
+
+class TestObtenerParametro:
+    def test_memory_cache_avoids_second_soap_call(self, app, monkeypatch):
+        monkeypatch.setattr(parametros_arca, 'get_redis', _sin_redis)
+        client = _FakeParamClient()
+
+        with app.app_context():
+            primero = obtener_parametro(client, 'tipos_cbte')
+            segundo = obtener_parametro(client, 'tipos_cbte')
+
+        assert primero == segundo
+        assert _FakeParamClient.llamadas == ['tipos_cbte']
+
+    def test_redis_shares_values_between_processes(self, app, monkeypatch):
+        fake_redis = _FakeRedis()
+        monkeypatch.setattr(parametros_arca, 'get_redis', lambda: fake_redis)
+        client = _FakeParamClient()
+
+        with app.app_context():
+            assert obtener_cotizacion(client, 'DOL') == Decimal('1050.25')
+            # Otro proceso: memoria vacía, Redis con el valor.
+            invalidar_parametros()
+            assert obtener_cotizacion(client, 'DOL') == Decimal('1050.25')
+
+        assert _FakeParamClient.llamadas == [('cotizacion', 'DOL')]
+        assert fake_redis.data['arca:param:cotizacion:testing:DOL'][1] == app.config['PARAMETROS_ARCA_COTIZACION_TTL_SECONDS']
+
+    def test_ptos_venta_are_scoped_by_cuit(self, app, monkeypatch):
+        monkeypatch.setattr(parametros_arca, 'get_redis', _sin_redis)
+
+        with app.app_context():
+            obtener_parametro(_FakeParamClient(cuit='20111111112'), 'ptos_venta')
+            obtener_parametro(_FakeParamClient(cuit='20222222223'), 'ptos_venta')
+
+        assert _FakeParamClient.llamadas == ['ptos_venta', 'ptos_venta']
+
+
+class TestEmisionConParametros:
+    def test_foreign_currency_uses_cached_quote(self, app, db, facturador, receptor, monkeypatch):
+        monkeypatch.setattr(parametros_arca, 'get_redis', _sin_redis)
+        factura = Factura(
+            tenant_id=facturador.tenant_id,
+            facturador_id=facturador.id,
+            receptor=receptor,
+            tipo_comprobante=11,
+            concepto=1,
+            punto_venta=1,
+            fecha_emision=date(2026, 2, 10),
+            importe_neto=Decimal('10.00'),
+            importe_iva=Decimal('0'),
+            importe_total=Decimal('10.00'),
+            moneda='DOL',
+            cotizacion=Decimal('1'),
+        )
+
+        request_data = _construir_request_factura(_FakeParamClient(), factura, 1)
+
+        det = request_data['FeCAEReq']['FeDetReq']['FECAEDetRequest'][0]
+        assert det['MonId'] == 'DOL'
+        assert Decimal(str(det['MonCotiz'])) == Decimal('1050.25')
+        assert factura.cotizacion == Decimal('1050.25')
+
+    def test_lote_skips_disabled_punto_venta(self, db, facturador, receptor, monkeypatch):
+        monkeypatch.setattr(parametros_arca, 'get_redis', _sin_redis)
+        monkeypatch.setattr('arca_integration.ArcaClient', _FakeParamClient)
+        monkeypatch.setattr('app.tasks.facturacion.get_facturador_credentials', lambda _f: (b'cert', b'key'))
+        monkeypatch.setattr('app.tasks.facturacion.ProgressReporter', _SilentProgress)
+        _FakeParamClient.ptos_venta = [{'nro': 1, 'emision_tipo': 'CAE', 'bloqueado': True, 'fch_baja': None}]
+
+        facturador.cert_encrypted = b'cert'
+        facturador.key_encrypted = b'key'
+        lote = Lote(tenant_id=facturador.tenant_id, etiqueta='Lote PV', tipo='factura', estado='pendiente')
+        db.session.add(lote)
+        db.session.flush()
+        db.session.add(Factura(
+            tenant_id=facturador.tenant_id,
+            lote_id=lote.id,
+            facturador_id=facturador.id,
+            receptor_id=receptor.id,
+            tipo_comprobante=11,
+            concepto=1,
+            punto_venta=1,
+            fecha_emision=date(2026, 2, 10),
+            importe_neto=Decimal('10.00'),
+            importe_total=Decimal('10.00'),
+            estado='pendiente',
+        ))
+        db.session.commit()
+
+        result = procesar_lote.run(lote.id, lote.tenant_id)
+
+        assert result['errors'] == 1
+        factura = Factura.query.filter_by(lote_id=lote.id).one()
+        assert factura.estado == 'error'
+        assert factura.error_codigo == 'punto_venta_inhabilitado'
@@ -0,0 +1,102 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.models import Factura, FacturaItem
+from app.services.particiones import asegurar_particiones, factura_particionada
+from app.tasks.particiones import crear_particiones_factura
+
+
+@pytest.fixture
+def factura(db, facturador, receptor):
+    factura = Factura(
+        tenant_id=facturador.tenant_id,
+        facturador_id=facturador.id,
+        receptor_id=receptor.id,
+        tipo_comprobante=11,
+        concepto=1,
+        punto_venta=1,
+        fecha_emision=date(2026, 3, 15),
+        importe_neto=Decimal('100.00'),
+        importe_iva=Decimal('0'),
+        importe_total=Decimal('100.00'),
+        estado='pendiente',
+    )
+    db.session.add(factura)
+    db.session.commit()
+    return factura
+
+
+def _item(**kwargs):
+    return FacturaItem(descripcion='Servicio', cantidad=Decimal('1'), precio_unitario=Decimal('100'),
+                       subtotal=Decimal('100'), **kwargs)
+
+
+class TestFechaEmisionItem:
+    def test_desde_la_relacion(self, db, factura):
+        factura.items.append(_item())
+        db.session.commit()
+
+        assert factura.items[0].fecha_emision == date(2026, 3, 15)
+
+    def test_desde_la_factura_en_sesion_con_fecha_nueva(self, db, factura):
+        factura.fecha_emision = date(2026, 4, 1)
+        item = _item(factura_id=factura.id)
+        db.session.add(item)
+        db.session.commit()
+
+        assert item.fecha_emision == date(2026, 4, 1)
+
+    def test_desde_la_base(self, db, factura):
+        factura_id = factura.id
+        db.session.expunge_all()
+        item = _item(factura_id=factura_id)
+        db.session.add(item)
+        db.session.commit()
+
+        assert item.fecha_emision == date(2026, 3, 15)
+
+
+class TestParticiones:
+    def test_sin_postgres_no_hace_nada(self, app, db):
+        assert factura_particionada() is False
+        assert asegurar_particiones(meses_adelante=3) == []
+        assert crear_particiones_factura.run() == {'creadas': []}
+
+
+class TestModelosParticionados:
+    def test_pk_incluye_la_clave_de_particion(self):
+        assert [c.name for c in Factura.__table__.primary_key] == ['id', 'fecha_emision']
+        assert [c.name for c in FacturaItem.__table__.primary_key] == ['id', 'fecha_emision']
+
+    def test_solo_factura_item_tiene_fk_a_factura(self, db):
+        con_fk = sorted(
+            tabla.name for tabla in db.metadata.sorted_tables
+            if any(fk.column.table.name == 'factura' for fk in tabla.foreign_keys)
+        )
+        assert con_fk == ['factura_item']
+
+    def test_payload_se_borra_con_la_factura(self, db, factura):
+        from app.models import FacturaPayload
+
+        factura.comprobante_html = '<html></html>'
+        db.session.commit()
+        db.session.delete(factura)
+        db.session.commit()
+
+        assert FacturaPayload.query.count() == 0
+
+    def test_indices_de_la_migracion_estan_en_el_modelo(self):
+        import importlib.util
+        from pathlib import Path
+
+        ruta = Path(__file__).resolve().parents[1] / 'migrations/versions/f1c9e4a7b3d6_partition_factura_by_fecha_emision.py'
+        spec = importlib.util.spec_from_file_location('migracion_particiones', ruta)
+        migracion = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migracion)
+
+        for tabla, indices in ((Factura.__table__, migracion.INDICES_FACTURA),
+                               (FacturaItem.__table__, migracion.INDICES_ITEM)):
+            declarados = {indice.name: f"({', '.join(c.name for c in indice.columns)})" for indice in tabla.indexes}
+            assert {nombre: declarados.get(nombre) for nombre in indices} == indices
@@ -0,0 +1,203 @@
+import json
+import time
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+
+import pytest
+import redis
+
+from app.models import Lote
+from app.services import planificador
+from app.services.planificador import (
+    CLAVE_DIFERIDOS,
+    CLAVE_EN_CURSO,
+    TURNO_TTL_SECONDS,
+    LugarTurno,
+    _agregar_turno,
+    despachar,
+    encolar_lote,
+    terminar_turno,
+)
+
+
+class _RedisFalso:
+    def __init__(self):
+        self.listas = {}
+        self.conjuntos = {}
+        self.hashes = {}
+        self.zsets = {}
+
+    def lock(self, *_args, **_kwargs):
+        return nullcontext()
+
+    def rpush(self, clave, valor):
+        self.listas.setdefault(clave, []).append(valor)
+
+    def lpop(self, clave):
+        lista = self.listas.get(clave) or []
+        return lista.pop(0) if lista else None
+
+    def lindex(self, clave, indice):
+        lista = self.listas.get(clave) or []
+        return lista[indice] if len(lista) > indice else None
+
+    def llen(self, clave):
+        return len(self.listas.get(clave) or [])
+
+    def sadd(self, clave, valor):
+        conjunto = self.conjuntos.setdefault(clave, set())
+        nuevo = valor not in conjunto
+        conjunto.add(valor)
+        return int(nuevo)
+
+    def srem(self, clave, valor):
+        self.conjuntos.get(clave, set()).discard(valor)
+
+    def hget(self, clave, campo):
+        return self.hashes.get(clave, {}).get(campo)
+
+    def hset(self, clave, campo, valor):
+        self.hashes.setdefault(clave, {})[campo] = str(valor)
+
+    def hdel(self, clave, campo):
+        self.hashes.get(clave, {}).pop(campo, None)
+
+    def zadd(self, clave, valores, xx=False):
+        zset = self.zsets.setdefault(clave, {})
+        zset.update({m: score for m, score in valores.items() if not xx or m in zset})
+
+    def zrangebyscore(self, clave, minimo, maximo):
+        zset = self.zsets.get(clave, {})
+        return sorted((m for m, score in zset.items() if score <= maximo), key=zset.get)
+
+    def zrem(self, clave, miembro):
+        self.zsets.get(clave, {}).pop(miembro, None)
+
+    def zcard(self, clave):
+        return len(self.zsets.get(clave, {}))
+
+    def zremrangebyscore(self, clave, minimo, maximo):
+        zset = self.zsets.get(clave, {})
+        for miembro in [m for m, score in zset.items() if score <= maximo]:
+            del zset[miembro]
+
+
+@pytest.fixture
+def redis_falso(monkeypatch):
+    falso = _RedisFalso()
+    monkeypatch.setattr(planificador, 'get_redis', lambda: falso)
+    return falso
+
+
+@pytest.fixture
+def despachados(monkeypatch):
+    despachados = []
+    monkeypatch.setattr(
+        'app.tasks.facturacion.procesar_lote.apply_async',
+        lambda **kwargs: despachados.append(kwargs['task_id']),
+    )
+    return despachados
+
+
+@pytest.fixture
+def habilitado(app, db, monkeypatch):
+    monkeypatch.setitem(app.config, 'FACTURACION_PLANIFICADOR_HABILITADO', True)
+    monkeypatch.setitem(app.config, 'FACTURACION_FACTURAS_POR_TURNO', 100)
+
+
+def _turno(tenant_id, task_id, costo=100):
+    return json.dumps({'args': ['lote', tenant_id], 'task_id': task_id, 'costo': costo, 'continuacion': True})
+
+
+@pytest.mark.usefixtures('habilitado')
+class TestPlanificador:
+    def test_lote_chico_no_espera_al_lote_grande(self, app, monkeypatch, redis_falso, despachados):
+        monkeypatch.setitem(app.config, 'FACTURACION_TURNOS_SIMULTANEOS', 1)
+        for task_id in ('a1', 'a2', 'a3'):
+            _agregar_turno(redis_falso, 'A', _turno('A', task_id))
+        despachar()
+        _agregar_turno(redis_falso, 'B', _turno('B', 'b1', costo=10))
+        despachar()
+
+        assert despachados == ['a1']
+        for task_id in ('a1', 'b1', 'a2'):
+            terminar_turno(task_id)
+
+        assert despachados == ['a1', 'b1', 'a2', 'a3']
+
+    def test_pesos_reparten_turnos_por_vuelta(self, app, monkeypatch, redis_falso, despachados):
+        monkeypatch.setitem(app.config, 'FACTURACION_TURNOS_SIMULTANEOS', 10)
+        monkeypatch.setitem(app.config, 'FACTURACION_PESOS_TENANT', 'A:2')
+        for tenant_id in ('A', 'B'):
+            for n in range(1, 5):
+                _agregar_turno(redis_falso, tenant_id, _turno(tenant_id, f'{tenant_id.lower()}{n}'))
+
+        despachar()
+
+        assert despachados == ['a1', 'a2', 'b1', 'a3', 'a4', 'b2', 'b3', 'b4']
+        assert redis_falso.zcard(CLAVE_EN_CURSO) == 8
+        assert redis_falso.listas['planificador:anillo'] == []
+
+    def test_lugar_vencido_se_libera(self, app, monkeypatch, redis_falso, despachados):
+        monkeypatch.setitem(app.config, 'FACTURACION_TURNOS_SIMULTANEOS', 1)
+        _agregar_turno(redis_falso, 'A', _turno('A', 'a1'))
+        _agregar_turno(redis_falso, 'A', _turno('A', 'a2'))
+        despachar()
+        redis_falso.zsets[CLAVE_EN_CURSO]['a1'] = 0  # el worker murió
+
+        despachar()
+
+        assert despachados == ['a1', 'a2']
+
+    def test_encolar_lote_despacha_y_guarda_el_task_id(self, db, tenant, redis_falso, despachados):
+        lote = Lote(tenant_id=tenant.id, etiqueta='Lote', tipo='factura', estado='procesando')
+        db.session.add(lote)
+        db.session.commit()
+
+        task_id = encolar_lote(lote)
+
+        assert despachados == [task_id]
+        assert db.session.get(Lote, lote.id).celery_task_id == task_id
+
+    def test_sin_redis_encola_directo_en_celery(self, db, tenant, monkeypatch, despachados):
+        def sin_redis():
+            raise redis.ConnectionError('sin redis')
+
+        monkeypatch.setattr(planificador, 'get_redis', sin_redis)
+        lote = Lote(tenant_id=tenant.id, etiqueta='Lote', tipo='factura', estado='procesando')
+        db.session.add(lote)
+        db.session.commit()
+
+        task_id = encolar_lote(lote, continuacion=True)
+
+        assert despachados == [task_id]
+
+    def test_reintento_diferido_espera_en_el_planificador(self, db, tenant, redis_falso, despachados):
+        lote = Lote(tenant_id=tenant.id, etiqueta='Lote', tipo='factura', estado='procesando')
+        db.session.add(lote)
+        db.session.commit()
+
+        task_id = encolar_lote(lote, continuacion=True, no_antes_de=datetime.utcnow() + timedelta(minutes=5))
+
+        assert despachados == []
+        assert db.session.get(Lote, lote.id).celery_task_id == task_id
+        miembro, = redis_falso.zsets[CLAVE_DIFERIDOS]
+        redis_falso.zsets[CLAVE_DIFERIDOS][miembro] = 0  # llegó la hora
+
+        despachar()
+
+        assert despachados == [task_id]
+        assert redis_falso.zsets[CLAVE_DIFERIDOS] == {}
+
+    def test_lugar_del_turno_se_renueva_mientras_corre(self, redis_falso, monkeypatch):
+        redis_falso.zadd(CLAVE_EN_CURSO, {'a1': 0})
+        lugar = LugarTurno('a1')
+        lugar.renovar()
+        assert redis_falso.zsets[CLAVE_EN_CURSO]['a1'] == 0  # todavía no toca
+
+        monkeypatch.setattr(planificador, 'TURNO_RENOVACION_SECONDS', 0)
+        lugar.renovar()
+        assert redis_falso.zsets[CLAVE_EN_CURSO]['a1'] > time.time() + TURNO_TTL_SECONDS - 5
+
+        LugarTurno('vencido').renovar()
+        assert 'vencido' not in redis_falso.zsets[CLAVE_EN_CURSO]
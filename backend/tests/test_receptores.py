@@ -321,7 +321,7 @@ class TestConsultarCuit:
                     }
                 }
 
-        monkeypatch.setattr('app.api.receptores.decrypt_certificate', lambda _value: b'decrypted')
+        monkeypatch.setattr('app.api.receptores.get_facturador_credentials', lambda _facturador: (b'decrypted', b'decrypted'))
         monkeypatch.setattr('arca_integration.ArcaClient', _FakeClient)
 
         response = client.post('/api/receptores/consultar-cuit', headers=auth_headers, json={'cuit': '30-12345678-9'})
@@ -344,7 +344,7 @@ class TestConsultarCuit:
             def consultar_padron(self, cuit):
                 return {'success': False, 'error': 'Persona no encontrada'}
 
-        monkeypatch.setattr('app.api.receptores.decrypt_certificate', lambda _value: b'decrypted')
+        monkeypatch.setattr('app.api.receptores.get_facturador_credentials', lambda _facturador: (b'decrypted', b'decrypted'))
         monkeypatch.setattr('arca_integration.ArcaClient', _FakeClient)
 
         response = client.post('/api/receptores/consultar-cuit', headers=auth_headers, json={'cuit': '30-99999999-9'})
@@ -0,0 +1,334 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from arca_integration.exceptions import ArcaNetworkError
+
+from app.models import Factura, FacturaArcaIntercambio, Receptor
+from app.services.autorizaciones import registrar_autorizacion, registrar_emision_en_curso
+from app.tasks.reconciliacion import importar_comprobantes_externos, reconciliar_facturas
+
+
+class _SilentProgress:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def update(self, *args, **kwargs):
+        return False
+
+
+class _FakeArcaClient:
+    comprobantes = {}
+    ultimo = 15
+
+    def __init__(self, *args, **kwargs):
+        self.wsfe = object()
+
+    def fe_comp_ultimo_autorizado(self, punto_venta, tipo_cbte):
+        return _FakeArcaClient.ultimo
+
+    def fe_comp_consultar(self, tipo_cbte, punto_venta, numero):
+        comprobante = _FakeArcaClient.comprobantes.get(numero)
+        if isinstance(comprobante, Exception):
+            raise comprobante
+        if comprobante is None:
+            return {'encontrado': False}
+        return {'encontrado': True, **comprobante}
+
+
+@pytest.fixture
+def facturas_autorizadas(db, facturador, receptor, monkeypatch):
+    facturador.cert_encrypted = b'cert'
+    facturador.key_encrypted = b'key'
+
+    facturas = []
+    for numero in (10, 11, 12, 14, 15):
+        factura = Factura(
+            tenant_id=facturador.tenant_id,
+            facturador_id=facturador.id,
+            receptor_id=receptor.id,
+            tipo_comprobante=11,
+            concepto=1,
+            punto_venta=facturador.punto_venta,
+            numero_comprobante=numero,
+            fecha_emision=date(2026, 2, 1),
+            importe_neto=Decimal('100.00'),
+            importe_iva=Decimal('0'),
+            importe_total=Decimal('100.00'),
+            estado='autorizado',
+            cae=f'7000000000{numero:04d}',
+        )
+        db.session.add(factura)
+        facturas.append(factura)
+    db.session.commit()
+
+    _FakeArcaClient.ultimo = 15
+    _FakeArcaClient.comprobantes = {
+        numero: {'cae': f'7000000000{numero:04d}', 'imp_total': 100.0, 'fecha_cbte': '20260201'}
+        for numero in (10, 11, 12, 14, 15)
+    }
+    monkeypatch.setattr('arca_integration.ArcaClient', _FakeArcaClient)
+    monkeypatch.setattr('app.tasks.reconciliacion.ProgressReporter', _SilentProgress)
+    monkeypatch.setattr(
+        'app.tasks.reconciliacion.get_facturador_credentials',
+        lambda _facturador: (b'cert', b'key'),
+    )
+    return facturas
+
+
+class TestReconciliarFacturas:
+    def test_reports_mismatches_missing_and_errors(self, db, facturador, facturas_autorizadas):
+        _FakeArcaClient.comprobantes[11] = {'cae': '79999999999999', 'imp_total': 90.0, 'fecha_cbte': '20260201'}
+        del _FakeArcaClient.comprobantes[12]
+        _FakeArcaClient.comprobantes[15] = ArcaNetworkError('timeout')
+
+        result = reconciliar_facturas.run(facturador.tenant_id, facturador_id=facturador.id)
+
+        assert result['total'] == 5
+        assert result['processed'] == 5
+        assert result['ok'] == 2
+
+        assert len(result['diferencias']) == 1
+        diferencia = result['diferencias'][0]
+        assert diferencia['numero_comprobante'] == 11
+        assert {d['campo'] for d in diferencia['diferencias']} == {'cae', 'importe_total'}
+
+        assert [r['numero_comprobante'] for r in result['no_encontradas']] == [12]
+        assert [r['numero_comprobante'] for r in result['errores']] == [15]
+        assert result['numeros_faltantes'] == [{
+            'facturador_id': str(facturador.id),
+            'punto_venta': facturador.punto_venta,
+            'tipo_comprobante': 11,
+            'numeros': [13],
+        }]
+
+    def test_date_range_filters_facturas(self, db, facturador, facturas_autorizadas):
+        facturas_autorizadas[0].fecha_emision = date(2026, 3, 1)
+        db.session.commit()
+
+        result = reconciliar_facturas.run(
+            facturador.tenant_id,
+            fecha_desde='2026-03-01',
+            fecha_hasta='2026-03-31',
+        )
+
+        assert result['total'] == 1
+        assert result['diferencias'][0]['diferencias'] == [
+            {'campo': 'fecha_emision', 'local': '2026-03-01', 'arca': '2026-02-01'}
+        ]
+
+
+def _comprobante_externo(numero, doc_tipo=80, doc_nro=30111111111):
+    return {
+        'tipo_cbte': 11,
+        'punto_venta': 1,
+        'concepto': 1,
+        'doc_tipo': doc_tipo,
+        'doc_nro': doc_nro,
+        'fecha_cbte': '20260210',
+        'imp_total': 250.5,
+        'imp_neto': 250.5,
+        'imp_iva': 0,
+        'mon_id': 'PES',
+        'mon_cotiz': 1,
+        'cae': f'8000000000{numero:04d}',
+        'cae_vto': '20260220',
+        'resultado': 'A',
+    }
+
+
+class TestImportarComprobantesExternos:
+    def test_imports_numbers_above_highest_known(self, db, facturador, receptor, facturas_autorizadas):
+        _FakeArcaClient.ultimo = 19
+        _FakeArcaClient.comprobantes.update({
+            16: _comprobante_externo(16),
+            17: _comprobante_externo(17, doc_nro=20999999990),
+            19: _comprobante_externo(19, doc_tipo=99, doc_nro=0),
+        })
+
+        # 18 quedó en curso desde este sistema: no debe importarse como externo.
+        en_curso = Factura(
+            tenant_id=facturador.tenant_id,
+            facturador_id=facturador.id,
+            receptor_id=receptor.id,
+            tipo_comprobante=11,
+            concepto=1,
+            punto_venta=facturador.punto_venta,
+            fecha_emision=date(2026, 2, 10),
+            importe_neto=Decimal('1.00'),
+            importe_total=Decimal('1.00'),
+            estado='pendiente',
+        )
+        db.session.add(en_curso)
+        db.session.commit()
+        registrar_emision_en_curso(en_curso, 18, {
+            'FeCAEReq': {'FeDetReq': {'FECAEDetRequest': [{
+                'DocTipo': 80, 'DocNro': '30111111111', 'CbteFch': '20260210', 'ImpTotal': 1.0,
+            }]}}
+        })
+
+        result = importar_comprobantes_externos.run(facturador.tenant_id, facturador.id, 11)
+
+        # 13 es un hueco propio: se consulta, pero ARCA no lo tiene.
+        assert result['total'] == 4
+        assert result['importados'] == 3
+        assert result['mayor_conocido'] == 15
+        assert result['no_encontrados'] == [13]
+
+        externas = Factura.query.filter_by(origen='externo').order_by(Factura.numero_comprobante).all()
+        assert [f.numero_comprobante for f in externas] == [16, 17, 19]
+        assert all(f.estado == 'autorizado' for f in externas)
+        assert externas[0].receptor_id == receptor.id
+        assert externas[0].importe_total == Decimal('250.50')
+        assert externas[0].cae_vencimiento == date(2026, 2, 20)
+
+        nuevo = Receptor.query.filter_by(doc_nro='20999999990').one()
+        assert externas[1].receptor_id == nuevo.id
+        assert Receptor.query.filter_by(doc_nro='0').one().doc_tipo == 99
+
+        intercambios = FacturaArcaIntercambio.query.filter_by(factura_id=externas[0].id).all()
+        assert [i.operacion for i in intercambios] == ['FECompConsultar']
+
+    def test_nothing_to_import_when_up_to_date(self, db, facturador, facturas_autorizadas):
+        facturas_autorizadas[0].numero_comprobante = 13  # sin huecos: 11..15
+        db.session.commit()
+
+        result = importar_comprobantes_externos.run(facturador.tenant_id, facturador.id, 11)
+
+        assert result['total'] == 0
+        assert result['importados'] == 0
+
+    def test_failed_number_is_retried_after_higher_ones_are_imported(self, db, facturador, facturas_autorizadas):
+        _FakeArcaClient.ultimo = 17
+        _FakeArcaClient.comprobantes.update({
+            13: _comprobante_externo(13),
+            16: ArcaNetworkError('timeout'),
+            17: _comprobante_externo(17),
+        })
+
+        primera = importar_comprobantes_externos.run(facturador.tenant_id, facturador.id, 11)
+        _FakeArcaClient.comprobantes[16] = _comprobante_externo(16)
+        segunda = importar_comprobantes_externos.run(facturador.tenant_id, facturador.id, 11)
+
+        assert [e['numero_comprobante'] for e in primera['errores']] == [16]
+        assert primera['importados'] == 2
+        assert segunda['total'] == 1
+        assert segunda['importados'] == 1
+        externas = Factura.query.filter_by(origen='externo').order_by(Factura.numero_comprobante).all()
+        assert [f.numero_comprobante for f in externas] == [13, 16, 17]
+
+    def test_skips_numbers_authorized_by_this_system_meanwhile(
+        self, db, facturador, receptor, facturas_autorizadas, monkeypatch
+    ):
+        propia = Factura(
+            tenant_id=facturador.tenant_id,
+            facturador_id=facturador.id,
+            receptor_id=receptor.id,
+            tipo_comprobante=11,
+            concepto=1,
+            punto_venta=facturador.punto_venta,
+            fecha_emision=date(2026, 2, 10),
+            importe_neto=Decimal('1.00'),
+            importe_total=Decimal('1.00'),
+            estado='pendiente',
+        )
+        db.session.add(propia)
+        db.session.commit()
+        _FakeArcaClient.ultimo = 16
+        _FakeArcaClient.comprobantes[16] = _comprobante_externo(16)
+        consultar = _FakeArcaClient.fe_comp_consultar
+
+        def consultar_mientras_emite(client, tipo_cbte, punto_venta, numero):
+            # procesar_lote obtiene el CAE del 16 después de la foto inicial.
+            if numero == 16:
+                registrar_autorizacion(propia, '80000000000016', '20260220', 16)
+            return consultar(client, tipo_cbte, punto_venta, numero)
+
+        monkeypatch.setattr(_FakeArcaClient, 'fe_comp_consultar', consultar_mientras_emite)
+
+        result = importar_comprobantes_externos.run(facturador.tenant_id, facturador.id, 11)
+
+        assert result['importados'] == 0
+        assert Factura.query.filter_by(origen='externo').count() == 0
+
+    def test_receptor_must_match_doc_tipo_and_fecha_is_required(self, db, facturador, receptor, facturas_autorizadas):
+        _FakeArcaClient.ultimo = 17
+        sin_fecha = _comprobante_externo(17)
+        sin_fecha['fecha_cbte'] = None
+        _FakeArcaClient.comprobantes.update({
+            16: _comprobante_externo(16, doc_tipo=86, doc_nro=int(receptor.doc_nro)),
+            17: sin_fecha,
+        })
+
+        result = importar_comprobantes_externos.run(facturador.tenant_id, facturador.id, 11)
+
+        assert result['importados'] == 0
+        assert [e['numero_comprobante'] for e in result['errores']] == [16, 17]
+        assert Factura.query.filter_by(origen='externo').count() == 0
+
+
+class TestReconciliarEndpoint:
+    def test_requires_scope(self, client, auth_headers):
+        response = client.post('/api/comprobantes/reconciliar', headers=auth_headers, json={})
+        assert response.status_code == 400
+
+    def test_rejects_invalid_date(self, client, auth_headers):
+        response = client.post(
+            '/api/comprobantes/reconciliar',
+            headers=auth_headers,
+            json={'fecha_desde': '01/02/2026'},
+        )
+        assert response.status_code == 400
+
+    def test_starts_task(self, client, auth_headers, facturador, monkeypatch):
+        captured = {}
+
+        class _Task:
+            id = 'task-reconciliacion'
+
+        def _fake_delay(*args, **kwargs):
+            captured['args'] = args
+            captured['kwargs'] = kwargs
+            return _Task()
+
+        monkeypatch.setattr('app.tasks.reconciliacion.reconciliar_facturas.delay', _fake_delay)
+
+        response = client.post(
+            '/api/comprobantes/reconciliar',
+            headers=auth_headers,
+            json={'facturador_id': str(facturador.id), 'fecha_desde': '2026-01-01'},
+        )
+
+        assert response.status_code == 202
+        assert response.get_json()['task_id'] == 'task-reconciliacion'
+        assert captured['kwargs']['facturador_id'] == str(facturador.id)
+        assert captured['kwargs']['fecha_desde'] == '2026-01-01'
+
+    def test_importar_externos_starts_task(self, client, auth_headers, facturador, monkeypatch):
+        facturador.cert_encrypted = b'cert'
+        facturador.key_encrypted = b'key'
+
+        class _Task:
+            id = 'task-importacion'
+
+        monkeypatch.setattr(
+            'app.tasks.reconciliacion.importar_comprobantes_externos.delay',
+            lambda *args, **kwargs: _Task(),
+        )
+
+        response = client.post(
+            '/api/comprobantes/importar-externos',
+            headers=auth_headers,
+            json={'facturador_id': str(facturador.id), 'tipo_comprobante': 11},
+        )
+
+        assert response.status_code == 202
+        assert response.get_json()['task_id'] == 'task-importacion'
+
+    def test_importar_externos_requires_tipo(self, client, auth_headers, facturador):
+        response = client.post(
+            '/api/comprobantes/importar-externos',
+            headers=auth_headers,
+            json={'facturador_id': str(facturador.id)},
+        )
+        assert response.status_code == 400
@@ -0,0 +1,138 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from flask import g
+from sqlalchemy import insert
+
+from app import create_app
+from app.config import TestingConfig
+from app.extensions import db
+from app.models import AuditLog, Tenant, Usuario
+from app.services import replica
+from app.services.replica import leer_de_replica
+
+
+class _RedisFalso:
+    def __init__(self):
+        self.datos = {}
+
+    def get(self, clave):
+        return self.datos.get(clave)
+
+    def setex(self, clave, ttl, valor):
+        self.datos[clave] = valor
+
+
+@pytest.fixture
+def redis_falso(monkeypatch):
+    falso = _RedisFalso()
+    monkeypatch.setattr(replica, 'get_redis', lambda: falso)
+    return falso
+
+
+@pytest.fixture
+def app_replica(tmp_path):
+    """Primaria y réplica en dos archivos SQLite con el mismo esquema."""
+    class ReplicaConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "primaria.db"}'
+        SQLALCHEMY_BINDS = {'replica': f'sqlite:///{tmp_path / "replica.db"}'}
+
+    app = create_app(ReplicaConfig)
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(db.engines['replica'])
+        yield app
+        db.session.remove()
+    # init_app registra una metadata por bind; las demás apps de test no tienen réplica.
+    db.metadatas.pop('replica', None)
+
+
+def _tenant_en(bind, nombre):
+    tenant_id = uuid.uuid4()
+    with db.engines[bind].begin() as conn:
+        conn.execute(insert(Tenant).values(id=tenant_id, nombre=nombre, slug=nombre, activo=True))
+    return tenant_id
+
+
+class TestRoutingSession:
+    def test_lecturas_del_bloque_van_a_la_replica(self, app_replica):
+        _tenant_en(None, 'primaria')
+        _tenant_en('replica', 'replica')
+
+        with leer_de_replica() as usa_replica:
+            dentro = [t.nombre for t in Tenant.query.all()]
+        db.session.rollback()
+        fuera = [t.nombre for t in Tenant.query.all()]
+
+        assert usa_replica is True
+        assert dentro == ['replica']
+        assert fuera == ['primaria']
+
+    def test_for_update_y_lecturas_tras_un_flush_van_a_la_primaria(self, app_replica):
+        _tenant_en(None, 'primaria')
+        _tenant_en('replica', 'replica')
+
+        with leer_de_replica():
+            bloqueados = [t.nombre for t in Tenant.query.with_for_update().all()]
+            db.session.add(Tenant(nombre='nuevo', slug='nuevo', activo=True))
+            db.session.flush()
+            despues = sorted(t.nombre for t in Tenant.query.all())
+
+        assert bloqueados == ['primaria']
+        assert despues == ['nuevo', 'primaria']
+
+    def test_sin_alcanzar_la_posicion_lee_de_la_primaria(self, app_replica):
+        with leer_de_replica('') as usa_replica:
+            pass
+        assert usa_replica is False
+
+
+class TestSoloLectura:
+    @pytest.fixture
+    def usuario(self, app_replica):
+        tenant = Tenant(nombre='Test', slug='test', activo=True)
+        db.session.add(tenant)
+        db.session.flush()
+        usuario = Usuario(tenant_id=tenant.id, email='admin@test.com', nombre='Admin', rol='admin', activo=True)
+        usuario.set_password('test123')
+        db.session.add(usuario)
+        db.session.commit()
+        # "Replicación": el mismo tenant y usuario en la réplica, más un log que la primaria no tiene.
+        with db.engines['replica'].begin() as conn:
+            conn.execute(insert(Tenant).values(id=tenant.id, nombre='Test', slug='test', activo=True))
+            conn.execute(insert(AuditLog).values(id=uuid.uuid4(), tenant_id=tenant.id, accion='solo_en_replica'))
+        return usuario
+
+    @pytest.fixture
+    def headers(self, app_replica, usuario, redis_falso):
+        response = app_replica.test_client().post('/api/auth/login', json={
+            'email': 'admin@test.com',
+            'password': 'test123',
+        })
+        return {'Authorization': f'Bearer {response.get_json()["access_token"]}'}
+
+    def _acciones(self, app_replica, headers):
+        response = app_replica.test_client().get('/api/audit', headers=headers)
+        assert response.status_code == 200
+        return {item['accion'] for item in response.get_json()['items']}
+
+    def test_usuario_que_acaba_de_escribir_lee_de_la_primaria(self, app_replica, headers, usuario, redis_falso):
+        # El login registró el acceso en audit_log: la marca queda en Redis.
+        assert f'replica:escritura:{usuario.id}' in redis_falso.datos
+
+        assert self._acciones(app_replica, headers) == {'login:exitoso'}
+
+    def test_vencida_la_marca_lee_de_la_replica(self, app_replica, headers, redis_falso):
+        redis_falso.datos.clear()
+
+        assert self._acciones(app_replica, headers) == {'solo_en_replica'}
+
+    def test_commit_en_request_marca_al_usuario(self, app_replica, redis_falso):
+        user_id = uuid.uuid4()
+        with app_replica.test_request_context():
+            g.current_user = SimpleNamespace(id=user_id)
+            db.session.add(Tenant(nombre='Otro', slug='otro', activo=True))
+            db.session.commit()
+
+        assert redis_falso.datos == {f'replica:escritura:{user_id}': ''}
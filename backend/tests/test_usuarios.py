@@ -187,6 +187,40 @@ class TestToggleActive:
         assert response.status_code == 400
 
 
+class TestAuthCache:
+    def test_deactivated_user_rejected_after_toggle(self, client, auth_headers, operator_user, operator_headers):
+        assert client.get('/api/dashboard/stats', headers=operator_headers).status_code == 200
+
+        client.post(f'/api/usuarios/{operator_user.id}/toggle-active', headers=auth_headers)
+
+        response = client.get('/api/dashboard/stats', headers=operator_headers)
+        assert response.status_code == 403
+
+    def test_rol_change_applies_immediately(self, client, auth_headers, operator_user, operator_headers):
+        assert client.get('/api/receptores', headers=operator_headers).status_code == 200
+
+        client.put(f'/api/usuarios/{operator_user.id}', headers=auth_headers, json={'rol': 'viewer'})
+
+        response = client.post('/api/receptores', headers=operator_headers, json={
+            'doc_nro': '20111111112',
+            'razon_social': 'Nuevo',
+        })
+        assert response.status_code == 403
+
+    def test_cached_snapshot_skips_db_until_invalidated(self, client, db, operator_user, operator_headers):
+        from app.services.auth_cache import invalidate_user
+
+        assert client.get('/api/dashboard/stats', headers=operator_headers).status_code == 200
+
+        # Cambio directo en DB sin pasar por la API: el snapshot sigue vigente
+        operator_user.activo = False
+        db.session.commit()
+        assert client.get('/api/dashboard/stats', headers=operator_headers).status_code == 200
+
+        invalidate_user(operator_user.id)
+        assert client.get('/api/dashboard/stats', headers=operator_headers).status_code == 403
+
+
 class TestLoginRateLimiting:
     def test_lockout_after_failed_attempts(self, client, admin_user):
         for i in range(5):
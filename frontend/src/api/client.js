@@ -96,6 +96,43 @@ client.interceptors.response.use(
 
 export default client
 
+// Stream SSE de progreso de una tarea. Usa fetch (EventSource no permite
+// enviar el header Authorization). Resuelve al cerrarse el stream y rechaza
+// si el servidor no lo soporta, para que el llamador vuelva al polling.
+async function streamJobStatus(taskId, { signal, onOpen, onEvent }) {
+  const token = useAuthStore.getState().accessToken
+  const response = await fetch(`${API_URL}/api/jobs/${taskId}/stream`, {
+    headers: token ? { Authorization: `Bearer ${token}` } : {},
+    signal,
+  })
+
+  if (!response.ok || !response.body) {
+    throw new Error(`Stream no disponible (${response.status})`)
+  }
+
+  onOpen?.()
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+
+  while (true) {
+    const { value, done } = await reader.read()
+    if (done) break
+
+    buffer += decoder.decode(value, { stream: true })
+    const events = buffer.split('\n\n')
+    buffer = events.pop()
+
+    for (const event of events) {
+      const dataLine = event.split('\n').find((line) => line.startsWith('data: '))
+      if (dataLine) {
+        onEvent?.(JSON.parse(dataLine.slice(6)))
+      }
+    }
+  }
+}
+
 // API functions
 export const api = {
   // Auth
@@ -124,6 +161,8 @@ export const api = {
         headers: { 'Content-Type': 'multipart/form-data' },
       }),
     testConnection: (id) => client.post(`/facturadores/${id}/test-conexion`),
+    caea: (id) => client.get(`/facturadores/${id}/caea`),
+    parametros: (id, tipo, params) => client.get(`/facturadores/${id}/parametros/${tipo}`, { params }),
     consultarCuit: (cuit) => client.post('/facturadores/consultar-cuit', { cuit }),
   },
 
@@ -148,6 +187,7 @@ export const api = {
     update: (id, data) => client.put(`/facturas/${id}`, data),
     create: (data) => client.post('/facturas', data),
     getItems: (id) => client.get(`/facturas/${id}/items`),
+    getArcaHistorial: (id) => client.get(`/facturas/${id}/arca-historial`),
     getComprobanteHtml: (id, params) => client.get(`/facturas/${id}/comprobante-html`, { params }),
     getComprobantePdf: (id, params) =>
       client.get(`/facturas/${id}/comprobante-pdf`, {
@@ -181,12 +221,15 @@ export const api = {
   // Jobs
   jobs: {
     getStatus: (taskId) => client.get(`/jobs/${taskId}/status`),
+    streamStatus: streamJobStatus,
   },
 
   // Comprobantes
   comprobantes: {
     consultar: (data) => client.post('/comprobantes/consultar', data),
     ultimoAutorizado: (data) => client.post('/comprobantes/ultimo-autorizado', data),
+    reconciliar: (data) => client.post('/comprobantes/reconciliar', data),
+    importarExternos: (data) => client.post('/comprobantes/importar-externos', data),
   },
 
   // Usuarios
@@ -1,8 +1,44 @@
-import { useQuery } from '@tanstack/react-query'
+import { useEffect, useState } from 'react'
+import { useQuery, useQueryClient } from '@tanstack/react-query'
 import { api } from '../api/client'
 
+const TERMINAL_STATUSES = ['SUCCESS', 'FAILURE', 'REVOKED']
+
 export function useJobStatus(taskId, options = {}) {
   const { enabled = true, refetchInterval = 2000 } = options
+  const queryClient = useQueryClient()
+  const [streaming, setStreaming] = useState(false)
+  const active = enabled && !!taskId
+
+  // Preferir el stream SSE (reconecta al cerrarse por timeout); si el servidor
+  // no lo soporta, el polling retoma solo.
+  useEffect(() => {
+    if (!active) return undefined
+
+    const controller = new AbortController()
+
+    const run = async () => {
+      while (!controller.signal.aborted) {
+        try {
+          await api.jobs.streamStatus(taskId, {
+            signal: controller.signal,
+            onOpen: () => setStreaming(true),
+            onEvent: (data) => queryClient.setQueryData(['job', taskId], data),
+          })
+        } catch {
+          return
+        } finally {
+          setStreaming(false)
+        }
+
+        const status = queryClient.getQueryData(['job', taskId])?.status
+        if (TERMINAL_STATUSES.includes(status)) return
+      }
+    }
+
+    run()
+    return () => controller.abort()
+  }, [active, taskId, queryClient])
 
   return useQuery({
     queryKey: ['job', taskId],
@@ -10,10 +46,10 @@ export function useJobStatus(taskId, options = {}) {
       const response = await api.jobs.getStatus(taskId)
       return response.data
     },
-    enabled: enabled && !!taskId,
-    refetchInterval: (data) => {
-      // Stop polling when job is complete or failed
-      if (data?.status === 'SUCCESS' || data?.status === 'FAILURE') {
+    enabled: active,
+    refetchInterval: (query) => {
+      // Stop polling when job is complete or failed, or while streaming
+      if (TERMINAL_STATUSES.includes(query.state.data?.status) || streaming) {
         return false
       }
       return refetchInterval
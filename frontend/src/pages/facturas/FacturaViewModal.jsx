@@ -1,3 +1,4 @@
+import { useState } from 'react'
 import { useQuery } from '@tanstack/react-query'
 import { api } from '@/api/client'
 import { Badge, Button, Modal } from '@/components/ui'
@@ -30,7 +31,52 @@ function formatComprobanteSimple(factura) {
   return `${tipo} ${Number(factura.numero_comprobante)}`
 }
 
+function ArcaHistorial({ facturaId }) {
+  const { data, isLoading, isError } = useQuery({
+    queryKey: ['factura-arca-historial', facturaId],
+    queryFn: async () => {
+      const response = await api.facturas.getArcaHistorial(facturaId)
+      return response.data
+    },
+  })
+
+  if (isLoading) {
+    return <p className="text-sm text-text-secondary">Cargando historial...</p>
+  }
+  if (isError) {
+    return <p className="text-sm text-error">No se pudo cargar el historial</p>
+  }
+
+  const intercambios = data?.intercambios || []
+  if (intercambios.length === 0) {
+    return <p className="text-sm text-text-secondary">Sin intercambios registrados</p>
+  }
+
+  return (
+    <div className="space-y-2">
+      {intercambios.map((intercambio) => (
+        <details key={intercambio.id} className="rounded-md border border-border/60 p-2">
+          <summary className="cursor-pointer text-sm text-text-primary">
+            #{intercambio.intento} {intercambio.operacion} · {intercambio.resultado}
+            {intercambio.error_codigo ? ` (${intercambio.error_codigo})` : ''}
+            <span className="ml-2 text-xs text-text-secondary">{formatDate(intercambio.created_at)}</span>
+          </summary>
+          <div className="mt-2 grid grid-cols-1 gap-2 md:grid-cols-2">
+            <pre className="max-h-64 overflow-auto rounded bg-secondary/50 p-2 text-xs">
+              {JSON.stringify(intercambio.request, null, 2)}
+            </pre>
+            <pre className="max-h-64 overflow-auto rounded bg-secondary/50 p-2 text-xs">
+              {JSON.stringify(intercambio.response, null, 2)}
+            </pre>
+          </div>
+        </details>
+      ))}
+    </div>
+  )
+}
+
 function FacturaViewModal({ isOpen, onClose, facturaId }) {
+  const [verHistorial, setVerHistorial] = useState(false)
   const { data, isLoading } = useQuery({
     queryKey: ['factura-detail', facturaId],
     queryFn: async () => {
@@ -172,6 +218,18 @@ function FacturaViewModal({ isOpen, onClose, facturaId }) {
             </div>
           )}
 
+          <div className="rounded-md border border-border p-3">
+            <div className="mb-2 flex items-center justify-between">
+              <p className="text-xs uppercase text-text-muted">Intercambios con ARCA</p>
+              {!verHistorial && (
+                <Button variant="secondary" size="sm" onClick={() => setVerHistorial(true)}>
+                  Ver historial
+                </Button>
+              )}
+            </div>
+            {verHistorial && <ArcaHistorial facturaId={facturaId} />}
+          </div>
+
           <div className="rounded-md border border-border p-3">
             <p className="mb-2 text-xs uppercase text-text-muted">Items del comprobante</p>
             {!factura.items || factura.items.length === 0 ? (
@@ -8,11 +8,15 @@ import { toast } from '@/stores/toastStore'
 function ImportModal({ isOpen, onClose, onSuccess }) {
   const [file, setFile] = useState(null)
   const [errors, setErrors] = useState([])
+  const [enriquecer, setEnriquecer] = useState(true)
 
   const importMutation = useMutation({
     mutationFn: async () => {
       const formData = new FormData()
       formData.append('file', file)
+      if (enriquecer) {
+        formData.append('enriquecer', 'true')
+      }
       return api.receptores.import(formData)
     },
     onSuccess: (response) => {
@@ -31,6 +35,13 @@ function ImportModal({ isOpen, onClose, onSuccess }) {
         )
       }
 
+      if (response.data.enriquecimiento?.task_id) {
+        toast.info(
+          'Completando datos desde padrón',
+          `${response.data.enriquecimiento.total} receptores se completan en segundo plano.`
+        )
+      }
+
       onSuccess?.(response.data)
       if (omitidos === 0) {
         handleClose()
@@ -133,6 +144,14 @@ function ImportModal({ isOpen, onClose, onSuccess }) {
               </>
             )}
           </label>
+          <label className="mt-3 flex items-center gap-2 text-sm text-text-secondary">
+            <input
+              type="checkbox"
+              checked={enriquecer}
+              onChange={(event) => setEnriquecer(event.target.checked)}
+            />
+            Completar condición IVA, razón social y domicilio desde el padrón de ARCA
+          </label>
         </div>
 
         <div>
@@ -0,0 +1,5 @@
+#!/bin/sh
+# Init de la primaria para docker-compose.replica.yml: habilita conexiones de
+# replicación (pg_basebackup / streaming) desde la red interna.
+set -e
+echo "host replication ${POSTGRES_USER} all scram-sha-256" >> "$PGDATA/pg_hba.conf"